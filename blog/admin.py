@@ -1,23 +1,239 @@
-from django.contrib import admin
+from django import forms
+from django.conf import settings
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ActionForm
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.views.main import PAGE_VAR
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
 
-from .models import Comment, Post
+from . import deletion, moderation, spam
+from .models import Comment, DeletionJob, Notification, Post, Tag
+from .paginators import EstimatedCountPaginator
+
+
+class AutocompleteFilter(admin.SimpleListFilter):
+    """
+    Фільтр за ForeignKey з полем автодоповнення замість списку всіх об'єктів.
+    Поле field_name має бути в autocomplete_fields відповідного ModelAdmin.
+    """
+
+    template = "admin/blog/autocomplete_filter.html"
+    field_name = None
+
+    def __init__(self, request, params, model, model_admin):
+        self.field = model._meta.get_field(self.field_name)
+        self.admin_site = model_admin.admin_site
+        super().__init__(request, params, model, model_admin)
+        self.preserved_params = [
+            (name, value)
+            for name, values in request.GET.lists()
+            if name not in (self.parameter_name, "p")
+            for value in values
+        ]
+
+    def value(self):
+        # значення з адресного рядка, що не є ключем пов'язаної моделі, - некоректні параметри
+        # (адмінка перенаправляє на ?e=1), а не помилка БД у filter(pk=...)
+        value = super().value()
+        if value:
+            try:
+                self.field.target_field.to_python(value)
+            except ValidationError as error:
+                raise IncorrectLookupParameters(error) from error
+        return value
+
+    def lookups(self, request, model_admin):
+        # У бічній панелі - лише обраний об'єкт, решта підвантажується через AJAX
+        value = self.value()
+        if not value:
+            return []
+        related = self.field.related_model._default_manager.filter(pk=value).first()
+        return [(value, str(related))] if related else []
+
+    def has_output(self):
+        return True
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(**{self.field.attname: self.value()})
+        return queryset
+
+    @property
+    def widget_html(self):
+        field = forms.ModelChoiceField(
+            queryset=self.field.related_model._default_manager.all(),
+            widget=AutocompleteSelect(self.field, self.admin_site, attrs={"onchange": "this.form.submit()"}),
+            required=False,
+        )
+        return field.widget.render(self.parameter_name, self.value())
+
+
+class AuthorFilter(AutocompleteFilter):
+    title = "Автор"
+    field_name = "author"
+    parameter_name = "author__id__exact"
+
+
+class ModerationActionForm(ActionForm):
+    """Форма дій з полем логіна нового автора для дії передачі постів"""
+
+    target_username = forms.CharField(required=False, label="Новий автор (логін)")
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """
+    Спільні налаштування changelist для таблиць з мільйонами рядків.
+    Дії модерації виконуються set-based UPDATE/DELETE пачками (blog.moderation)
+    над усім відфільтрованим списком, без завантаження об'єктів і сторінки підтвердження.
+    Відфільтрований список рахується до ADMIN_COUNT_LIMIT рядків, повний COUNT(*)
+    таблиці («N з M») - лише з ADMIN_FULL_RESULT_COUNT.
+    """
+
+    paginator = EstimatedCountPaginator
+    show_facets = admin.ShowFacets.NEVER
+    action_form = ModerationActionForm
+    actions = ["hide_selected", "unhide_selected", "reassign_selected", "bulk_delete_selected"]
+
+    def get_actions(self, request):
+        # Стандартна delete_selected завантажує всі об'єкти - замінена на bulk_delete_selected
+        actions = super().get_actions(request)
+        actions.pop("delete_selected", None)
+        return actions
+
+    @property
+    def show_full_result_count(self):
+        return settings.ADMIN_FULL_RESULT_COUNT
+
+    def get_paginator(self, request, queryset, per_page, orphans=0, allow_empty_first_page=True):
+        try:
+            number = max(int(request.GET.get(PAGE_VAR, 1)), 1)
+        except ValueError:
+            number = 1
+        return self.paginator(
+            queryset,
+            per_page,
+            orphans,
+            allow_empty_first_page,
+            number=number,
+            max_count=settings.ADMIN_COUNT_LIMIT,
+        )
+
+    @admin.action(description="Приховати вибрані", permissions=["change"])
+    def hide_selected(self, request, queryset):
+        count = moderation.hide(queryset)
+        self.message_user(request, f"Приховано: {count}", messages.SUCCESS)
+
+    @admin.action(description="Показати вибрані", permissions=["change"])
+    def unhide_selected(self, request, queryset):
+        count = moderation.hide(queryset, hidden=False)
+        self.message_user(request, f"Знову показано: {count}", messages.SUCCESS)
+
+    @admin.action(description="Передати вибрані іншому автору", permissions=["change"])
+    def reassign_selected(self, request, queryset):
+        username = request.POST.get("target_username", "").strip()
+        user = User.objects.filter(username=username).first()
+        if user is None:
+            self.message_user(request, f"Користувача «{username}» не знайдено", messages.ERROR)
+            return
+        count = moderation.reassign(queryset, user)
+        self.message_user(request, f"Передано користувачу {user.username}: {count}", messages.SUCCESS)
+
+    @admin.action(description="Видалити вибрані (масово, без сигналів)", permissions=["delete"])
+    def bulk_delete_selected(self, request, queryset):
+        count = moderation.delete(queryset)
+        self.message_user(request, f"Видалено: {count}", messages.SUCCESS)
+
+    @property
+    def media(self):
+        author_field = self.model._meta.get_field("author")
+        return super().media + AutocompleteSelect(author_field, self.admin_site).media
+
+
+class QueuedDeletionMixin:
+    """
+    Видалення зі сторінки об'єкта через чергу (blog.deletion): сторінка підтвердження
+    не збирає весь граф залежних рядків, а об'єкт лише приховується і видаляється воркером.
+    """
+
+    def get_deleted_objects(self, objs, request):
+        perms_needed = set() if self.has_delete_permission(request) else {self.model._meta.verbose_name}
+        return [str(obj) for obj in objs], {}, perms_needed, []
+
+    def delete_model(self, request, obj):
+        deletion.schedule_deletion(obj, request.user)
+
+    def delete_queryset(self, request, queryset):
+        for obj in queryset:
+            deletion.schedule_deletion(obj, request.user)
 
 
 @admin.register(Post)
-class PostAdmin(admin.ModelAdmin):
-    list_display = ["title", "author", "date_posted"]
-    list_filter = ["date_posted", "author"]
+class PostAdmin(QueuedDeletionMixin, LargeTableAdmin):
+    list_display = ["title", "author", "date_posted", "status", "comment_count", "is_hidden"]
+    list_filter = ["date_posted", "status", "is_hidden", AuthorFilter]
+    list_select_related = ["author"]
     search_fields = ["title", "content"]
     date_hierarchy = "date_posted"
+    autocomplete_fields = ["author"]
 
 
 @admin.register(Comment)
-class CommentAdmin(admin.ModelAdmin):
-    list_display = ["author", "post", "date_posted", "content_preview"]
-    list_filter = ["date_posted", "author"]
+class CommentAdmin(LargeTableAdmin):
+    list_display = ["author", "post", "date_posted", "content_preview", "is_hidden", "spam_score", "review"]
+    # Перевірка: на перевірці - черга коментарів, затриманих моделлю спаму (blog.spam)
+    list_filter = ["review", "date_posted", "is_hidden", AuthorFilter]
+    list_select_related = ["author", "post"]
     search_fields = ["content", "author__username"]
+    autocomplete_fields = ["author", "post"]
+    actions = [*LargeTableAdmin.actions, "mark_not_spam", "mark_spam"]
 
     def content_preview(self, obj):
         return obj.content[:50] + "..." if len(obj.content) > 50 else obj.content
 
     content_preview.short_description = "Зміст"
+
+    @admin.action(description="Не спам (показати і навчати модель)", permissions=["change"])
+    def mark_not_spam(self, request, queryset):
+        count = spam.review(queryset, Comment.Review.APPROVED)
+        self.message_user(request, f"Позначено як не спам: {count}", messages.SUCCESS)
+
+    @admin.action(description="Спам (приховати і навчати модель)", permissions=["change"])
+    def mark_spam(self, request, queryset):
+        count = spam.review(queryset, Comment.Review.SPAM)
+        self.message_user(request, f"Позначено як спам: {count}", messages.SUCCESS)
+
+
+@admin.register(Notification)
+class NotificationAdmin(admin.ModelAdmin):
+    list_display = ["recipient", "post", "comment_count", "updated", "is_read"]
+    list_filter = ["is_read"]
+    list_select_related = ["recipient", "post"]
+    raw_id_fields = ["recipient", "post", "last_comment"]
+
+
+@admin.register(Tag)
+class TagAdmin(admin.ModelAdmin):
+    list_display = ["name", "slug", "post_count"]
+    search_fields = ["name", "slug"]
+    readonly_fields = ["post_count"]
+
+
+@admin.register(DeletionJob)
+class DeletionJobAdmin(admin.ModelAdmin):
+    list_display = ["target_repr", "target", "status", "step", "deleted_rows", "created", "finished_at"]
+    list_filter = ["status", "target"]
+    search_fields = ["target_repr"]
+    readonly_fields = [field.name for field in DeletionJob._meta.fields]
+    actions = ["retry"]
+
+    def has_add_permission(self, request):
+        return False
+
+    @admin.action(description="Повторити (продовжити з поточного етапу)")
+    def retry(self, request, queryset):
+        updated = queryset.exclude(status=DeletionJob.Status.DONE).update(
+            status=DeletionJob.Status.PENDING, last_error="", lease="", lease_until=None
+        )
+        self.message_user(request, f"Поставлено в чергу: {updated}")
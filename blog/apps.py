@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+
+class BlogConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "blog"
+    verbose_name = "Блог"
+
+    def ready(self):
+        """Імпортуємо signals при запуску додатку"""
+        import blog.signals  # noqa: F401
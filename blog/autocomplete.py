@@ -0,0 +1,339 @@
+"""
+Автодоповнення імен користувачів і заголовків постів без запитів до БД.
+
+Індекс - файл AUTOCOMPLETE_INDEX: для кожного виду (users, posts) відсортовані
+ключі з номером об'єкта і окремо «id\\0підпис» кожного об'єкта, обидва з масивами
+зсувів. Кожен процес відкриває файл через mmap, тож усі воркери gunicorn ділять
+ті самі сторінки кешу ОС, а пошук префікса - двійковий пошук по зсувах ключів.
+Ключ - ім'я чи заголовок у casefold; заголовок індексується ще й з кожного
+наступного слова (до MAX_WORDS), тож «django» знаходить «Міграції в Django».
+
+Зміни між перебудовами сигнали й масові операції дописують після коміту в журнал
+AUTOCOMPLETE_INDEX.log рядками «+ вид id підпис» (новий чи змінений об'єкт) або
+«- вид id» (об'єкт зник). Перед пошуком процес перевіряє розмір журналу одним
+stat і дочитує нові рядки у власний невеликий відсортований список.
+`python manage.py update_autocomplete` (з --loop - кожні AUTOCOMPLETE_INTERVAL
+секунд) перебудовує файл з БД і починає новий журнал. Перший раз її запускають
+при розгортанні (make migrate): доки файлу немає, підказок немає, а запити не
+чекають на побудову.
+"""
+
+import bisect
+import heapq
+import mmap
+import os
+import struct
+import threading
+import time
+from contextlib import contextmanager, suppress
+
+try:
+    import fcntl
+except ImportError:  # Windows: перебудови не блокуються між процесами, див. _locked
+    fcntl = None
+
+import numpy as np
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import transaction
+
+from .bulk import BATCH_SIZE, iter_pk_batches
+from .models import Post
+
+INDEX_PATH = getattr(settings, "AUTOCOMPLETE_INDEX", "autocomplete.idx")
+LIMIT = getattr(settings, "AUTOCOMPLETE_LIMIT", 10)
+
+KINDS = ("users", "posts")
+MAX_WORDS = 8  # з якої кількості перших слів заголовка він знаходиться
+KEY_LENGTH = 32  # довші ключі обрізаються: підказки потрібні для перших символів
+RELOAD_CHECK = 1.0  # як часто процес перевіряє, чи не перебудовано файл, с
+BULK_LINES = 100  # з якої кількості нових рядків журналу список змін сортується заново
+MAGIC = b"BQAC\x02\x00\x00\x00"
+# для ключів і об'єктів кожного виду: кількість, позиція зсувів, позиція записів
+HEADER = struct.Struct("<8s" + "QQQ" * 2 * len(KINDS))
+
+_lock = threading.Lock()
+_index = None
+
+
+def suggest(kind, text, limit=LIMIT):
+    """До limit [(id, підпис)] виду kind ("users" чи "posts"), чий ключ починається з text, за абеткою"""
+    prefix = _key(text).encode()
+    if not prefix:
+        return []
+    global _index
+    with _lock:
+        if _index is None or _index.path != str(INDEX_PATH):
+            _index = Index(str(INDEX_PATH))
+        _index.refresh()
+        if _index.snapshot is None:
+            return []
+        matches = _index.snapshot.search(kind, prefix, _index.removed[kind])
+        added = list(_index.search(kind, prefix))
+        if added:
+            # обидва джерела вже відсортовані за ключем
+            matches = heapq.merge(matches, added)
+        results, seen = [], set()
+        for _, pk, label in matches:
+            if pk not in seen:
+                seen.add(pk)
+                results.append((pk, label))
+                if len(results) == limit:
+                    break
+        return results
+
+
+def ready():
+    """Чи побудовано індекс; до першого update_autocomplete suggest повертає []"""
+    return os.path.exists(str(INDEX_PATH))
+
+
+def build(path=None, batch_size=BATCH_SIZE):
+    """Перебудовує індекс з БД і починає новий журнал змін; повертає {вид: кількість об'єктів}"""
+    path = str(path or INDEX_PATH)
+    with _locked(path):
+        return _rebuild(path, batch_size)
+
+
+def user_changed(user):
+    """Записує в журнал ім'я користувача (неактивний зникає з підказок)"""
+    changed("users", [(user.pk, user.username if user.is_active else None)])
+
+
+def post_changed(post):
+    """Записує в журнал заголовок поста (прихований чи неопублікований зникає з підказок)"""
+    changed("posts", [(post.pk, post.title if post.is_public else None)])
+
+
+def posts_changed(pks, batch_size=BATCH_SIZE):
+    """Після масової зміни чи видалення постів pks записує в журнал їхній поточний стан з БД"""
+    pks = list(pks)
+    for start in range(0, len(pks), batch_size):
+        end = start + batch_size
+        titles = dict(Post.objects.public().filter(pk__in=pks[start:end]).values_list("pk", "title"))
+        changed("posts", [(pk, titles.get(pk)) for pk in pks[start:end]])
+
+
+def changed(kind, entries):
+    """Записує [(id, підпис або None - об'єкт зник)] у журнал після коміту поточної транзакції"""
+    lines = "".join(f"+\t{kind}\t{pk}\t{_label(label)}\n" if label else f"-\t{kind}\t{pk}\n" for pk, label in entries)
+    if lines:
+        transaction.on_commit(lambda: _append(lines))
+
+
+class Snapshot:
+    """Файл індексу, відкритий через mmap"""
+
+    def __init__(self, path):
+        with open(path, "rb") as file:
+            stat = os.fstat(file.fileno())
+            self.data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.version = (stat.st_ino, stat.st_mtime_ns)
+        fields = HEADER.unpack_from(self.data)
+        if fields[0] != MAGIC:
+            raise ValueError(f"{path}: не файл індексу автодоповнення")
+        sections = [self._section(*section) for section in zip(*[iter(fields[1:])] * 3)]
+        self.kinds = dict(zip(KINDS, zip(sections[::2], sections[1::2])))
+
+    def search(self, kind, prefix, removed):
+        """(ключ, id, підпис) з ключем, що починається з prefix, по порядку; об'єкти з removed пропускаються"""
+        (offsets, base), (item_offsets, item_base) = self.kinds[kind]
+        data, size = self.data, len(prefix)
+        low, high = 0, len(offsets) - 1
+        while low < high:
+            middle = (low + high) // 2
+            start = base + offsets[middle]
+            end = start + size
+            if data[start:end] < prefix:
+                low = middle + 1
+            else:
+                high = middle
+        for number in range(low, len(offsets) - 1):
+            start, end = base + offsets[number], base + offsets[number + 1]
+            entry = data[start:end]
+            if not entry.startswith(prefix):
+                return
+            item = int.from_bytes(entry[-4:], "big")
+            start, end = item_base + item_offsets[item], item_base + item_offsets[item + 1]
+            pk, _, label = data[start:end].partition(b"\0")
+            pk = int(pk)
+            if pk not in removed:
+                yield entry[:-5], pk, label.decode()
+
+    def _section(self, count, offsets_at, records_at):
+        # memoryview, а не масив numpy: елемент - звичайний int без обгортки
+        return memoryview(self.data)[offsets_at:records_at].cast("I"), records_at
+
+
+class Index:
+    """Файл індексу зі змінами з журналу - окремо в кожному процесі"""
+
+    def __init__(self, path):
+        self.path = path
+        self.snapshot = None
+        self.checked = -RELOAD_CHECK
+        self.log_inode = None
+        self.log_offset = 0
+
+    def refresh(self):
+        """Перевідкриває перебудований файл (не частіше за RELOAD_CHECK) і дочитує нові рядки журналу"""
+        now = time.monotonic()
+        if now - self.checked >= RELOAD_CHECK:
+            self.checked = now
+            self._reload()
+        if self.snapshot is not None:
+            self._read_log()
+
+    def search(self, kind, prefix):
+        """(ключ, id, підпис) з журналу з ключем, що починається з prefix, по порядку"""
+        added = self.added[kind]
+        for number in range(bisect.bisect_left(added, (prefix,)), len(added)):
+            if not added[number][0].startswith(prefix):
+                return
+            yield added[number]
+
+    def _reload(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            # будує update_autocomplete, а не запит: на великій БД це хвилини
+            self.snapshot = None
+            return
+        if self.snapshot is None or self.snapshot.version != (stat.st_ino, stat.st_mtime_ns):
+            self.snapshot = Snapshot(self.path)
+            # новий файл уже містить усе з попереднього журналу
+            self.added = {kind: [] for kind in KINDS}
+            self.entries = {kind: {} for kind in KINDS}
+            self.removed = {kind: set() for kind in KINDS}
+            self.log_inode = None
+
+    def _read_log(self):
+        log = f"{self.path}.log"
+        try:
+            stat = os.stat(log)
+        except FileNotFoundError:
+            return
+        if stat.st_ino != self.log_inode:
+            self.log_inode, self.log_offset = stat.st_ino, 0
+        if stat.st_size <= self.log_offset:
+            return
+        with open(log, "rb") as file:
+            if os.fstat(file.fileno()).st_ino != self.log_inode:
+                return  # журнал щойно замінено - новий прочитається наступного разу
+            file.seek(self.log_offset)
+            chunk = file.read(stat.st_size - self.log_offset)
+        complete = chunk.rfind(b"\n") + 1  # рядок, який ще дописується, читається наступного разу
+        self.log_offset += complete
+        lines = chunk[:complete].decode().splitlines()
+        # багато рядків (новий процес, довгий журнал) - одне сортування замість вставки кожного ключа
+        bulk = len(lines) > BULK_LINES
+        for line in lines:
+            self._apply(*line.split("\t", 3), bulk=bulk)
+        if bulk:
+            for kind in KINDS:
+                self.added[kind] = sorted(entry for entries in self.entries[kind].values() for entry in entries)
+
+    def _apply(self, op, kind, pk, label="", bulk=False):
+        """Кожен рядок замінює об'єкт цілком: і з файлу, і з попередніх рядків"""
+        pk = int(pk)
+        added = self.added[kind]
+        for entry in self.entries[kind].pop(pk, ()):
+            if not bulk:
+                del added[bisect.bisect_left(added, entry)]
+        self.removed[kind].add(pk)
+        if op == "+":
+            self.entries[kind][pk] = [(key, pk, label) for key in _keys(kind, label)]
+            if not bulk:
+                for entry in self.entries[kind][pk]:
+                    bisect.insort(added, entry)
+
+
+def _key(text):
+    return " ".join(text.split()).casefold()[:KEY_LENGTH]
+
+
+def _label(text):
+    return " ".join(text.replace("\0", "").split())
+
+
+def _keys(kind, label):
+    """Ключі імені (один) чи заголовка (з кожного з перших MAX_WORDS слів)"""
+    words = label.casefold().split(" ")
+    starts = range(min(len(words), MAX_WORDS)) if kind == "posts" else [0]
+    return sorted({" ".join(words[start:])[:KEY_LENGTH].encode() for start in starts})
+
+
+def _rows(kind, batch_size):
+    if kind == "users":
+        queryset, field = User.objects.filter(is_active=True), "username"
+    else:
+        queryset, field = Post.objects.public(), "title"
+    for pks in iter_pk_batches(queryset, batch_size):
+        yield from queryset.model.objects.filter(pk__in=pks).values_list("pk", field)
+
+
+def _rebuild(path, batch_size):
+    log = f"{path}.log"
+    # рядки журналу дописуються після коміту, тож усе, що в ньому вже є, прочитається з БД нижче;
+    # зміни, закомічені під час читання, потраплять у новий журнал
+    with suppress(FileNotFoundError):
+        os.replace(log, f"{log}.old")
+    sections, counts = [], {}
+    for kind in KINDS:
+        entries, items = [], []
+        for pk, label in _rows(kind, batch_size):
+            label = _label(label)
+            # ключ, \0 і номер об'єкта: сортування за ключем, а об'єкт знаходиться без розбору рядка
+            item = b"\0" + len(items).to_bytes(4, "big")
+            entries.extend(key + item for key in _keys(kind, label))
+            items.append(f"{pk}\0{label}".encode())
+        entries.sort()
+        sections += [entries, items]
+        counts[kind] = len(items)
+    _write(path, sections)
+    with suppress(FileNotFoundError):
+        os.remove(f"{log}.old")
+    return counts
+
+
+def _write(path, sections):
+    """Записує файл атомарно: процеси відкривають або старий, або новий"""
+    fields, parts, position = [MAGIC], [], HEADER.size
+    for records in sections:
+        padding = -position % 4  # зсуви вирівняні для memoryview.cast
+        parts.append(b"\0" * padding)
+        position += padding
+        offsets = np.zeros(len(records) + 1, dtype=np.uint32)
+        np.cumsum([len(record) for record in records], out=offsets[1:])
+        fields += [len(records), position, position + offsets.nbytes]
+        parts += [offsets.tobytes(), *records]
+        position += offsets.nbytes + int(offsets[-1])
+    temporary = f"{path}.tmp"
+    with open(temporary, "wb") as file:
+        file.write(HEADER.pack(*fields))
+        file.writelines(parts)
+    os.replace(temporary, path)
+
+
+def _append(lines):
+    # один write() у файл з O_APPEND: рядки різних процесів не перемішуються
+    descriptor = os.open(f"{INDEX_PATH}.log", os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(descriptor, lines.encode())
+    finally:
+        os.close(descriptor)
+
+
+@contextmanager
+def _locked(path):
+    """Одна перебудова за раз на всі процеси (без fcntl - лише в межах процесу)"""
+    if fcntl is None:
+        with _lock:
+            yield
+        return
+    with open(f"{path}.lock", "w") as file:
+        fcntl.flock(file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(file, fcntl.LOCK_UN)
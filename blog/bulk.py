@@ -0,0 +1,100 @@
+"""
+Set-based операції над великими queryset'ами.
+Працюють пачками первинних ключів, кожна пачка - окрема коротка транзакція,
+тож SQLite не блокується надовго, а об'єкти не завантажуються в Python.
+"""
+
+from django.db import models, transaction
+
+BATCH_SIZE = 1000
+
+
+def iter_pk_batches(queryset, batch_size=BATCH_SIZE, field="pk"):
+    """Повертає значення field (типово pk) queryset пачками (keyset по field, без OFFSET); field має бути унікальним"""
+    values = queryset.order_by(field).values_list(field, flat=True)
+    last = None
+    while True:
+        page = values if last is None else values.filter(**{f"{field}__gt": last})
+        batch = list(page[:batch_size])
+        if not batch:
+            return
+        yield batch
+        last = batch[-1]
+
+
+def bulk_update(queryset, values, batch_size=BATCH_SIZE, progress=None):
+    """UPDATE ... WHERE pk IN (пачка) для кожної пачки; повертає кількість змінених рядків"""
+    manager = queryset.model._base_manager.db_manager(queryset.db)
+    done = 0
+    for pks in iter_pk_batches(queryset, batch_size):
+        with transaction.atomic(using=queryset.db):
+            done += manager.filter(pk__in=pks).update(**values)
+        if progress:
+            progress(done)
+    return done
+
+
+def bulk_delete(queryset, batch_size=BATCH_SIZE, progress=None):
+    """
+    DELETE пачками з каскадом по залежних таблицях, без Collector і сигналів.
+    Повертає кількість видалених рядків самого queryset (без залежних).
+    """
+    done = 0
+    for pks in iter_pk_batches(queryset, batch_size):
+        done += delete_pks(queryset.model, pks, batch_size, using=queryset.db)
+        if progress:
+            progress(done)
+    return done
+
+
+def delete_pks(model, pks, batch_size=BATCH_SIZE, using="default"):
+    """
+    Видаляє рядки model з pk із pks.
+    Великі набори залежних рядків видаляються заздалегідь окремими пачками,
+    а залишок каскаду і самі рядки - однією короткою транзакцією.
+    Якщо серед залежних є PROTECT/RESTRICT/SET_DEFAULT, усе робить звичайний Collector.
+    """
+    if _needs_collector(model):
+        with transaction.atomic(using=using):
+            return _collector_delete(model, pks, using)
+    for related_model, lookup, on_delete in _dependents(model):
+        if on_delete is models.CASCADE:
+            bulk_delete(related_model._base_manager.using(using).filter(**{lookup: pks}), batch_size)
+    with transaction.atomic(using=using):
+        return _raw_delete_cascade(model, pks, using)
+
+
+def _dependents(model):
+    """Зворотні ForeignKey/OneToOne на model: (модель, lookup "<fk>__in", on_delete)"""
+    for field in model._meta.get_fields(include_hidden=True):
+        if field.auto_created and not field.concrete and (field.one_to_many or field.one_to_one):
+            yield field.related_model, f"{field.field.name}__in", field.field.remote_field.on_delete
+
+
+def _needs_collector(model, seen=frozenset()):
+    """Чи є серед залежних model (і далі по CASCADE) on_delete, крім CASCADE, SET_NULL і DO_NOTHING"""
+    seen = seen | {model}
+    for related_model, _, on_delete in _dependents(model):
+        if on_delete is models.CASCADE:
+            if related_model not in seen and _needs_collector(related_model, seen):
+                return True
+        elif on_delete not in (models.SET_NULL, models.DO_NOTHING):
+            return True
+    return False
+
+
+def _collector_delete(model, pks, using):
+    return model._base_manager.using(using).filter(pk__in=pks).delete()[1].get(model._meta.label, 0)
+
+
+def _raw_delete_cascade(model, pks, using):
+    # лише для model без _needs_collector: тут уже немає PROTECT/RESTRICT/SET_DEFAULT
+    for related_model, lookup, on_delete in _dependents(model):
+        related = related_model._base_manager.using(using).filter(**{lookup: pks})
+        if on_delete is models.CASCADE:
+            related_pks = list(related.values_list("pk", flat=True))
+            if related_pks:
+                _raw_delete_cascade(related_model, related_pks, using)
+        elif on_delete is models.SET_NULL:
+            related.update(**{lookup.removesuffix("__in"): None})
+    return model._base_manager.using(using).filter(pk__in=pks)._raw_delete(using)
@@ -0,0 +1,11 @@
+from django.utils.functional import SimpleLazyObject
+
+from . import notifications as notifications_module
+
+
+def notifications(request):
+    """unread_notifications для навбару; кеш читається, лише якщо шаблон використав значення"""
+    user = getattr(request, "user", None)
+    if user is None or not user.is_authenticated:
+        return {}
+    return {"unread_notifications": SimpleLazyObject(lambda: notifications_module.unread_count(user))}
@@ -0,0 +1,125 @@
+"""
+Лічильники постів із відкладеним записом (write-behind).
+
+Прирости накопичуються в пам'яті процесу і раз на flush_interval секунд
+записуються в БД однією транзакцією - по одному UPDATE на кожне значення
+приросту, а не на кожен перегляд. Запис робить наступний add, а якщо запитів
+немає - фоновий потік процесу, тож при аварійному завершенні процесу
+втрачається не більше ніж flush_interval секунд приростів.
+"""
+
+import atexit
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, OperationalError, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from blog_project.ratelimit import client_ip
+
+from .models import Post
+
+logger = logging.getLogger(__name__)
+
+UPDATE_CHUNK_SIZE = 500
+
+
+class CounterBuffer:
+    """Буфер приростів одного числового поля Post"""
+
+    def __init__(self, field, flush_interval):
+        self.field = field
+        self.flush_interval = flush_interval
+        self._pending = defaultdict(int)
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self._flusher_pid = None
+
+    def add(self, post_id, delta=1):
+        with self._lock:
+            self._pending[post_id] += delta
+            due = time.monotonic() - self._last_flush >= self.flush_interval
+            if not due:
+                self._start_flusher()
+        if due:
+            self.flush()
+
+    def pending(self, post_id):
+        return self._pending.get(post_id, 0)
+
+    def flush(self):
+        """Записує накопичені прирости в БД; повертає кількість оновлених постів"""
+        with self._lock:
+            pending, self._pending = self._pending, defaultdict(int)
+            self._last_flush = time.monotonic()
+
+        by_delta = defaultdict(list)
+        for post_id, delta in pending.items():
+            if delta:
+                by_delta[delta].append(post_id)
+        if not by_delta:
+            return 0
+
+        now = timezone.now()
+        try:
+            with transaction.atomic():
+                for delta, post_ids in by_delta.items():
+                    while post_ids:
+                        chunk, post_ids = post_ids[:UPDATE_CHUNK_SIZE], post_ids[UPDATE_CHUNK_SIZE:]
+                        values = {self.field: F(self.field) + delta, "activity_at": now}
+                        Post.objects.filter(pk__in=chunk).update(**values)
+        except OperationalError:
+            # БД зайнята або недоступна - повертаємо прирости в буфер до наступної спроби
+            logger.exception("Не вдалося записати лічильник %s", self.field)
+            with self._lock:
+                for post_id, delta in pending.items():
+                    self._pending[post_id] += delta
+            return 0
+        except DatabaseError:
+            # повтор не допоможе (порушене обмеження, помилка в запиті) - прирости відкидаються
+            logger.exception("Прирости лічильника %s відкинуто", self.field)
+            return 0
+        return sum(1 for delta in pending.values() if delta)
+
+    def _start_flusher(self):
+        # потік не переживає fork, тож у кожному процесі (воркері gunicorn) - свій
+        if self._flusher_pid != os.getpid():
+            self._flusher_pid = os.getpid()
+            threading.Thread(target=self._flush_periodically, name=f"flush-{self.field}", daemon=True).start()
+
+    def _flush_periodically(self):
+        """Записує прирости, які лежать у буфері довше за flush_interval, навіть без нових add"""
+        while True:
+            time.sleep(self.flush_interval)
+            if self._pending and time.monotonic() - self._last_flush >= self.flush_interval:
+                self.flush()
+                connection.close()  # з'єднання цього потоку не тримається між записами
+
+
+view_counts = CounterBuffer("view_count", settings.VIEW_COUNT_FLUSH_INTERVAL)
+like_counts = CounterBuffer("like_count", settings.LIKE_COUNT_FLUSH_INTERVAL)
+atexit.register(view_counts.flush)
+atexit.register(like_counts.flush)
+
+
+def _viewer_key(request):
+    """Ідентифікатор читача: сесія, а без неї - IP і User-Agent"""
+    if request.session.session_key:
+        return request.session.session_key
+    raw = f"{client_ip(request)}|{request.META.get('HTTP_USER_AGENT', '')}"
+    return hashlib.blake2b(raw.encode(), digest_size=12).hexdigest()
+
+
+def record_view(request, post_id):
+    """Зараховує перегляд, якщо цей читач не переглядав пост протягом VIEW_COUNT_DEDUPE_WINDOW"""
+    if not settings.VIEW_COUNT_ENABLED:
+        return
+    if cache.add(f"views:seen:{post_id}:{_viewer_key(request)}", 1, settings.VIEW_COUNT_DEDUPE_WINDOW):
+        view_counts.add(post_id)
@@ -0,0 +1,181 @@
+"""
+Фонове видалення постів і користувачів з великою історією.
+
+Видалення користувача з мільйоном коментарів через Collector - одна
+транзакція, що завантажує весь граф у пам'ять і тримає блокування запису
+(у SQLite - всієї БД) хвилинами. Тут запит лише приховує об'єкт - пост
+стає прихованим, користувач неактивним (не може увійти, його пости
+приховані, а коментарі не показуються, див. CommentQuerySet.public) - і ставить DeletionJob у чергу. Воркер
+`python manage.py run_deletions --loop` видаляє залежні рядки етапами,
+кожен - пачками по короткій транзакції (blog.bulk, blog.moderation), з
+оновленням лічильників (comment_count, like_count, follower_count, теги),
+і робить паузу DELETION_BATCH_PAUSE між пачками, тож запит, що пише
+паралельно, чекає на блокування не довше за одну пачку. Після кожної
+пачки в задачу пишеться прогрес, а після кожного етапу - його номер, тож
+перерване видалення продовжується з того самого етапу. Воркер тримає задачу
+(lease) DELETION_LEASE секунд і продовжує після кожної пачки; задачу воркера,
+що впав посеред видалення, після цього бере інший.
+Невеликі пости (до DELETION_INLINE_LIMIT коментарів і вподобань)
+видаляються так само, але одразу в запиті.
+"""
+
+import logging
+import time
+import uuid
+from datetime import timedelta
+from functools import partial
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from users.models import Follow, Profile
+
+from . import autocomplete, moderation
+from .bulk import BATCH_SIZE, bulk_delete, iter_pk_batches
+from .models import Comment, DeletionJob, Like, Post, TimelineEntry
+
+logger = logging.getLogger(__name__)
+
+INLINE_LIMIT = getattr(settings, "DELETION_INLINE_LIMIT", 1000)
+BATCH_PAUSE = getattr(settings, "DELETION_BATCH_PAUSE", 0.1)
+LEASE = getattr(settings, "DELETION_LEASE", 5 * 60)
+ACTIVE = [DeletionJob.Status.PENDING, DeletionJob.Status.RUNNING]
+
+
+def schedule_deletion(obj, requested_by=None):
+    """Приховує пост чи користувача одразу і ставить його видалення в чергу; повертає задачу"""
+    if isinstance(obj, Post):
+        target = DeletionJob.Target.POST
+        moderation.hide(Post.objects.filter(pk=obj.pk))
+    else:
+        target = DeletionJob.Target.USER
+        User.objects.filter(pk=obj.pk).update(is_active=False)
+        autocomplete.changed("users", [(obj.pk, None)])
+        moderation.hide(Post.objects.filter(author_id=obj.pk))
+    job = _enqueue(target, obj.pk, str(obj)[:200], requested_by)
+    if target == DeletionJob.Target.POST and obj.comment_count + obj.like_count <= INLINE_LIMIT:
+        run_job(job)
+    return job
+
+
+def _enqueue(target, target_id, target_repr, requested_by):
+    active = DeletionJob.objects.filter(target=target, target_id=target_id, status__in=ACTIVE)
+    try:
+        with transaction.atomic():
+            return active.first() or DeletionJob.objects.create(
+                target=target, target_id=target_id, target_repr=target_repr, requested_by=requested_by
+            )
+    except IntegrityError:  # ту саму задачу щойно створив паралельний запит
+        return active.get()
+
+
+def run_pending(batch_size=BATCH_SIZE, progress=None, pause=BATCH_PAUSE):
+    """Виконує задачі в черзі від найстарішої, зокрема покинуті воркерами, що впали; повертає кількість завершених"""
+    done = 0
+    for job in DeletionJob.objects.filter(_claimable(timezone.now())).order_by("created"):
+        if run_job(job, batch_size, progress, pause):
+            done += 1
+    return done
+
+
+def _claimable(now):
+    """Задачі в черзі і ті, що виконуються, але воркер не продовжив їх вчасно"""
+    running = Q(status=DeletionJob.Status.RUNNING) & (Q(lease_until__lt=now) | Q(lease_until__isnull=True))
+    return Q(status=DeletionJob.Status.PENDING) | running
+
+
+class _LeaseLost(Exception):
+    """Задачу, яку воркер не продовжив вчасно, взяв інший воркер"""
+
+
+def run_job(job, batch_size=BATCH_SIZE, progress=None, pause=0):
+    """
+    Виконує задачу з її поточного етапу; повертає True, якщо все видалено.
+    Пауза pause після кожної пачки дає дочекатися блокування запиту, що пише паралельно.
+    """
+    lease = uuid.uuid4().hex
+    now = timezone.now()
+    claimed = DeletionJob.objects.filter(_claimable(now), pk=job.pk).update(
+        status=DeletionJob.Status.RUNNING, started_at=now, lease=lease, lease_until=now + timedelta(seconds=LEASE)
+    )
+    if not claimed:  # задачу вже виконує інший воркер
+        return False
+    job.refresh_from_db()  # покинуту задачу інший воркер міг просунути на кілька етапів
+    jobs = DeletionJob.objects.filter(pk=job.pk, lease=lease)
+    deleted = job.deleted_rows
+
+    def renew(**values):
+        if not jobs.update(lease_until=timezone.now() + timedelta(seconds=LEASE), **values):
+            raise _LeaseLost
+
+    def report(step_done):
+        renew(deleted_rows=deleted + step_done)
+        if progress:
+            progress(deleted + step_done)
+        time.sleep(pause)
+
+    try:
+        steps = _steps(job)
+        for step in range(job.step, len(steps)):
+            deleted += steps[step](batch_size=batch_size, progress=report)
+            renew(step=step + 1, deleted_rows=deleted)
+    except _LeaseLost:
+        logger.warning("Видалення %s продовжує інший воркер", job)
+        return False
+    except Exception as exc:
+        logger.exception("Видалення %s перервано", job)
+        jobs.update(status=DeletionJob.Status.FAILED, last_error=repr(exc), finished_at=timezone.now(), lease="")
+        return False
+    jobs.update(status=DeletionJob.Status.DONE, finished_at=timezone.now(), last_error="", lease="")
+    return True
+
+
+def _steps(job):
+    """Етапи видалення: спершу найбільші набори залежних рядків, сам об'єкт - останнім"""
+    pk = job.target_id
+    if job.target == DeletionJob.Target.POST:
+        return [
+            partial(bulk_delete, Comment.objects.filter(post_id=pk)),
+            partial(bulk_delete, Like.objects.filter(post_id=pk)),
+            partial(bulk_delete, TimelineEntry.objects.filter(post_id=pk)),
+            partial(moderation.delete, Post.objects.filter(pk=pk)),
+        ]
+    return [
+        # коментарі - з перерахунком comment_count постів і reply_count гілок
+        partial(moderation.delete, Comment.objects.filter(author_id=pk)),
+        partial(_delete_likes, pk),
+        partial(_delete_follows, pk),
+        partial(moderation.delete, Post.objects.filter(author_id=pk)),
+        partial(bulk_delete, TimelineEntry.objects.filter(user_id=pk)),
+        partial(bulk_delete, User.objects.filter(pk=pk)),
+    ]
+
+
+def _delete_likes(user_id, batch_size=BATCH_SIZE, progress=None):
+    """Вподобання користувача з -1 у like_count кожного поста (одне вподобання на пост)"""
+    done = 0
+    for pks in iter_pk_batches(Like.objects.filter(user_id=user_id), batch_size):
+        with transaction.atomic():
+            post_ids = list(Like.objects.filter(pk__in=pks).values_list("post_id", flat=True))
+            done += Like.objects.filter(pk__in=pks)._raw_delete(Like.objects.db)
+            Post.objects.filter(pk__in=post_ids).update(like_count=Greatest(F("like_count") - 1, 0))
+        if progress:
+            progress(done)
+    return done
+
+
+def _delete_follows(user_id, batch_size=BATCH_SIZE, progress=None):
+    """Підписки користувача з -1 у follower_count кожного автора"""
+    done = 0
+    for pks in iter_pk_batches(Follow.objects.filter(follower_id=user_id), batch_size):
+        with transaction.atomic():
+            author_ids = list(Follow.objects.filter(pk__in=pks).values_list("author_id", flat=True))
+            done += Follow.objects.filter(pk__in=pks)._raw_delete(Follow.objects.db)
+            Profile.objects.filter(user_id__in=author_ids).update(follower_count=Greatest(F("follower_count") - 1, 0))
+        if progress:
+            progress(done)
+    return done
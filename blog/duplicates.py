@@ -0,0 +1,116 @@
+"""
+Пошук майже однакових постів і коментарів - спаму, розісланого копіями.
+
+MinHash-підпис тексту (blog.minhash) зберігається в Post.minhash/Comment.minhash
+при збереженні, а ключі його смуг - у PostBand/CommentBand (сигнал post_save).
+Новий текст порівнюється лише з кандидатами, що мають із ним спільну смугу
+(один запит за індексом bucket), а не з кожним збереженим текстом.
+PostForm і CommentForm відхиляють дублікат одразу (DUPLICATES_CHECK_INLINE);
+`python manage.py find_duplicates` заповнює підписи наявних текстів пачками, а з
+--hide - приховує тексти, що повторюють раніший (перевірка після збереження).
+"""
+
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+
+from . import moderation
+from .bulk import BATCH_SIZE, iter_pk_batches
+from .minhash import buckets, from_bytes, signature, similarity, to_bytes
+from .models import Comment, CommentBand, JobCheckpoint, Post, PostBand
+
+THRESHOLD = getattr(settings, "DUPLICATES_THRESHOLD", 0.6)
+CHECK_INLINE = getattr(settings, "DUPLICATES_CHECK_INLINE", True)
+MAX_PARAMS = 10_000  # значень в одному IN (...) - менше за ліміт параметрів SQLite
+
+BANDS = {Post: (PostBand, "post_id"), Comment: (CommentBand, "comment_id")}
+
+
+def find(model, text, exclude=None, threshold=THRESHOLD):
+    """pk збережених текстів model, майже однакових з text, найсхожіші першими; exclude - pk самого тексту"""
+    sig = signature(text)
+    if sig is None:
+        return []
+    return [pk for pk, _ in _matches(model, {exclude: sig}, threshold)[exclude]]
+
+
+def index(obj):
+    """Замінює ключі смуг поста чи коментаря ключами його поточного підпису"""
+    band_model, field = BANDS[type(obj)]
+    with transaction.atomic():
+        band_model.objects.filter(**{field: obj.pk}).delete()
+        _store_bands(band_model, field, {obj.pk: from_bytes(obj.minhash)})
+
+
+def scan(model, hide=False, threshold=THRESHOLD, full=False, batch_size=BATCH_SIZE, progress=None):
+    """
+    Проходить тексти model після позначки: рахує відсутні підписи і ключі смуг, а з hide -
+    приховує тексти, майже однакові з якимось ранішим. Повертає (перевірено, приховано).
+    """
+    checkpoint = f"duplicates:{model._meta.model_name}"
+    band_model, field = BANDS[model]
+    last = 0 if full else int(JobCheckpoint.get(checkpoint) or 0)
+    done = hidden = 0
+    for pks in iter_pk_batches(model.objects.filter(pk__gt=last), batch_size):
+        signatures, missing = {}, []
+        for pk, content, stored in model.objects.filter(pk__in=pks).values_list("pk", "content", "minhash"):
+            if stored is None:
+                sig = signature(content)
+                missing.append(model(pk=pk, minhash=to_bytes(sig)))
+            else:
+                sig = from_bytes(stored)
+            if sig is not None:
+                signatures[pk] = sig
+        with transaction.atomic():
+            model.objects.bulk_update(missing, ["minhash"])
+            _store_bands(band_model, field, {obj.pk: signatures.get(obj.pk) for obj in missing})
+            JobCheckpoint.set(checkpoint, pks[-1])
+        if hide:
+            found = _matches(model, signatures, threshold)
+            copies = [pk for pk, similar in found.items() if any(other < pk for other, _ in similar)]
+            hidden += moderation.hide(model.objects.filter(pk__in=copies))
+        done += len(pks)
+        if progress:
+            progress(done)
+    return done, hidden
+
+
+def _store_bands(band_model, field, signatures):
+    band_model.objects.bulk_create(
+        band_model(**{field: pk, "bucket": bucket})
+        for pk, sig in signatures.items()
+        if sig is not None
+        for bucket in buckets(sig)
+    )
+
+
+def _matches(model, signatures, threshold):
+    """
+    Для кожного підпису з signatures ({ключ: підпис}) - [(pk, схожість)] текстів model
+    зі схожістю не нижче threshold, найсхожіші першими. Ключ, що є pk тексту, з ним не порівнюється.
+    """
+    band_model, field = BANDS[model]
+    keys = {key: buckets(sig) for key, sig in signatures.items()}
+    owners = defaultdict(set)
+    for chunk in _chunks({bucket for bucket_keys in keys.values() for bucket in bucket_keys}):
+        for bucket, owner in band_model.objects.filter(bucket__in=chunk).values_list("bucket", field):
+            owners[bucket].add(owner)
+    candidates = {
+        key: set().union(*(owners[bucket] for bucket in bucket_keys)) - {key} for key, bucket_keys in keys.items()
+    }
+    stored = {}
+    for chunk in _chunks(set().union(*candidates.values())):
+        stored.update(model.objects.filter(pk__in=chunk).values_list("pk", "minhash"))
+    result = {}
+    for key, pks in candidates.items():
+        scored = ((similarity(signatures[key], from_bytes(stored[pk])), pk) for pk in pks if stored.get(pk))
+        result[key] = [(pk, score) for score, pk in sorted(scored, reverse=True) if score >= threshold]
+    return result
+
+
+def _chunks(values, size=MAX_PARAMS):
+    values = list(values)
+    for start in range(0, len(values), size):
+        end = start + size
+        yield values[start:end]
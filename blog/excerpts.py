@@ -0,0 +1,18 @@
+"""
+Короткий опис поста для списків (головна, пости автора, стрічка, RSS).
+
+excerpt, has_more і word_count обчислюються з тексту відрендереного поста
+(Post.render, див. blog.rendering) при його збереженні,
+тож списки читають лише їх і не завантажують повний content
+(PostQuerySet.listing) - обсяг читання сторінки не залежить від довжини постів.
+Пости, збережені в обхід save(), дозаповнює `python manage.py backfill_excerpts`.
+"""
+
+from django.conf import settings
+
+EXCERPT_LENGTH = getattr(settings, "POST_EXCERPT_LENGTH", 200)
+
+
+def summarize(content, length=EXCERPT_LENGTH):
+    """(excerpt, has_more, word_count) для простого тексту поста"""
+    return content[:length], len(content) > length, len(content.split())
@@ -0,0 +1,167 @@
+"""
+RSS/Atom стрічки: загальна і для кожного автора.
+
+Стан стрічки (ETag і Last-Modified) і згенероване тіло зберігаються в кеші,
+тож опитування без змін коштує одного звернення до кешу і повертає 304.
+ETag - хеш записів стрічки, Last-Modified - час найновішого з них: обидва
+виводяться з БД і однакові в усіх процесах. Зміна поста скидає стан у процесі,
+де вона сталася (див. blog.signals); зміни з інших процесів (планувальник,
+видалення, інші воркери з власним кешем) видно, коли стан вийде з кешу через
+FEED_STATE_TIMEOUT секунд.
+"""
+
+import hashlib
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.syndication.views import Feed
+from django.core.cache import cache
+from django.http import Http404, HttpResponse
+from django.urls import reverse, reverse_lazy
+from django.utils.feedgenerator import Atom1Feed
+from django.views.decorators.http import condition
+
+from .models import Post
+
+FEED_SIZE = getattr(settings, "FEED_SIZE", 20)
+FEED_CACHE_TIMEOUT = getattr(settings, "FEED_CACHE_TIMEOUT", 24 * 60 * 60)
+FEED_STATE_TIMEOUT = getattr(settings, "FEED_STATE_TIMEOUT", 5 * 60)
+AUTHOR_ID_CACHE_TIMEOUT = 5 * 60
+ALL_AUTHORS = "all"
+
+
+class LatestPostsFeed(Feed):
+    """Загальна RSS-стрічка останніх постів"""
+
+    title = "BlogQA - останні пости"
+    link = reverse_lazy("blog-home")
+    description = "Нові пости всіх авторів BlogQA"
+
+    def items(self):
+        return Post.objects.public().listing().select_related("author").order_by("-date_posted")[:FEED_SIZE]
+
+    def item_title(self, item):
+        return item.title
+
+    def item_description(self, item):
+        return item.excerpt
+
+    def item_categories(self, item):
+        return [tag.name for tag in item.tags.all()]
+
+    def item_author_name(self, item):
+        return item.author.username
+
+    def item_pubdate(self, item):
+        return item.date_posted
+
+
+class LatestPostsAtomFeed(LatestPostsFeed):
+    """Загальна Atom-стрічка останніх постів"""
+
+    feed_type = Atom1Feed
+    subtitle = LatestPostsFeed.description
+
+
+class UserPostsFeed(LatestPostsFeed):
+    """RSS-стрічка постів одного автора"""
+
+    def get_object(self, request, username):
+        author = User.objects.filter(username=username, is_active=True).first()
+        if author is None:
+            raise Http404("Автора не знайдено")
+        return author
+
+    def title(self, obj):
+        return f"BlogQA - пости {obj.username}"
+
+    def link(self, obj):
+        return reverse("user-posts", kwargs={"username": obj.username})
+
+    def description(self, obj):
+        return f"Нові пости автора {obj.username}"
+
+    def items(self, obj):
+        posts = Post.objects.public().listing().filter(author=obj).select_related("author")
+        return posts.order_by("-date_posted")[:FEED_SIZE]
+
+
+class UserPostsAtomFeed(UserPostsFeed):
+    """Atom-стрічка постів одного автора"""
+
+    feed_type = Atom1Feed
+
+    def subtitle(self, obj):
+        return self.description(obj)
+
+
+def _state_key(scope):
+    return f"feed:state:{scope}"
+
+
+def _author_id(username):
+    """
+    id активного автора за логіном; кешується, щоб опитування не ходило в БД.
+    Невідомий логін - 404 без запису в кеш: акаунт може з'явитися будь-якої миті.
+    """
+    key = f"feed:author-id:{username}"
+    author_id = cache.get(key)
+    if author_id is None:
+        author_id = User.objects.filter(username=username, is_active=True).values_list("pk", flat=True).first()
+        if author_id is None:
+            raise Http404("Автора не знайдено")
+        cache.set(key, author_id, AUTHOR_ID_CACHE_TIMEOUT)
+    return author_id
+
+
+def feed_state(scope):
+    """
+    Версія (для ETag) і час останньої зміни стрічки scope ("all" або id автора): хеш
+    записів стрічки і дата найновішого з них - один запит FEED_SIZE рядків за індексом
+    """
+    state = cache.get(_state_key(scope))
+    if state is None:
+        posts = Post.objects.public()
+        if scope != ALL_AUTHORS:
+            posts = posts.filter(author_id=scope)
+        rows = list(posts.order_by("-date_posted").values_list("pk", "date_posted", "title", "excerpt")[:FEED_SIZE])
+        state = {
+            "version": hashlib.blake2b(repr(rows).encode(), digest_size=16).hexdigest(),
+            "last_modified": rows[0][1] if rows else None,
+        }
+        cache.set(_state_key(scope), state, FEED_STATE_TIMEOUT)
+    return state
+
+
+def invalidate_feeds(*author_ids):
+    """
+    Скидає стан загальної стрічки і стрічок авторів: feed_state порахує версію заново
+    (тіла змінених стрічок у кеші стають недосяжними) з часом найновішого поста
+    """
+    cache.delete_many([_state_key(scope) for scope in (ALL_AUTHORS, *author_ids)])
+
+
+def cached_feed(feed_class):
+    """View стрічки з умовним GET (ETag/Last-Modified) і кешованим тілом"""
+    feed = feed_class()
+
+    def state(request, username=None):
+        if not hasattr(request, "_feed_state"):
+            request._feed_state = feed_state(_author_id(username) if username else ALL_AUTHORS)
+        return request._feed_state
+
+    @condition(
+        etag_func=lambda request, **kwargs: state(request, **kwargs)["version"],
+        last_modified_func=lambda request, **kwargs: state(request, **kwargs)["last_modified"],
+    )
+    def view(request, username=None):
+        key = f"feed:body:{feed_class.__name__}:{username or ''}:{state(request, username)['version']}"
+        cached = cache.get(key)
+        if cached is not None:
+            content_type, body = cached
+            return HttpResponse(body, content_type=content_type)
+        response = feed(request, username) if username else feed(request)
+        cache.set(key, (response["Content-Type"], response.content), FEED_CACHE_TIMEOUT)
+        return response
+
+    return view
@@ -1,28 +1,100 @@
 from django import forms
+from django.utils import timezone
 
-from .models import Comment, Post
+from . import duplicates
+from .models import Comment, Post, Tag
+from .tags import MAX_TAGS, parse_tags, set_tags
 
 
 class PostForm(forms.ModelForm):
-    """Форма створення/редагування поста"""
+    """Форма створення/редагування поста (теги - рядком через кому, статус - до публікації)"""
+
+    tags = forms.CharField(
+        required=False,
+        label="Теги",
+        widget=forms.TextInput(attrs={"class": "form-control", "placeholder": "Через кому: python, django"}),
+    )
+
+    publish_at = forms.DateTimeField(
+        required=False,
+        label="Час публікації",
+        widget=forms.DateTimeInput(attrs={"class": "form-control", "type": "datetime-local"}, format="%Y-%m-%dT%H:%M"),
+    )
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.instance.pk:
+            self.initial.setdefault("tags", ", ".join(tag.name for tag in self.instance.tags.all()))
+        if self.instance.pk and self.instance.status == Post.Status.PUBLISHED:
+            # опублікований пост не повертається в чернетки
+            del self.fields["status"], self.fields["publish_at"]
+            return
+        self.fields["status"].required = False
+        if self.instance.status == Post.Status.SCHEDULED:
+            self.initial.setdefault("publish_at", timezone.localtime(self.instance.date_posted))
+
+    def clean_status(self):
+        return self.cleaned_data["status"] or Post.Status.PUBLISHED
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if cleaned_data.get("status") == Post.Status.SCHEDULED:
+            publish_at = cleaned_data.get("publish_at")
+            if publish_at is None:
+                self.add_error("publish_at", "Вкажіть час публікації")
+            elif publish_at <= timezone.now():
+                self.add_error("publish_at", "Час публікації має бути в майбутньому")
+            else:
+                self.instance.date_posted = publish_at
+        return cleaned_data
+
+    def clean_content(self):
+        content = self.cleaned_data["content"]
+        if duplicates.CHECK_INLINE and "content" in self.changed_data:
+            if duplicates.find(Post, content, exclude=self.instance.pk):
+                raise forms.ValidationError("Майже такий самий текст уже є на сайті")
+        return content
+
+    def clean_tags(self):
+        tags = parse_tags(self.cleaned_data["tags"])
+        if len(tags) > MAX_TAGS:
+            raise forms.ValidationError(f"Не більше {MAX_TAGS} тегів")
+        max_length = Tag._meta.get_field("name").max_length
+        if any(len(slug) > max_length or len(name) > max_length for slug, name in tags.items()):
+            raise forms.ValidationError(f"Тег має бути не довшим за {max_length} символів")
+        return tags
+
+    def _save_m2m(self):
+        super()._save_m2m()
+        set_tags(self.instance, self.cleaned_data["tags"])
 
     class Meta:
         model = Post
-        fields = ["title", "content"]
+        fields = ["title", "content", "status"]
         labels = {
             "title": "Заголовок",
-            "content": "Зміст",
+            "content": "Зміст (Markdown)",
+            "status": "Публікація",
         }
         widgets = {
             "title": forms.TextInput(attrs={"class": "form-control", "placeholder": "Введіть заголовок"}),
             "content": forms.Textarea(
                 attrs={"class": "form-control", "rows": 10, "placeholder": "Напишіть ваш пост..."}
             ),
+            "status": forms.Select(attrs={"class": "form-select"}),
         }
 
 
 class CommentForm(forms.ModelForm):
-    """Форма створення коментаря"""
+    """Форма створення коментаря або відповіді (parent - id коментаря, на який відповідають)"""
+
+    parent = forms.IntegerField(required=False, min_value=1, widget=forms.HiddenInput)
+
+    def clean_content(self):
+        content = self.cleaned_data["content"]
+        if duplicates.CHECK_INLINE and duplicates.find(Comment, content):
+            raise forms.ValidationError("Майже такий самий коментар уже є на сайті")
+        return content
 
     class Meta:
         model = Comment
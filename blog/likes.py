@@ -0,0 +1,39 @@
+"""
+Вподобання постів.
+
+Унікальність (user, post) гарантує БД, тож повторні запити ідемпотентні.
+Post.like_count оновлюється через write-behind буфер (blog.counters), тож
+популярний пост не стає "гарячим" рядком, на якому стоять усі записи.
+"""
+
+from django.db import IntegrityError, transaction
+
+from .counters import like_counts
+from .models import Like
+
+
+def like(user, post_id):
+    """Ставить вподобання; повертає True, якщо воно нове"""
+    try:
+        with transaction.atomic():
+            Like.objects.create(user=user, post_id=post_id)
+    except IntegrityError:
+        return False
+    like_counts.add(post_id)
+    return True
+
+
+def unlike(user, post_id):
+    """Знімає вподобання; повертає True, якщо воно було"""
+    deleted, _ = Like.objects.filter(user=user, post_id=post_id).delete()
+    if deleted:
+        like_counts.add(post_id, -1)
+    return bool(deleted)
+
+
+def liked_post_ids(user, posts):
+    """id постів зі сторінки, які вподобав user, - один запит на всю сторінку"""
+    if not user.is_authenticated:
+        return set()
+    post_ids = [post.pk for post in posts]
+    return set(Like.objects.filter(user=user, post_id__in=post_ids).values_list("post_id", flat=True))
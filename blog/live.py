@@ -0,0 +1,207 @@
+"""
+Живі коментарі: нові коментарі поста як Server-Sent Events.
+
+Кожне відкрите з'єднання - асинхронний генератор, що чекає на своїй черзі
+asyncio, тож тисячі клієнтів обслуговує один event loop без потоку на клієнта
+(потрібен ASGI-сервер, див. blog_project.asgi). Після коміту нового коментаря
+(blog.signals) подія з його даними публікується в канал поста:
+- LocalBroker роздає її підпискам свого процесу;
+- RedisBroker (LIVE_REDIS_URL) публікує в Redis, а один потік-слухач на
+  процес роздає подію локальним підпискам, тож її бачать клієнти всіх воркерів.
+
+Клієнт отримує лише нові коментарі (id події - id коментаря). Після обриву
+браузер повторно підключається з Last-Event-ID і дочитує пропущене з БД;
+якщо пропущено забагато, отримує подію reload. Клієнт, що не встигає читати,
+відключається, коли його черга переповнюється, і так само дочитує з БД.
+"""
+
+import asyncio
+import json
+import logging
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from .models import Comment
+from .paths import ancestor_ids
+
+logger = logging.getLogger(__name__)
+
+HEARTBEAT = getattr(settings, "LIVE_COMMENTS_HEARTBEAT", 20)
+QUEUE_SIZE = getattr(settings, "LIVE_COMMENTS_QUEUE_SIZE", 100)
+BACKLOG = getattr(settings, "LIVE_COMMENTS_BACKLOG", 100)
+REDIS_URL = getattr(settings, "LIVE_REDIS_URL", None)
+RETRY_MS = 5000
+REDIS_PREFIX = "blogqa:live:"
+
+
+class Subscription:
+    """Черга подій одного клієнта в event loop, де його обслуговують"""
+
+    def __init__(self, queue_size):
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(queue_size)
+        self.overflowed = False
+
+    def put(self, event):
+        """Викликається в потоці event loop; переповнена черга закриває підписку"""
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # відкидаємо всю чергу: клієнт дочитає з БД усе після останнього отриманого id
+            self.overflowed = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(None)
+
+    async def get(self):
+        """Наступна подія або None, якщо клієнт відстав і має дочитати з БД"""
+        return await self.queue.get()
+
+
+class LocalBroker:
+    """Підписки одного процесу: канал -> набір черг"""
+
+    def __init__(self, queue_size=QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._channels = defaultdict(set)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def subscribe(self, channel):
+        subscription = Subscription(self.queue_size)
+        with self._lock:
+            self._channels[channel].add(subscription)
+        try:
+            yield subscription
+        finally:
+            with self._lock:
+                self._channels[channel].discard(subscription)
+                if not self._channels[channel]:
+                    del self._channels[channel]
+
+    def subscriber_count(self, channel):
+        return len(self._channels.get(channel, ()))
+
+    def publish(self, channel, event):
+        """Потокобезпечно передає подію всім підпискам каналу в цьому процесі"""
+        with self._lock:
+            subscriptions = list(self._channels.get(channel, ()))
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.put, event)
+            except RuntimeError:  # event loop клієнта вже закрито
+                pass
+
+
+class RedisBroker(LocalBroker):
+    """Спільний канал для кількох процесів через Redis PUBLISH/PSUBSCRIBE"""
+
+    def __init__(self, url, queue_size=QUEUE_SIZE):
+        super().__init__(queue_size)
+        try:
+            import redis
+        except ImportError as exc:
+            raise ImproperlyConfigured("LIVE_REDIS_URL потребує пакета redis") from exc
+        self._redis = redis.Redis.from_url(url)
+        self._listener = None
+
+    @contextmanager
+    def subscribe(self, channel):
+        self._start_listener()
+        with super().subscribe(channel) as subscription:
+            yield subscription
+
+    def publish(self, channel, event):
+        self._redis.publish(REDIS_PREFIX + channel, json.dumps(event))
+
+    def _start_listener(self):
+        with self._lock:
+            if self._listener is None:
+                self._listener = threading.Thread(target=self._listen, name="live-comments-redis", daemon=True)
+                self._listener.start()
+
+    def _listen(self):
+        pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+        pubsub.psubscribe(REDIS_PREFIX + "*")
+        for message in pubsub.listen():
+            try:
+                channel = message["channel"].decode().removeprefix(REDIS_PREFIX)
+                LocalBroker.publish(self, channel, json.loads(message["data"]))
+            except (ValueError, KeyError, AttributeError):
+                logger.exception("Некоректне повідомлення живих коментарів")
+
+
+broker = RedisBroker(REDIS_URL) if REDIS_URL else LocalBroker()
+
+
+def post_channel(post_id):
+    return f"post:{post_id}"
+
+
+def comment_event(comment):
+    """Дані коментаря для клієнта; HTML будує сторінка, бо він залежить від користувача"""
+    return {
+        "id": comment.pk,
+        "parent": comment.parent_id,
+        "depth": comment.depth,
+        "author": comment.author.username,
+        "avatar": comment.author.profile.image.url,
+        "date": comment.date_posted.isoformat(),
+        "content": comment.content,
+    }
+
+
+def publish_comment(comment):
+    """Надсилає новий коментар читачам поста, якщо його гілка не прихована"""
+    if Comment.objects.hidden().filter(pk__in=ancestor_ids(comment.path)).exists():
+        return
+    broker.publish(post_channel(comment.post_id), comment_event(comment))
+
+
+def missed_comments(post_id, after_id, limit=BACKLOG):
+    """Видимі коментарі поста з id > after_id (до limit + 1, щоб помітити переповнення)"""
+    comments = (
+        Comment.objects.public()
+        .filter(post_id=post_id, pk__gt=after_id)
+        .select_related("author__profile")
+        .order_by("pk")[: limit + 1]
+    )
+    return [comment_event(comment) for comment in comments]
+
+
+def format_event(event):
+    return f"id: {event['id']}\nevent: comment\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+
+
+async def comment_events(post_id, last_event_id=None, heartbeat=HEARTBEAT):
+    """Потік SSE нових коментарів поста після last_event_id"""
+    with broker.subscribe(post_channel(post_id)) as subscription:
+        yield f"retry: {RETRY_MS}\n\n"
+        sent = int(last_event_id) if last_event_id and last_event_id.isdigit() else None
+        if sent is not None:
+            # підписка вже діє, тож між читанням з БД і чергою нічого не губиться
+            missed = await sync_to_async(missed_comments)(post_id, sent)
+            if len(missed) > BACKLOG:
+                yield "event: reload\ndata: {}\n\n"
+                return
+            for event in missed:
+                yield format_event(event)
+                sent = event["id"]
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.get(), heartbeat)
+            except asyncio.TimeoutError:
+                yield ": ping\n\n"  # тримає з'єднання живим крізь проксі
+                continue
+            if event is None:
+                return
+            if sent is not None and event["id"] <= sent:
+                continue
+            yield format_event(event)
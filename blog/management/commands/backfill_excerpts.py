@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from blog.bulk import BATCH_SIZE
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = "Заповнює уривки (excerpt, has_more, word_count) постів, збережених без них"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full", action="store_true", help="Перерахувати всі пости (після зміни POST_EXCERPT_LENGTH)"
+        )
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+
+    def handle(self, full, batch_size, **options):
+        posts = Post.objects.all() if full else Post.objects.filter(excerpt="").exclude(content="")
+        # уривок рахується з відрендереного тексту, тож разом оновлюється і content_html
+        done = posts.render(batch_size, progress=self.progress)
+        self.stdout.write(self.style.SUCCESS(f"\nГотово: {done}"))
+
+    def progress(self, done):
+        self.stdout.write(f"\rОброблено: {done}", ending="")
+        self.stdout.flush()
@@ -0,0 +1,96 @@
+import os
+import random
+import shutil
+import tempfile
+import time
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.test import Client
+from django.urls import reverse
+
+from blog import autocomplete
+from blog.models import Post
+from blog_project.benchmark import BenchmarkCommand, measure
+
+
+class Command(BenchmarkCommand):
+    help = "Автодоповнення: побудова індексу, підказка з mmap-індексу проти LIKE у SQLite, вплив журналу змін"
+
+    file_database = True
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=100_000)
+        parser.add_argument("--posts", type=int, default=300_000)
+        parser.add_argument("--changes", type=int, default=10_000, help="Змін у журналі після перебудови")
+        parser.add_argument("--seed", type=int, default=1)
+
+    def run_benchmark(self, users, posts, changes, seed, **options):
+        rng = random.Random(seed)
+        names = [f"{self._word(rng)}{number}" for number in range(users)]
+        for start in range(0, users, 5000):
+            User.objects.bulk_create([User(username=name) for name in names[start:][:5000]])
+        author = User.objects.get(username=names[0])
+        titles = [" ".join(self._word(rng).capitalize() for _ in range(rng.randint(3, 8))) for _ in range(posts)]
+        for start in range(0, posts, 5000):
+            Post.objects.bulk_create(
+                [Post(title=title, content="x", excerpt="x", author=author) for title in titles[start:][:5000]]
+            )
+
+        index_dir = tempfile.mkdtemp(prefix="blogqa-bench-autocomplete-")
+        try:
+            with patch("blog.autocomplete.INDEX_PATH", os.path.join(index_dir, "autocomplete.idx")):
+                self._run(rng, names, titles, changes)
+        finally:
+            shutil.rmtree(index_dir)
+
+    def _run(self, rng, names, titles, changes):
+        started = time.perf_counter()
+        counts = autocomplete.build()
+        elapsed = time.perf_counter() - started
+        total = len(names) + len(titles)
+        self.report(f"побудова, {total} імен і заголовків", total / elapsed, elapsed / total, unit="об./с")
+        self.stdout.write(
+            f"об'єктів: {counts}, файл {os.path.getsize(autocomplete.INDEX_PATH) / 2**20:.1f} МіБ (спільний, mmap)"
+        )
+
+        # початки справжніх імен і заголовків у 2-4 символи
+        queries = [text.casefold()[: rng.randint(2, 4)] for text in rng.sample(names, 500) + rng.sample(titles, 500)]
+        autocomplete.suggest("users", "a")  # відкриття файлу
+
+        def from_index():
+            query = rng.choice(queries)
+            autocomplete.suggest("users", query)
+            autocomplete.suggest("posts", query)
+
+        measure(from_index, 2000)  # сторінки файлу в кеші ОС
+        self.report("підказка: індекс (імена + заголовки)", *measure(from_index, 20_000))
+
+        def from_database():
+            query = rng.choice(queries)
+            list(User.objects.filter(is_active=True, username__istartswith=query).values_list("username")[:10])
+            list(Post.objects.public().filter(title__icontains=query).values_list("pk", "title")[:10])
+
+        self.report("підказка: LIKE у SQLite", *measure(from_database, 200))
+
+        for pk, title in Post.objects.values_list("pk", "title")[:changes]:
+            autocomplete.changed("posts", [(pk, f"{title} {self._word(rng)}")])
+        autocomplete.suggest("posts", "a")  # дочитування журналу
+        self.report(f"підказка: індекс + {changes} змін у журналі", *measure(from_index, 20_000))
+
+        other = autocomplete.Index(autocomplete.INDEX_PATH)
+        started = time.perf_counter()
+        other.refresh()
+        elapsed = time.perf_counter() - started
+        self.report("новий процес: відкриття + журнал", 1 / elapsed, elapsed)
+
+        client = Client()
+        url = reverse("autocomplete")
+
+        def endpoint():
+            client.get(url, {"q": rng.choice(queries)})
+
+        self.report("GET /autocomplete/", *measure(endpoint, 2000))
+
+    def _word(self, rng):
+        return "".join(rng.choice("абвгдежзиклмнопрстуфхцчшaeioukmnprst") for _ in range(rng.randint(3, 9)))
@@ -0,0 +1,110 @@
+import multiprocessing
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connections
+from django.test import override_settings
+
+from blog_project.benchmark import BenchmarkCommand, measure
+
+
+class Command(BenchmarkCommand):
+    help = "Кеш: locmem, файловий, БД і спільна пам'ять - затримка, і кілька процесів разом (частка влучань, incr)"
+
+    file_database = True
+
+    def add_arguments(self, parser):
+        parser.add_argument("--processes", type=int, default=4, help="Процесів, як воркерів gunicorn")
+        parser.add_argument("--ops", type=int, default=20_000, help="Звернень у кожному процесі")
+        parser.add_argument("--keys", type=int, default=2000)
+        parser.add_argument("--value-size", type=int, default=1000)
+        parser.add_argument("--seed", type=int, default=1)
+
+    def run_benchmark(self, processes, ops, keys, value_size, seed, **options):
+        cache_dir = tempfile.mkdtemp(
+            prefix="blogqa-bench-cache-", dir="/dev/shm" if os.path.isdir("/dev/shm") else None
+        )
+        backends = {
+            "locmem": {
+                "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+                "OPTIONS": {"MAX_ENTRIES": 100_000},
+            },
+            "файловий": {
+                "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                "LOCATION": os.path.join(cache_dir, "files"),
+                "OPTIONS": {"MAX_ENTRIES": 100_000},
+            },
+            "БД": {
+                "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+                "LOCATION": "bench_cache",
+                "OPTIONS": {"MAX_ENTRIES": 100_000},
+            },
+            "спільна пам'ять": {
+                "BACKEND": "blog_project.cache.SharedMemoryCache",
+                "LOCATION": os.path.join(cache_dir, "shared"),
+                "OPTIONS": {"MAX_ENTRIES": 100_000, "SIZE": 64 * 2**20},
+            },
+        }
+        try:
+            for name, config in backends.items():
+                with override_settings(CACHES={"default": config}):
+                    call_command("createcachetable", verbosity=0)
+                    self._run(name, processes, ops, keys, value_size, seed)
+        finally:
+            shutil.rmtree(cache_dir)
+
+    def _run(self, name, processes, ops, keys, value_size, seed):
+        cache = caches["default"]
+        cache.clear()
+        value = "x" * value_size
+        rng = random.Random(seed)
+        cache.set("warm", value)
+        self.report(f"{name}: get", *measure(lambda: cache.get("warm"), 5000))
+        self.report(f"{name}: set", *measure(lambda: cache.set(f"k{rng.randrange(keys)}", value), 2000))
+        cache.clear()
+
+        # кожен процес: get, а при промаху - set (як кешований фрагмент), і incr спільного лічильника
+        connections.close_all()  # з'єднання з БД не мають переходити в дочірні процеси
+        context = multiprocessing.get_context("fork")
+        results = context.Queue()
+        cache.add("counter", 0, None)
+        workers = [
+            context.Process(target=self._work, args=(results, seed + number, ops, keys, value))
+            for number in range(processes)
+        ]
+        started = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        totals = [results.get() for _ in workers]
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - started
+        hits = sum(hit for hit, _ in totals)
+        increments = sum(incr for _, incr in totals)
+        self.report(f"{name}: {processes} процеси разом", processes * ops / elapsed, elapsed / (processes * ops))
+        self.stdout.write(
+            f"    влучань {hits / (processes * ops):.1%}; incr: {increments}, "
+            f"лічильник у батьківському процесі {cache.get('counter')}"
+        )
+
+    def _work(self, results, seed, ops, keys, value):
+        cache = caches["default"]
+        rng = random.Random(seed)
+        hits = increments = 0
+        for number in range(ops):
+            key = f"k{rng.randrange(keys)}"
+            if cache.get(key) is None:
+                cache.set(key, value)
+            else:
+                hits += 1
+            if number % 10 == 0:
+                # locmem: кожен процес збільшує власну копію лічильника, отриману при fork
+                cache.incr("counter")
+                increments += 1
+        results.put((hits, increments))
+        connections.close_all()
@@ -0,0 +1,68 @@
+import random
+
+from django.contrib.auth.models import User
+
+from blog import threads
+from blog.models import Comment, Post
+from blog.paths import MAX_DEPTH, segment
+from blog_project.benchmark import BenchmarkCommand, measure
+
+
+class Command(BenchmarkCommand):
+    help = "Читання дерева коментарів поста з великою кількістю коментарів"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--comments", type=int, default=100000)
+        parser.add_argument("--roots", type=int, default=2000, help="Кількість кореневих гілок")
+        parser.add_argument("--iterations", type=int, default=200)
+        parser.add_argument("--seed", type=int, default=1)
+
+    def run_benchmark(self, comments, roots, iterations, seed, **options):
+        author = User.objects.create_user(username="bench", password="x")
+        post = Post.objects.create(title="Бенчмарк", content="x", author=author)
+        self._create_tree(post, author, comments, roots, random.Random(seed))
+
+        first = threads.post_threads(post)
+        middle = list(Comment.objects.filter(post=post, depth=0).order_by("path").values_list("path", flat=True))
+        middle = middle[len(middle) // 2]
+        biggest = Comment.objects.filter(post=post, depth=0).order_by("-reply_count").first()
+        self.stdout.write(f"{comments} коментарів, {roots} гілок, найбільша гілка - {biggest.reply_count} відповідей")
+
+        self.report("перша сторінка гілок", *measure(lambda: list(threads.post_threads(post)), iterations))
+        self.report(
+            "сторінка з середини (keyset)", *measure(lambda: list(threads.post_threads(post, middle)), iterations)
+        )
+        self.report("наступна сторінка", *measure(lambda: list(threads.post_threads(post, first.next_cursor)), 50))
+        self.report("найбільша гілка, 1 сторінка", *measure(lambda: list(threads.subtree(biggest)), iterations))
+
+    def _create_tree(self, post, author, count, roots, rng):
+        """Синтетичне дерево: відповіді частіше йдуть на свіжі коментарі, тож гілки виходять різної глибини"""
+        start = (Comment.objects.order_by("-pk").values_list("pk", flat=True).first() or 0) + 1
+        nodes, batch = [], []
+        for pk in range(start, start + count):
+            parent = None
+            if pk - start >= roots:
+                parent = nodes[int(len(nodes) * (1 - rng.random() ** 3))] if rng.random() < 0.7 else None
+                if parent is not None and parent.depth + 1 >= MAX_DEPTH:
+                    parent = None
+            comment = Comment(
+                pk=pk,
+                post=post,
+                author=author,
+                content=f"Коментар {pk}",
+                parent=parent,
+                depth=parent.depth + 1 if parent else 0,
+                path=(parent.path if parent else "") + segment(pk),
+            )
+            nodes.append(comment)
+            batch.append(comment)
+            ancestor = parent
+            while ancestor is not None:
+                ancestor.reply_count += 1
+                ancestor = ancestor.parent
+            if len(batch) == 5000:
+                Comment.objects.bulk_create(batch)
+                batch = []
+        Comment.objects.bulk_create(batch)
+        Comment.objects.bulk_update([node for node in nodes if node.reply_count], ["reply_count"], batch_size=5000)
+        Post.objects.filter(pk=post.pk).refresh_comment_counts()
@@ -0,0 +1,107 @@
+import threading
+import time
+
+from django.contrib.auth.models import User
+from django.db import OperationalError, connection
+from django.db.models import F
+
+from blog import deletion
+from blog.models import Comment, Like, Post
+from blog.paths import segment
+from blog_project.benchmark import BenchmarkCommand
+
+
+class Command(BenchmarkCommand):
+    help = "Видалення користувача з великою історією: черга пачками проти Collector і затримка інших записів"
+
+    # затримка записів паралельного запиту має сенс лише на файлі з блокуванням БД, як у роботі
+    file_database = True
+
+    def add_arguments(self, parser):
+        parser.add_argument("--comments", type=int, default=1_000_000, help="Коментарів видалюваного користувача")
+        parser.add_argument("--posts", type=int, default=1000, help="Чужих постів, під якими він коментував")
+        parser.add_argument(
+            "--collector-comments", type=int, default=100_000, help="Коментарів для порівняння з Collector (0 - без)"
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--pause", type=float, default=deletion.BATCH_PAUSE, help="Пауза між пачками, с")
+
+    def run_benchmark(self, comments, posts, collector_comments, batch_size, pause, **options):
+        other = User.objects.create_user(username="other", password="x")
+        Post.objects.bulk_create([Post(title="Пост", content="x", excerpt="x", author=other) for _ in range(posts)])
+        post_ids = list(Post.objects.values_list("pk", flat=True))
+        probe_post = post_ids[0]
+
+        user = self._create_history("leaver", post_ids, comments)
+        started = time.perf_counter()
+        job = deletion.schedule_deletion(user)
+        self.stdout.write(f"постановка в чергу (запит): {(time.perf_counter() - started) * 1000:.1f} мс")
+        with WriteProbe(probe_post) as probe:
+            started = time.perf_counter()
+            deletion.run_job(job, batch_size, pause=pause)
+            elapsed = time.perf_counter() - started
+        job.refresh_from_db()
+        self.stdout.write(
+            f"черга, {comments} коментарів: {elapsed:.1f} с, {job.deleted_rows / elapsed:.0f} рядків/с; {probe}"
+        )
+
+        if collector_comments:
+            user = self._create_history("collector", post_ids, collector_comments)
+            with WriteProbe(probe_post) as probe:
+                started = time.perf_counter()
+                user.delete()
+                elapsed = time.perf_counter() - started
+            self.stdout.write(f"Collector, {collector_comments} коментарів: {elapsed:.1f} с; {probe}")
+
+    def _create_history(self, username, post_ids, comments):
+        """Користувач з comments кореневими коментарями під постами post_ids і вподобанням кожного поста"""
+        user = User.objects.create_user(username=username, password="x")
+        start = (Comment.objects.order_by("-pk").values_list("pk", flat=True).first() or 0) + 1
+        for offset in range(0, comments, 10_000):
+            Comment.objects.bulk_create(
+                [
+                    Comment(pk=pk, post_id=post_ids[pk % len(post_ids)], author=user, content="x", path=segment(pk))
+                    for pk in range(start + offset, start + min(offset + 10_000, comments))
+                ]
+            )
+        Like.objects.bulk_create([Like(user=user, post_id=post_id) for post_id in post_ids])
+        Post.objects.update(like_count=F("like_count") + 1)
+        Post.objects.all().refresh_comment_counts()
+        return user
+
+
+class WriteProbe:
+    """Паралельний запис (UPDATE одного поста) кожні 10 мс: найдовше очікування блокування БД"""
+
+    def __init__(self, post_id, interval=0.01):
+        self.post_id = post_id
+        self.interval = interval
+        self.waits = []
+        self.failed = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+    def __str__(self):
+        longest = max(self.waits, default=0) * 1000
+        return f"запис поруч: {len(self.waits)} вдалих, найдовше очікування {longest:.0f} мс, невдалих {self.failed}"
+
+    def _run(self):
+        try:
+            while not self._stop.is_set():
+                started = time.perf_counter()
+                try:
+                    Post.objects.filter(pk=self.post_id).update(view_count=F("view_count") + 1)
+                    self.waits.append(time.perf_counter() - started)
+                except OperationalError:  # database is locked - очікування понад timeout SQLite
+                    self.failed += 1
+                time.sleep(self.interval)
+        finally:
+            connection.close()
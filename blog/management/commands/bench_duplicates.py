@@ -0,0 +1,92 @@
+import random
+import time
+
+import numpy as np
+from django.contrib.auth.models import User
+
+from blog import duplicates
+from blog.minhash import TOKEN_RE, from_bytes, signature
+from blog.models import Post
+from blog_project.benchmark import BenchmarkCommand, measure
+
+
+def bigrams(text):
+    words = TOKEN_RE.findall(text.lower())
+    return set(zip(words, words[1:]))
+
+
+def jaccard(text, other):
+    first, second = bigrams(text), bigrams(other)
+    return len(first & second) / len(first | second)
+
+
+class Command(BenchmarkCommand):
+    help = "Дублікати: заповнення підписів, точність/повнота LSH і перевірка нового тексту проти перебору"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--posts", type=int, default=100_000)
+        parser.add_argument("--copies", type=float, default=0.05, help="Частка постів - змінених копій інших")
+        parser.add_argument("--words", type=int, default=60, help="Слів у пості")
+        parser.add_argument("--seed", type=int, default=1)
+
+    def run_benchmark(self, posts, copies, words, seed, **options):
+        rng = random.Random(seed)
+        author = User.objects.create_user(username="bench", password="x")
+        texts, origins = [], {}
+        for number in range(posts):
+            if number > 100 and rng.random() < copies:
+                # копія з 1-6 заміненими словами і, можливо, дописаним рядком
+                origin = rng.randrange(number)
+                tokens = texts[origin].split()
+                for _ in range(rng.randint(1, 6)):
+                    tokens[rng.randrange(len(tokens))] = self._word(rng)
+                if rng.random() < 0.5:
+                    tokens += [self._word(rng) for _ in range(rng.randint(1, 10))]
+                origins[number] = origin
+                texts.append(" ".join(tokens))
+            else:
+                texts.append(" ".join(self._word(rng) for _ in range(words)))
+        for start in range(0, posts, 5000):
+            Post.objects.bulk_create(
+                [Post(title="x", content=text, excerpt="x", author=author) for text in texts[start:][:5000]]
+            )
+        pks = list(Post.objects.order_by("pk").values_list("pk", flat=True))
+
+        started = time.perf_counter()
+        duplicates.scan(Post)
+        elapsed = time.perf_counter() - started
+        self.report(f"заповнення підписів і смуг, {posts} постів", posts / elapsed, elapsed / posts, unit="постів/с")
+
+        started = time.perf_counter()
+        _, hidden = duplicates.scan(Post, hide=True, full=True)
+        elapsed = time.perf_counter() - started
+        self.report("пошук копій раніших постів (--hide)", posts / elapsed, elapsed / posts, unit="постів/с")
+
+        found = set(Post.objects.filter(is_hidden=True).values_list("pk", flat=True))
+        copies = {pks[number]: jaccard(texts[number], texts[origin]) for number, origin in origins.items()}
+        # справжні дублікати - копії, не менш схожі за поріг на пост, з якого їх зроблено
+        truth = {pk for pk, score in copies.items() if score >= duplicates.THRESHOLD}
+        correct = len(found & truth)
+        self.stdout.write(
+            f"змінених копій: {len(copies)}, з них схожих не менше за {duplicates.THRESHOLD}: {len(truth)}; "
+            f"приховано {hidden}: точність {correct / max(len(found), 1):.1%}, "
+            f"повнота {correct / max(len(truth), 1):.1%}; "
+            f"серед оригіналів хибно: {len(found - copies.keys())}"
+        )
+
+        def inline_check():
+            number = rng.choice(list(origins))
+            duplicates.find(Post, texts[number], exclude=pks[number])
+
+        self.report("перевірка нового тексту: LSH", *measure(inline_check, 500))
+
+        def brute_force():
+            sig = signature(texts[rng.randrange(posts)])
+            stored = np.vstack([from_bytes(value) for value in Post.objects.values_list("minhash", flat=True)])
+            return np.flatnonzero((stored == sig).mean(axis=1) >= duplicates.THRESHOLD)
+
+        self.report("перевірка нового тексту: перебір усіх", *measure(brute_force, 5))
+
+    def _word(self, rng):
+        """Третина слів - зі 100 службових, решта - зі словника на 20 тис."""
+        return f"s{rng.randrange(100)}" if rng.random() < 0.3 else f"w{rng.randrange(20_000)}"
@@ -0,0 +1,45 @@
+import asyncio
+import threading
+import time
+import tracemalloc
+
+from blog import live
+from blog_project.benchmark import BenchmarkCommand
+
+
+class Command(BenchmarkCommand):
+    help = "Тримає тисячі відкритих SSE-потоків в одному event loop і вимірює пам'ять та час розсилки коментаря"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--clients", type=int, default=5000, help="Кількість відкритих потоків")
+        parser.add_argument("--events", type=int, default=20, help="Кількість опублікованих коментарів")
+
+    def run_benchmark(self, clients, events, **options):
+        asyncio.run(self.bench(clients, events))
+
+    async def bench(self, clients, events):
+        channel = live.post_channel(1)
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        streams = [live.comment_events(1, heartbeat=3600) for _ in range(clients)]
+        for stream in streams:
+            await anext(stream)  # "retry" - потік підписаний і чекає на черзі
+        memory = tracemalloc.get_traced_memory()[0] - before
+        tracemalloc.stop()
+        self.stdout.write(
+            f"Відкрито потоків: {live.broker.subscriber_count(channel)}, потоків ОС: {threading.active_count()}, "
+            f"пам'ять на клієнта: {memory / clients / 1024:.1f} КБ"
+        )
+
+        total = 0.0
+        for pk in range(1, events + 1):
+            event = {"id": pk, "parent": None, "depth": 0, "author": "bench", "avatar": "", "date": "", "content": "x"}
+            started = time.perf_counter()
+            live.broker.publish(channel, event)
+            await asyncio.gather(*(anext(stream) for stream in streams))
+            total += time.perf_counter() - started
+        self.report(f"розсилка коментаря {clients} клієнтам", events / total, total / events)
+        self.report("на одного клієнта", events * clients / total, total / events / clients, unit="под/с")
+
+        for stream in streams:
+            await stream.aclose()
@@ -0,0 +1,34 @@
+from django.contrib.auth.models import User
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from blog.counters import view_counts
+from blog.models import Post
+from blog_project.benchmark import BenchmarkCommand, measure
+
+
+class Command(BenchmarkCommand):
+    help = "Пропускна здатність PostDetailView з лічильником переглядів і без нього"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=2000)
+        parser.add_argument("--flush-interval", type=float, default=10)
+
+    def run_benchmark(self, requests, flush_interval, **options):
+        author = User.objects.create_user(username="bench", password="x")
+        post = Post.objects.create(title="Бенчмарк", content="x" * 2000, author=author)
+        url = reverse("post-detail", kwargs={"pk": post.pk})
+        client = Client()
+        viewers = iter(range(10**9))
+
+        def unique_view():
+            # кожен запит - новий читач, тож дедуплікація не відсікає перегляди
+            client.get(url, REMOTE_ADDR=f"10.{next(viewers) % 250}.0.1", HTTP_USER_AGENT=str(next(viewers)))
+
+        view_counts.flush_interval = flush_interval
+        with override_settings(VIEW_COUNT_ENABLED=False):
+            self.report("без лічильника", *measure(unique_view, requests), unit="зап/с")
+        self.report(f"з лічильником (flush кожні {flush_interval} с)", *measure(unique_view, requests), unit="зап/с")
+        view_counts.flush()
+        post.refresh_from_db()
+        self.stdout.write(f"view_count після flush: {post.view_count} (очікувалось {requests})")
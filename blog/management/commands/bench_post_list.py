@@ -0,0 +1,42 @@
+from io import StringIO
+
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.management import call_command
+from django.test import RequestFactory
+from django.urls import reverse
+
+from blog.models import Post
+from blog.views import PostListView
+from blog_project.benchmark import BenchmarkCommand, measure
+
+
+class Command(BenchmarkCommand):
+    help = "Час сторінки списку постів із повним content і з уривками (defer) для різної довжини постів"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--posts", type=int, default=50)
+        parser.add_argument(
+            "--sizes", type=int, nargs="+", default=[1_000, 20_000, 200_000], help="Довжина поста, символів"
+        )
+        parser.add_argument("--requests", type=int, default=200)
+
+    def run_benchmark(self, posts, sizes, requests, **options):
+        author = User.objects.create_user(username="bench", password="x")
+        request = RequestFactory().get(reverse("blog-home"))
+        request.user = AnonymousUser()
+        variants = (
+            ("повний content", PostListView.as_view(queryset=Post.objects.public())),
+            ("уривки (defer)", PostListView.as_view()),
+        )
+        for size in sizes:
+            Post.objects.all().delete()
+            Post.objects.bulk_create(
+                [Post(title=f"Пост {i}", content="слово " * (size // 6), author=author) for i in range(posts)]
+            )
+            call_command("backfill_excerpts", stdout=StringIO())  # bulk_create оминає Post.save()
+            for label, view in variants:
+                self.report(
+                    f"{size // 1000} тис. симв.: {label}",
+                    *measure(lambda: view(request).render(), requests),
+                    unit="зап/с",
+                )
@@ -0,0 +1,50 @@
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.test import Client
+from django.urls import reverse
+
+from blog.models import Post
+from blog.rendering import render_markdown
+from blog_project.benchmark import BenchmarkCommand, measure
+
+SECTION = """## Розділ {i}
+
+Абзац із **жирним**, *курсивом*, `кодом` і [посиланням](https://example.com/{i}).
+Другий рядок абзацу.
+
+- пункт перший
+- пункт другий
+
+```python
+def f{i}(x):
+    return x * {i}
+```
+
+"""
+
+
+class Command(BenchmarkCommand):
+    help = "Сторінка поста зі збереженим HTML проти рендерингу Markdown на кожен запит"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes", type=int, nargs="+", default=[2_000, 20_000, 100_000], help="Довжина поста, символів"
+        )
+        parser.add_argument("--requests", type=int, default=50)
+
+    def run_benchmark(self, sizes, requests, **options):
+        author = User.objects.create_user(username="bench", password="x")
+        client = Client()
+        for size in sizes:
+            sections = max(1, size // len(SECTION.format(i=0)))
+            post = Post.objects.create(
+                title=f"Пост {size}", content="".join(SECTION.format(i=i) for i in range(sections)), author=author
+            )
+            url = reverse("post-detail", args=[post.pk])
+            label = f"{len(post.content) // 1000} тис. симв."
+            self.report(f"{label}: лише рендер", *measure(lambda: render_markdown(post.content), requests))
+            self.report(f"{label}: збережений HTML", *measure(lambda: client.get(url), requests), unit="зап/с")
+            # як до збереження HTML: рендер Markdown і санітизація в кожному запиті
+            with patch.object(Post, "ensure_rendered", Post.render):
+                self.report(f"{label}: рендер на запит", *measure(lambda: client.get(url), requests), unit="зап/с")
@@ -0,0 +1,57 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from django.utils import timezone
+
+from blog import publishing
+from blog.models import Post
+from blog_project.benchmark import BenchmarkCommand, measure
+
+
+class Command(BenchmarkCommand):
+    help = "Запит планувальника і стрічки публічних постів з частковими індексами і без них"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--posts", type=int, default=200_000, help="Опублікованих постів")
+        parser.add_argument("--scheduled", type=int, default=1000, help="Запланованих постів")
+        parser.add_argument("--drafts", type=int, default=20_000)
+        parser.add_argument("--reads", type=int, default=500)
+
+    def run_benchmark(self, posts, scheduled, drafts, reads, **options):
+        author = User.objects.create_user(username="bench", password="x")
+        now = timezone.now()
+        rows = [("published", now - timezone.timedelta(seconds=i)) for i in range(posts)]
+        rows += [("scheduled", now + timezone.timedelta(minutes=i + 1)) for i in range(scheduled)]
+        rows += [("draft", now - timezone.timedelta(seconds=i)) for i in range(drafts)]
+        Post.objects.bulk_create(
+            [
+                Post(title="Пост", content="x", excerpt="x", author=author, status=status, date_posted=date)
+                for status, date in rows
+            ],
+            batch_size=10_000,
+        )
+
+        def front_page():
+            return list(Post.objects.public().listing().order_by("-date_posted")[:5])
+
+        def due_now():
+            return Post.objects.filter(status=Post.Status.SCHEDULED, date_posted__lte=timezone.now()).exists()
+
+        def report_queries(label):
+            self.report(f"{label}: час наступної публікації", *measure(publishing.next_due, reads))
+            self.report(f"{label}: чи є що публікувати", *measure(due_now, reads))
+            self.report(f"{label}: головна сторінка", *measure(front_page, reads))
+
+        report_queries("часткові індекси")
+        partial = [index for index in Post._meta.indexes if index.condition is not None]
+        with connection.schema_editor() as editor:
+            for index in partial:
+                editor.remove_index(Post, index)
+        report_queries("без часткових індексів")
+        with connection.schema_editor() as editor:
+            for index in partial:
+                editor.add_index(Post, index)
+
+        due = Post.objects.filter(status=Post.Status.SCHEDULED).order_by("date_posted")[99].date_posted
+        self.report(
+            "публікація 100 постів (сигнали)", *measure(lambda: publishing.publish_due(now=due), 1), unit="пак/с"
+        )
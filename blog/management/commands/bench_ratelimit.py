@@ -0,0 +1,108 @@
+import logging
+import multiprocessing
+import time
+from collections import Counter
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import OperationalError, connection
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from blog.counters import view_counts
+from blog.models import Post
+from blog_project.benchmark import BenchmarkCommand, measure
+
+
+class Command(BenchmarkCommand):
+    help = "Пропускна здатність читання під час потоку записів коментарів - з обмеженням частоти і без нього"
+    file_database = True
+
+    def add_arguments(self, parser):
+        parser.add_argument("--duration", type=float, default=5, help="Тривалість кожного сценарію, с")
+        parser.add_argument("--readers", type=int, default=4)
+        parser.add_argument("--flooders", type=int, default=4)
+        parser.add_argument("--rate", default="10/m", help="Ліміт коментарів для сценарію з обмеженням")
+
+    def run_benchmark(self, duration, readers, flooders, rate, **options):
+        author = User.objects.create_user(username="author", password="x")
+        bots = [User.objects.create_user(username=f"bot{i}", password="x") for i in range(flooders)]
+        post = Post.objects.create(title="Ціль", content="x" * 2000, author=author)
+
+        logging.getLogger("django.request").setLevel(logging.ERROR)  # без рядка в лог на кожну 429
+
+        # вартість одного запиту бота: прийнятий коментар проти відмови 429
+        client = Client()
+        client.force_login(bots[0])
+        url = reverse("add-comment", kwargs={"pk": post.pk})
+        with override_settings(RATELIMIT_ENABLED=False):
+            self.report("коментар прийнято", *measure(lambda: client.post(url, {"content": "x"}), 200), unit="зап/с")
+        with override_settings(RATELIMIT_ENABLED=True, RATELIMIT_RATES={"comment": "1/d"}):
+            self.report(
+                "коментар відхилено (429)", *measure(lambda: client.post(url, {"content": "x"}), 200), unit="зап/с"
+            )
+
+        self.stdout.write(f"\n{readers} читачів, {flooders} ботів, {duration} с на сценарій")
+        self.stdout.write(
+            f"{'':<24} {'читань/с':>9} {'p50, мс':>8} {'p95, мс':>8} {'записів':>8} {'429':>6} {'помилок':>8}"
+        )
+        scenarios = (("лише читання", False, []), ("без обмеження", False, bots), (f"з обмеженням {rate}", True, bots))
+        for label, enabled, flood_bots in scenarios:
+            cache.clear()
+            with override_settings(RATELIMIT_ENABLED=enabled, RATELIMIT_RATES={"comment": rate}):
+                stats, latencies = self._run(post, flood_bots, readers, duration)
+            latencies.sort()
+            p50, p95 = (latencies[int(len(latencies) * q)] * 1000 if latencies else 0 for q in (0.5, 0.95))
+            self.stdout.write(
+                f"{label:<24} {len(latencies) / duration:>9.1f} {p50:>8.1f} {p95:>8.1f} "
+                f"{stats[302]:>8} {stats[429]:>6} {stats['error']:>8}"
+            )
+
+    def _run(self, post, bots, readers, duration):
+        """Читачі і боти - окремі процеси (як воркери gunicorn), спільна лише файлова БД"""
+        stop = time.time() + duration
+        context = multiprocessing.get_context("fork")
+        results = context.Queue()
+        connection.close()  # дочірні процеси відкривають власні з'єднання
+        workers = [context.Process(target=_read, args=(results, post.pk, i, stop)) for i in range(readers)]
+        workers += [context.Process(target=_flood, args=(results, post.pk, bot, stop)) for bot in bots]
+        for worker in workers:
+            worker.start()
+        stats, latencies = Counter(), []
+        for _ in workers:
+            worker_stats, worker_latencies = results.get()
+            stats.update(worker_stats)
+            latencies += worker_latencies
+        for worker in workers:
+            worker.join()
+        return stats, latencies
+
+
+def _read(results, post_pk, i, stop):
+    stats, latencies = Counter(), []
+    client = Client(REMOTE_ADDR=f"10.1.0.{i}")
+    url = reverse("post-detail", kwargs={"pk": post_pk}) if i % 2 else reverse("blog-home")
+    while time.time() < stop:
+        started = time.perf_counter()
+        try:
+            if client.get(url).status_code == 200:
+                latencies.append(time.perf_counter() - started)
+            else:
+                stats["error"] += 1
+        except OperationalError:  # SQLite "database is locked" під навантаженням
+            stats["error"] += 1
+    view_counts.flush()
+    results.put((stats, latencies))
+
+
+def _flood(results, post_pk, bot, stop):
+    stats = Counter()
+    client = Client(REMOTE_ADDR="10.2.0.1")
+    client.force_login(bot)
+    url = reverse("add-comment", kwargs={"pk": post_pk})
+    while time.time() < stop:
+        try:
+            stats[client.post(url, {"content": f"Спам {sum(stats.values())}"}).status_code] += 1
+        except OperationalError:
+            stats["error"] += 1
+    results.put((stats, []))
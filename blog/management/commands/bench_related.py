@@ -0,0 +1,74 @@
+import os
+import random
+import shutil
+import tempfile
+import time
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+
+from blog import related
+from blog.models import Post, RelatedPost
+from blog_project.benchmark import BenchmarkCommand, measure
+
+
+class Command(BenchmarkCommand):
+    help = "Схожі пости: повна перебудова TF-IDF-сусідів, інкрементальне оновлення і читання на сторінці поста"
+
+    # мільйон постів з текстом у БД в пам'яті не лишив би пам'яті самій перебудові
+    file_database = True
+
+    def add_arguments(self, parser):
+        parser.add_argument("--posts", type=int, default=100_000)
+        parser.add_argument("--topics", type=int, default=2000, help="Тем, слова яких домінують у постах")
+        parser.add_argument("--words", type=int, default=200, help="Слів у пості")
+        parser.add_argument("--workers", type=int, default=os.cpu_count())
+        parser.add_argument("--seed", type=int, default=1)
+
+    def run_benchmark(self, posts, topics, words, workers, seed, **options):
+        rng = random.Random(seed)
+        author = User.objects.create_user(username="bench", password="x")
+        for start in range(0, posts, 5000):
+            texts = [self._text(rng, rng.randrange(topics), words) for _ in range(min(5000, posts - start))]
+            Post.objects.bulk_create(
+                [Post(title=text[:60], content=text, excerpt="x", author=author) for text in texts]
+            )
+
+        index_dir = tempfile.mkdtemp(prefix="blogqa-bench-related-")
+        try:
+            with patch("blog.related.INDEX_PATH", os.path.join(index_dir, "related.npz")):
+                self._run(posts, topics, words, workers, rng, author)
+        finally:
+            shutil.rmtree(index_dir)
+
+    def _run(self, posts, topics, words, workers, rng, author):
+        for count in sorted({1, workers}):
+            started = time.perf_counter()
+            related.build(workers=count)
+            elapsed = time.perf_counter() - started
+            self.stdout.write(f"повна перебудова, {posts} постів, процесів {count}: {elapsed:.1f} с")
+        pairs = RelatedPost.objects.values_list("post__title", "related__title")[:20_000]
+        same_topic = sum(title.split("x")[0] == other.split("x")[0] for title, other in pairs)
+        self.stdout.write(
+            f"ядер на машині: {os.cpu_count()}; пар у RelatedPost: {RelatedPost.objects.count()}, "
+            f"з тієї самої теми: {same_topic / max(len(pairs), 1):.1%}"
+        )
+
+        def add_post():
+            Post.objects.create(title="Новий", content=self._text(rng, rng.randrange(topics), words), author=author)
+            related.update_stale()
+
+        self.report("новий пост: сусіди + списки сусідів", *measure(add_post, 20))
+
+        post = Post.objects.order_by("?").first()
+
+        def read():
+            return list(Post.objects.public().related_to(post).only("pk", "title", "date_posted")[:5])
+
+        self.report("сторінка поста: 5 схожих", *measure(read, 2000))
+
+    def _text(self, rng, topic, words):
+        """Половина слів - з теми (200 слів), решта - загальні (Ципф по 50 тис. слів)"""
+        tokens = [f"t{topic}x{rng.randrange(200)}" for _ in range(words // 2)]
+        tokens += [f"w{int(rng.paretovariate(1.1)) % 50_000}" for _ in range(words - len(tokens))]
+        return " ".join(tokens)
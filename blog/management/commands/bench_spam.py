@@ -0,0 +1,107 @@
+import os
+import random
+import shutil
+import tempfile
+import time
+from unittest.mock import patch
+
+import numpy as np
+from django.contrib.auth.models import User
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from blog import spam
+from blog.models import Comment, Post
+from blog_project.benchmark import BenchmarkCommand, measure
+
+
+class Command(BenchmarkCommand):
+    help = "Спам у коментарях: навчання, переоцінка всіх коментарів (коментарів/с), точність і вартість у запиті"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--comments", type=int, default=200_000)
+        parser.add_argument("--spam", dest="share", type=float, default=0.1, help="Частка спаму")
+        parser.add_argument("--words", type=int, default=30, help="Слів у коментарі")
+        parser.add_argument("--workers", type=int, default=os.cpu_count())
+        parser.add_argument("--seed", type=int, default=1)
+
+    def run_benchmark(self, comments, share, words, workers, seed, **options):
+        rng = random.Random(seed)
+        author = User.objects.create_user(username="bench", password="x")
+        post = Post.objects.create(title="Пост", content="x", author=author)
+        for start in range(0, comments, 5000):
+            batch = []
+            for _ in range(min(5000, comments - start)):
+                is_spam = rng.random() < share
+                batch.append(
+                    Comment(
+                        post=post,
+                        author=author,
+                        content=self._text(rng, is_spam, words),
+                        is_hidden=is_spam,
+                        review=Comment.Review.SPAM if is_spam else "",
+                    )
+                )
+            Comment.objects.bulk_create(batch)
+
+        model_dir = tempfile.mkdtemp(prefix="blogqa-bench-spam-")
+        try:
+            with patch("blog.spam.MODEL_PATH", os.path.join(model_dir, "spam.npz")):
+                self._run(comments, share, words, workers, rng, author, post)
+        finally:
+            shutil.rmtree(model_dir)
+
+    def _run(self, comments, share, words, workers, rng, author, post):
+        texts = list(Comment.objects.values_list("content", flat=True)[:20_000])
+        for count in sorted({1, workers}):
+            with spam._featurizer(count) as featurize:
+                rate, seconds = measure(lambda: featurize(texts), 1)
+            self.report(f"ознаки, процесів {count}", len(texts) * rate, seconds / len(texts), unit="комент./с")
+
+        started = time.perf_counter()
+        spam.train(workers=workers)
+        elapsed = time.perf_counter() - started
+        self.report(f"навчання, {comments} коментарів", comments / elapsed, elapsed / comments, unit="комент./с")
+
+        started = time.perf_counter()
+        spam.score(Comment.objects.all(), workers=workers)
+        elapsed = time.perf_counter() - started
+        self.report("переоцінка всіх (з записом оцінок)", comments / elapsed, elapsed / comments, unit="комент./с")
+
+        # окремі тексти, яких модель не бачила
+        labels = np.asarray([rng.random() < share for _ in range(20_000)])
+        scores = spam.Model.load().scores(spam.features([self._text(rng, is_spam, words) for is_spam in labels]))
+        flagged = scores >= spam.HOLD_THRESHOLD
+        caught = np.count_nonzero(flagged & labels)
+        self.stdout.write(
+            f"нові тексти з порогом {spam.HOLD_THRESHOLD}: точність {caught / max(np.count_nonzero(flagged), 1):.1%}, "
+            f"повнота {caught / max(np.count_nonzero(labels), 1):.1%}"
+        )
+
+        def inline():
+            spam.Model.load().scores(spam.features([self._text(rng, False, words)]))
+
+        self.report("оцінка в запиті (модель + ознаки)", *measure(inline, 200))
+
+        client = Client()
+        client.force_login(author)
+        url = reverse("add-comment", args=[post.pk])
+
+        def add_comment():
+            client.post(url, {"content": self._text(rng, False, words)})
+
+        with override_settings(RATELIMIT_ENABLED=False):
+            self.report("add_comment (без оцінки)", *measure(add_comment, 200))
+
+        def worker_pass():
+            Comment.objects.create(post=post, author=author, content=self._text(rng, True, words))
+            spam.score_pending()
+
+        self.report("воркер: новий коментар + оцінка", *measure(worker_pass, 200))
+
+    def _text(self, rng, is_spam, words):
+        """Звичайні коментарі - слова зі словника на 20 тис.; у спамі третина слів - з 300 рекламних"""
+        return " ".join(
+            f"s{rng.randrange(300)}" if is_spam and rng.random() < 0.3 else f"w{rng.randrange(20_000)}"
+            for _ in range(words)
+        )
@@ -0,0 +1,98 @@
+import random
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models import Count
+from django.utils import timezone
+
+from blog import tags
+from blog.models import Post, PostTag, Tag
+from blog_project.benchmark import BenchmarkCommand, measure
+
+PER_PAGE = 10
+
+
+def keyset_page(tag_list, match_any=False, cursor=None):
+    return list(tags.tagged_posts(tag_list, match_any, cursor, PER_PAGE))
+
+
+def offset_page(tag_list, offset=0):
+    """Як без PostTag.date_posted: JOIN з постами, сортування за датою поста і OFFSET"""
+    posts = Post.objects.public().listing().filter(tags__in=tag_list).distinct().order_by("-date_posted", "-pk")
+    return list(posts.select_related("author__profile")[offset:][:PER_PAGE])
+
+
+class Command(BenchmarkCommand):
+    help = "Стрічки тегів (keyset по PostTag) проти JOIN + ORDER BY + OFFSET і хмара тегів проти GROUP BY"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--posts", type=int, default=200_000)
+        parser.add_argument("--tag-count", type=int, default=200, help="Кількість тегів (частоти за законом Ципфа)")
+        parser.add_argument("--per-post", type=int, default=3, help="Тегів на пост")
+        parser.add_argument("--reads", type=int, default=100)
+
+    def run_benchmark(self, posts, tag_count, per_post, reads, **options):
+        by_size = self._create_data(posts, tag_count, per_post)
+        popular, second, rare = by_size[0], by_size[1], by_size[-1]
+        self.stdout.write(
+            f"Зв'язків пост-тег: {PostTag.objects.count()}; "
+            f"постів у тегах: {popular.post_count}, {second.post_count}, {rare.post_count}"
+        )
+        depth = 200 * PER_PAGE
+        entry = PostTag.objects.filter(tag=popular).order_by("-date_posted", "-post_id")[depth - 1]
+        deep_cursor = f"{entry.date_posted.isoformat()}|{entry.post_id}"
+
+        cases = [
+            ("1 тег, сторінка 1", lambda: keyset_page([popular]), lambda: offset_page([popular])),
+            (
+                "1 тег, сторінка 201",
+                lambda: keyset_page([popular], cursor=deep_cursor),
+                lambda: offset_page([popular], depth),
+            ),
+            ("2 теги, AND", lambda: keyset_page([popular, second]), None),
+            ("2 теги, AND з рідкісним", lambda: keyset_page([popular, rare]), None),
+            (
+                "3 теги, OR",
+                lambda: keyset_page([popular, second, rare], True),
+                lambda: offset_page([popular, second, rare]),
+            ),
+        ]
+        for label, keyset, offset in cases:
+            self.report(f"{label}: keyset", *measure(keyset, reads), unit="стор/с")
+            if offset:
+                self.report(f"{label}: JOIN + OFFSET", *measure(offset, max(1, reads // 10)), unit="стор/с")
+
+        group_by = PostTag.objects.values("tag").annotate(total=Count("pk")).order_by("-total")[: tags.TAG_CLOUD_SIZE]
+        self.report("хмара тегів: GROUP BY", *measure(lambda: list(group_by), max(1, reads // 10)))
+        self.report("хмара тегів: індекс post_count", *measure(lambda: (cache.clear(), tags.tag_cloud()), reads))
+        self.report("хмара тегів: кеш", *measure(tags.tag_cloud, reads * 10))
+
+    def _create_data(self, posts, tag_count, per_post):
+        author = User.objects.create_user(username="bench", password="x")
+        Tag.objects.bulk_create([Tag(slug=f"tag{i}", name=f"tag{i}") for i in range(tag_count)])
+        tag_ids = list(Tag.objects.order_by("pk").values_list("pk", flat=True))
+        weights = [1 / (rank + 1) for rank in range(tag_count)]
+        start = timezone.now() - timezone.timedelta(days=365)
+        rng = random.Random(42)
+        for offset in range(0, posts, 10_000):
+            batch = Post.objects.bulk_create(
+                [
+                    Post(
+                        title=f"Пост {i}",
+                        content="x",
+                        excerpt="x",
+                        author=author,
+                        date_posted=start + timezone.timedelta(seconds=i),
+                    )
+                    for i in range(offset, min(offset + 10_000, posts))
+                ]
+            )
+            PostTag.objects.bulk_create(
+                [
+                    PostTag(post=post, tag_id=tag_id, date_posted=post.date_posted)
+                    for post in batch
+                    for tag_id in set(rng.choices(tag_ids, weights, k=per_post))
+                ]
+            )
+        Tag.objects.refresh_post_counts()
+        return list(Tag.objects.order_by("-post_count"))
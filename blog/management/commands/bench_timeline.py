@@ -0,0 +1,47 @@
+from django.contrib.auth.models import User
+from django.test import override_settings
+
+from blog import timeline
+from blog.models import Post, TimelineEntry
+from blog_project.benchmark import BenchmarkCommand, measure
+from users.models import Follow, Profile
+
+
+class Command(BenchmarkCommand):
+    help = "Вартість публікації (fan-out) і читання стрічки залежно від кількості підписників автора"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--followers", type=int, nargs="+", default=[1, 100, 1000, 10000, 100000])
+        parser.add_argument("--posts", type=int, default=5, help="Публікацій на кожен розмір")
+        parser.add_argument("--reads", type=int, default=200)
+
+    def run_benchmark(self, followers, posts, reads, **options):
+        readers = self._create_readers(max(followers))
+        for count in followers:
+            author = User.objects.create_user(username=f"author{count}", password="x")
+            Follow.objects.bulk_create([Follow(follower_id=pk, author=author) for pk in readers[:count]])
+            Profile.objects.filter(user=author).update(follower_count=count)
+            reader = User(pk=readers[0])
+
+            for mode, limit in (("fan-out on write", 10**9), ("fan-out on read", 0)):
+                with override_settings(TIMELINE_FANOUT_LIMIT=limit):
+                    titles = iter(range(10**9))
+
+                    def publish():
+                        Post.objects.create(title=f"Пост {next(titles)}", content="x", author=author)
+
+                    self.report(f"{count} підп., публікація, {mode}", *measure(publish, posts), unit="пост/с")
+                    self.report(
+                        f"{count} підп., читання стрічки, {mode}",
+                        *measure(lambda: list(timeline.timeline_page(reader, per_page=10)), reads),
+                        unit="стор/с",
+                    )
+            TimelineEntry.objects.all().delete()
+            Follow.objects.filter(author=author).delete()
+
+    def _create_readers(self, count):
+        """Читачі без хешування пароля і сигналів - bulk_create в обхід create_user"""
+        User.objects.bulk_create([User(username=f"reader{i}", password="!") for i in range(count)], batch_size=5000)
+        readers = list(User.objects.filter(username__startswith="reader").order_by("pk").values_list("pk", flat=True))
+        Profile.objects.bulk_create([Profile(user_id=pk) for pk in readers], batch_size=5000)
+        return readers
@@ -0,0 +1,45 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from blog import duplicates
+from blog.bulk import BATCH_SIZE
+from blog.models import Comment, Post
+
+MODELS = {"posts": Post, "comments": Comment}
+
+
+class Command(BaseCommand):
+    help = "Рахує MinHash-підписи нових постів і коментарів, з --hide - приховує майже однакові з ранішими"
+
+    def add_arguments(self, parser):
+        parser.add_argument("targets", nargs="*", choices=MODELS, help="Що перевіряти (типово - все)")
+        parser.add_argument("--hide", action="store_true", help="Приховати копії раніших текстів")
+        parser.add_argument("--threshold", type=float, default=duplicates.THRESHOLD, help="Мінімальна схожість")
+        parser.add_argument("--full", action="store_true", help="Перевірити всі тексти, а не лише нові")
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+        parser.add_argument("--loop", action="store_true", help="Працювати постійно")
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=settings.DUPLICATES_INTERVAL,
+            help="Пауза між перевірками в режимі --loop, с",
+        )
+
+    def handle(self, targets, hide, threshold, full, batch_size, loop, interval, **options):
+        while True:
+            for target in targets or MODELS:
+                done, hidden = duplicates.scan(
+                    MODELS[target], hide, threshold, full, batch_size=batch_size, progress=self.progress
+                )
+                if done or not loop:
+                    self.stdout.write(self.style.SUCCESS(f"\n{target}: перевірено {done}, приховано {hidden}"))
+            if not loop:
+                return
+            full = False
+            time.sleep(interval)
+
+    def progress(self, done):
+        self.stdout.write(f"\rОброблено: {done}", ending="")
+        self.stdout.flush()
@@ -0,0 +1,60 @@
+from datetime import datetime
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from blog import moderation
+from blog.bulk import BATCH_SIZE
+from blog.models import Comment, Post
+
+MODELS = {"posts": Post, "comments": Comment}
+
+
+def parse_date(value):
+    return timezone.make_aware(datetime.fromisoformat(value)) if value else None
+
+
+class Command(BaseCommand):
+    help = "Масова модерація постів/коментарів за фільтром (автор, період, текст) пачками SQL"
+
+    def add_arguments(self, parser):
+        parser.add_argument("target", choices=MODELS, help="Що модерувати")
+        parser.add_argument("action", choices=["hide", "unhide", "delete", "reassign"])
+        parser.add_argument("--author", help="Логін автора")
+        parser.add_argument("--since", help="Дата від (YYYY-MM-DD[THH:MM])")
+        parser.add_argument("--until", help="Дата до (YYYY-MM-DD[THH:MM])")
+        parser.add_argument("--contains", help="Підрядок у тексті")
+        parser.add_argument("--to", help="Логін нового автора для reassign")
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+
+    def handle(self, target, action, **options):
+        queryset = MODELS[target].objects.all()
+        if options["author"]:
+            queryset = queryset.filter(author__username=options["author"])
+        if options["since"]:
+            queryset = queryset.filter(date_posted__gte=parse_date(options["since"]))
+        if options["until"]:
+            queryset = queryset.filter(date_posted__lt=parse_date(options["until"]))
+        if options["contains"]:
+            queryset = queryset.filter(content__icontains=options["contains"])
+
+        kwargs = {"batch_size": options["batch_size"], "progress": self.progress}
+        if action == "hide":
+            count = moderation.hide(queryset, **kwargs)
+        elif action == "unhide":
+            count = moderation.hide(queryset, hidden=False, **kwargs)
+        elif action == "delete":
+            count = moderation.delete(queryset, **kwargs)
+        else:
+            try:
+                user = User.objects.get(username=options["to"])
+            except User.DoesNotExist:
+                raise CommandError(f"Користувача «{options['to']}» не знайдено")
+            count = moderation.reassign(queryset, user, **kwargs)
+
+        self.stdout.write(self.style.SUCCESS(f"\nГотово: {count}"))
+
+    def progress(self, done):
+        self.stdout.write(f"\rОброблено: {done}", ending="")
+        self.stdout.flush()
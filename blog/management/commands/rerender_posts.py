@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from blog.bulk import BATCH_SIZE
+from blog.models import Post
+from blog.rendering import RENDERER_VERSION
+
+
+class Command(BaseCommand):
+    help = "Перерендерює HTML постів, збережений іншою версією рендерера (blog.rendering)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--full", action="store_true", help="Перерендерити всі пости")
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+
+    def handle(self, full, batch_size, **options):
+        posts = Post.objects.all() if full else Post.objects.exclude(content_html_version=RENDERER_VERSION)
+        done = posts.render(batch_size, progress=self.progress)
+        self.stdout.write(self.style.SUCCESS(f"\nГотово: {done} (версія {RENDERER_VERSION})"))
+
+    def progress(self, done):
+        self.stdout.write(f"\rОброблено: {done}", ending="")
+        self.stdout.flush()
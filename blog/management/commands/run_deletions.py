@@ -0,0 +1,40 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from blog.bulk import BATCH_SIZE
+from blog.deletion import run_pending
+
+
+class Command(BaseCommand):
+    help = "Видаляє пости і користувачів із черги DeletionJob пачками коротких транзакцій"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+        parser.add_argument("--loop", action="store_true", help="Працювати постійно")
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=settings.DELETION_INTERVAL,
+            help="Пауза між перевірками черги в режимі --loop, с",
+        )
+        parser.add_argument(
+            "--pause",
+            type=float,
+            default=settings.DELETION_BATCH_PAUSE,
+            help="Пауза між пачками, с: за неї записують запити, що чекають на блокування БД",
+        )
+
+    def handle(self, batch_size, loop, interval, pause, **options):
+        while True:
+            count = run_pending(batch_size=batch_size, progress=self.progress, pause=pause)
+            if count or not loop:
+                self.stdout.write(self.style.SUCCESS(f"\nЗавершено задач: {count}"))
+            if not loop:
+                return
+            time.sleep(interval)
+
+    def progress(self, done):
+        self.stdout.write(f"\rВидалено рядків: {done}", ending="")
+        self.stdout.flush()
@@ -0,0 +1,30 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from blog.bulk import BATCH_SIZE
+from blog.publishing import publish_due, seconds_until_due
+
+
+class Command(BaseCommand):
+    help = "Публікує заплановані пости, прокидаючись у час найближчої публікації"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+        parser.add_argument("--loop", action="store_true", help="Працювати постійно")
+        parser.add_argument(
+            "--recheck",
+            type=float,
+            default=settings.PUBLISH_SCHEDULER_RECHECK,
+            help="Найдовший сон у режимі --loop, с: за цей час помічаються нові заплановані пости",
+        )
+
+    def handle(self, batch_size, loop, recheck, **options):
+        while True:
+            count = publish_due(batch_size=batch_size)
+            if count or not loop:
+                self.stdout.write(f"Опубліковано постів: {count}")
+            if not loop:
+                return
+            time.sleep(seconds_until_due(recheck=recheck))
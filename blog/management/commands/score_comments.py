@@ -0,0 +1,52 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from blog import spam
+from blog.bulk import BATCH_SIZE
+from blog.models import Comment
+
+
+class Command(BaseCommand):
+    help = "Оцінює нові коментарі на спам і затримує підозрілі; --train навчає модель, --rescore переоцінює всі"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--train", action="store_true", help="Навчити модель на рішеннях модераторів")
+        parser.add_argument("--rescore", action="store_true", help="Переоцінити всі не перевірені коментарі")
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=None,
+            help="Процесів для перетворення текстів на ознаки (типово - SPAM_WORKERS)",
+        )
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+        parser.add_argument("--loop", action="store_true", help="Працювати постійно")
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=settings.SPAM_INTERVAL,
+            help="Пауза між перевірками нових коментарів у режимі --loop, с",
+        )
+
+    def handle(self, train, rescore, workers, batch_size, loop, interval, **options):
+        kwargs = {"workers": workers, "batch_size": batch_size, "progress": self.progress}
+        if train:
+            examples = spam.train(**kwargs)
+            if not examples:
+                raise CommandError("Для навчання потрібні і спам, і не спам")
+            self.stdout.write(self.style.SUCCESS(f"\nМодель навчено на {examples} коментарях"))
+        if rescore:
+            done, held = spam.score(Comment.objects.filter(review=""), **kwargs)
+            self.stdout.write(self.style.SUCCESS(f"\nПереоцінено: {done}, затримано: {held}"))
+        while True:
+            done, held = spam.score_pending(**kwargs)
+            if done or not loop:
+                self.stdout.write(self.style.SUCCESS(f"\nОцінено: {done}, затримано: {held}"))
+            if not loop:
+                return
+            time.sleep(interval)
+
+    def progress(self, done):
+        self.stdout.write(f"\rОброблено: {done}", ending="")
+        self.stdout.flush()
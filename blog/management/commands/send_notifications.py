@@ -0,0 +1,30 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from blog.bulk import BATCH_SIZE
+from blog.notifications import build_digests
+
+
+class Command(BaseCommand):
+    help = "Збирає нові коментарі в сповіщення авторам постів і ставить у чергу листи-дайджести"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+        parser.add_argument("--no-email", action="store_true", help="Лише сповіщення на сайті, без листів")
+        parser.add_argument("--loop", action="store_true", help="Працювати постійно")
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=settings.NOTIFICATION_DIGEST_INTERVAL,
+            help="Вікно дайджесту: пауза між запусками в режимі --loop, с",
+        )
+
+    def handle(self, batch_size, no_email, loop, interval, **options):
+        while True:
+            count = build_digests(batch_size=batch_size, send_email=not no_email)
+            self.stdout.write(f"Оброблено коментарів: {count}")
+            if not loop:
+                return
+            time.sleep(interval)
@@ -0,0 +1,31 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from blog import autocomplete
+from blog.bulk import BATCH_SIZE
+
+
+class Command(BaseCommand):
+    help = "Перебудовує індекс автодоповнення імен і заголовків з БД і починає новий журнал змін"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+        parser.add_argument("--loop", action="store_true", help="Працювати постійно")
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=settings.AUTOCOMPLETE_INTERVAL,
+            help="Пауза між перебудовами в режимі --loop, с",
+        )
+
+    def handle(self, batch_size, loop, interval, **options):
+        while True:
+            counts = autocomplete.build(batch_size=batch_size)
+            self.stdout.write(
+                self.style.SUCCESS(f"Проіндексовано: користувачів {counts['users']}, постів {counts['posts']}")
+            )
+            if not loop:
+                return
+            time.sleep(interval)
@@ -0,0 +1,42 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from blog import related
+from blog.bulk import BATCH_SIZE
+
+
+class Command(BaseCommand):
+    help = "Рахує схожі пости (TF-IDF) для нових і змінених постів або перебудовує їх для всіх (--full)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--full", action="store_true", help="Перебудувати матрицю і сусідів усіх постів")
+        parser.add_argument(
+            "--workers", type=int, default=None, help="Процесів для --full (типово - RELATED_POSTS_WORKERS)"
+        )
+        parser.add_argument("--chunk-size", type=int, default=related.CHUNK_SIZE, help="Рядків схожостей на пачку")
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+        parser.add_argument("--loop", action="store_true", help="Працювати постійно")
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=settings.RELATED_POSTS_INTERVAL,
+            help="Пауза між оновленнями в режимі --loop, с",
+        )
+
+    def handle(self, full, workers, chunk_size, batch_size, loop, interval, **options):
+        if full:
+            done = related.build(workers, chunk_size, batch_size, progress=self.progress)
+            self.stdout.write(self.style.SUCCESS(f"\nГотово: {done}"))
+        while True:
+            done = related.update_stale(batch_size, progress=self.progress)
+            if done or not loop:
+                self.stdout.write(self.style.SUCCESS(f"\nОновлено: {done}"))
+            if not loop:
+                return
+            time.sleep(interval)
+
+    def progress(self, done):
+        self.stdout.write(f"\rОброблено: {done}", ending="")
+        self.stdout.flush()
@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog.bulk import BATCH_SIZE
+from blog.trending import update_trending_scores
+
+
+class Command(BaseCommand):
+    help = "Перераховує trending_score для постів з новою активністю з моменту попереднього запуску"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--full", action="store_true", help="Перерахувати всі пости")
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+        parser.add_argument("--loop", action="store_true", help="Працювати постійно")
+        parser.add_argument("--interval", type=float, default=60, help="Пауза між запусками в режимі --loop, с")
+
+    def handle(self, full, batch_size, loop, interval, **options):
+        while True:
+            count = update_trending_scores(batch_size=batch_size, full=full)
+            self.stdout.write(f"Оновлено оцінок: {count}")
+            if not loop:
+                return
+            full = False
+            time.sleep(interval)
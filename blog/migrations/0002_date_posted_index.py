@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-19 04:10
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='comment',
+            name='date_posted',
+            field=models.DateTimeField(db_index=True, default=django.utils.timezone.now, verbose_name='Дата публікації'),
+        ),
+        migrations.AlterField(
+            model_name='post',
+            name='date_posted',
+            field=models.DateTimeField(db_index=True, default=django.utils.timezone.now, verbose_name='Дата публікації'),
+        ),
+    ]
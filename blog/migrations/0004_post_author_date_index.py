@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 04:14
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0003_moderation_fields'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['author', '-date_posted'], name='blog_post_author_date_idx'),
+        ),
+    ]
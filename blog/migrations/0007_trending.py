@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-19 04:19
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0006_likes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True, verbose_name='Задача')),
+                ('value', models.CharField(blank=True, max_length=255, verbose_name='Позначка')),
+            ],
+            options={
+                'verbose_name': 'Позначка задачі',
+                'verbose_name_plural': 'Позначки задач',
+            },
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='activity_at',
+            field=models.DateTimeField(db_index=True, default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='trending_score',
+            field=models.FloatField(default=0, editable=False, verbose_name='Популярність'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['-trending_score', '-id'], name='blog_post_trending_idx'),
+        ),
+    ]
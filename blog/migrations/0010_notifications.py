@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-19 04:44
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0009_comment_threads'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Notification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('comment_count', models.PositiveIntegerField(default=0, verbose_name='Нових коментарів')),
+                ('updated', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Оновлено')),
+                ('is_read', models.BooleanField(default=False, verbose_name='Прочитано')),
+                ('last_comment', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='blog.comment', verbose_name='Останній коментар')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='blog.post', verbose_name='Пост')),
+                ('recipient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notifications', to=settings.AUTH_USER_MODEL, verbose_name='Отримувач')),
+            ],
+            options={
+                'verbose_name': 'Сповіщення',
+                'verbose_name_plural': 'Сповіщення',
+                'indexes': [models.Index(fields=['recipient', '-updated', '-id'], name='blog_notification_inbox_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('is_read', False)), fields=('recipient', 'post'), name='blog_notification_unread_unique')],
+            },
+        ),
+    ]
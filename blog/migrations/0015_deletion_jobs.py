@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:28
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0014_post_status'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeletionJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('target', models.CharField(choices=[('post', 'Пост'), ('user', 'Користувач')], max_length=10, verbose_name='Що видаляється')),
+                ('target_id', models.PositiveBigIntegerField(verbose_name='id')),
+                ('target_repr', models.CharField(blank=True, max_length=200, verbose_name="Об'єкт")),
+                ('status', models.CharField(choices=[('pending', 'Очікує'), ('running', 'Виконується'), ('done', 'Завершено'), ('failed', 'Помилка')], default='pending', max_length=10, verbose_name='Стан')),
+                ('step', models.PositiveSmallIntegerField(default=0, verbose_name='Етап')),
+                ('deleted_rows', models.PositiveBigIntegerField(default=0, verbose_name='Видалено рядків')),
+                ('created', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Створено')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='Розпочато')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Завершено')),
+                ('last_error', models.TextField(blank=True, verbose_name='Помилка')),
+                ('requested_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Ініціатор')),
+            ],
+            options={
+                'verbose_name': 'Задача видалення',
+                'verbose_name_plural': 'Задачі видалення',
+                'indexes': [models.Index(fields=['status', 'created'], name='blog_deletionjob_queue_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('status__in', ['pending', 'running'])), fields=('target', 'target_id'), name='blog_deletionjob_active_unique')],
+            },
+        ),
+    ]
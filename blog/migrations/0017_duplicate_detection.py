@@ -0,0 +1,50 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0016_related_posts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='minhash',
+            field=models.BinaryField(null=True, verbose_name='MinHash'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='minhash',
+            field=models.BinaryField(null=True, verbose_name='MinHash'),
+        ),
+        migrations.CreateModel(
+            name='CommentBand',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.BigIntegerField(verbose_name='Ключ смуги')),
+                ('comment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='blog.comment', verbose_name='Коментар')),
+            ],
+            options={
+                'verbose_name': 'Смуга підпису коментаря',
+                'verbose_name_plural': 'Смуги підписів коментарів',
+                'indexes': [models.Index(fields=['bucket', 'comment'], name='blog_commentband_bucket_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='PostBand',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.BigIntegerField(verbose_name='Ключ смуги')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='blog.post', verbose_name='Пост')),
+            ],
+            options={
+                'verbose_name': 'Смуга підпису поста',
+                'verbose_name_plural': 'Смуги підписів постів',
+                'indexes': [models.Index(fields=['bucket', 'post'], name='blog_postband_bucket_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:58
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0017_duplicate_detection'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='review',
+            field=models.CharField(blank=True, choices=[('held', 'На перевірці'), ('approved', 'Не спам'), ('spam', 'Спам')], editable=False, max_length=10, verbose_name='Перевірка'),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='spam_score',
+            field=models.FloatField(editable=False, null=True, verbose_name='Імовірність спаму'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(condition=models.Q(('spam_score__isnull', True)), fields=['id'], name='blog_comment_unscored_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(condition=models.Q(('review', 'held')), fields=['-date_posted'], name='blog_comment_held_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0018_comment_spam_review'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='deletionjob',
+            name='lease',
+            field=models.CharField(blank=True, editable=False, max_length=32, verbose_name='Воркер'),
+        ),
+        migrations.AddField(
+            model_name='deletionjob',
+            name='lease_until',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Утримується до'),
+        ),
+    ]
@@ -0,0 +1,69 @@
+"""
+MinHash-підписи текстів для пошуку майже однакових постів і коментарів (blog.duplicates).
+
+Текст - множина шинглів (SHINGLE_SIZE слів поспіль). Частка однакових мінімумів
+NUM_PERM випадкових хеш-функцій над шинглами двох текстів оцінює їхню схожість
+Жаккара. Підпис ділиться на BANDS смуг по ROWS значень: тексти зі схожістю s мають
+хоча б одну спільну смугу з імовірністю 1 - (1 - s**ROWS)**BANDS (≈0.9987 для
+s=0.7, ≈0.97 для s=0.6, ≈0.16 для s=0.3), тож кандидатів шукають за ключами
+смуг в індексі, а не порівнянням з кожним текстом.
+"""
+
+import hashlib
+import re
+import zlib
+
+import numpy as np
+from django.conf import settings
+
+MIN_WORDS = getattr(settings, "DUPLICATES_MIN_WORDS", 10)
+SHINGLE_SIZE = 2
+BANDS = 25
+ROWS = 4
+NUM_PERM = BANDS * ROWS
+PRIME = 4294967311  # найменше просте число, більше за 2**32
+CHUNK_SIZE = 4096
+
+TOKEN_RE = re.compile(r"\w+")
+
+# Коефіцієнти хеш-функцій (a * x + b) mod PRIME - фіксовані, інакше збережені підписи стали б непорівнянними.
+# a, b, x < 2**32, тож a * x + b вміщується в uint64 без переповнення.
+_rng = np.random.default_rng(47)
+_A = _rng.integers(1, 2**32, NUM_PERM, dtype=np.uint64)[:, None]
+_B = _rng.integers(0, 2**32, NUM_PERM, dtype=np.uint64)[:, None]
+
+
+def signature(text, min_words=MIN_WORDS):
+    """Підпис тексту (NUM_PERM значень uint32) або None, якщо слів менше за min_words"""
+    words = TOKEN_RE.findall(text.lower())
+    if len(words) < max(min_words, SHINGLE_SIZE):
+        return None
+    shingles = {" ".join(gram) for gram in zip(*(words[shift:] for shift in range(SHINGLE_SIZE)))}
+    hashes = np.fromiter((zlib.crc32(shingle.encode()) for shingle in shingles), np.uint64, len(shingles))
+    values = np.full(NUM_PERM, PRIME, dtype=np.uint64)
+    # частинами - довгий текст не створює матрицю NUM_PERM x усі шингли
+    for chunk in np.array_split(hashes, max(1, len(hashes) // CHUNK_SIZE)):
+        np.minimum(values, ((_A * chunk + _B) % PRIME).min(axis=1), out=values)
+    return values.astype(np.uint32)
+
+
+def to_bytes(sig):
+    """Підпис для Post.minhash/Comment.minhash; b"" - текст закороткий для перевірки"""
+    return b"" if sig is None else sig.tobytes()
+
+
+def from_bytes(value):
+    return np.frombuffer(value, dtype=np.uint32) if value else None
+
+
+def buckets(sig):
+    """Ключі смуг підпису: перші 8 байтів blake2b від номера смуги і її значень як знакове 64-бітне число"""
+    return [
+        int.from_bytes(hashlib.blake2b(bytes([number]) + band.tobytes(), digest_size=8).digest(), "big", signed=True)
+        for number, band in enumerate(sig.reshape(BANDS, ROWS))
+    ]
+
+
+def similarity(sig, other):
+    """Оцінка схожості Жаккара двох текстів за їхніми підписами"""
+    return float(np.count_nonzero(sig == other)) / NUM_PERM
@@ -1,19 +1,126 @@
 from django.contrib.auth.models import User
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.dispatch import Signal
 from django.urls import reverse
 from django.utils import timezone
 
+from .bulk import BATCH_SIZE, iter_pk_batches
+from .excerpts import summarize
+from .minhash import signature, to_bytes
+from .paths import MAX_DEPTH, MAX_LENGTH, ancestor_ids, segment
+from .ranking import post_score
+from .rendering import RENDERER_VERSION, plain_text, render_markdown
+
+RENDER_FIELDS = ["content_html", "content_html_version", "excerpt", "has_more", "word_count"]
+
+# Пост став публічним - створений опублікованим, опублікований автором чи планувальником (post=...)
+post_published = Signal()
+
+
+class PostQuerySet(models.QuerySet):
+    def public(self):
+        """Пости, які бачать читачі"""
+        return self.filter(is_hidden=False, status=Post.Status.PUBLISHED)
+
+    def visible_to(self, user):
+        """Публічні пости і, для автора, його чернетки та заплановані"""
+        if not user.is_authenticated:
+            return self.public()
+        return self.filter(models.Q(status=Post.Status.PUBLISHED) | models.Q(author=user), is_hidden=False)
+
+    def listing(self):
+        """Пости для списків: без повного тексту, шаблони показують excerpt і теги"""
+        return self.defer("content", "content_html").prefetch_related("tags")
+
+    def render(self, batch_size=BATCH_SIZE, progress=None):
+        """Перерендерює content_html і уривки постів queryset пачками; повертає кількість постів"""
+        done = 0
+        for pks in iter_pk_batches(self, batch_size):
+            with transaction.atomic():
+                for post in Post.objects.filter(pk__in=pks).only("pk", "content", "content_html_version"):
+                    version = post.content_html_version
+                    post.render()
+                    # пост, збережений тим часом, уже має свіжий HTML - умова на версію його не перезапише
+                    Post.objects.filter(pk=post.pk, content_html_version=version).update(
+                        **{field: getattr(post, field) for field in RENDER_FIELDS}
+                    )
+            done += len(pks)
+            if progress:
+                progress(done)
+        return done
+
+    def related_to(self, post):
+        """Схожі пости post у порядку схожості - збережені сусіди (blog.related), один запит"""
+        return self.filter(similar_to__post=post).order_by("similar_to__rank")
+
+    def refresh_comment_counts(self):
+        """Перераховує comment_count одним UPDATE для всіх постів queryset"""
+        visible = (
+            Comment.objects.filter(post=OuterRef("pk"), is_hidden=False)
+            .order_by()
+            .values("post")
+            .annotate(total=Count("pk"))
+            .values("total")
+        )
+        return self.update(comment_count=Coalesce(Subquery(visible), 0), activity_at=timezone.now())
+
 
 class Post(models.Model):
     """Модель для постів блогу"""
 
+    class Status(models.TextChoices):
+        DRAFT = "draft", "Чернетка"
+        SCHEDULED = "scheduled", "Заплановано"
+        PUBLISHED = "published", "Опубліковано"
+
     title = models.CharField(max_length=200, verbose_name="Заголовок")
     content = models.TextField(verbose_name="Зміст")
-    date_posted = models.DateTimeField(default=timezone.now, verbose_name="Дата публікації")
+    # HTML з Markdown (blog.rendering) і версія рендерера, якою його отримано
+    content_html = models.TextField(blank=True, editable=False, verbose_name="Зміст (HTML)")
+    content_html_version = models.CharField(max_length=64, blank=True, editable=False, verbose_name="Версія HTML")
+    # Початок тексту для списків (blog.excerpts) - оновлюється разом із content
+    excerpt = models.TextField(blank=True, editable=False, verbose_name="Уривок")
+    has_more = models.BooleanField(default=False, editable=False, verbose_name="Текст довший за уривок")
+    word_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="Слів")
+    date_posted = models.DateTimeField(default=timezone.now, db_index=True, verbose_name="Дата публікації")
     author = models.ForeignKey(User, on_delete=models.CASCADE, verbose_name="Автор")
+    is_hidden = models.BooleanField(default=False, verbose_name="Приховано")
+    # Заплановані публікує blog.publishing, коли настає date_posted
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PUBLISHED, verbose_name="Статус")
+    comment_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="Коментарів")
+    view_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="Переглядів")
+    like_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="Вподобань")
+    trending_score = models.FloatField(default=0, editable=False, verbose_name="Популярність")
+    # Остання активність (коментар, перегляди, вподобання) - за нею перераховується trending_score
+    activity_at = models.DateTimeField(default=timezone.now, db_index=True, editable=False)
+    tags = models.ManyToManyField("Tag", through="PostTag", related_name="posts", blank=True, verbose_name="Теги")
+    # Текст змінився, а схожі пости ще не перераховано (blog.related)
+    related_stale = models.BooleanField(default=True, editable=False, verbose_name="Схожі пости застаріли")
+    # MinHash-підпис змісту для пошуку дублікатів (blog.duplicates); None - ще не пораховано
+    minhash = models.BinaryField(null=True, editable=False, verbose_name="MinHash")
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
         ordering = ["-date_posted"]
+        indexes = [
+            models.Index(fields=["author", "-date_posted"], name="blog_post_author_date_idx"),
+            models.Index(fields=["-trending_score", "-id"], name="blog_post_trending_idx"),
+            # Стрічка публічних постів - без чернеток і прихованих у індексі
+            models.Index(
+                fields=["-date_posted"],
+                condition=models.Q(is_hidden=False, status="published"),
+                name="blog_post_public_date_idx",
+            ),
+            # Черга планувальника: найближчий запланований пост - перший рядок індексу
+            models.Index(
+                fields=["date_posted"], condition=models.Q(status="scheduled"), name="blog_post_scheduled_idx"
+            ),
+            # Черга перерахунку схожих постів
+            models.Index(fields=["id"], condition=models.Q(related_stale=True), name="blog_post_related_stale_idx"),
+        ]
         verbose_name = "Пост"
         verbose_name_plural = "Пости"
 
@@ -23,19 +130,429 @@ class Post(models.Model):
     def get_absolute_url(self):
         return reverse("post-detail", kwargs={"pk": self.pk})
 
+    # Статус і прихованість, з якими пост прочитано з БД: save() помічає момент публікації,
+    # а сигнали (blog.signals) - зміну видимості без зайвого запиту
+    _loaded_status = None
+    _loaded_hidden = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        post = super().from_db(db, field_names, values)
+        post._loaded_status = post.__dict__.get("status")
+        post._loaded_hidden = post.__dict__.get("is_hidden")
+        return post
+
+    @property
+    def is_public(self):
+        return not self.is_hidden and self.status == Post.Status.PUBLISHED
+
+    def save(self, *args, **kwargs):
+        if self._state.adding:
+            self.trending_score = post_score(self)
+        update_fields = kwargs.get("update_fields")
+        if "content" not in self.get_deferred_fields() and (update_fields is None or "content" in update_fields):
+            self.render()
+            self.minhash = to_bytes(signature(self.content))
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, *RENDER_FIELDS, "minhash"}
+        if update_fields is None or {"title", "content"} & set(update_fields):
+            self.related_stale = True
+            if update_fields is not None:
+                kwargs["update_fields"] = {*kwargs["update_fields"], "related_stale"}
+        publishing = (
+            self.__dict__.get("status") == Post.Status.PUBLISHED
+            and self._loaded_status != Post.Status.PUBLISHED
+            and (update_fields is None or "status" in update_fields)
+        )
+        if publishing and not self._state.adding:
+            # чернетка чи запланований пост, опублікований автором, з'являється нагорі стрічок,
+            # а популярність рахується від моменту публікації, а не створення чернетки
+            self.date_posted = self.activity_at = timezone.now()
+            self.trending_score = post_score(self)
+            if update_fields is not None:
+                kwargs["update_fields"] = {*kwargs["update_fields"], "date_posted", "activity_at", "trending_score"}
+        super().save(*args, **kwargs)
+        self._loaded_status = self.__dict__.get("status")
+        self._loaded_hidden = self.__dict__.get("is_hidden")
+        if publishing:
+            post_published.send(sender=Post, post=self)
+
+    def render(self):
+        """Рендерить content у HTML і оновлює уривок (без збереження)"""
+        self.content_html = render_markdown(self.content)
+        self.content_html_version = RENDERER_VERSION
+        self.excerpt, self.has_more, self.word_count = summarize(plain_text(self.content_html))
+
+    def ensure_rendered(self):
+        """HTML, збережений старішою версією рендерера, перерендерюється при першому читанні"""
+        if self.content_html_version != RENDERER_VERSION:
+            Post.objects.filter(pk=self.pk).render()
+            self.refresh_from_db(fields=RENDER_FIELDS)
+
+
+class CommentQuerySet(models.QuerySet):
+    def public(self):
+        """
+        Коментарі, які бачать читачі. Коментарі неактивного автора (зокрема поставленого
+        на видалення, blog.deletion) зникають одразу, ще до того, як їх видалить воркер
+        """
+        return self.filter(is_hidden=False, author__is_active=True)
+
+    def hidden(self):
+        """Коментарі, яких читачі не бачать, - протилежність public()"""
+        return self.filter(Q(is_hidden=True) | Q(author__is_active=False))
+
+    def refresh_reply_counts(self):
+        """Перераховує reply_count (кількість усіх нащадків) одним UPDATE для всіх коментарів queryset"""
+        descendants = (
+            Comment.objects.filter(post=OuterRef("post"), path__startswith=OuterRef("path"))
+            .exclude(pk=OuterRef("pk"))
+            .order_by()
+            .values("post")
+            .annotate(total=Count("pk"))
+            .values("total")
+        )
+        return self.update(reply_count=Coalesce(Subquery(descendants), 0))
+
 
 class Comment(models.Model):
-    """Модель для коментарів до постів"""
+    """Модель для коментарів до постів; відповіді утворюють дерево з матеріалізованим шляхом (blog.paths)"""
+
+    class Review(models.TextChoices):
+        HELD = "held", "На перевірці"
+        APPROVED = "approved", "Не спам"
+        SPAM = "spam", "Спам"
 
     post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name="comments", verbose_name="Пост")
     author = models.ForeignKey(User, on_delete=models.CASCADE, verbose_name="Автор")
     content = models.TextField(verbose_name="Текст коментаря")
-    date_posted = models.DateTimeField(default=timezone.now, verbose_name="Дата публікації")
+    date_posted = models.DateTimeField(default=timezone.now, db_index=True, verbose_name="Дата публікації")
+    is_hidden = models.BooleanField(default=False, verbose_name="Приховано")
+    parent = models.ForeignKey(
+        "self",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name="replies",
+        verbose_name="Відповідь на",
+    )
+    path = models.CharField(max_length=MAX_LENGTH, default="", editable=False, verbose_name="Шлях")
+    depth = models.PositiveSmallIntegerField(default=0, editable=False, verbose_name="Рівень")
+    reply_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="Відповідей у гілці")
+    # MinHash-підпис тексту для пошуку дублікатів (blog.duplicates); None - ще не пораховано
+    minhash = models.BinaryField(null=True, editable=False, verbose_name="MinHash")
+    # Імовірність спаму за моделлю blog.spam; None - ще не оцінено
+    spam_score = models.FloatField(null=True, editable=False, verbose_name="Імовірність спаму")
+    # Підозрілі чекають на модератора прихованими; рішення модератора - навчальні дані моделі
+    review = models.CharField(
+        max_length=10, choices=Review.choices, blank=True, editable=False, verbose_name="Перевірка"
+    )
+
+    objects = CommentQuerySet.as_manager()
 
     class Meta:
         ordering = ["date_posted"]
+        indexes = [
+            # дерево поста і піддерево коментаря - діапазони шляхів
+            models.Index(fields=["post", "path"], name="blog_comment_post_path_idx"),
+            # сторінка кореневих гілок поста
+            models.Index(fields=["post", "depth", "path"], name="blog_comment_post_root_idx"),
+            # приховані коментарі рідкісні - частковий індекс дозволяє знайти їх у гілці без сканування всієї гілки
+            models.Index(fields=["post", "path"], condition=models.Q(is_hidden=True), name="blog_comment_hidden_idx"),
+            # черга оцінки на спам
+            models.Index(fields=["id"], condition=models.Q(spam_score__isnull=True), name="blog_comment_unscored_idx"),
+            # черга модерації
+            models.Index(fields=["-date_posted"], condition=models.Q(review="held"), name="blog_comment_held_idx"),
+        ]
         verbose_name = "Коментар"
         verbose_name_plural = "Коментарі"
 
     def __str__(self):
         return f'Коментар від {self.author.username} до "{self.post.title}"'
+
+    def save(self, *args, **kwargs):
+        """Підтримуємо шлях, reply_count предків і Post.comment_count"""
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None or "content" in update_fields:
+            self.minhash = to_bytes(signature(self.content))
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "minhash"}
+        if not self._state.adding:
+            super().save(*args, **kwargs)
+            Post.objects.filter(pk=self.post_id).refresh_comment_counts()
+            return
+
+        parent = self.parent if self.parent_id else None
+        # глибше MAX_DEPTH гілка не росте: відповідь стає сусідом батька
+        while parent is not None and parent.depth + 1 >= MAX_DEPTH:
+            parent = parent.parent
+        self.parent = parent
+        self.depth = parent.depth + 1 if parent else 0
+
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            self.path = (parent.path if parent else "") + segment(self.pk)
+            Comment.objects.filter(pk=self.pk).update(path=self.path)
+            if parent:
+                Comment.objects.filter(pk__in=ancestor_ids(self.path)).update(reply_count=F("reply_count") + 1)
+            if not self.is_hidden:
+                Post.objects.filter(pk=self.post_id).update(
+                    comment_count=F("comment_count") + 1, activity_at=timezone.now()
+                )
+
+    def delete(self, *args, **kwargs):
+        """Разом із коментарем видаляється вся його гілка"""
+        with transaction.atomic():
+            replies = Comment.objects.filter(pk=self.pk).values_list("reply_count", flat=True).first() or 0
+            result = super().delete(*args, **kwargs)
+            if self.parent_id:
+                Comment.objects.filter(pk__in=ancestor_ids(self.path)).update(
+                    reply_count=F("reply_count") - (replies + 1)
+                )
+            if replies:
+                Post.objects.filter(pk=self.post_id).refresh_comment_counts()
+            elif not self.is_hidden:
+                Post.objects.filter(pk=self.post_id).update(comment_count=F("comment_count") - 1)
+        return result
+
+
+class Like(models.Model):
+    """Вподобання поста користувачем (не більше одного на пару user/post)"""
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="likes", verbose_name="Користувач")
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name="likes", verbose_name="Пост")
+    created = models.DateTimeField(default=timezone.now, verbose_name="Дата")
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=["user", "post"], name="blog_like_unique_user_post")]
+        verbose_name = "Вподобання"
+        verbose_name_plural = "Вподобання"
+
+    def __str__(self):
+        return f'Вподобання від {self.user.username} до "{self.post.title}"'
+
+
+class TagQuerySet(models.QuerySet):
+    def refresh_post_counts(self):
+        """Перераховує post_count (видимі пости) одним UPDATE для всіх тегів queryset"""
+        visible = (
+            PostTag.objects.filter(tag=OuterRef("pk"), post__is_hidden=False, post__status=Post.Status.PUBLISHED)
+            .order_by()
+            .values("tag")
+            .annotate(total=Count("pk"))
+            .values("total")
+        )
+        return self.update(post_count=Coalesce(Subquery(visible), 0))
+
+
+class Tag(models.Model):
+    """Тег постів (blog.tags)"""
+
+    name = models.CharField(max_length=50, verbose_name="Назва")
+    slug = models.SlugField(max_length=50, unique=True, allow_unicode=True, verbose_name="Slug")
+    # Видимих постів з тегом - оновлюється разом зі зв'язками, хмара тегів читає лише його
+    post_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="Постів")
+
+    objects = TagQuerySet.as_manager()
+
+    class Meta:
+        ordering = ["name"]
+        indexes = [models.Index(fields=["-post_count", "name"], name="blog_tag_cloud_idx")]
+        verbose_name = "Тег"
+        verbose_name_plural = "Теги"
+
+    def __str__(self):
+        return self.name
+
+    def get_absolute_url(self):
+        return reverse("tag-posts", kwargs={"slugs": self.slug})
+
+
+class PostTag(models.Model):
+    """Зв'язок пост-тег з копією дати публікації: стрічка тегу - діапазон одного індексу"""
+
+    # Окремі індекси по FK не потрібні: їх покривають складені індекси нижче
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, db_index=False, verbose_name="Пост")
+    tag = models.ForeignKey(Tag, on_delete=models.CASCADE, db_index=False, verbose_name="Тег")
+    date_posted = models.DateTimeField(verbose_name="Дата публікації")
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=["post", "tag"], name="blog_posttag_unique_post_tag")]
+        indexes = [models.Index(fields=["tag", "-date_posted", "-post"], name="blog_posttag_tag_date_idx")]
+        verbose_name = "Тег поста"
+        verbose_name_plural = "Теги постів"
+
+    def __str__(self):
+        return f"{self.post_id}: {self.tag_id}"
+
+
+class RelatedPost(models.Model):
+    """Один із найближчих за TF-IDF постів до post (blog.related): rank 0 - найсхожіший"""
+
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name="+", db_index=False, verbose_name="Пост")
+    related = models.ForeignKey(Post, on_delete=models.CASCADE, related_name="similar_to", verbose_name="Схожий пост")
+    rank = models.PositiveSmallIntegerField(verbose_name="Місце")
+    score = models.FloatField(verbose_name="Схожість")
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=["post", "rank"], name="blog_relatedpost_unique_rank")]
+        verbose_name = "Схожий пост"
+        verbose_name_plural = "Схожі пости"
+
+    def __str__(self):
+        return f"{self.post_id} ~ {self.related_id} ({self.score:.2f})"
+
+
+class PostBand(models.Model):
+    """Ключ однієї смуги MinHash-підпису поста (blog.duplicates): пости зі спільним ключем - кандидати в дублікати"""
+
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name="+", verbose_name="Пост")
+    bucket = models.BigIntegerField(verbose_name="Ключ смуги")
+
+    class Meta:
+        # пошук кандидатів читає лише індекс
+        indexes = [models.Index(fields=["bucket", "post"], name="blog_postband_bucket_idx")]
+        verbose_name = "Смуга підпису поста"
+        verbose_name_plural = "Смуги підписів постів"
+
+    def __str__(self):
+        return f"{self.post_id}: {self.bucket}"
+
+
+class CommentBand(models.Model):
+    """Ключ однієї смуги MinHash-підпису коментаря (blog.duplicates)"""
+
+    comment = models.ForeignKey(Comment, on_delete=models.CASCADE, related_name="+", verbose_name="Коментар")
+    bucket = models.BigIntegerField(verbose_name="Ключ смуги")
+
+    class Meta:
+        indexes = [models.Index(fields=["bucket", "comment"], name="blog_commentband_bucket_idx")]
+        verbose_name = "Смуга підпису коментаря"
+        verbose_name_plural = "Смуги підписів коментарів"
+
+    def __str__(self):
+        return f"{self.comment_id}: {self.bucket}"
+
+
+class JobCheckpoint(models.Model):
+    """Позначка, до якої фонова задача вже обробила дані (час, id тощо)"""
+
+    name = models.CharField(max_length=100, unique=True, verbose_name="Задача")
+    value = models.CharField(max_length=255, blank=True, verbose_name="Позначка")
+
+    class Meta:
+        verbose_name = "Позначка задачі"
+        verbose_name_plural = "Позначки задач"
+
+    def __str__(self):
+        return f"{self.name}: {self.value}"
+
+    @classmethod
+    def get(cls, name, default=None):
+        value = cls.objects.filter(name=name).values_list("value", flat=True).first()
+        return default if value is None else value
+
+    @classmethod
+    def set(cls, name, value):
+        cls.objects.update_or_create(name=name, defaults={"value": str(value)})
+
+
+class TimelineEntry(models.Model):
+    """Рядок персональної стрічки: пост автора, на якого підписаний user (blog.timeline)"""
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="timeline", verbose_name="Читач")
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name="+", verbose_name="Пост")
+    author = models.ForeignKey(User, on_delete=models.CASCADE, related_name="+", verbose_name="Автор")
+    date_posted = models.DateTimeField(verbose_name="Дата публікації")
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=["user", "post"], name="blog_timeline_unique_user_post")]
+        indexes = [
+            models.Index(fields=["user", "-date_posted", "-post"], name="blog_timeline_user_date_idx"),
+            models.Index(fields=["user", "author"], name="blog_timeline_user_author_idx"),
+        ]
+        verbose_name = "Запис стрічки"
+        verbose_name_plural = "Записи стрічки"
+
+    def __str__(self):
+        return f"{self.user_id}: {self.post_id}"
+
+
+class Notification(models.Model):
+    """Дайджест нових коментарів до поста для його автора (blog.notifications)"""
+
+    recipient = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="notifications", verbose_name="Отримувач"
+    )
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name="+", verbose_name="Пост")
+    comment_count = models.PositiveIntegerField(default=0, verbose_name="Нових коментарів")
+    last_comment = models.ForeignKey(
+        Comment, on_delete=models.SET_NULL, null=True, related_name="+", verbose_name="Останній коментар"
+    )
+    updated = models.DateTimeField(default=timezone.now, verbose_name="Оновлено")
+    is_read = models.BooleanField(default=False, verbose_name="Прочитано")
+
+    class Meta:
+        constraints = [
+            # Поки сповіщення не прочитане, нові коментарі дописуються в нього
+            models.UniqueConstraint(
+                fields=["recipient", "post"],
+                condition=models.Q(is_read=False),
+                name="blog_notification_unread_unique",
+            )
+        ]
+        # Непрочитані рахуються по індексу обмеження вище, список - по цьому
+        indexes = [models.Index(fields=["recipient", "-updated", "-id"], name="blog_notification_inbox_idx")]
+        verbose_name = "Сповіщення"
+        verbose_name_plural = "Сповіщення"
+
+    def __str__(self):
+        return f"{self.recipient_id}: {self.post_id} (+{self.comment_count})"
+
+
+class DeletionJob(models.Model):
+    """Фонове видалення поста чи користувача з усіма залежними рядками (blog.deletion)"""
+
+    class Target(models.TextChoices):
+        POST = "post", "Пост"
+        USER = "user", "Користувач"
+
+    class Status(models.TextChoices):
+        PENDING = "pending", "Очікує"
+        RUNNING = "running", "Виконується"
+        DONE = "done", "Завершено"
+        FAILED = "failed", "Помилка"
+
+    target = models.CharField(max_length=10, choices=Target.choices, verbose_name="Що видаляється")
+    target_id = models.PositiveBigIntegerField(verbose_name="id")
+    target_repr = models.CharField(max_length=200, blank=True, verbose_name="Об'єкт")
+    requested_by = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True, related_name="+", verbose_name="Ініціатор"
+    )
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING, verbose_name="Стан")
+    step = models.PositiveSmallIntegerField(default=0, verbose_name="Етап")
+    deleted_rows = models.PositiveBigIntegerField(default=0, verbose_name="Видалено рядків")
+    created = models.DateTimeField(default=timezone.now, verbose_name="Створено")
+    started_at = models.DateTimeField(null=True, blank=True, verbose_name="Розпочато")
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name="Завершено")
+    last_error = models.TextField(blank=True, verbose_name="Помилка")
+    # Воркер, що виконує задачу, і до коли він її тримає: задачу воркера, що впав, бере інший
+    lease = models.CharField(max_length=32, blank=True, editable=False, verbose_name="Воркер")
+    lease_until = models.DateTimeField(null=True, blank=True, editable=False, verbose_name="Утримується до")
+
+    class Meta:
+        constraints = [
+            # Повторний запит на видалення того самого об'єкта не створює другу задачу
+            models.UniqueConstraint(
+                fields=["target", "target_id"],
+                condition=models.Q(status__in=["pending", "running"]),
+                name="blog_deletionjob_active_unique",
+            )
+        ]
+        indexes = [models.Index(fields=["status", "created"], name="blog_deletionjob_queue_idx")]
+        verbose_name = "Задача видалення"
+        verbose_name_plural = "Задачі видалення"
+
+    def __str__(self):
+        return f"{self.get_target_display()} {self.target_repr or self.target_id}: {self.get_status_display()}"
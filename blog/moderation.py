@@ -0,0 +1,117 @@
+"""
+Масова модерація постів і коментарів.
+Використовується адмін-діями і командою `python manage.py moderate`.
+"""
+
+from collections import Counter
+from contextlib import contextmanager
+from itertools import groupby
+
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+
+from . import autocomplete, tags
+from .bulk import BATCH_SIZE, bulk_delete, bulk_update, delete_pks, iter_pk_batches
+from .feeds import invalidate_feeds
+from .models import Comment, Post, PostTag
+from .paths import ancestor_ids
+
+
+def hide(queryset, hidden=True, batch_size=BATCH_SIZE, progress=None):
+    """Приховує (або показує) пости чи коментарі"""
+    if queryset.model is Comment:
+        return _update_comments(queryset.filter(is_hidden=not hidden), {"is_hidden": hidden}, batch_size, progress)
+    # знову показаним постам заново рахуються схожі (blog.related)
+    values = {"is_hidden": hidden} if hidden else {"is_hidden": False, "related_stale": True}
+    changing = queryset.filter(is_hidden=not hidden)
+    with _invalidating_feeds(queryset), _refreshing_tags(queryset), _refreshing_autocomplete(changing):
+        return bulk_update(changing, values, batch_size, progress)
+
+
+def reassign(queryset, user, batch_size=BATCH_SIZE, progress=None):
+    """Передає пости чи коментарі іншому автору"""
+    if queryset.model is Comment:
+        return bulk_update(queryset.exclude(author=user), {"author": user}, batch_size, progress)
+    with _invalidating_feeds(queryset, user.pk):
+        return bulk_update(queryset.exclude(author=user), {"author": user}, batch_size, progress)
+
+
+def delete(queryset, batch_size=BATCH_SIZE, progress=None):
+    """Видаляє пости чи коментарі разом із залежними рядками"""
+    if queryset.model is Comment:
+        return _update_comments(queryset, None, batch_size, progress)
+    with _invalidating_feeds(queryset), _refreshing_tags(queryset), _refreshing_autocomplete(queryset):
+        return bulk_delete(queryset, batch_size, progress)
+
+
+@contextmanager
+def _invalidating_feeds(posts, *extra_author_ids):
+    """Масові операції оминають сигнали, тож стрічки авторів скидаються явно"""
+    author_ids = set(posts.order_by().values_list("author_id", flat=True).distinct())
+    try:
+        yield
+    finally:
+        invalidate_feeds(*author_ids, *extra_author_ids)
+
+
+@contextmanager
+def _refreshing_tags(posts):
+    """Так само явно перераховуються лічильники тегів змінених постів"""
+    tag_ids = set(PostTag.objects.filter(post__in=posts).order_by().values_list("tag_id", flat=True).distinct())
+    try:
+        yield
+    finally:
+        tags.refresh_counts(tag_ids)
+
+
+@contextmanager
+def _refreshing_autocomplete(posts):
+    """І заголовки змінених постів записуються в журнал автодоповнення"""
+    pks = list(posts.values_list("pk", flat=True))
+    try:
+        yield
+    finally:
+        autocomplete.posts_changed(pks)
+
+
+def _update_comments(queryset, values, batch_size, progress):
+    """
+    UPDATE is_hidden (або DELETE, якщо values=None) коментарів з оновленням Post.comment_count
+    (і reply_count предків видалених гілок) у тій самій транзакції
+    """
+    done = 0
+    for pks in iter_pk_batches(queryset, batch_size):
+        with transaction.atomic():
+            rows = list(Comment.objects.filter(pk__in=pks).values_list("post_id", "path", "reply_count", "is_hidden"))
+            if values is None:
+                ancestors = {pk for _, path, _, _ in rows for pk in ancestor_ids(path)}
+                done += delete_pks(Comment, pks, batch_size)
+                Comment.objects.filter(pk__in=ancestors).refresh_reply_counts()
+                Post.objects.filter(pk__in=_subtract_leaves(rows)).refresh_comment_counts()
+            else:
+                # comment_count - видимі коментарі, тож кожен приховуваний (показуваний) змінює його рівно на 1
+                hidden = values["is_hidden"]
+                done += Comment.objects.filter(pk__in=pks).exclude(is_hidden=hidden).update(**values)
+                changed = Counter(post_id for post_id, _, _, is_hidden in rows if is_hidden != hidden)
+                _shift_comment_counts(changed, -1 if hidden else 1)
+        if progress:
+            progress(done)
+    return done
+
+
+def _subtract_leaves(rows):
+    """
+    Видалені коментарі без відповідей зменшують comment_count постів на кількість видимих,
+    без перерахунку всіх коментарів поста; повертає пости, де видалено гілки (їх треба перерахувати)
+    """
+    with_replies = {post_id for post_id, _, reply_count, _ in rows if reply_count}
+    visible = Counter(post_id for post_id, _, _, is_hidden in rows if post_id not in with_replies and not is_hidden)
+    _shift_comment_counts(visible, -1)
+    return with_replies
+
+
+def _shift_comment_counts(counts, sign):
+    """Додає до comment_count постів {id поста: кількість} зі знаком sign - один UPDATE на кожну кількість"""
+    for delta, group in groupby(sorted(counts, key=counts.get), key=counts.get):
+        Post.objects.filter(pk__in=list(group)).update(comment_count=Greatest(F("comment_count") + sign * delta, 0))
@@ -0,0 +1,114 @@
+"""
+Сповіщення авторів про нові коментарі до їхніх постів.
+
+Запит add_comment нічого не знає про сповіщення: воркер `send_notifications`
+раз на NOTIFICATION_DIGEST_INTERVAL секунд читає коментарі, що з'явилися з
+попереднього запуску (позначка - id останнього обробленого коментаря), і
+агрегує їх у SQL по постах. На кожен пост існує щонайбільше одне непрочитане
+сповіщення, до якого дописується кількість нових коментарів, а кожен автор
+отримує один лист на запуск, скільки б коментарів не набрали його пости.
+"""
+
+from collections import defaultdict
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.mail import send_mass_mail
+from django.db import transaction
+from django.db.models import Count, F, Max
+from django.urls import reverse
+from django.utils import timezone
+
+from .bulk import BATCH_SIZE, iter_pk_batches
+from .models import Comment, JobCheckpoint, Notification
+
+CHECKPOINT = "notifications"
+UNREAD_CACHE_TIMEOUT = getattr(settings, "NOTIFICATION_UNREAD_CACHE_TIMEOUT", 10 * 60)
+SITE_URL = getattr(settings, "SITE_URL", "")
+
+
+def _unread_key(user_id):
+    return f"notifications:unread:{user_id}"
+
+
+def unread_count(user):
+    """Кількість непрочитаних сповіщень користувача (кешується до наступної зміни)"""
+    count = cache.get(_unread_key(user.pk))
+    if count is None:
+        count = Notification.objects.filter(recipient=user, is_read=False).count()
+        cache.set(_unread_key(user.pk), count, UNREAD_CACHE_TIMEOUT)
+    return count
+
+
+def mark_read(user, pks=None):
+    """Позначає прочитаними всі (або лише pks) сповіщення користувача"""
+    notifications = Notification.objects.filter(recipient=user, is_read=False)
+    if pks is not None:
+        notifications = notifications.filter(pk__in=pks)
+    count = notifications.update(is_read=True)
+    cache.delete(_unread_key(user.pk))
+    return count
+
+
+def build_digests(batch_size=BATCH_SIZE, send_email=True):
+    """
+    Обробляє коментарі, додані після попереднього запуску: оновлює сповіщення і
+    ставить у чергу листи-дайджести. Повертає кількість оброблених коментарів.
+    """
+    last = int(JobCheckpoint.get(CHECKPOINT) or 0)
+    newest = Comment.objects.order_by("-pk").values_list("pk", flat=True).first() or 0
+    if newest <= last:
+        return 0
+
+    digests = defaultdict(dict)  # отримувач -> {id поста: (назва, нових коментарів)}
+    done = 0
+    comments = Comment.objects.filter(pk__gt=last, pk__lte=newest)
+    for pks in iter_pk_batches(comments, batch_size):
+        groups = (
+            Comment.objects.filter(pk__in=pks, is_hidden=False, post__is_hidden=False)
+            .exclude(author=F("post__author"))
+            .order_by()
+            .values("post_id", "post__author_id", "post__title")
+            .annotate(count=Count("pk"), last_comment_id=Max("pk"))
+        )
+        with transaction.atomic():
+            for group in groups:
+                _add_to_digest(group)
+                _, seen = digests[group["post__author_id"]].get(group["post_id"], (None, 0))
+                digests[group["post__author_id"]][group["post_id"]] = (group["post__title"], seen + group["count"])
+            JobCheckpoint.set(CHECKPOINT, pks[-1])
+        cache.delete_many([_unread_key(user_id) for user_id in digests])
+        done += len(pks)
+
+    if send_email and digests:
+        _send_digest_emails(digests)
+    return done
+
+
+def _add_to_digest(group):
+    """Дописує коментарі групи в непрочитане сповіщення про пост або створює нове"""
+    values = {"last_comment_id": group["last_comment_id"], "updated": timezone.now()}
+    updated = Notification.objects.filter(
+        recipient_id=group["post__author_id"], post_id=group["post_id"], is_read=False
+    ).update(comment_count=F("comment_count") + group["count"], **values)
+    if not updated:
+        Notification.objects.create(
+            recipient_id=group["post__author_id"], post_id=group["post_id"], comment_count=group["count"], **values
+        )
+
+
+def _send_digest_emails(digests):
+    """Один лист на автора з переліком постів і кількістю нових коментарів"""
+    emails = dict(User.objects.filter(pk__in=digests).exclude(email="").values_list("pk", "email"))
+    messages = []
+    for user_id, posts in digests.items():
+        if user_id not in emails:
+            continue
+        lines = [
+            f"«{title}»: нових коментарів - {count}\n{SITE_URL}{reverse('post-detail', args=[post_id])}"
+            for post_id, (title, count) in posts.items()
+        ]
+        body = "Ваші пости обговорюють на BlogQA:\n\n" + "\n\n".join(lines)
+        messages.append(("Нові коментарі до ваших постів", body, None, [emails[user_id]]))
+    send_mass_mail(messages)
@@ -0,0 +1,146 @@
+import heapq
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Max, Q
+from django.http import Http404
+from django.utils.functional import cached_property
+
+
+def estimate_row_count(model, using="default"):
+    """
+    Приблизна кількість рядків таблиці без повного COUNT(*).
+    PostgreSQL - статистика планувальника, інші БД - найбільший первинний ключ.
+    """
+    connection = connections[using]
+    table = model._meta.db_table
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE relname = %s", [table])
+            row = cursor.fetchone()
+        if row and row[0] > 0:
+            return row[0]
+        return None
+    if model._meta.pk.get_internal_type() in ("AutoField", "BigAutoField"):
+        return model._default_manager.using(using).aggregate(max_pk=Max("pk"))["max_pk"] or 0
+    return None
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator для великих таблиць:
+    - нефільтрований список - оцінка кількості рядків замість COUNT(*);
+    - відфільтрований список - COUNT(*) лише до max_count рядків, але щонайменше до кінця
+      сторінки, наступної за number, тож посилання «далі» є на будь-якій сторінці.
+    count_is_estimate - count приблизний, count_is_lower_bound - рядків може бути більше.
+    """
+
+    max_count = 10000
+
+    def __init__(self, object_list, per_page, *args, number=1, max_count=None, **kwargs):
+        super().__init__(object_list, per_page, *args, **kwargs)
+        self.number = number
+        if max_count is not None:
+            self.max_count = max_count
+        self.count_is_estimate = self.count_is_lower_bound = False
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = estimate_row_count(queryset.model, queryset.db)
+            if estimate is not None and estimate > self.max_count:
+                self.count_is_estimate = True
+                return estimate
+        limit = max(self.max_count, (self.number + 1) * self.per_page)
+        count = queryset.order_by()[: limit + 1].count()
+        if count > limit:
+            self.count_is_lower_bound = True
+            return limit
+        return count
+
+
+class KeysetPage:
+    """
+    Сторінка keyset-пагінації за (field DESC, tiebreak DESC); tiebreak - унікальне поле, типово pk.
+    Замість OFFSET - умова "після курсора", тож будь-яка сторінка - це
+    короткий діапазон індексу, а не сортування і пропуск усіх попередніх рядків.
+    """
+
+    separator = "|"
+
+    def __init__(self, queryset, field, cursor, per_page, tiebreak="pk"):
+        self.field = field
+        self.tiebreak = tiebreak
+        queryset = queryset.order_by(f"-{field}", f"-{tiebreak}")
+        if cursor:
+            value, pk = self.decode(queryset.model, cursor)
+            # field <= value дозволяє БД почати діапазонне сканування індексу з курсора
+            queryset = queryset.filter(**{f"{field}__lte": value}).filter(
+                Q(**{f"{field}__lt": value}) | Q(**{f"{tiebreak}__lt": pk})
+            )
+        rows = list(queryset[: per_page + 1])
+        self.object_list = rows[:per_page]
+        self.next_cursor = self.encode(self.object_list[-1]) if len(rows) > per_page else None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def encode(self, obj):
+        value = getattr(obj, self.field)
+        value = value.isoformat() if hasattr(value, "isoformat") else repr(value)
+        return f"{value}{self.separator}{getattr(obj, self.tiebreak)}"
+
+    def decode(self, model, cursor):
+        try:
+            value, pk = cursor.rsplit(self.separator, 1)
+            return model._meta.get_field(self.field).to_python(value), int(pk)
+        except (ValueError, ValidationError):
+            raise Http404("Некоректний курсор сторінки")
+
+
+class CursorPage:
+    """Готова сторінка з курсором наступної - той самий інтерфейс, що й KeysetPage"""
+
+    def __init__(self, object_list, next_cursor):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+
+def merge_pages(pages, per_page):
+    """
+    Зливає сторінки постів кількох джерел, відсортовані за (date_posted, pk) від
+    новіших, в одну сторінку без дублікатів; курсор - у форматі KeysetPage
+    """
+    merged, seen = [], set()
+    for post in heapq.merge(*(page.object_list for page in pages), key=_date_key, reverse=True):
+        if post.pk not in seen:
+            seen.add(post.pk)
+            merged.append(post)
+    has_more = any(page.has_next() for page in pages) or len(merged) > per_page
+    posts = merged[:per_page]
+    next_cursor = None
+    if has_more and posts:
+        last = posts[-1]
+        next_cursor = f"{last.date_posted.isoformat()}{KeysetPage.separator}{last.pk}"
+    return CursorPage(posts, next_cursor)
+
+
+def _date_key(post):
+    return post.date_posted, post.pk
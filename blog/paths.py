@@ -0,0 +1,37 @@
+"""
+Матеріалізовані шляхи дерева коментарів.
+
+Шлях коментаря - конкатенація сегментів його предків і його самого, де
+сегмент - pk у base36 фіксованої ширини STEP. Через фіксовану ширину
+лексикографічний порядок шляхів - це обхід дерева в глибину (відповіді після
+батька, сусіди в порядку створення), а піддерево вузла - неперервний
+діапазон [path, subtree_end(path)), який читається одним запитом по індексу.
+"""
+
+STEP = 7  # 36**7 ≈ 7.8e10 коментарів
+MAX_DEPTH = 32
+MAX_LENGTH = STEP * MAX_DEPTH
+DIGITS = "0123456789abcdefghijklmnopqrstuvwxyz"
+
+
+def segment(pk):
+    """Сегмент шляху для pk: base36, доповнений нулями до STEP символів"""
+    digits = ""
+    while pk:
+        pk, rest = divmod(pk, 36)
+        digits = DIGITS[rest] + digits
+    return digits.rjust(STEP, "0")
+
+
+def subtree_end(path):
+    """Верхня межа (не включно) діапазону шляхів піддерева path - шлях наступного сусіда"""
+    return path[:-STEP] + segment(int(path[-STEP:], 36) + 1)
+
+
+def ancestor_ids(path):
+    """pk предків вузла з шляхом path, від кореня"""
+    return [int(path[:end][-STEP:], 36) for end in range(STEP, len(path), STEP)]
+
+
+def root_id(path):
+    return int(path[:STEP], 36)
@@ -0,0 +1,58 @@
+"""
+Відкладена публікація постів.
+
+Запланований пост (status=scheduled) має date_posted у майбутньому і не
+видимий читачам. Воркер `python manage.py run_publish_scheduler` бере час
+найближчої публікації - перший рядок часткового індексу
+blog_post_scheduled_idx, а не перегляд таблиці постів, - і спить рівно до
+нього (але не довше за PUBLISH_SCHEDULER_RECHECK секунд, щоб помітити
+пости, заплановані на раніше, поки він спав). Кожен опублікований пост
+проходить через сигнал post_published, як і опублікований автором: стрічки
+підписників, теги, RSS/Atom.
+"""
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .bulk import BATCH_SIZE, iter_pk_batches
+from .models import Post, post_published
+from .ranking import post_score
+
+RECHECK = getattr(settings, "PUBLISH_SCHEDULER_RECHECK", 60)
+
+
+def next_due():
+    """Час найближчої запланованої публікації або None"""
+    scheduled = Post.objects.filter(status=Post.Status.SCHEDULED).order_by("date_posted")
+    return scheduled.values_list("date_posted", flat=True).first()
+
+
+def publish_due(now=None, batch_size=BATCH_SIZE):
+    """Публікує заплановані пости, час яких настав; повертає їх кількість"""
+    now = now or timezone.now()
+    due = Post.objects.filter(status=Post.Status.SCHEDULED, date_posted__lte=now)
+    done = 0
+    for pks in iter_pk_batches(due, batch_size):
+        for post in Post.objects.filter(pk__in=pks).defer("content", "content_html"):
+            with transaction.atomic():
+                # автор міг тим часом перенести публікацію чи повернути пост у чернетки;
+                # популярність рахується від часу публікації, а не від створення поста
+                published = due.filter(pk=post.pk).update(
+                    status=Post.Status.PUBLISHED, trending_score=post_score(post), activity_at=post.date_posted
+                )
+                if not published:
+                    continue
+                post.status = post._loaded_status = Post.Status.PUBLISHED
+                post_published.send(sender=Post, post=post)
+            done += 1
+    return done
+
+
+def seconds_until_due(now=None, recheck=RECHECK):
+    """Скільки спати до наступної публікації (не більше recheck)"""
+    now = now or timezone.now()
+    due = next_due()
+    if due is None:
+        return recheck
+    return min(max((due - now).total_seconds(), 0), recheck)
@@ -0,0 +1,29 @@
+"""
+Формула популярності (trending) постів.
+
+Використовується log-шкала з "вбудованим" часом публікації (як у Reddit hot):
+кожні TRENDING_DECAY_SECONDS новизни важать стільки ж, скільки 10x активності.
+Порядок постів з часом не змінюється сам по собі, тож оцінку треба
+перераховувати лише для постів, у яких з'явилась нова активність.
+"""
+
+import math
+from datetime import datetime, timezone
+
+from django.conf import settings
+
+EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+TRENDING_DECAY_SECONDS = getattr(settings, "TRENDING_DECAY_SECONDS", 45000)
+TRENDING_WEIGHTS = getattr(settings, "TRENDING_WEIGHTS", {"comments": 3.0, "likes": 2.0, "views": 0.1})
+
+
+def hot_score(comments, likes, views, posted_at):
+    """Оцінка популярності поста"""
+    weight = (
+        comments * TRENDING_WEIGHTS["comments"] + likes * TRENDING_WEIGHTS["likes"] + views * TRENDING_WEIGHTS["views"]
+    )
+    return math.log10(max(weight, 1)) + (posted_at - EPOCH).total_seconds() / TRENDING_DECAY_SECONDS
+
+
+def post_score(post):
+    return hot_score(post.comment_count, post.like_count, post.view_count, post.date_posted)
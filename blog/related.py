@@ -0,0 +1,317 @@
+"""
+Схожі пости: найближчі сусіди за косинусною схожістю TF-IDF заголовка і тексту.
+
+Сусіди рахуються не в запиті, а воркером
+`python manage.py update_related_posts` і зберігаються в RelatedPost, тож
+сторінка поста читає RELATED_POSTS_COUNT постів одним запитом по індексу
+(PostQuerySet.related_to).
+
+- Повна перебудова (--full): вектори всіх публічних постів - розріджена
+  матриця SciPy (терми хешуються в N_FEATURES стовпців, словник не
+  зберігається), у кожного поста лишаються TERMS_PER_POST найвагоміших
+  термів. Схожості рахуються пачками рядків (X[пачка] @ X.T) паралельно в
+  процесах-воркерах, що ділять матрицю після fork; у пам'яті щоразу лише
+  CHUNK_SIZE рядків схожостей на процес.
+- Інкрементальне оновлення: пости з related_stale (новий, відредагований,
+  опублікований, знову показаний) векторизуються з IDF останньої повної
+  перебудови, замінюють свої рядки в збереженій матриці (RELATED_POSTS_INDEX)
+  і отримують сусідів; заодно вони потрапляють до списків своїх сусідів, якщо
+  схожіші за найдальшого з них, а списки, де вони стояли зі старою схожістю,
+  перераховуються з незмінних векторів власників. IDF з часом відстає від
+  корпусу, тож повну перебудову варто запускати періодично (наприклад, раз на добу).
+"""
+
+import multiprocessing
+import os
+import re
+import zlib
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from django.conf import settings
+from django.db import connection, connections, transaction
+from scipy import sparse
+
+from .bulk import BATCH_SIZE, iter_pk_batches
+from .models import Post, RelatedPost
+
+RELATED_COUNT = getattr(settings, "RELATED_POSTS_COUNT", 5)
+INDEX_PATH = getattr(settings, "RELATED_POSTS_INDEX", "related_posts.npz")
+CHUNK_SIZE = getattr(settings, "RELATED_POSTS_CHUNK_SIZE", 256)
+WORKERS = getattr(settings, "RELATED_POSTS_WORKERS", None)
+
+N_FEATURES = 2**20
+TERMS_PER_POST = 64
+MAX_DF = 0.5  # терми з більшої частки постів не відрізняють їх один від одного
+MIN_DF = 2  # терм одного поста не робить його схожим ні на що
+TOKEN_RE = re.compile(r"\w{2,}")
+
+
+class Index:
+    """Нормовані TF-IDF вектори публічних постів (рядки matrix) і частоти термів, з яких пораховано IDF"""
+
+    def __init__(self, matrix, post_ids, df, n_docs):
+        self.matrix = matrix
+        self.post_ids = post_ids
+        self.df = df
+        self.n_docs = n_docs
+        self.idf = _idf(df, n_docs)
+
+    @classmethod
+    def load(cls, path=None):
+        """Збережений індекс або None, якщо повної перебудови ще не було"""
+        path = path or INDEX_PATH
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as saved:
+            matrix = sparse.csr_matrix(
+                (saved["data"], saved["indices"], saved["indptr"]), shape=(len(saved["post_ids"]), N_FEATURES)
+            )
+            return cls(matrix, saved["post_ids"], saved["df"], int(saved["n_docs"]))
+
+    def save(self, path=None):
+        """Записує індекс атомарно: читачі бачать або старий файл, або новий"""
+        path = path or INDEX_PATH
+        temporary = f"{path}.tmp.npz"
+        np.savez(
+            temporary,
+            data=self.matrix.data,
+            indices=self.matrix.indices,
+            indptr=self.matrix.indptr,
+            post_ids=self.post_ids,
+            df=self.df,
+            n_docs=self.n_docs,
+        )
+        os.replace(temporary, path)
+
+    def vectors(self, texts):
+        return _weigh(_counts(texts), self.idf)
+
+    def remove(self, post_ids):
+        keep = ~np.isin(self.post_ids, post_ids)
+        self.matrix, self.post_ids = self.matrix[keep], self.post_ids[keep]
+
+    def add(self, post_ids, vectors):
+        self.matrix = sparse.vstack([self.matrix, vectors], format="csr")
+        self.post_ids = np.concatenate([self.post_ids, np.asarray(post_ids, dtype=np.int64)])
+
+    def neighbours(self, vectors, post_ids, count):
+        """{id поста: [(id сусіда, схожість), ...]} для векторів vectors постів post_ids"""
+        scores = (self.matrix @ vectors.T).T.tocsr()
+        return dict(zip(post_ids, _top_k(scores, self.post_ids, post_ids, count)))
+
+
+def post_text(title, content):
+    # заголовок важить удвічі більше за текст
+    return f"{title} {title} {content}"
+
+
+def build(workers=None, chunk_size=CHUNK_SIZE, batch_size=BATCH_SIZE, count=RELATED_COUNT, progress=None):
+    """Повна перебудова: вектори всіх публічних постів і їхні сусіди; повертає кількість постів"""
+    post_ids, batches = [], []
+    df = np.zeros(N_FEATURES, dtype=np.int32)
+    for pks in iter_pk_batches(Post.objects.public(), batch_size):
+        with transaction.atomic():
+            rows = list(Post.objects.public().filter(pk__in=pks).values_list("pk", "title", "content"))
+            # правка після цього моменту знову позначить пост і потрапить в інкрементальне оновлення
+            Post.objects.filter(pk__in=pks).update(related_stale=False)
+        post_ids.extend(pk for pk, _, _ in rows)
+        batches.append(_counts([post_text(title, content) for _, title, content in rows]))
+        df += np.bincount(batches[-1].indices, minlength=N_FEATURES).astype(np.int32)
+    if not post_ids:
+        return 0
+    idf = _idf(df, len(post_ids))
+    weighted = []
+    for number, counts in enumerate(batches):
+        weighted.append(_weigh(counts, idf))
+        batches[number] = None  # сирі частоти займають більше за зважені вектори - звільняються одразу
+    index = Index(sparse.vstack(weighted, format="csr"), np.asarray(post_ids, dtype=np.int64), df, len(post_ids))
+    del weighted
+
+    done = 0
+    for neighbours in _parallel_neighbours(index, workers, chunk_size, count):
+        _store(neighbours)
+        done += len(neighbours)
+        if progress:
+            progress(done)
+    RelatedPost.objects.exclude(post__in=Post.objects.public()).delete()
+    index.save()
+    return done
+
+
+def update_stale(batch_size=BATCH_SIZE, count=RELATED_COUNT, progress=None):
+    """Перераховує сусідів постів з related_stale; без збереженого індексу - повна перебудова"""
+    index = Index.load()
+    if index is None:
+        return build(batch_size=batch_size, count=count, progress=progress)
+    done = 0
+    for pks in iter_pk_batches(Post.objects.filter(related_stale=True), batch_size):
+        with transaction.atomic():
+            rows = list(Post.objects.public().filter(pk__in=pks).values_list("pk", "title", "content"))
+            Post.objects.filter(pk__in=pks).update(related_stale=False)
+            RelatedPost.objects.filter(post_id__in=pks).delete()
+            owners = set(RelatedPost.objects.filter(related_id__in=pks).values_list("post_id", flat=True))
+        index.remove(pks)
+        if rows:
+            post_ids = [pk for pk, _, _ in rows]
+            vectors = index.vectors([post_text(title, content) for _, title, content in rows])
+            index.add(post_ids, vectors)
+            neighbours = index.neighbours(vectors, post_ids, count)
+            _store(neighbours)
+            _offer(neighbours, count)
+        _recompute(index, owners, count)
+        done += len(pks)
+        if progress:
+            progress(done)
+    if done:
+        index.save()
+    return done
+
+
+def _counts(texts):
+    """Частоти хешованих термів: CSR len(texts) x N_FEATURES"""
+    indptr, indices, data = [0], [], []
+    for text in texts:
+        # crc32, а не hash(): стовпці мають збігатися в різних процесах і запусках
+        terms = Counter(zlib.crc32(token.encode()) & (N_FEATURES - 1) for token in TOKEN_RE.findall(text.lower()))
+        indices.extend(terms)
+        data.extend(terms.values())
+        indptr.append(len(indices))
+    return sparse.csr_matrix(
+        (np.asarray(data, dtype=np.float32), np.asarray(indices, dtype=np.int32), np.asarray(indptr, dtype=np.int64)),
+        shape=(len(texts), N_FEATURES),
+    )
+
+
+def _idf(df, n_docs):
+    idf = (np.log((1 + n_docs) / (1 + df)) + 1).astype(np.float32)
+    idf[(df < MIN_DF) | (df > MAX_DF * n_docs)] = 0
+    return idf
+
+
+def _weigh(counts, idf):
+    """Сублінійний TF x IDF, лише TERMS_PER_POST найвагоміших термів поста, L2-нормування"""
+    weights = (1 + np.log(counts.data)) * idf[counts.indices]
+    indptr, indices, data = [0], [], []
+    for row in range(counts.shape[0]):
+        start, end = counts.indptr[row], counts.indptr[row + 1]
+        row_weights, row_terms = weights[start:end], counts.indices[start:end]
+        kept = row_weights > 0
+        row_weights, row_terms = row_weights[kept], row_terms[kept]
+        if len(row_weights) > TERMS_PER_POST:
+            top = np.argpartition(row_weights, -TERMS_PER_POST)[-TERMS_PER_POST:]
+            row_weights, row_terms = row_weights[top], row_terms[top]
+        norm = np.linalg.norm(row_weights)
+        indices.append(row_terms)
+        data.append(row_weights / norm if norm else row_weights)
+        indptr.append(indptr[-1] + len(row_terms))
+    return sparse.csr_matrix(
+        (
+            np.concatenate(data or [np.empty(0, np.float32)]).astype(np.float32),
+            np.concatenate(indices or [np.empty(0, np.int32)]).astype(np.int32),
+            np.asarray(indptr, dtype=np.int64),
+        ),
+        shape=counts.shape,
+    )
+
+
+def _top_k(scores, column_ids, row_ids, count):
+    """Для кожного рядка схожостей scores (CSR) - count найсхожіших постів column_ids, крім самого поста"""
+    for row, post_id in enumerate(row_ids):
+        start, end = scores.indptr[row], scores.indptr[row + 1]
+        ids, values = column_ids[scores.indices[start:end]], scores.data[start:end]
+        other = ids != post_id
+        ids, values = ids[other], values[other]
+        if len(values) > count:
+            top = np.argpartition(values, -count)[-count:]
+            ids, values = ids[top], values[top]
+        order = np.argsort(-values, kind="stable")
+        yield [(int(related_id), float(score)) for related_id, score in zip(ids[order], values[order])]
+
+
+# Матриця індексу в процесах-воркерах повної перебудови: успадковується через fork, а не копіюється
+_shared = None
+
+
+def _init_worker(index, transposed):
+    global _shared
+    _shared = index, transposed
+
+
+def _chunk_neighbours(bounds, count):
+    index, transposed = _shared
+    start, end = bounds
+    post_ids = index.post_ids[start:end]
+    scores = (index.matrix[start:end] @ transposed).tocsr()
+    return dict(zip(post_ids.tolist(), _top_k(scores, index.post_ids, post_ids, count)))
+
+
+def _parallel_neighbours(index, workers, chunk_size, count):
+    """Сусіди всіх постів індексу пачками по chunk_size рядків у workers процесах (None - WORKERS)"""
+    workers = workers or WORKERS or os.cpu_count()
+    transposed = index.matrix.T.tocsr()
+    chunks = [(start, start + chunk_size) for start in range(0, len(index.post_ids), chunk_size)]
+    if workers == 1:
+        _init_worker(index, transposed)
+        yield from (_chunk_neighbours(chunk, count) for chunk in chunks)
+        return
+    connections.close_all()  # з'єднання з БД не мають переходити в дочірні процеси
+    with ProcessPoolExecutor(
+        workers,
+        mp_context=multiprocessing.get_context("fork"),
+        initializer=_init_worker,
+        initargs=(index, transposed),
+    ) as pool:
+        yield from pool.map(_chunk_neighbours, chunks, [count] * len(chunks))
+
+
+def _store(neighbours):
+    """Замінює збережених сусідів постів {id поста: [(id сусіда, схожість), ...]}"""
+    rows = [
+        (post_id, related_id, rank, score)
+        for post_id, related in neighbours.items()
+        for rank, (related_id, score) in enumerate(related)
+    ]
+    quote = connection.ops.quote_name
+    columns = ", ".join(
+        quote(RelatedPost._meta.get_field(name).column) for name in ["post", "related", "rank", "score"]
+    )
+    with transaction.atomic(), connection.cursor() as cursor:
+        RelatedPost.objects.filter(post_id__in=list(neighbours))._raw_delete(connection.alias)
+        # bulk_create будує модель на кожен рядок - на мільйонах пар повної перебудови це довше за саму схожість
+        cursor.executemany(
+            f"INSERT INTO {quote(RelatedPost._meta.db_table)} ({columns}) VALUES (%s, %s, %s, %s)", rows
+        )
+
+
+def _recompute(index, post_ids, count):
+    """Заново рахує сусідів постів post_ids за їхніми векторами в індексі"""
+    positions = np.flatnonzero(np.isin(index.post_ids, list(post_ids)))
+    if len(positions):
+        _store(index.neighbours(index.matrix[positions], index.post_ids[positions].tolist(), count))
+
+
+def _offer(neighbours, count):
+    """Додає щойно пораховані пости до списків їхніх сусідів, якщо вони схожіші за найдальшого з них"""
+    offers = {}
+    for post_id, related in neighbours.items():
+        for related_id, score in related:
+            offers.setdefault(related_id, []).append((post_id, score))
+    current = {}
+    for post_id, related_id, score in (
+        RelatedPost.objects.filter(post_id__in=list(offers))
+        .order_by("rank")
+        .values_list("post_id", "related_id", "score")
+    ):
+        current.setdefault(post_id, []).append((related_id, score))
+    changed = {}
+    for post_id, candidates in offers.items():
+        existing = current.get(post_id, [])
+        known = {related_id for related_id, _ in candidates}
+        merged = candidates + [item for item in existing if item[0] not in known]
+        merged = sorted(merged, key=lambda item: -item[1])[:count]
+        if merged != existing:
+            changed[post_id] = merged
+    if changed:
+        _store(changed)
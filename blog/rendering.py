@@ -0,0 +1,52 @@
+"""
+Markdown постів -> безпечний HTML.
+
+HTML рендериться один раз - при збереженні поста (Post.render) або, для
+постів, збережених старішою версією рендерера, при першому читанні - і
+зберігається поруч із джерелом разом із RENDERER_VERSION. Версія включає
+версії markdown і nh3, тож оновлення бібліотек чи налаштувань нижче робить
+збережений HTML застарілим: `python manage.py rerender_posts` перерендерює
+такі пости пачками у фоні, а не в запитах читачів.
+"""
+
+import html
+
+import markdown
+import nh3
+from django.utils.html import strip_tags
+
+# Збільшувати при зміні розширень, дозволених тегів чи атрибутів
+RENDERER_REVISION = 1
+RENDERER_VERSION = f"{RENDERER_REVISION}-markdown{markdown.__version__}-nh3{nh3.__version__}"
+
+EXTENSIONS = ["fenced_code", "tables", "sane_lists", "nl2br"]
+ALLOWED_TAGS = set(
+    "a abbr b blockquote br code del em h1 h2 h3 h4 h5 h6 hr i img li ol p pre strong "
+    "table tbody td th thead tr ul".split()
+)
+ALLOWED_ATTRIBUTES = {
+    "a": {"href", "title"},
+    "abbr": {"title"},
+    "code": {"class"},  # language-* з fenced_code
+    "img": {"src", "alt", "title"},
+    "td": {"align"},
+    "th": {"align"},
+}
+URL_SCHEMES = {"http", "https", "mailto"}
+
+
+def render_markdown(text):
+    """Markdown -> HTML без скриптів, обробників подій і небезпечних посилань"""
+    rendered = markdown.markdown(text, extensions=EXTENSIONS, output_format="html")
+    return nh3.clean(
+        rendered,
+        tags=ALLOWED_TAGS,
+        attributes=ALLOWED_ATTRIBUTES,
+        url_schemes=URL_SCHEMES,
+        link_rel="nofollow noopener noreferrer",
+    )
+
+
+def plain_text(rendered):
+    """Текст відрендереного HTML (для уривків і підрахунку слів)"""
+    return html.unescape(strip_tags(rendered))
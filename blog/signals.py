@@ -0,0 +1,112 @@
+from functools import partial
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from . import autocomplete, duplicates
+from .feeds import invalidate_feeds
+from .live import publish_comment
+from .models import Comment, Post, post_published
+from .tags import publish_post, untag_post, visibility_changed
+from .timeline import fan_out
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_feeds(sender, instance, **kwargs):
+    """Будь-яка зміна поста робить застарілими загальну стрічку і стрічку автора"""
+    invalidate_feeds(instance.author_id)
+
+
+@receiver(post_save, sender=Post)
+def recount_tags_on_visibility_change(sender, instance, created, update_fields, **kwargs):
+    """
+    Прихований, показаний чи знятий з публікації пост (форма адмінки) виходить з лічильників
+    тегів або повертається в них; опублікування рахує count_published_post_tags
+    """
+    if created or instance._loaded_status is None or instance._loaded_hidden is None:
+        return
+    if update_fields is not None and not {"is_hidden", "status"} & set(update_fields):
+        return
+    if instance.status == Post.Status.PUBLISHED and instance._loaded_status != Post.Status.PUBLISHED:
+        return
+    was_public = not instance._loaded_hidden and instance._loaded_status == Post.Status.PUBLISHED
+    if was_public != instance.is_public:
+        visibility_changed(instance)
+
+
+@receiver(pre_delete, sender=Post)
+def untag_deleted_post(sender, instance, **kwargs):
+    """Видалений пост більше не рахується в тегах (зв'язки PostTag видалить каскад)"""
+    untag_post(instance)
+
+
+@receiver(post_published)
+def fan_out_published_post(sender, post, **kwargs):
+    """Опублікований пост потрапляє в стрічки підписників автора"""
+    fan_out(post)
+
+
+@receiver(post_published)
+def count_published_post_tags(sender, post, **kwargs):
+    """Опублікований пост з'являється в стрічках і хмарі своїх тегів"""
+    publish_post(post)
+
+
+@receiver(post_published)
+def invalidate_published_post_feeds(sender, post, **kwargs):
+    """Планувальник публікує через UPDATE, без post_save, тож RSS/Atom скидаються тут"""
+    invalidate_feeds(post.author_id)
+
+
+@receiver(post_published)
+def mark_published_post_related_stale(sender, post, **kwargs):
+    """Опублікований планувальником пост отримує схожі пости при наступному оновленні (blog.related)"""
+    Post.objects.filter(pk=post.pk).update(related_stale=True)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Comment)
+def index_minhash(sender, instance, update_fields, **kwargs):
+    """Новий підпис тексту (Post.save/Comment.save рахують його разом зі змістом) потрапляє в індекс дублікатів"""
+    if "content" not in instance.get_deferred_fields() and (update_fields is None or "minhash" in update_fields):
+        duplicates.index(instance)
+
+
+@receiver(post_save, sender=User)
+def index_user_name(sender, instance, update_fields, **kwargs):
+    """Нове ім'я чи деактивація користувача потрапляє в журнал автодоповнення (не кожне оновлення last_login)"""
+    if update_fields is None or {"username", "is_active"} & set(update_fields):
+        autocomplete.user_changed(instance)
+
+
+@receiver(post_delete, sender=User)
+def unindex_deleted_user(sender, instance, **kwargs):
+    autocomplete.changed("users", [(instance.pk, None)])
+
+
+@receiver(post_save, sender=Post)
+def index_post_title(sender, instance, update_fields, **kwargs):
+    """Заголовок поста з'являється в підказках чи зникає з них разом з публікацією і прихованням"""
+    if update_fields is None or {"title", "status", "is_hidden"} & set(update_fields):
+        autocomplete.post_changed(instance)
+
+
+@receiver(post_delete, sender=Post)
+def unindex_deleted_post(sender, instance, **kwargs):
+    autocomplete.changed("posts", [(instance.pk, None)])
+
+
+@receiver(post_published)
+def index_published_post_title(sender, post, **kwargs):
+    """Пост, опублікований планувальником через UPDATE, теж з'являється в підказках"""
+    autocomplete.post_changed(post)
+
+
+@receiver(post_save, sender=Comment)
+def publish_new_comment(sender, instance, created, **kwargs):
+    """Новий видимий коментар надсилається читачам поста після коміту (шлях уже заповнено)"""
+    if created and not instance.is_hidden:
+        transaction.on_commit(partial(publish_comment, instance))
@@ -0,0 +1,197 @@
+"""
+Оцінка коментарів на спам: мультиноміальний наївний Баєс над хешованими словами і парами слів.
+
+add_comment зберігає коментар одразу (spam_score = None) і не рахує нічого на
+CPU. Воркер `python manage.py score_comments --loop` кожні SPAM_INTERVAL секунд
+оцінює нові коментарі пачками: тексти стають розрідженою матрицею частот ознак
+(у процесах пулу, якщо SPAM_WORKERS чи --workers > 1), а ймовірності спаму всієї пачки - одне
+множення матриці на вектор ваг. Коментарі з імовірністю від SPAM_HOLD_THRESHOLD
+приховуються і чекають на модератора в CommentAdmin (Перевірка: на перевірці).
+
+Навчання (`score_comments --train`) - суми стовпців тієї самої матриці для
+спаму і не спаму: спам - позначені модератором, не спам - схвалені та видимі
+коментарі без перевірки. Модель (ваги ознак) зберігається в SPAM_MODEL.
+"""
+
+import functools
+import multiprocessing
+import os
+import re
+import zlib
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+
+import numpy as np
+from django.conf import settings
+from django.db import connection, connections, transaction
+from django.db.models import Q
+from scipy import sparse
+from scipy.special import expit
+
+from . import moderation
+from .bulk import BATCH_SIZE, iter_pk_batches
+from .models import Comment
+
+MODEL_PATH = getattr(settings, "SPAM_MODEL", "spam_model.npz")
+HOLD_THRESHOLD = getattr(settings, "SPAM_HOLD_THRESHOLD", 0.9)
+WORKERS = getattr(settings, "SPAM_WORKERS", 1)
+
+N_FEATURES = 2**18
+ALPHA = 1.0  # згладжування Лапласа: ознака, якої не було в навчальних даних, не робить імовірність нульовою
+CHUNK_SIZE = 256  # текстів на одне завдання пулу
+TOKEN_RE = re.compile(r"\w+")
+
+
+class Model:
+    """Логарифм відношення правдоподібностей спам/не спам для кожної ознаки і апріорне відношення класів"""
+
+    def __init__(self, weights, bias):
+        self.weights = weights
+        self.bias = bias
+
+    @classmethod
+    def fit(cls, counts, is_spam, alpha=ALPHA):
+        """Навчання на матриці частот ознак counts (CSR) і булевому векторі міток is_spam"""
+        spam = np.asarray(counts[is_spam].sum(axis=0)).ravel() + alpha
+        ham = np.asarray(counts[~is_spam].sum(axis=0)).ravel() + alpha
+        weights = np.log(spam / spam.sum()) - np.log(ham / ham.sum())
+        bias = np.log(np.count_nonzero(is_spam) / np.count_nonzero(~is_spam))
+        return cls(weights.astype(np.float32), float(bias))
+
+    @classmethod
+    def load(cls, path=None):
+        """Збережена модель або None, якщо її ще не навчено"""
+        path = path or MODEL_PATH
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as saved:
+            return cls(saved["weights"], float(saved["bias"]))
+
+    def save(self, path=None):
+        """Записує модель атомарно: воркер читає або стару, або нову"""
+        path = path or MODEL_PATH
+        temporary = f"{path}.tmp.npz"
+        np.savez(temporary, weights=self.weights, bias=self.bias)
+        os.replace(temporary, path)
+
+    def scores(self, counts):
+        """Імовірності спаму для рядків матриці counts"""
+        return expit(counts @ self.weights + self.bias)
+
+
+def train(workers=None, batch_size=BATCH_SIZE, progress=None):
+    """Навчає модель на рішеннях модераторів і видимих коментарях; повертає кількість прикладів (0 - бракує класу)"""
+    examples = Comment.objects.filter(
+        Q(review__in=[Comment.Review.SPAM, Comment.Review.APPROVED]) | Q(review="", is_hidden=False)
+    )
+    counts, labels, done = [], [], 0
+    with _featurizer(workers) as featurize:
+        for pks in iter_pk_batches(examples, batch_size):
+            rows = list(Comment.objects.filter(pk__in=pks).values_list("content", "review"))
+            counts.append(featurize([content for content, _ in rows]))
+            labels.extend(review == Comment.Review.SPAM for _, review in rows)
+            done += len(rows)
+            if progress:
+                progress(done)
+    is_spam = np.asarray(labels, dtype=bool)
+    if is_spam.all() or not is_spam.any():
+        return 0
+    Model.fit(sparse.vstack(counts, format="csr"), is_spam).save()
+    return done
+
+
+def score_pending(workers=None, batch_size=BATCH_SIZE, progress=None):
+    """Оцінює ще не оцінені коментарі; повертає (оцінено, затримано)"""
+    return score(Comment.objects.filter(spam_score__isnull=True), workers, batch_size, progress)
+
+
+def score(queryset, workers=None, batch_size=BATCH_SIZE, progress=None):
+    """
+    Оцінює коментарі queryset новою моделлю і затримує видимі, не перевірені модератором,
+    з імовірністю від HOLD_THRESHOLD. Без навченої моделі нічого не робить. Повертає (оцінено, затримано).
+    """
+    model = Model.load()
+    if model is None:
+        return 0, 0
+    done = held = 0
+    with _featurizer(workers) as featurize:
+        for pks in iter_pk_batches(queryset, batch_size):
+            rows = list(Comment.objects.filter(pk__in=pks).values_list("pk", "content"))
+            scores = model.scores(featurize([content for _, content in rows]))
+            held += _apply({pk: float(value) for (pk, _), value in zip(rows, scores)})
+            done += len(rows)
+            if progress:
+                progress(done)
+    return done, held
+
+
+def review(queryset, decision, batch_size=BATCH_SIZE):
+    """Рішення модератора: «не спам» показує коментарі, «спам» - приховує; повертає кількість коментарів"""
+    done = 0
+    # keyset по pk: зміна review/is_hidden у пройдених пачках не зсуває наступні
+    for pks in iter_pk_batches(queryset, batch_size):
+        batch = Comment.objects.filter(pk__in=pks)
+        batch.update(review=decision)
+        moderation.hide(batch, hidden=decision == Comment.Review.SPAM)
+        done += len(pks)
+    return done
+
+
+def features(texts):
+    """Частоти хешованих слів і пар сусідніх слів: CSR len(texts) x N_FEATURES"""
+    indptr, indices, data = [0], [], []
+    for text in texts:
+        words = TOKEN_RE.findall(text.lower())
+        # crc32, а не hash(): стовпці мають збігатися в різних процесах і запусках
+        terms = Counter(zlib.crc32(word.encode()) & (N_FEATURES - 1) for word in words)
+        terms.update(
+            zlib.crc32(f"{first} {second}".encode()) & (N_FEATURES - 1) for first, second in zip(words, words[1:])
+        )
+        indices.extend(terms)
+        data.extend(terms.values())
+        indptr.append(len(indices))
+    return sparse.csr_matrix(
+        (np.asarray(data, dtype=np.float32), np.asarray(indices, dtype=np.int32), np.asarray(indptr, dtype=np.int64)),
+        shape=(len(texts), N_FEATURES),
+    )
+
+
+@contextmanager
+def _featurizer(workers):
+    """
+    Функція texts -> features(texts); з workers > 1 (None - WORKERS) тексти діляться
+    на частини між процесами пулу
+    """
+    workers = workers or WORKERS
+    if workers <= 1:
+        yield features
+        return
+    connections.close_all()  # з'єднання з БД не мають переходити в дочірні процеси
+    with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("fork")) as pool:
+        yield functools.partial(_chunked_features, map_=pool.map)
+
+
+def _chunked_features(texts, map_=map):
+    """features(texts), порахована частинами по CHUNK_SIZE текстів через map_ і складена в одну матрицю"""
+    bounds = [(start, start + CHUNK_SIZE) for start in range(0, len(texts), CHUNK_SIZE)]
+    chunks = [texts[start:end] for start, end in bounds]
+    return sparse.vstack(list(map_(features, chunks)) or [features([])], format="csr")
+
+
+def _apply(scores):
+    """Зберігає оцінки {pk: імовірність} і затримує нових підозрілих; повертає кількість затриманих"""
+    suspects = [pk for pk, value in scores.items() if value >= HOLD_THRESHOLD]
+    quote = connection.ops.quote_name
+    table, column = quote(Comment._meta.db_table), quote(Comment._meta.get_field("spam_score").column)
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            # bulk_update будує CASE на всю пачку - окремі UPDATE за первинним ключем швидші
+            cursor.executemany(
+                f"UPDATE {table} SET {column} = %s WHERE {quote(Comment._meta.pk.column)} = %s",
+                [(value, pk) for pk, value in scores.items()],
+            )
+        held = list(Comment.objects.filter(pk__in=suspects, review="", is_hidden=False).values_list("pk", flat=True))
+        Comment.objects.filter(pk__in=held).update(review=Comment.Review.HELD)
+        moderation.hide(Comment.objects.filter(pk__in=held))
+    return len(held)
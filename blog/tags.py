@@ -0,0 +1,126 @@
+"""
+Теги постів.
+
+PostTag зберігає копію date_posted поста, тож стрічка тегу - діапазон
+індексу (tag, -date_posted, -post) з keyset-пагінацією, скільки б постів не
+мав тег. Кілька тегів:
+- усі (AND) - прохід індексом найрідшого тегу з перевіркою решти по
+  унікальному індексу (post, tag), тож робота обмежена найменшим тегом;
+- будь-який (OR) - злиття сторінок кожного тегу, як у стрічці (blog.timeline).
+Tag.post_count оновлюється разом зі зв'язками, тож хмара тегів - початок
+індексу за post_count (і кеш), а не GROUP BY по всіх PostTag.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Exists, F, OuterRef
+from django.utils.text import slugify
+
+from .feeds import invalidate_feeds
+from .models import Post, PostTag, Tag
+from .paginators import CursorPage, KeysetPage, merge_pages
+
+MAX_TAGS = getattr(settings, "POST_MAX_TAGS", 10)
+TAG_CLOUD_SIZE = getattr(settings, "TAG_CLOUD_SIZE", 30)
+TAG_CLOUD_CACHE_TIMEOUT = getattr(settings, "TAG_CLOUD_CACHE_TIMEOUT", 10 * 60)
+CLOUD_KEY = "tags:cloud"
+
+
+def parse_tags(text):
+    """Теги з рядка через кому: {slug: назва} без дублікатів, у порядку введення"""
+    tags = {}
+    for name in text.split(","):
+        name = " ".join(name.split()).lower()
+        slug = slugify(name, allow_unicode=True)
+        if slug and slug not in tags:
+            tags[slug] = name
+    return tags
+
+
+def set_tags(post, tags):
+    """Замінює теги поста ({slug: назва}); лічильники тегів змінюються в тій самій транзакції"""
+    with transaction.atomic():
+        current = set(PostTag.objects.filter(post=post).values_list("tag__slug", flat=True))
+        added = [slug for slug in tags if slug not in current]
+        removed = current - set(tags)
+        if added:
+            Tag.objects.bulk_create([Tag(slug=slug, name=tags[slug]) for slug in added], ignore_conflicts=True)
+            tag_ids = list(Tag.objects.filter(slug__in=added).values_list("pk", flat=True))
+            PostTag.objects.bulk_create(
+                [PostTag(post=post, tag_id=tag_id, date_posted=post.date_posted) for tag_id in tag_ids]
+            )
+            _add_to_counts(post, tag_ids, 1)
+        if removed:
+            tag_ids = list(Tag.objects.filter(slug__in=removed).values_list("pk", flat=True))
+            PostTag.objects.filter(post=post, tag_id__in=tag_ids).delete()
+            _add_to_counts(post, tag_ids, -1)
+    if added or removed:
+        invalidate_feeds(post.author_id)  # теги - категорії записів RSS/Atom
+
+
+def publish_post(post):
+    """Опублікований пост: дата публікації у зв'язках і +1 у лічильниках його тегів"""
+    PostTag.objects.filter(post=post).update(date_posted=post.date_posted)
+    _add_to_counts(post, list(PostTag.objects.filter(post=post).values_list("tag_id", flat=True)), 1)
+
+
+def visibility_changed(post):
+    """Пост приховано, показано чи знято з публікації через save() (адмінка): ±1 у лічильниках його тегів"""
+    tag_ids = list(PostTag.objects.filter(post=post).values_list("tag_id", flat=True))
+    if tag_ids:
+        Tag.objects.filter(pk__in=tag_ids).update(post_count=F("post_count") + (1 if post.is_public else -1))
+        cache.delete(CLOUD_KEY)
+
+
+def untag_post(post):
+    """Знімає пост з лічильників тегів перед видаленням (зв'язки видалить каскад)"""
+    _add_to_counts(post, list(PostTag.objects.filter(post=post).values_list("tag_id", flat=True)), -1)
+
+
+def _add_to_counts(post, tag_ids, delta):
+    # рахуються лише публічні пости (див. TagQuerySet.refresh_post_counts)
+    if tag_ids and post.is_public:
+        Tag.objects.filter(pk__in=tag_ids).update(post_count=F("post_count") + delta)
+        cache.delete(CLOUD_KEY)
+
+
+def refresh_counts(tag_ids):
+    """Перераховує лічильники тегів після масових змін постів в обхід сигналів (blog.moderation)"""
+    if tag_ids:
+        Tag.objects.filter(pk__in=tag_ids).refresh_post_counts()
+        cache.delete(CLOUD_KEY)
+
+
+def tag_cloud(size=TAG_CLOUD_SIZE):
+    """Найуживаніші теги: [{slug, name, post_count}]"""
+    cloud = cache.get(CLOUD_KEY)
+    if cloud is None:
+        tags = Tag.objects.filter(post_count__gt=0).order_by("-post_count", "name")[:size]
+        cloud = list(tags.values("slug", "name", "post_count"))
+        cache.set(CLOUD_KEY, cloud, TAG_CLOUD_CACHE_TIMEOUT)
+    return cloud
+
+
+def tagged_posts(tags, match_any=False, cursor=None, per_page=5):
+    """Сторінка видимих постів з усіма (або будь-яким) тегами tags; курсор у форматі KeysetPage"""
+    if match_any:
+        return merge_pages([_tag_page(_entries(tag), cursor, per_page) for tag in tags], per_page)
+    rarest, *others = sorted(tags, key=lambda tag: tag.post_count)
+    entries = _entries(rarest)
+    for tag in others:
+        entries = entries.filter(Exists(PostTag.objects.filter(post=OuterRef("post_id"), tag=tag)))
+    return _tag_page(entries, cursor, per_page)
+
+
+def _entries(tag):
+    return (
+        PostTag.objects.filter(tag=tag, post__is_hidden=False, post__status=Post.Status.PUBLISHED)
+        .select_related("post__author__profile")
+        .defer("post__content", "post__content_html")
+    )
+
+
+def _tag_page(entries, cursor, per_page):
+    page = KeysetPage(entries, "date_posted", cursor, per_page, tiebreak="post_id")
+    return CursorPage([entry.post for entry in page], page.next_cursor)
@@ -4,15 +4,84 @@ blog/tests.py  — UNIT-тести для додатку blog
 Використовує: django.test.TestCase, unittest.mock (Mock/Spy/patch)
 """
 
+import asyncio
+import functools
+import itertools
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+from io import StringIO
 from unittest.mock import patch
 
 from django.contrib.auth.models import User
-from django.test import Client, TestCase
+from django.core import mail
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import IntegrityError, OperationalError, connection, models
+from django.db.models import ProtectedError
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
-
+from django.utils.http import http_date
+
+from blog import (
+    autocomplete,
+    bulk,
+    deletion,
+    duplicates,
+    feeds,
+    likes,
+    live,
+    moderation,
+    notifications,
+    publishing,
+    related,
+    rendering,
+    spam,
+    tags,
+    threads,
+    timeline,
+)
+from blog.admin import CommentAdmin
+from blog.counters import CounterBuffer
 from blog.forms import CommentForm, PostForm
-from blog.models import Comment, Post
+from blog.minhash import signature, similarity
+from blog.models import (
+    Comment,
+    DeletionJob,
+    JobCheckpoint,
+    Like,
+    Notification,
+    Post,
+    PostBand,
+    PostTag,
+    RelatedPost,
+    Tag,
+    TimelineEntry,
+)
+from blog.paginators import EstimatedCountPaginator, KeysetPage
+from blog.paths import MAX_DEPTH, ancestor_ids, segment, subtree_end
+from blog.ranking import hot_score
+from blog.trending import update_trending_scores
+from blog_project import ratelimit
+from blog_project.cache import SLOT, TABLE_AT, VERSION, SharedMemoryCache
+from users.models import Follow, Profile
+
+
+def forks_processes(test):
+    """Тест запускає дочірні процеси: воркер --parallel - демон, і їх не може мати, тож там тест пропускається"""
+
+    @functools.wraps(test)
+    def wrapper(self, *args, **kwargs):
+        if multiprocessing.current_process().daemon:
+            self.skipTest("дочірні процеси недоступні у воркері --parallel")
+        return test(self, *args, **kwargs)
+
+    return wrapper
+
 
 # ══════════════════════════════════════════════════════
 #  1. MODELS  — повне покриття (100%)
@@ -20,12 +89,13 @@ from blog.models import Comment, Post
 
 
 class PostModelTest(TestCase):
-    def setUp(self):
-        self.user = User.objects.create_user(username="author", password="pass1234")
-        self.post = Post.objects.create(
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="author", password="pass1234")
+        cls.post = Post.objects.create(
             title="Тестовий пост",
             content="Вміст поста",
-            author=self.user,
+            author=cls.user,
         )
 
     # __str__
@@ -69,12 +139,13 @@ class PostModelTest(TestCase):
 
 
 class CommentModelTest(TestCase):
-    def setUp(self):
-        self.user = User.objects.create_user(username="commenter", password="pass1234")
-        self.post = Post.objects.create(title="Пост", content="Вміст", author=self.user)
-        self.comment = Comment.objects.create(
-            post=self.post,
-            author=self.user,
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="commenter", password="pass1234")
+        cls.post = Post.objects.create(title="Пост", content="Вміст", author=cls.user)
+        cls.comment = Comment.objects.create(
+            post=cls.post,
+            author=cls.user,
             content="Мій коментар",
         )
 
@@ -184,9 +255,9 @@ class CommentFormTest(TestCase):
 
 
 class PostListViewTest(TestCase):
-    def setUp(self):
-        self.client = Client()
-        self.user = User.objects.create_user(username="user1", password="pass")
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="user1", password="pass")
 
     def test_status_200(self):
         response = self.client.get(reverse("blog-home"))
@@ -215,12 +286,12 @@ class PostListViewTest(TestCase):
 
 
 class UserPostListViewTest(TestCase):
-    def setUp(self):
-        self.client = Client()
-        self.user = User.objects.create_user(username="blogger", password="pass")
-        self.other = User.objects.create_user(username="other", password="pass")
-        self.post = Post.objects.create(title="Мій пост", content="c", author=self.user)
-        Post.objects.create(title="Чужий пост", content="c", author=self.other)
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="blogger", password="pass")
+        cls.other = User.objects.create_user(username="other", password="pass")
+        cls.post = Post.objects.create(title="Мій пост", content="c", author=cls.user)
+        Post.objects.create(title="Чужий пост", content="c", author=cls.other)
 
     def test_status_200(self):
         response = self.client.get(reverse("user-posts", kwargs={"username": self.user.username}))
@@ -246,10 +317,10 @@ class UserPostListViewTest(TestCase):
 
 
 class PostDetailViewTest(TestCase):
-    def setUp(self):
-        self.client = Client()
-        self.user = User.objects.create_user(username="author", password="pass")
-        self.post = Post.objects.create(title="Деталі", content="вміст", author=self.user)
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="author", password="pass")
+        cls.post = Post.objects.create(title="Деталі", content="вміст", author=cls.user)
 
     def test_status_200(self):
         response = self.client.get(reverse("post-detail", kwargs={"pk": self.post.pk}))
@@ -274,9 +345,9 @@ class PostDetailViewTest(TestCase):
 
 
 class PostCreateViewTest(TestCase):
-    def setUp(self):
-        self.client = Client()
-        self.user = User.objects.create_user(username="creator", password="pass")
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="creator", password="pass")
 
     def test_requires_login_redirects(self):
         response = self.client.get(reverse("post-create"))
@@ -312,11 +383,11 @@ class PostCreateViewTest(TestCase):
 
 
 class PostUpdateViewTest(TestCase):
-    def setUp(self):
-        self.client = Client()
-        self.user = User.objects.create_user(username="editor", password="pass")
-        self.other = User.objects.create_user(username="stranger", password="pass")
-        self.post = Post.objects.create(title="Старий", content="старий", author=self.user)
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="editor", password="pass")
+        cls.other = User.objects.create_user(username="stranger", password="pass")
+        cls.post = Post.objects.create(title="Старий", content="старий", author=cls.user)
 
     def test_author_can_update(self):
         self.client.login(username="editor", password="pass")
@@ -350,11 +421,11 @@ class PostUpdateViewTest(TestCase):
 
 
 class PostDeleteViewTest(TestCase):
-    def setUp(self):
-        self.client = Client()
-        self.user = User.objects.create_user(username="deleter", password="pass")
-        self.other = User.objects.create_user(username="intruder", password="pass")
-        self.post = Post.objects.create(title="Delete me", content="bye", author=self.user)
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="deleter", password="pass")
+        cls.other = User.objects.create_user(username="intruder", password="pass")
+        cls.post = Post.objects.create(title="Delete me", content="bye", author=cls.user)
 
     def test_author_can_delete(self):
         self.client.login(username="deleter", password="pass")
@@ -379,10 +450,10 @@ class PostDeleteViewTest(TestCase):
 
 
 class AddCommentViewTest(TestCase):
-    def setUp(self):
-        self.client = Client()
-        self.user = User.objects.create_user(username="commenter", password="pass")
-        self.post = Post.objects.create(title="Пост", content="вміст", author=self.user)
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="commenter", password="pass")
+        cls.post = Post.objects.create(title="Пост", content="вміст", author=cls.user)
 
     def test_add_comment_creates_object(self):
         self.client.login(username="commenter", password="pass")
@@ -443,12 +514,12 @@ class AddCommentViewTest(TestCase):
 
 
 class DeleteCommentViewTest(TestCase):
-    def setUp(self):
-        self.client = Client()
-        self.user = User.objects.create_user(username="owner", password="pass")
-        self.other = User.objects.create_user(username="alien", password="pass")
-        self.post = Post.objects.create(title="Пост", content="вміст", author=self.user)
-        self.comment = Comment.objects.create(post=self.post, author=self.user, content="Оригінальний")
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="owner", password="pass")
+        cls.other = User.objects.create_user(username="alien", password="pass")
+        cls.post = Post.objects.create(title="Пост", content="вміст", author=cls.user)
+        cls.comment = Comment.objects.create(post=cls.post, author=cls.user, content="Оригінальний")
 
     def test_author_can_delete_comment(self):
         self.client.login(username="owner", password="pass")
@@ -470,3 +541,2014 @@ class DeleteCommentViewTest(TestCase):
         self.client.login(username="alien", password="pass")
         self.client.post(reverse("delete-comment", kwargs={"pk": self.comment.pk}))
         mock_messages.error.assert_called_once()
+
+
+# ══════════════════════════════════════════════════════
+#  4. ADMIN  — changelist для великих таблиць
+# ══════════════════════════════════════════════════════
+
+
+class AdminChangelistTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(username="admin", password="pass", email="a@ex.com")
+        cls.authors = [User.objects.create_user(username=f"writer{i}", password="pass") for i in range(3)]
+        for author in cls.authors:
+            post = Post.objects.create(title=f"Пост {author.username}", content="c", author=author)
+            Comment.objects.create(post=post, author=author, content="коментар")
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def test_post_changelist_200(self):
+        response = self.client.get(reverse("admin:blog_post_changelist"))
+        self.assertEqual(response.status_code, 200)
+
+    def test_author_filter_does_not_list_all_users(self):
+        response = self.client.get(reverse("admin:blog_post_changelist"))
+        self.assertNotContains(response, "?author__id__exact=")
+        self.assertContains(response, 'data-field-name="author"')
+
+    def test_author_filter_applies(self):
+        author = self.authors[0]
+        response = self.client.get(reverse("admin:blog_post_changelist") + f"?author__id__exact={author.pk}")
+        self.assertEqual([p.author for p in response.context["cl"].result_list], [author])
+        self.assertContains(response, f"?author__id__exact={author.pk}")
+
+    def test_author_filter_rejects_non_numeric_value(self):
+        url = reverse("admin:blog_post_changelist")
+        self.assertRedirects(
+            self.client.get(url + "?author__id__exact=x"), url + "?e=1", fetch_redirect_response=False
+        )
+
+    def test_comment_changelist_query_count_independent_of_rows(self):
+        url = reverse("admin:blog_comment_changelist")
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(url)
+        post = Post.objects.first()
+        for _ in range(5):
+            Comment.objects.create(post=post, author=self.authors[1], content="ще")
+        with self.assertNumQueries(len(ctx.captured_queries)):
+            self.client.get(url)
+
+    def test_full_result_count_disabled(self):
+        response = self.client.get(reverse("admin:blog_comment_changelist") + "?q=коментар")
+        self.assertFalse(response.context["cl"].show_full_result_count)
+
+    @override_settings(ADMIN_FULL_RESULT_COUNT=True)
+    def test_full_result_count_toggle(self):
+        response = self.client.get(reverse("admin:blog_comment_changelist") + "?q=коментар")
+        self.assertEqual(response.context["cl"].full_result_count, 3)
+
+    @override_settings(ADMIN_COUNT_LIMIT=1)
+    @patch.object(CommentAdmin, "list_per_page", 1)
+    def test_pages_beyond_count_limit(self):
+        url = reverse("admin:blog_comment_changelist") + "?q=коментар"
+        response = self.client.get(url)
+        self.assertContains(response, "2+ ")
+        response = self.client.get(url + "&p=3")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context["cl"].result_list), 1)
+        self.assertEqual(response.context["cl"].result_count, 3)
+
+
+class EstimatedCountPaginatorTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="pager", password="pass")
+        Post.objects.bulk_create(Post(title=f"P{i}", content="c", author=cls.user) for i in range(6))
+
+    def test_small_table_exact_count(self):
+        self.assertEqual(EstimatedCountPaginator(Post.objects.all(), 2).count, 6)
+
+    def test_large_table_uses_estimate(self):
+        paginator = EstimatedCountPaginator(Post.objects.all(), 2)
+        paginator.max_count = 3
+        max_pk = Post.objects.order_by("-pk").first().pk
+        with self.assertNumQueries(1):
+            self.assertEqual(paginator.count, max_pk)
+
+    def test_filtered_count_is_capped(self):
+        paginator = EstimatedCountPaginator(Post.objects.filter(author=self.user), 2)
+        paginator.max_count = 4
+        self.assertEqual(paginator.count, 4)
+        self.assertTrue(paginator.count_is_lower_bound)
+
+    def test_filtered_count_reaches_past_current_page(self):
+        paginator = EstimatedCountPaginator(Post.objects.filter(author=self.user), 2, number=2, max_count=3)
+        self.assertEqual(paginator.count, 6)
+        self.assertFalse(paginator.count_is_lower_bound)
+        self.assertEqual(len(paginator.page(3)), 2)
+
+
+# ══════════════════════════════════════════════════════
+#  5. MODERATION  — масові set-based дії
+# ══════════════════════════════════════════════════════
+
+
+class ModerationTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.spammer = User.objects.create_user(username="spammer", password="pass")
+        cls.reader = User.objects.create_user(username="reader", password="pass")
+        cls.post = Post.objects.create(title="Пост", content="c", author=cls.reader)
+        for i in range(5):
+            Comment.objects.create(post=cls.post, author=cls.spammer, content=f"buy pills {i}")
+        Comment.objects.create(post=cls.post, author=cls.reader, content="нормальний коментар")
+
+    def test_comment_count_maintained_on_create(self):
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comment_count, 6)
+
+    def test_hide_comments_in_batches_updates_counter(self):
+        progress = []
+        count = moderation.hide(Comment.objects.filter(author=self.spammer), batch_size=2, progress=progress.append)
+        self.assertEqual(count, 5)
+        self.assertEqual(progress, [2, 4, 5])
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comment_count, 1)
+
+    def test_hidden_comments_not_shown(self):
+        moderation.hide(Comment.objects.filter(author=self.spammer))
+        response = self.client.get(reverse("post-detail", kwargs={"pk": self.post.pk}))
+        self.assertEqual(len(response.context["comments"]), 1)
+
+    def test_delete_comments_by_content(self):
+        count = moderation.delete(Comment.objects.filter(content__contains="pills"), batch_size=2)
+        self.assertEqual(count, 5)
+        self.assertEqual(Comment.objects.count(), 1)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comment_count, 1)
+
+    def test_delete_posts_cascades_to_comments(self):
+        moderation.delete(Post.objects.filter(author=self.reader))
+        self.assertEqual(Post.objects.count(), 0)
+        self.assertEqual(Comment.objects.count(), 0)
+
+    def test_reassign_comments(self):
+        count = moderation.reassign(Comment.objects.filter(author=self.spammer), self.reader)
+        self.assertEqual(count, 5)
+        self.assertFalse(Comment.objects.filter(author=self.spammer).exists())
+
+    def test_hidden_post_not_public(self):
+        moderation.hide(Post.objects.all())
+        self.assertEqual(self.client.get(reverse("post-detail", kwargs={"pk": self.post.pk})).status_code, 404)
+        self.assertEqual(len(self.client.get(reverse("blog-home")).context["posts"]), 0)
+
+    def test_bulk_delete_is_single_statement_per_batch(self):
+        with CaptureQueriesContext(connection) as ctx:
+            moderation.delete(Comment.objects.filter(author=self.spammer), batch_size=10)
+        deletes = [q for q in ctx.captured_queries if q["sql"].startswith("DELETE")]
+        self.assertEqual(len(deletes), 1)
+
+    def test_protected_dependent_checked_before_any_changes(self):
+        Follow.objects.create(follower=self.spammer, author=self.reader)
+        author_field = Follow._meta.get_field("author")
+        with patch.object(author_field.remote_field, "on_delete", models.PROTECT):
+            with self.assertRaises(ProtectedError):
+                bulk.delete_pks(User, [self.reader.pk])
+        self.assertTrue(Post.objects.filter(pk=self.post.pk).exists())
+        self.assertEqual(Comment.objects.count(), 6)
+
+
+class ModerationAdminActionTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(username="moder", password="pass", email="m@ex.com")
+        cls.spammer = User.objects.create_user(username="spammer", password="pass")
+        cls.post = Post.objects.create(title="Спам", content="c", author=cls.spammer)
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def _action(self, action, **extra):
+        data = {"action": action, "_selected_action": [self.post.pk], "index": 0, **extra}
+        return self.client.post(reverse("admin:blog_post_changelist"), data)
+
+    def test_default_delete_action_replaced(self):
+        response = self.client.get(reverse("admin:blog_post_changelist"))
+        self.assertNotContains(response, 'value="delete_selected"')
+        self.assertContains(response, 'value="bulk_delete_selected"')
+
+    def test_hide_action(self):
+        self._action("hide_selected")
+        self.post.refresh_from_db()
+        self.assertTrue(self.post.is_hidden)
+
+    def test_bulk_delete_action(self):
+        self._action("bulk_delete_selected")
+        self.assertFalse(Post.objects.filter(pk=self.post.pk).exists())
+
+    def test_reassign_action(self):
+        self._action("reassign_selected", target_username="moder")
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.author, self.admin)
+
+    def test_reassign_unknown_user_keeps_author(self):
+        self._action("reassign_selected", target_username="nobody")
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.author, self.spammer)
+
+
+# ══════════════════════════════════════════════════════
+#  6. FEEDS  — RSS/Atom з умовним GET і кешем
+# ══════════════════════════════════════════════════════
+
+
+class FeedTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="feeder", password="pass")
+        cls.other = User.objects.create_user(username="other", password="pass")
+        cls.post = Post.objects.create(title="Перший у стрічці", content="вміст", author=cls.user)
+        Post.objects.create(title="Чужий у стрічці", content="вміст", author=cls.other)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_global_rss(self):
+        response = self.client.get(reverse("feed-rss"))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Перший у стрічці")
+        self.assertContains(response, "Чужий у стрічці")
+        self.assertIn("rss", response["Content-Type"])
+
+    def test_user_atom_only_author_posts(self):
+        response = self.client.get(reverse("user-feed-atom", kwargs={"username": "feeder"}))
+        self.assertIn("atom", response["Content-Type"])
+        self.assertContains(response, "Перший у стрічці")
+        self.assertNotContains(response, "Чужий у стрічці")
+
+    def test_unknown_author_404(self):
+        response = self.client.get(reverse("user-feed-rss", kwargs={"username": "nobody"}))
+        self.assertEqual(response.status_code, 404)
+
+    def test_author_registered_after_unknown_lookup(self):
+        url = reverse("user-feed-rss", kwargs={"username": "newcomer"})
+        self.client.get(url)
+        newcomer = User.objects.create_user(username="newcomer", password="pass")
+        Post.objects.create(title="Перший пост новачка", content="вміст", author=newcomer)
+        self.assertContains(self.client.get(url), "Перший пост новачка")
+        Post.objects.create(title="Другий пост новачка", content="вміст", author=newcomer)
+        self.assertContains(self.client.get(url), "Другий пост новачка")
+
+    def test_conditional_get_returns_304(self):
+        first = self.client.get(reverse("feed-rss"))
+        self.assertIn("ETag", first)
+        self.assertIn("Last-Modified", first)
+        with self.assertNumQueries(0):
+            second = self.client.get(reverse("feed-rss"), HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(second.status_code, 304)
+
+    def test_body_served_from_cache(self):
+        self.client.get(reverse("feed-atom"))
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("feed-atom"))
+        self.assertContains(response, "Перший у стрічці")
+
+    def test_new_post_invalidates_author_and_global_feeds(self):
+        global_etag = self.client.get(reverse("feed-rss"))["ETag"]
+        user_url = reverse("user-feed-rss", kwargs={"username": "feeder"})
+        other_url = reverse("user-feed-rss", kwargs={"username": "other"})
+        user_etag = self.client.get(user_url)["ETag"]
+        other_etag = self.client.get(other_url)["ETag"]
+
+        Post.objects.create(title="Свіжий", content="вміст", author=self.user)
+
+        self.assertEqual(self.client.get(reverse("feed-rss"), HTTP_IF_NONE_MATCH=global_etag).status_code, 200)
+        self.assertContains(self.client.get(user_url, HTTP_IF_NONE_MATCH=user_etag), "Свіжий")
+        self.assertEqual(self.client.get(other_url, HTTP_IF_NONE_MATCH=other_etag).status_code, 304)
+
+    def test_last_modified_is_newest_post(self):
+        Post.objects.filter(pk=self.post.pk).update(date_posted=timezone.now() - timezone.timedelta(days=2))
+        self.post.refresh_from_db()
+        self.post.save()
+        url = reverse("user-feed-rss", kwargs={"username": "feeder"})
+        self.client.get(url)
+        response = self.client.get(url)  # тіло з кешу, Last-Modified - зі стану стрічки
+        self.assertEqual(response["Last-Modified"], http_date(self.post.date_posted.timestamp()))
+
+    def test_changes_from_other_processes_seen_after_state_timeout(self):
+        url = reverse("feed-rss")
+        etag = self.client.get(url)["ETag"]
+        # планувальник чи інший воркер змінює пост, але їхній invalidate_feeds сюди не доходить
+        Post.objects.filter(pk=self.post.pk).update(title="Виправлений заголовок")
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        later = time.time() + feeds.FEED_STATE_TIMEOUT + 1
+        with patch("time.time", return_value=later):
+            self.assertContains(self.client.get(url, HTTP_IF_NONE_MATCH=etag), "Виправлений заголовок")
+
+    def test_validators_stable_across_processes(self):
+        url = reverse("feed-rss")
+        first = self.client.get(url)
+        cache.clear()  # інший воркер з власним кешем рахує той самий стан
+        second = self.client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(second.status_code, 304)
+
+    def test_hidden_posts_excluded_after_moderation(self):
+        self.client.get(reverse("feed-rss"))
+        moderation.hide(Post.objects.filter(pk=self.post.pk))
+        self.assertNotContains(self.client.get(reverse("feed-rss")), "Перший у стрічці")
+
+
+# ══════════════════════════════════════════════════════
+#  7. VIEW COUNTERS  — write-behind лічильник переглядів
+# ══════════════════════════════════════════════════════
+
+
+class ViewCounterTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="viewed", password="pass")
+        cls.post = Post.objects.create(title="Популярний", content="c", author=cls.user)
+        cls.other = Post.objects.create(title="Інший", content="c", author=cls.user)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_detail_view_counts_view(self):
+        self.client.get(reverse("post-detail", kwargs={"pk": self.post.pk}))
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.view_count, 1)
+
+    def test_repeat_view_same_viewer_deduplicated(self):
+        url = reverse("post-detail", kwargs={"pk": self.post.pk})
+        for _ in range(3):
+            self.client.get(url)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.view_count, 1)
+
+    def test_different_viewers_counted(self):
+        url = reverse("post-detail", kwargs={"pk": self.post.pk})
+        self.client.get(url, REMOTE_ADDR="10.0.0.1")
+        self.client.get(url, REMOTE_ADDR="10.0.0.2")
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.view_count, 2)
+
+    def test_buffer_waits_for_flush_interval(self):
+        buffer = CounterBuffer("view_count", flush_interval=3600)
+        buffer.add(self.post.pk)
+        buffer.add(self.post.pk)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.view_count, 0)
+        self.assertEqual(buffer.pending(self.post.pk), 2)
+
+    def test_flush_groups_posts_by_delta(self):
+        buffer = CounterBuffer("view_count", flush_interval=3600)
+        buffer.add(self.post.pk, 3)
+        buffer.add(self.other.pk, 3)
+        with self.assertNumQueries(3):  # SAVEPOINT + один UPDATE + RELEASE
+            self.assertEqual(buffer.flush(), 2)
+        self.assertEqual(list(Post.objects.order_by("pk").values_list("view_count", flat=True)), [3, 3])
+        self.assertEqual(buffer.pending(self.post.pk), 0)
+
+    def test_idle_buffer_flushed_in_background(self):
+        buffer = CounterBuffer("view_count", flush_interval=0.05)
+        # справжній запис ішов би через окреме з'єднання потоку, без тестової БД у пам'яті
+        with patch.object(buffer, "flush", side_effect=buffer._pending.clear) as flush:
+            buffer.add(self.post.pk)
+            deadline = time.monotonic() + 5
+            while not flush.called and time.monotonic() < deadline:
+                time.sleep(0.01)
+        self.assertTrue(flush.called)
+
+    def test_failed_flush_requeued_only_for_operational_errors(self):
+        buffer = CounterBuffer("view_count", flush_interval=3600)
+        buffer.add(self.post.pk, 2)
+        with patch("blog.counters.transaction.atomic", side_effect=OperationalError("database is locked")):
+            self.assertEqual(buffer.flush(), 0)
+        self.assertEqual(buffer.pending(self.post.pk), 2)
+        with patch("blog.counters.transaction.atomic", side_effect=IntegrityError("constraint")):
+            self.assertEqual(buffer.flush(), 0)
+        self.assertEqual(buffer.pending(self.post.pk), 0)
+
+    @override_settings(VIEW_COUNT_ENABLED=False)
+    def test_counting_can_be_disabled(self):
+        self.client.get(reverse("post-detail", kwargs={"pk": self.post.pk}))
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.view_count, 0)
+
+
+# ══════════════════════════════════════════════════════
+#  8. LIKES  — ідемпотентні вподобання
+# ══════════════════════════════════════════════════════
+
+
+class LikeTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="liker", password="pass")
+        cls.author = User.objects.create_user(username="liked", password="pass")
+        cls.posts = [Post.objects.create(title=f"Пост {i}", content="c", author=cls.author) for i in range(5)]
+        cls.post = cls.posts[0]
+
+    def test_like_is_idempotent(self):
+        self.assertTrue(likes.like(self.user, self.post.pk))
+        self.assertFalse(likes.like(self.user, self.post.pk))
+        self.assertEqual(Like.objects.count(), 1)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.like_count, 1)
+
+    def test_unlike(self):
+        likes.like(self.user, self.post.pk)
+        self.assertTrue(likes.unlike(self.user, self.post.pk))
+        self.assertFalse(likes.unlike(self.user, self.post.pk))
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.like_count, 0)
+
+    def test_unique_constraint(self):
+        Like.objects.create(user=self.user, post=self.post)
+        with self.assertRaises(IntegrityError):
+            Like.objects.create(user=self.user, post=self.post)
+
+    def test_liked_post_ids_single_query(self):
+        likes.like(self.user, self.posts[1].pk)
+        likes.like(self.user, self.posts[3].pk)
+        with self.assertNumQueries(1):
+            liked = likes.liked_post_ids(self.user, self.posts)
+        self.assertEqual(liked, {self.posts[1].pk, self.posts[3].pk})
+
+    def test_like_endpoint_requires_login(self):
+        response = self.client.post(reverse("like-post", kwargs={"pk": self.post.pk}))
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Like.objects.count(), 0)
+
+    def test_like_endpoint_rejects_get(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse("like-post", kwargs={"pk": self.post.pk}))
+        self.assertEqual(response.status_code, 405)
+
+    def test_like_and_unlike_endpoints(self):
+        self.client.force_login(self.user)
+        response = self.client.post(reverse("like-post", kwargs={"pk": self.post.pk}), {"next": "/"})
+        self.assertRedirects(response, "/")
+        self.assertTrue(Like.objects.filter(user=self.user, post=self.post).exists())
+        self.client.post(reverse("unlike-post", kwargs={"pk": self.post.pk}))
+        self.assertFalse(Like.objects.filter(user=self.user, post=self.post).exists())
+
+    def test_feed_marks_liked_posts(self):
+        likes.like(self.user, self.posts[2].pk)
+        self.client.force_login(self.user)
+        response = self.client.get(reverse("blog-home"))
+        self.assertEqual(response.context["liked_post_ids"], {self.posts[2].pk})
+        self.assertContains(response, reverse("unlike-post", kwargs={"pk": self.posts[2].pk}))
+
+
+# ══════════════════════════════════════════════════════
+#  9. TRENDING  — інкрементний перерахунок і keyset-пагінація
+# ══════════════════════════════════════════════════════
+
+
+class TrendingTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="trendy", password="pass")
+        cls.posts = [Post.objects.create(title=f"Тренд {i}", content="c", author=cls.user) for i in range(7)]
+
+    def test_score_grows_with_activity_and_recency(self):
+        now = timezone.now()
+        self.assertGreater(hot_score(10, 0, 0, now), hot_score(1, 0, 0, now))
+        self.assertGreater(hot_score(1, 0, 0, now), hot_score(1, 0, 0, now - timezone.timedelta(days=1)))
+
+    def test_new_post_gets_initial_score(self):
+        self.assertTrue(all(post.trending_score > 0 for post in self.posts))
+
+    def test_job_recomputes_only_active_posts(self):
+        update_trending_scores(full=True)
+        Post.objects.update(trending_score=-1, activity_at=timezone.now() - timezone.timedelta(days=1))
+        Comment.objects.create(post=self.posts[0], author=self.user, content="Свіжий")
+        self.assertEqual(update_trending_scores(), 1)
+        scores = dict(Post.objects.values_list("pk", "trending_score"))
+        self.assertGreater(scores[self.posts[0].pk], 0)
+        self.assertEqual(scores[self.posts[1].pk], -1)
+        self.assertIsNotNone(JobCheckpoint.get("trending"))
+
+    def test_counter_flush_marks_activity(self):
+        Post.objects.update(activity_at=timezone.now() - timezone.timedelta(days=1))
+        buffer = CounterBuffer("view_count", flush_interval=3600)
+        buffer.add(self.posts[2].pk)
+        buffer.flush()
+        recent = Post.objects.filter(activity_at__gte=timezone.now() - timezone.timedelta(minutes=1))
+        self.assertEqual(list(recent.values_list("pk", flat=True)), [self.posts[2].pk])
+
+    def test_keyset_pages_cover_all_posts_once(self):
+        Post.objects.update(trending_score=1.0)  # однакові оцінки - порядок вирішує pk
+        seen, cursor = [], None
+        while True:
+            page = KeysetPage(Post.objects.all(), "trending_score", cursor, per_page=3)
+            seen += [post.pk for post in page]
+            if not page.has_next():
+                break
+            cursor = page.next_cursor
+        self.assertEqual(seen, sorted((post.pk for post in self.posts), reverse=True))
+
+    def test_trending_view(self):
+        Post.objects.filter(pk=self.posts[3].pk).update(trending_score=10**6)
+        response = self.client.get(reverse("blog-home"), {"sort": "trending"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["sort"], "trending")
+        self.assertEqual(response.context["posts"][0], self.posts[3])
+        self.assertIn("after=", response.content.decode())
+
+    def test_trending_view_rejects_bad_cursor(self):
+        response = self.client.get(reverse("blog-home"), {"sort": "trending", "after": "garbage"})
+        self.assertEqual(response.status_code, 404)
+
+
+# ══════════════════════════════════════════════════════
+#  10. TIMELINE  — персональна стрічка (fan-out on write / on read)
+# ══════════════════════════════════════════════════════
+
+
+class TimelineTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.reader = User.objects.create_user(username="reader", password="pass")
+        cls.author = User.objects.create_user(username="writer", password="pass")
+        cls.star = User.objects.create_user(username="star", password="pass")
+        cls.old_post = Post.objects.create(title="Давній", content="c", author=cls.author)
+
+    def test_follow_backfills_and_counts(self):
+        self.assertTrue(timeline.follow(self.reader, self.author))
+        self.assertFalse(timeline.follow(self.reader, self.author))
+        self.assertFalse(timeline.follow(self.reader, self.reader))
+        self.assertEqual(Follow.objects.count(), 1)
+        self.author.profile.refresh_from_db()
+        self.assertEqual(self.author.profile.follower_count, 1)
+        self.assertEqual(list(TimelineEntry.objects.values_list("post_id", flat=True)), [self.old_post.pk])
+
+    def test_new_post_fans_out_to_followers(self):
+        timeline.follow(self.reader, self.author)
+        post = Post.objects.create(title="Новий", content="c", author=self.author)
+        self.assertTrue(TimelineEntry.objects.filter(user=self.reader, post=post).exists())
+
+    def test_unfollow_removes_entries(self):
+        timeline.follow(self.reader, self.author)
+        self.assertTrue(timeline.unfollow(self.reader, self.author))
+        self.assertFalse(timeline.unfollow(self.reader, self.author))
+        self.assertFalse(TimelineEntry.objects.exists())
+        self.author.profile.refresh_from_db()
+        self.assertEqual(self.author.profile.follower_count, 0)
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=1)
+    def test_popular_author_is_read_on_demand(self):
+        timeline.follow(self.reader, self.author)
+        timeline.follow(self.reader, self.star)
+        star_post = Post.objects.create(title="Зірковий", content="c", author=self.star)
+        own_post = Post.objects.create(title="Звичайний", content="c", author=self.author)
+        self.assertFalse(TimelineEntry.objects.filter(author=self.star).exists())
+        page = timeline.timeline_page(self.reader, per_page=10)
+        self.assertEqual(page.object_list, [own_post, star_post, self.old_post])
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=1)
+    def test_merged_pages_have_no_gaps_or_duplicates(self):
+        timeline.follow(self.reader, self.author)
+        timeline.follow(self.reader, self.star)
+        for i in range(4):
+            Post.objects.create(title=f"A{i}", content="c", author=self.author)
+            Post.objects.create(title=f"S{i}", content="c", author=self.star)
+        seen, cursor = [], None
+        while True:
+            page = timeline.timeline_page(self.reader, cursor, per_page=3)
+            seen += [post.pk for post in page]
+            if not page.has_next():
+                break
+            cursor = page.next_cursor
+        expected = Post.objects.filter(author__in=[self.author, self.star]).order_by("-date_posted", "-pk")
+        self.assertEqual(seen, list(expected.values_list("pk", flat=True)))
+
+    def test_hidden_posts_not_shown(self):
+        timeline.follow(self.reader, self.author)
+        Post.objects.filter(pk=self.old_post.pk).update(is_hidden=True)
+        self.assertEqual(len(timeline.timeline_page(self.reader)), 0)
+
+    def test_unpublished_posts_not_shown(self):
+        timeline.follow(self.reader, self.author)
+        Post.objects.filter(pk=self.old_post.pk).update(status=Post.Status.DRAFT)
+        self.assertEqual(len(timeline.timeline_page(self.reader)), 0)
+
+    def test_posts_kept_when_author_drops_below_fanout_limit(self):
+        with override_settings(TIMELINE_FANOUT_LIMIT=1):
+            timeline.follow(self.reader, self.star)
+            star_post = Post.objects.create(title="Зірковий", content="c", author=self.star)
+        self.assertFalse(TimelineEntry.objects.exists())
+        # поріг вищий за кількість підписників зірки, а рядків у стрічці від неї немає
+        self.assertEqual(timeline.timeline_page(self.reader, per_page=10).object_list, [star_post])
+
+    def test_timeline_view(self):
+        timeline.follow(self.reader, self.author)
+        self.client.force_login(self.reader)
+        response = self.client.get(reverse("timeline"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.context["posts"]), [self.old_post])
+
+    def test_timeline_requires_login(self):
+        self.assertEqual(self.client.get(reverse("timeline")).status_code, 302)
+
+    def test_follow_endpoints(self):
+        self.client.force_login(self.reader)
+        response = self.client.post(reverse("follow-user", kwargs={"username": "writer"}))
+        self.assertRedirects(response, reverse("user-posts", kwargs={"username": "writer"}))
+        self.assertTrue(Follow.objects.filter(follower=self.reader, author=self.author).exists())
+        response = self.client.get(reverse("user-posts", kwargs={"username": "writer"}))
+        self.assertTrue(response.context["is_following"])
+        self.client.post(reverse("unfollow-user", kwargs={"username": "writer"}))
+        self.assertFalse(Follow.objects.exists())
+
+
+# ══════════════════════════════════════════════════════
+#  11. THREADED COMMENTS  — матеріалізовані шляхи
+# ══════════════════════════════════════════════════════
+
+
+class CommentThreadTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="threader", password="pass")
+        cls.post = Post.objects.create(title="Обговорення", content="c", author=cls.user)
+        cls.first = cls.reply(None, "Перший")
+        cls.answer = cls.reply(cls.first, "Відповідь")
+        cls.nested = cls.reply(cls.answer, "Вкладена")
+        cls.second = cls.reply(None, "Другий")
+
+    @classmethod
+    def reply(cls, parent, content):
+        return Comment.objects.create(post=cls.post, author=cls.user, content=content, parent=parent)
+
+    def test_paths(self):
+        self.assertEqual(ancestor_ids(segment(5) + segment(40) + segment(77)), [5, 40])
+        self.assertEqual(subtree_end(segment(5) + segment(35)), segment(5) + segment(36))
+        self.assertEqual(self.nested.path, segment(self.first.pk) + segment(self.answer.pk) + segment(self.nested.pk))
+        self.assertEqual(self.nested.depth, 2)
+
+    def test_reply_counts_cover_whole_subtree(self):
+        self.first.refresh_from_db()
+        self.answer.refresh_from_db()
+        self.assertEqual((self.first.reply_count, self.answer.reply_count), (2, 1))
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comment_count, 4)
+
+    def test_tree_is_one_ordered_page(self):
+        with self.assertNumQueries(3):  # корені, приховані, дерево
+            page = threads.post_threads(self.post)
+            comments = list(page)
+            [comment.author.profile for comment in comments]
+        self.assertEqual(comments, [self.first, self.answer, self.nested, self.second])
+        self.assertEqual([comment.level for comment in comments], [0, 1, 2, 0])
+
+    def test_threads_paginate_by_root(self):
+        page = threads.post_threads(self.post, per_page=1)
+        self.assertEqual(list(page), [self.first, self.answer, self.nested])
+        page = threads.post_threads(self.post, page.next_cursor, per_page=1)
+        self.assertEqual(list(page), [self.second])
+        self.assertFalse(page.has_next())
+
+    def test_deep_replies_are_collapsed(self):
+        page = threads.post_threads(self.post, max_depth=1)
+        self.assertEqual(list(page), [self.first, self.answer, self.second])
+        self.assertEqual(page.object_list[1].collapsed_replies, 1)
+
+    def test_long_thread_is_truncated(self):
+        page = threads.post_threads(self.post, replies=1)
+        self.assertEqual(list(page), [self.first, self.answer, self.second])
+        self.assertTrue(page.object_list[0].truncated)
+
+    def test_hidden_comment_hides_its_replies(self):
+        Comment.objects.filter(pk=self.answer.pk).update(is_hidden=True)
+        self.assertEqual(list(threads.post_threads(self.post)), [self.first, self.second])
+
+    def test_subtree_pages(self):
+        page = threads.subtree(self.answer, per_page=1)
+        self.assertEqual(list(page), [self.answer])
+        page = threads.subtree(self.answer, page.next_cursor, per_page=1)
+        self.assertEqual(list(page), [self.nested])
+        self.assertEqual(page.object_list[0].level, 1)
+
+    def test_depth_is_capped(self):
+        parent = self.nested
+        for i in range(MAX_DEPTH + 2):
+            parent = self.reply(parent, f"Рівень {i}")
+        self.assertEqual(parent.depth, MAX_DEPTH - 1)
+
+    def test_delete_removes_subtree_and_updates_counts(self):
+        self.answer.delete()
+        self.assertFalse(Comment.objects.filter(pk=self.nested.pk).exists())
+        self.first.refresh_from_db()
+        self.post.refresh_from_db()
+        self.assertEqual((self.first.reply_count, self.post.comment_count), (0, 2))
+
+    def test_moderation_delete_refreshes_ancestors(self):
+        moderation.delete(Comment.objects.filter(pk=self.nested.pk))
+        self.first.refresh_from_db()
+        self.assertEqual(self.first.reply_count, 1)
+
+    def test_reply_view(self):
+        self.client.force_login(self.user)
+        self.client.post(
+            reverse("add-comment", kwargs={"pk": self.post.pk}), {"content": "Ще одна", "parent": self.second.pk}
+        )
+        self.assertEqual(Comment.objects.get(content="Ще одна").parent, self.second)
+
+    def test_reply_to_other_post_rejected(self):
+        other = Post.objects.create(title="Інший", content="c", author=self.user)
+        self.client.force_login(self.user)
+        response = self.client.post(
+            reverse("add-comment", kwargs={"pk": other.pk}), {"content": "Чужа", "parent": self.first.pk}
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_thread_view(self):
+        response = self.client.get(reverse("comment-thread", kwargs={"pk": self.answer.pk}))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.context["comments"]), [self.answer, self.nested])
+        Comment.objects.filter(pk=self.first.pk).update(is_hidden=True)
+        response = self.client.get(reverse("comment-thread", kwargs={"pk": self.answer.pk}))
+        self.assertEqual(response.status_code, 404)
+
+
+# ══════════════════════════════════════════════════════
+#  12. RATE LIMITING  — ковзне вікно в кеші
+# ══════════════════════════════════════════════════════
+
+
+@override_settings(
+    RATELIMIT_ENABLED=True, RATELIMIT_RATES={"comment": "3/m", "post": "1/m"}, RATELIMIT_IP_RATES={"comment": "5/m"}
+)
+class RateLimitTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="spammer", password="pass")
+        cls.other = User.objects.create_user(username="regular", password="pass")
+        cls.post = Post.objects.create(title="Ціль", content="c", author=cls.other)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_parse_rate(self):
+        self.assertEqual(ratelimit.parse_rate("10/m"), (10, 60))
+        self.assertEqual(ratelimit.parse_rate("5/h"), (5, 3600))
+
+    def test_sliding_window_counts_previous_window(self):
+        for _ in range(4):
+            self.assertIsNone(ratelimit.hit("t", "k", 4, 60, now=600))
+        self.assertEqual(ratelimit.hit("t", "k", 4, 60, now=659), 1)
+        # на початку нового вікна попереднє важить майже повністю: 4 * 59/60 < 4
+        self.assertIsNone(ratelimit.hit("t", "k", 4, 60, now=661))
+        # 1 + 4 * 59/60 >= 4; місце звільниться, коли 1 + 4 * (1 - t/60) < 4, тобто через 14 с
+        self.assertEqual(ratelimit.hit("t", "k", 4, 60, now=661), 14)
+        self.assertIsNone(ratelimit.hit("t", "k", 4, 60, now=676))
+
+    def test_check_is_constant_number_of_cache_calls(self):
+        with patch.object(cache, "get_many", wraps=cache.get_many) as get_many:
+            for _ in range(10):
+                ratelimit.hit("t", "k", 100, 60)
+        self.assertEqual(get_many.call_count, 10)
+
+    def test_comment_flood_gets_429(self):
+        self.client.force_login(self.user)
+        url = reverse("add-comment", kwargs={"pk": self.post.pk})
+        statuses = [self.client.post(url, {"content": f"Спам {i}"}).status_code for i in range(5)]
+        self.assertEqual(statuses, [302, 302, 302, 429, 429])
+        self.assertEqual(Comment.objects.count(), 3)
+
+    def test_limits_are_per_user(self):
+        url = reverse("add-comment", kwargs={"pk": self.post.pk})
+        self.client.force_login(self.user)
+        for i in range(4):
+            self.client.post(url, {"content": f"Спам {i}"})
+        self.client.force_login(self.other)
+        self.assertEqual(self.client.post(url, {"content": "Нормальний"}).status_code, 302)
+
+    def test_many_accounts_from_one_address_share_ip_limit(self):
+        url = reverse("add-comment", kwargs={"pk": self.post.pk})
+        accounts = [User.objects.create_user(username=f"bot{i}", password="pass") for i in range(4)]
+        statuses = []
+        for account in accounts:
+            self.client.force_login(account)
+            statuses += [self.client.post(url, {"content": f"Спам {account.pk} {i}"}).status_code for i in range(2)]
+        self.assertEqual(statuses, [302] * 5 + [429] * 3)
+        self.client.force_login(self.other)
+        self.assertEqual(self.client.post(url, {"content": "Інша мережа"}, REMOTE_ADDR="10.0.0.9").status_code, 302)
+
+    def test_client_ip_behind_trusted_proxies(self):
+        request = RequestFactory().get("/", REMOTE_ADDR="10.0.0.1", HTTP_X_FORWARDED_FOR="6.6.6.6, 1.2.3.4")
+        self.assertEqual(ratelimit.client_ip(request), "10.0.0.1")
+        for hops, address in [(1, "1.2.3.4"), (2, "6.6.6.6"), (3, "10.0.0.1")]:
+            with override_settings(TRUSTED_PROXY_HOPS=hops):
+                self.assertEqual(ratelimit.client_ip(request), address)
+
+    @override_settings(TRUSTED_PROXY_HOPS=1)
+    def test_clients_behind_proxy_limited_separately(self):
+        url = reverse("add-comment", kwargs={"pk": self.post.pk})
+        accounts = [User.objects.create_user(username=f"reader{i}", password="pass") for i in range(6)]
+        for number, account in enumerate(accounts):
+            self.client.force_login(account)
+            response = self.client.post(
+                url, {"content": f"Коментар {number}"}, REMOTE_ADDR="10.0.0.1", HTTP_X_FORWARDED_FOR=f"1.2.3.{number}"
+            )
+            self.assertEqual(response.status_code, 302)
+
+    def test_reads_not_limited(self):
+        self.client.force_login(self.user)
+        for _ in range(3):
+            self.assertEqual(self.client.get(reverse("post-create")).status_code, 200)
+        self.client.post(reverse("post-create"), {"title": "Один", "content": "c"})
+        response = self.client.post(reverse("post-create"), {"title": "Два", "content": "c"})
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(self.client.get(reverse("blog-home")).status_code, 200)
+
+    @override_settings(RATELIMIT_ENABLED=False)
+    def test_can_be_disabled(self):
+        self.client.force_login(self.user)
+        url = reverse("add-comment", kwargs={"pk": self.post.pk})
+        for i in range(5):
+            self.assertEqual(self.client.post(url, {"content": f"Спам {i}"}).status_code, 302)
+
+
+# ══════════════════════════════════════════════════════
+#  13. NOTIFICATIONS  — дайджести нових коментарів
+# ══════════════════════════════════════════════════════
+
+
+class NotificationTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username="writer", email="writer@example.com", password="pass1234")
+        cls.reader = User.objects.create_user(username="reader", password="pass1234")
+        cls.post = Post.objects.create(title="Вірусний пост", content="Вміст", author=cls.author)
+        cls.other = Post.objects.create(title="Другий пост", content="Вміст", author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+
+    def comment(self, post=None, author=None, **kwargs):
+        return Comment.objects.create(
+            post=post or self.post, author=author or self.reader, content="Коментар", **kwargs
+        )
+
+    def test_comment_request_does_not_notify(self):
+        self.client.force_login(self.reader)
+        self.client.post(reverse("add-comment", args=[self.post.pk]), {"content": "Привіт"})
+        self.assertFalse(Notification.objects.exists())
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_many_comments_make_one_notification_and_one_email(self):
+        for _ in range(30):
+            self.comment()
+        last = self.comment(post=self.other)
+        self.assertEqual(notifications.build_digests(batch_size=7), 31)
+        self.assertEqual(Notification.objects.count(), 2)
+        digest = Notification.objects.get(post=self.post)
+        self.assertEqual((digest.recipient, digest.comment_count), (self.author, 30))
+        self.assertEqual(Notification.objects.get(post=self.other).last_comment, last)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn("нових коментарів - 30", mail.outbox[0].body)
+        self.assertIn(reverse("post-detail", args=[self.other.pk]), mail.outbox[0].body)
+
+    def test_next_window_extends_unread_digest(self):
+        self.comment()
+        notifications.build_digests()
+        self.assertEqual(notifications.build_digests(), 0)
+        self.comment()
+        notifications.build_digests()
+        self.assertEqual(Notification.objects.get().comment_count, 2)
+        self.assertEqual(len(mail.outbox), 2)
+
+    def test_read_digest_starts_new_one(self):
+        self.comment()
+        notifications.build_digests()
+        notifications.mark_read(self.author)
+        self.comment()
+        notifications.build_digests()
+        self.assertEqual(
+            list(Notification.objects.order_by("pk").values_list("is_read", "comment_count")), [(True, 1), (False, 1)]
+        )
+
+    def test_own_and_hidden_comments_ignored(self):
+        self.comment(author=self.author)
+        self.comment(is_hidden=True)
+        notifications.build_digests()
+        self.assertFalse(Notification.objects.exists())
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_unread_count_cached_until_change(self):
+        self.comment()
+        notifications.build_digests(send_email=False)
+        self.assertEqual(notifications.unread_count(self.author), 1)
+        with self.assertNumQueries(0):
+            self.assertEqual(notifications.unread_count(self.author), 1)
+        self.comment(post=self.other)
+        notifications.build_digests(send_email=False)
+        self.assertEqual(notifications.unread_count(self.author), 2)
+        notifications.mark_read(self.author)
+        self.assertEqual(notifications.unread_count(self.author), 0)
+
+    def test_navbar_badge_and_mark_read_view(self):
+        self.comment()
+        notifications.build_digests(send_email=False)
+        self.client.force_login(self.author)
+        response = self.client.get(reverse("notifications"))
+        self.assertContains(response, "Вірусний пост")
+        self.assertEqual(response.context["unread_notifications"], 1)
+        response = self.client.post(reverse("notifications-read"))
+        self.assertRedirects(response, reverse("notifications"))
+        self.assertFalse(Notification.objects.filter(is_read=False).exists())
+
+    def test_notifications_require_login(self):
+        response = self.client.get(reverse("notifications"))
+        self.assertEqual(response.status_code, 302)
+
+
+# ══════════════════════════════════════════════════════
+#  14. LIVE COMMENTS  — Server-Sent Events
+# ══════════════════════════════════════════════════════
+
+
+class LiveCommentsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="live", password="pass1234")
+        cls.post = Post.objects.create(title="Живий пост", content="Вміст", author=cls.user)
+        cls.first = Comment.objects.create(post=cls.post, author=cls.user, content="Перший")
+        cls.second = Comment.objects.create(post=cls.post, author=cls.user, content="Другий")
+
+    def event(self, pk):
+        return {"id": pk, "parent": None, "depth": 0, "author": "live", "avatar": "", "date": "", "content": "Новий"}
+
+    def test_new_comment_published_after_commit(self):
+        with patch.object(live.broker, "publish") as publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                comment = Comment.objects.create(post=self.post, author=self.user, content="Наживо", parent=self.first)
+        channel, event = publish.call_args.args
+        self.assertEqual(channel, live.post_channel(self.post.pk))
+        self.assertEqual((event["id"], event["parent"], event["content"]), (comment.pk, self.first.pk, "Наживо"))
+
+    def test_hidden_comments_not_published(self):
+        Comment.objects.filter(pk=self.first.pk).update(is_hidden=True)
+        with patch.object(live.broker, "publish") as publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                Comment.objects.create(post=self.post, author=self.user, content="Прихований", is_hidden=True)
+                Comment.objects.create(
+                    post=self.post, author=self.user, content="В прихованій гілці", parent=self.first
+                )
+        publish.assert_not_called()
+
+    async def test_stream_pushes_published_comment(self):
+        events = live.comment_events(self.post.pk)
+        self.assertEqual(await anext(events), "retry: 5000\n\n")
+        live.broker.publish(live.post_channel(self.post.pk), self.event(999))
+        self.assertTrue((await anext(events)).startswith("id: 999\nevent: comment\n"))
+        await events.aclose()
+        self.assertEqual(live.broker.subscriber_count(live.post_channel(self.post.pk)), 0)
+
+    async def test_reconnect_replays_missed_and_skips_duplicates(self):
+        events = live.comment_events(self.post.pk, str(self.first.pk))
+        await anext(events)
+        self.assertTrue((await anext(events)).startswith(f"id: {self.second.pk}\n"))
+        live.broker.publish(live.post_channel(self.post.pk), self.event(self.second.pk))
+        live.broker.publish(live.post_channel(self.post.pk), self.event(self.second.pk + 1))
+        self.assertTrue((await anext(events)).startswith(f"id: {self.second.pk + 1}\n"))
+        await events.aclose()
+
+    async def test_too_many_missed_asks_to_reload(self):
+        with patch("blog.live.BACKLOG", 1):
+            events = live.comment_events(self.post.pk, "0")
+            await anext(events)
+            self.assertTrue((await anext(events)).startswith("event: reload"))
+            with self.assertRaises(StopAsyncIteration):
+                await anext(events)
+
+    async def test_idle_stream_sends_heartbeat(self):
+        events = live.comment_events(self.post.pk, heartbeat=0.01)
+        await anext(events)
+        self.assertEqual(await anext(events), ": ping\n\n")
+        await events.aclose()
+
+    async def test_slow_client_disconnected_on_overflow(self):
+        broker = live.LocalBroker(queue_size=2)
+        with broker.subscribe("post:1") as subscription:
+            for pk in range(3):
+                broker.publish("post:1", self.event(pk))
+            await asyncio.sleep(0)
+            self.assertIsNone(await subscription.get())
+            self.assertTrue(subscription.queue.empty())
+
+    async def test_stream_view(self):
+        url = reverse("comment-stream", args=[self.post.pk])
+        response = await self.async_client.get(url, headers={"Last-Event-ID": str(self.first.pk)})
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        self.assertEqual(response["Cache-Control"], "no-cache")
+        chunks = response.streaming_content
+        await anext(chunks)
+        self.assertIn(f"id: {self.second.pk}".encode(), await anext(chunks))
+        await chunks.aclose()
+
+    async def test_stream_view_hidden_post(self):
+        await Post.objects.filter(pk=self.post.pk).aupdate(is_hidden=True)
+        response = await self.async_client.get(reverse("comment-stream", args=[self.post.pk]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_wsgi_client_told_to_stop(self):
+        response = self.client.get(reverse("comment-stream", args=[self.post.pk]))
+        self.assertEqual(response.status_code, 204)
+
+    def test_detail_page_starts_after_last_comment(self):
+        response = self.client.get(reverse("post-detail", args=[self.post.pk]))
+        self.assertContains(response, f"?last={self.second.pk}")
+
+
+# ══════════════════════════════════════════════════════
+#  15. EXCERPTS  — уривки замість повного тексту в списках
+# ══════════════════════════════════════════════════════
+
+
+class ExcerptTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="longread", password="pass1234")
+        cls.post = Post.objects.create(title="Лонгрід", content="слово " * 1000, author=cls.user)
+        cls.short = Post.objects.create(title="Коротко", content="Два слова", author=cls.user)
+
+    def test_excerpt_maintained_on_save(self):
+        self.assertEqual(len(self.post.excerpt), 200)
+        self.assertTrue(self.post.has_more)
+        self.assertEqual(self.post.word_count, 1000)
+        self.assertEqual((self.short.excerpt, self.short.has_more, self.short.word_count), ("Два слова", False, 2))
+
+    def test_content_change_updates_excerpt(self):
+        self.post.content = "Новий текст"
+        self.post.save(update_fields=["content"])
+        self.post.refresh_from_db()
+        self.assertEqual((self.post.excerpt, self.post.has_more, self.post.word_count), ("Новий текст", False, 2))
+
+    def test_saving_deferred_post_does_not_load_content(self):
+        post = Post.objects.listing().get(pk=self.post.pk)
+        post.title = "Інша назва"
+        with self.assertNumQueries(1):
+            post.save()
+        self.assertTrue(Post.objects.get(pk=self.post.pk).has_more)
+
+    def test_list_pages_do_not_read_content(self):
+        Follow.objects.create(follower=self.user, author=self.user)
+        timeline.fan_out(self.post)
+        self.client.force_login(self.user)
+        for url in (reverse("blog-home"), reverse("user-posts", args=["longread"]), reverse("timeline")):
+            with self.subTest(url=url), CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertContains(response, self.post.excerpt + "...")
+            self.assertFalse([q["sql"] for q in queries if '"blog_post"."content"' in q["sql"]])
+
+    def test_feed_uses_excerpt(self):
+        response = self.client.get(reverse("feed-rss"))
+        self.assertContains(response, self.post.excerpt)
+
+    def test_backfill_command(self):
+        Post.objects.update(excerpt="", has_more=False, word_count=0)
+        call_command("backfill_excerpts", batch_size=1, stdout=StringIO())
+        self.post.refresh_from_db()
+        self.assertEqual((len(self.post.excerpt), self.post.has_more, self.post.word_count), (200, True, 1000))
+
+
+# ══════════════════════════════════════════════════════
+#  16. MARKDOWN  — збережений санітизований HTML постів
+# ══════════════════════════════════════════════════════
+
+
+class MarkdownRenderingTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="markdown", password="pass1234")
+        cls.post = Post.objects.create(
+            title="Розмітка", content="# Заголовок\n\n**жирний** текст\n\n```python\nprint(1)\n```", author=cls.user
+        )
+
+    def test_markdown_rendered_on_save(self):
+        self.assertIn("<h1>Заголовок</h1>", self.post.content_html)
+        self.assertIn("<strong>жирний</strong>", self.post.content_html)
+        self.assertIn('<code class="language-python">print(1)', self.post.content_html)
+        self.assertEqual(self.post.content_html_version, rendering.RENDERER_VERSION)
+
+    def test_html_is_sanitized(self):
+        rendered = rendering.render_markdown(
+            '<script>alert(1)</script>\n\n<img src="x.png" onerror="alert(1)">\n\n[посилання](javascript:alert(1))'
+            "\n\n[сайт](https://example.com)"
+        )
+        self.assertNotIn("<script", rendered)
+        self.assertNotIn("onerror", rendered)
+        self.assertNotIn("javascript:", rendered)
+        self.assertIn('<a href="https://example.com" rel="nofollow noopener noreferrer">сайт</a>', rendered)
+
+    def test_plain_text_keeps_line_breaks(self):
+        self.assertEqual(rendering.render_markdown("перший\nдругий"), "<p>перший<br>\nдругий</p>")
+
+    def test_excerpt_uses_rendered_text(self):
+        self.assertEqual(self.post.excerpt, "Заголовок\nжирний текст\nprint(1)\n")
+        self.assertEqual(self.post.word_count, 4)
+
+    def test_detail_page_serves_stored_html(self):
+        response = self.client.get(reverse("post-detail", args=[self.post.pk]))
+        self.assertContains(response, "<strong>жирний</strong>", html=False)
+
+    def test_stale_html_rerendered_once_on_read(self):
+        Post.objects.filter(pk=self.post.pk).update(content_html="застарілий", content_html_version="0-old")
+        url = reverse("post-detail", args=[self.post.pk])
+        self.assertContains(self.client.get(url), "<strong>жирний</strong>", html=False)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.content_html_version, rendering.RENDERER_VERSION)
+        with patch("blog.models.render_markdown") as render:
+            self.client.get(url)
+        render.assert_not_called()
+
+    def test_background_render_keeps_concurrent_edit(self):
+        stale = Post.objects.filter(pk=self.post.pk)
+        stale.update(content_html_version="0-old")
+
+        def edit_meanwhile(text):
+            # пост редагують між читанням пачки і записом результату
+            Post.objects.filter(pk=self.post.pk).update(
+                content="нове", content_html="<p>нове</p>", content_html_version=rendering.RENDERER_VERSION
+            )
+            return rendering.render_markdown(text)
+
+        with patch("blog.models.render_markdown", side_effect=edit_meanwhile):
+            stale.render()
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.content_html, "<p>нове</p>")
+
+    def test_rerender_command(self):
+        Post.objects.update(content_html="", content_html_version="0-old")
+        out = StringIO()
+        call_command("rerender_posts", batch_size=1, stdout=out)
+        self.assertIn("Готово: 1", out.getvalue())
+        self.post.refresh_from_db()
+        self.assertIn("<h1>Заголовок</h1>", self.post.content_html)
+
+
+# ══════════════════════════════════════════════════════
+#  17. TAGS  — теги, стрічки тегів і хмара тегів
+# ══════════════════════════════════════════════════════
+
+
+class TagTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="tagger", password="pass1234")
+        start = timezone.now() - timezone.timedelta(days=1)
+        cls.posts = []
+        for i, names in enumerate(["python", "python, django", "django", "python, django, orm", "rust"]):
+            post = Post.objects.create(
+                title=f"Пост {i}", content="текст", author=cls.user, date_posted=start + timezone.timedelta(hours=i)
+            )
+            tags.set_tags(post, tags.parse_tags(names))
+            cls.posts.append(post)
+
+    def setUp(self):
+        cache.clear()
+
+    def titles(self, response):
+        return [post.title for post in response.context["posts"]]
+
+    def test_parse_tags_normalizes_and_dedupes(self):
+        self.assertEqual(
+            tags.parse_tags(" Python ,python,, Машинне   навчання, "),
+            {"python": "python", "машинне-навчання": "машинне навчання"},
+        )
+
+    def test_links_copy_post_date_and_counts_follow(self):
+        entry = PostTag.objects.get(post=self.posts[1], tag__slug="django")
+        self.assertEqual(entry.date_posted, self.posts[1].date_posted)
+        counts = dict(Tag.objects.values_list("slug", "post_count"))
+        self.assertEqual(counts, {"python": 3, "django": 3, "orm": 1, "rust": 1})
+
+    def test_create_and_edit_post_with_tags(self):
+        self.client.force_login(self.user)
+        self.client.post(reverse("post-create"), {"title": "Новий", "content": "текст", "tags": "Rust, Python"})
+        post = Post.objects.get(title="Новий")
+        self.assertEqual(sorted(post.tags.values_list("slug", flat=True)), ["python", "rust"])
+        response = self.client.get(reverse("post-update", args=[post.pk]))
+        self.assertEqual(response.context["form"]["tags"].value(), "python, rust")
+        self.client.post(reverse("post-update", args=[post.pk]), {"title": "Новий", "content": "текст", "tags": "go"})
+        self.assertEqual(list(post.tags.values_list("slug", flat=True)), ["go"])
+        counts = dict(Tag.objects.values_list("slug", "post_count"))
+        self.assertEqual((counts["rust"], counts["python"], counts["go"]), (1, 3, 1))
+
+    def test_form_limits_tags(self):
+        names = ", ".join(f"тег{i}" for i in range(tags.MAX_TAGS + 1))
+        form = PostForm(data={"title": "Заголовок", "content": "Вміст", "tags": names})
+        self.assertIn("tags", form.errors)
+
+    def test_tag_page_newest_first_with_cursor(self):
+        url = reverse("tag-posts", args=["python"])
+        response = self.client.get(url)
+        self.assertEqual(self.titles(response), ["Пост 3", "Пост 1", "Пост 0"])
+        with patch("blog.views.TagPostListView.paginate_by", 2):
+            first = self.client.get(url)
+            second = self.client.get(url, {"after": first.context["page_obj"].next_cursor})
+        self.assertEqual(self.titles(first) + self.titles(second), ["Пост 3", "Пост 1", "Пост 0"])
+        self.assertFalse(second.context["page_obj"].has_next())
+
+    def test_unknown_tag_404(self):
+        self.assertEqual(self.client.get(reverse("tag-posts", args=["python+немає"])).status_code, 404)
+
+    def test_all_and_any_tags(self):
+        url = reverse("tag-posts", args=["python+django"])
+        self.assertEqual(self.titles(self.client.get(url)), ["Пост 3", "Пост 1"])
+        response = self.client.get(url, {"match": "any"})
+        self.assertEqual(self.titles(response), ["Пост 3", "Пост 2", "Пост 1", "Пост 0"])
+
+    def test_any_tags_paginates_without_duplicates(self):
+        page = tags.tagged_posts(list(Tag.objects.filter(slug__in=["python", "django"])), True, per_page=3)
+        rest = tags.tagged_posts(
+            list(Tag.objects.filter(slug__in=["python", "django"])), True, page.next_cursor, per_page=3
+        )
+        self.assertEqual([post.title for post in [*page, *rest]], ["Пост 3", "Пост 2", "Пост 1", "Пост 0"])
+        self.assertFalse(rest.has_next())
+
+    def test_tag_page_query_count_does_not_depend_on_tags_size(self):
+        url = reverse("tag-posts", args=["python"])
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url)
+        self.assertFalse([q["sql"] for q in queries if "GROUP BY" in q["sql"]])
+        self.assertFalse([q["sql"] for q in queries if "OFFSET" in q["sql"]])
+
+    def test_hidden_and_deleted_posts_leave_tags(self):
+        moderation.hide(Post.objects.filter(pk=self.posts[3].pk))
+        self.assertEqual(self.titles(self.client.get(reverse("tag-posts", args=["python"]))), ["Пост 1", "Пост 0"])
+        self.assertEqual(Tag.objects.get(slug="orm").post_count, 0)
+        self.posts[0].delete()
+        self.assertEqual(Tag.objects.get(slug="python").post_count, 1)
+
+    def test_admin_edit_of_visibility_updates_counts(self):
+        post = Post.objects.get(pk=self.posts[3].pk)
+        post.is_hidden = True
+        post.save()
+        self.assertEqual(Tag.objects.get(slug="orm").post_count, 0)
+        post.save()
+        self.assertEqual(Tag.objects.get(slug="orm").post_count, 0)
+        post.is_hidden = False
+        post.status = Post.Status.DRAFT
+        post.save()
+        self.assertEqual(Tag.objects.get(slug="orm").post_count, 0)
+        post.status = Post.Status.PUBLISHED
+        post.save()
+        self.assertEqual(Tag.objects.get(slug="orm").post_count, 1)
+        post.is_hidden = True
+        post.save(update_fields=["is_hidden"])
+        post.delete()
+        self.assertEqual(Tag.objects.get(slug="django").post_count, 2)
+        self.assertEqual(Tag.objects.get(slug="orm").post_count, 0)
+
+    def test_tag_cloud_cached_until_tags_change(self):
+        self.assertEqual(tags.tag_cloud()[0], {"slug": "django", "name": "django", "post_count": 3})
+        with self.assertNumQueries(0):
+            tags.tag_cloud()
+        tags.set_tags(self.posts[4], tags.parse_tags("rust, orm"))
+        self.assertIn({"slug": "orm", "name": "orm", "post_count": 2}, tags.tag_cloud())
+
+    def test_cloud_and_badges_on_home_page(self):
+        response = self.client.get(reverse("blog-home"))
+        self.assertContains(response, reverse("tag-posts", args=["orm"]))
+        self.assertContains(response, "#orm")
+
+    def test_feed_lists_tags_as_categories(self):
+        response = self.client.get(reverse("feed-rss"))
+        self.assertContains(response, "<category>orm</category>")
+
+
+# ══════════════════════════════════════════════════════
+#  18. PUBLISHING  — чернетки і відкладена публікація
+# ══════════════════════════════════════════════════════
+
+
+class PublishingTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username="planner", password="pass1234")
+        cls.reader = User.objects.create_user(username="reader", password="pass1234")
+        Follow.objects.create(follower=cls.reader, author=cls.author)
+        cls.draft = Post.objects.create(title="Чернетка", content="текст", author=cls.author, status="draft")
+        cls.scheduled = Post.objects.create(
+            title="Запланований",
+            content="текст",
+            author=cls.author,
+            status="scheduled",
+            date_posted=timezone.now() + timezone.timedelta(hours=1),
+        )
+        tags.set_tags(cls.scheduled, tags.parse_tags("анонс"))
+
+    def setUp(self):
+        cache.clear()
+
+    def test_unpublished_posts_hidden_from_readers(self):
+        self.assertFalse(Post.objects.public().filter(pk__in=[self.draft.pk, self.scheduled.pk]).exists())
+        self.assertNotContains(self.client.get(reverse("blog-home")), "Чернетка")
+        self.assertEqual(self.client.get(reverse("post-detail", args=[self.draft.pk])).status_code, 404)
+        self.assertFalse(TimelineEntry.objects.filter(user=self.reader).exists())
+        self.assertEqual(Tag.objects.get(slug="анонс").post_count, 0)
+
+    def test_author_previews_and_lists_drafts(self):
+        self.client.force_login(self.author)
+        self.assertContains(self.client.get(reverse("post-detail", args=[self.draft.pk])), "Пост бачите лише ви")
+        response = self.client.get(reverse("drafts"))
+        self.assertEqual([post.title for post in response.context["posts"]], ["Запланований", "Чернетка"])
+
+    def test_create_scheduled_post_via_form(self):
+        self.client.force_login(self.author)
+        publish_at = timezone.localtime() + timezone.timedelta(days=1)
+        data = {"title": "Завтра", "content": "текст", "status": "scheduled", "tags": ""}
+        response = self.client.post(reverse("post-create"), {**data, "publish_at": ""})
+        self.assertFormError(response.context["form"], "publish_at", "Вкажіть час публікації")
+        self.client.post(reverse("post-create"), {**data, "publish_at": publish_at.strftime("%Y-%m-%dT%H:%M")})
+        post = Post.objects.get(title="Завтра")
+        self.assertEqual(post.status, Post.Status.SCHEDULED)
+        self.assertEqual(post.date_posted, publish_at.replace(second=0, microsecond=0))
+
+    def test_publishing_draft_moves_it_to_now_and_fans_out(self):
+        self.client.force_login(self.author)
+        self.client.post(
+            reverse("post-update", args=[self.draft.pk]),
+            {"title": "Чернетка", "content": "текст", "status": "published", "tags": ""},
+        )
+        self.draft.refresh_from_db()
+        self.assertTrue(self.draft.is_public)
+        self.assertAlmostEqual(self.draft.date_posted, timezone.now(), delta=timezone.timedelta(minutes=1))
+        self.assertTrue(TimelineEntry.objects.filter(user=self.reader, post=self.draft).exists())
+        self.assertNotIn("status", PostForm(instance=self.draft).fields)
+
+    def test_published_draft_ranked_from_publication(self):
+        # чернетку створено тиждень тому
+        week_ago = timezone.now() - timezone.timedelta(days=7)
+        stale = hot_score(0, 0, 0, week_ago)
+        Post.objects.filter(pk=self.draft.pk).update(date_posted=week_ago, activity_at=week_ago, trending_score=stale)
+        draft = Post.objects.get(pk=self.draft.pk)
+        draft.status = Post.Status.PUBLISHED
+        draft.save(update_fields=["status"])
+        draft.refresh_from_db()
+        fresh = Post.objects.create(title="Свіжий", content="текст", author=self.author)
+        self.assertAlmostEqual(draft.trending_score, fresh.trending_score, places=2)
+        self.assertEqual(draft.activity_at, draft.date_posted)
+
+    def test_scheduler_ranks_post_from_publication(self):
+        Post.objects.filter(pk=self.scheduled.pk).update(trending_score=0, activity_at=timezone.now())
+        publishing.publish_due(now=self.scheduled.date_posted)
+        self.scheduled.refresh_from_db()
+        self.assertAlmostEqual(self.scheduled.trending_score, hot_score(0, 0, 0, self.scheduled.date_posted))
+        self.assertEqual(self.scheduled.activity_at, self.scheduled.date_posted)
+
+    def test_scheduler_publishes_due_posts(self):
+        self.assertEqual(publishing.next_due(), self.scheduled.date_posted)
+        self.assertEqual(publishing.publish_due(), 0)
+        self.assertEqual(publishing.publish_due(now=self.scheduled.date_posted), 1)
+        self.scheduled.refresh_from_db()
+        self.assertEqual(self.scheduled.status, Post.Status.PUBLISHED)
+        self.assertIsNone(publishing.next_due())
+        self.assertTrue(TimelineEntry.objects.filter(user=self.reader, post=self.scheduled).exists())
+        self.assertEqual(Tag.objects.get(slug="анонс").post_count, 1)
+        self.assertEqual(PostTag.objects.get(post=self.scheduled).date_posted, self.scheduled.date_posted)
+
+    def test_scheduler_invalidates_feeds(self):
+        self.assertNotContains(self.client.get(reverse("feed-rss")), "Запланований")
+        publishing.publish_due(now=self.scheduled.date_posted)
+        self.assertContains(self.client.get(reverse("feed-rss")), "Запланований")
+
+    def test_scheduler_sleeps_until_next_due(self):
+        now = self.scheduled.date_posted - timezone.timedelta(seconds=5)
+        self.assertEqual(publishing.seconds_until_due(now=now, recheck=60), 5)
+        self.assertEqual(publishing.seconds_until_due(now=now, recheck=2), 2)
+        Post.objects.filter(pk=self.scheduled.pk).update(status="draft")
+        self.assertEqual(publishing.seconds_until_due(now=now, recheck=60), 60)
+
+    def test_scheduler_skips_post_unscheduled_meanwhile(self):
+        # пачку прочитано до того, як автор повернув пост у чернетки
+        with patch("blog.publishing.iter_pk_batches", return_value=[[self.scheduled.pk]]):
+            Post.objects.filter(pk=self.scheduled.pk).update(status="draft")
+            self.assertEqual(publishing.publish_due(now=self.scheduled.date_posted), 0)
+        self.assertEqual(Post.objects.get(pk=self.scheduled.pk).status, Post.Status.DRAFT)
+        self.assertFalse(TimelineEntry.objects.filter(post=self.scheduled).exists())
+
+    def test_command(self):
+        Post.objects.filter(pk=self.scheduled.pk).update(date_posted=timezone.now())
+        out = StringIO()
+        call_command("run_publish_scheduler", stdout=out)
+        self.assertIn("Опубліковано постів: 1", out.getvalue())
+
+
+# ══════════════════════════════════════════════════════
+#  19. DELETION  — фонове видалення постів і користувачів
+# ══════════════════════════════════════════════════════
+
+
+class DeletionTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.leaver = User.objects.create_user(username="leaver", password="pass1234")
+        cls.other = User.objects.create_user(username="stayer", password="pass1234")
+        cls.own_post = Post.objects.create(title="Мій пост", content="текст", author=cls.leaver)
+        cls.other_post = Post.objects.create(title="Чужий пост", content="текст", author=cls.other)
+        Comment.objects.create(post=cls.own_post, author=cls.other, content="під моїм")
+        for i in range(3):
+            Comment.objects.create(post=cls.other_post, author=cls.leaver, content=f"коментар {i}")
+        Comment.objects.create(post=cls.other_post, author=cls.other, content="лишається")
+        Like.objects.create(user=cls.leaver, post=cls.other_post)
+        Post.objects.filter(pk=cls.other_post.pk).update(like_count=1)
+        timeline.follow(cls.leaver, cls.other)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_user_hidden_at_once_and_deleted_by_worker(self):
+        job = deletion.schedule_deletion(self.leaver)
+        self.assertFalse(User.objects.get(pk=self.leaver.pk).is_active)
+        self.assertFalse(Post.objects.public().filter(author=self.leaver).exists())
+        self.assertEqual(self.client.get(reverse("user-posts", args=["leaver"])).status_code, 404)
+        self.assertFalse(self.client.login(username="leaver", password="pass1234"))
+        self.assertEqual(job.status, DeletionJob.Status.PENDING)
+        page = self.client.get(reverse("post-detail", args=[self.other_post.pk]))
+        self.assertEqual([comment.content for comment in page.context["comments"]], ["лишається"])
+        self.assertEqual(list(Comment.objects.public().filter(author=self.leaver)), [])
+
+        call_command("run_deletions", stdout=StringIO())
+        job.refresh_from_db()
+        self.assertEqual(job.status, DeletionJob.Status.DONE)
+        self.assertGreaterEqual(job.deleted_rows, 7)  # 3 коментарі, вподобання, підписка, пост, користувач
+        self.assertFalse(User.objects.filter(pk=self.leaver.pk).exists())
+        self.assertFalse(Post.objects.filter(pk=self.own_post.pk).exists())
+        other_post = Post.objects.get(pk=self.other_post.pk)
+        self.assertEqual((other_post.comment_count, other_post.like_count), (1, 0))
+        self.assertEqual(Profile.objects.get(user=self.other).follower_count, 0)
+
+    def test_small_post_deleted_in_request(self):
+        self.client.force_login(self.leaver)
+        self.client.post(reverse("post-delete", args=[self.own_post.pk]))
+        self.assertFalse(Post.objects.filter(pk=self.own_post.pk).exists())
+        self.assertEqual(DeletionJob.objects.get().status, DeletionJob.Status.DONE)
+
+    @patch("blog.deletion.INLINE_LIMIT", 0)
+    def test_large_post_hidden_and_queued(self):
+        self.client.force_login(self.leaver)
+        self.client.post(reverse("post-delete", args=[self.own_post.pk]))
+        self.assertTrue(Post.objects.get(pk=self.own_post.pk).is_hidden)
+        job = deletion.schedule_deletion(Post.objects.get(pk=self.own_post.pk))  # повторний запит - та сама задача
+        self.assertEqual(DeletionJob.objects.get(), job)
+        self.assertEqual(deletion.run_pending(), 1)
+        self.assertFalse(Post.objects.filter(pk=self.own_post.pk).exists())
+        self.assertFalse(Comment.objects.filter(content="під моїм").exists())
+
+    def test_failed_job_resumes_from_its_step(self):
+        job = deletion.schedule_deletion(self.leaver)
+        with self.assertLogs("blog.deletion", "ERROR"), patch(
+            "blog.deletion._delete_likes", side_effect=RuntimeError("збій")
+        ):
+            self.assertEqual(deletion.run_pending(), 0)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.step), (DeletionJob.Status.FAILED, 1))
+        self.assertIn("збій", job.last_error)
+        self.assertFalse(Comment.objects.filter(author=self.leaver).exists())
+
+        DeletionJob.objects.filter(pk=job.pk).update(status=DeletionJob.Status.PENDING)
+        self.assertEqual(deletion.run_pending(), 1)
+        self.assertFalse(User.objects.filter(pk=self.leaver.pk).exists())
+
+    def test_job_of_dead_worker_reclaimed_after_lease(self):
+        job = deletion.schedule_deletion(self.leaver)
+        # воркер видалив коментарі й упав, тримаючи задачу
+        until = timezone.now() + timezone.timedelta(seconds=deletion.LEASE)
+        DeletionJob.objects.filter(pk=job.pk).update(
+            status=DeletionJob.Status.RUNNING, step=1, lease="dead", lease_until=until
+        )
+        self.assertEqual(deletion.run_pending(), 0)
+        with patch("django.utils.timezone.now", return_value=until + timezone.timedelta(seconds=1)):
+            self.assertEqual(deletion.run_pending(), 1)
+        self.assertFalse(User.objects.filter(pk=self.leaver.pk).exists())
+        self.assertEqual(DeletionJob.objects.get(pk=job.pk).status, DeletionJob.Status.DONE)
+
+    def test_worker_stops_when_job_reclaimed(self):
+        job = deletion.schedule_deletion(self.leaver)
+
+        def reclaimed(user_id, **kwargs):
+            DeletionJob.objects.filter(pk=job.pk).update(lease="other")
+            return 0
+
+        with patch("blog.deletion._delete_likes", side_effect=reclaimed), self.assertLogs("blog.deletion", "WARNING"):
+            self.assertFalse(deletion.run_job(job))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.step, job.lease), (DeletionJob.Status.RUNNING, 1, "other"))
+
+    def test_admin_delete_queues_user(self):
+        admin_user = User.objects.create_superuser(username="boss", password="pass1234")
+        self.client.force_login(admin_user)
+        url = reverse("admin:auth_user_delete", args=[self.leaver.pk])
+        self.assertContains(self.client.get(url), "leaver")
+        self.client.post(url, {"post": "yes"})
+        self.assertFalse(User.objects.get(pk=self.leaver.pk).is_active)
+        job = DeletionJob.objects.get(target=DeletionJob.Target.USER, target_id=self.leaver.pk)
+        self.assertEqual(job.requested_by, admin_user)
+
+
+# ══════════════════════════════════════════════════════
+#  20. RELATED  — схожі пости (TF-IDF)
+# ══════════════════════════════════════════════════════
+
+
+class RelatedPostsTest(TestCase):
+    TEXTS = {
+        "Django ORM": "запити django orm queryset індекси міграції django моделі",
+        "Міграції Django": "django міграції моделі schema індекси queryset",
+        "Випічка хліба": "борошно дріжджі тісто хліб піч закваска",
+        "Закваска вдома": "закваска борошно тісто хліб дріжджі",
+        "Гірський похід": "намет рюкзак гори стежка маршрут вершина",
+        "Маршрути Карпат": "гори маршрут стежка карпати вершина",
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username="writer", password="pass1234")
+        cls.posts = {
+            title: Post.objects.create(title=title, content=content, author=cls.author)
+            for title, content in cls.TEXTS.items()
+        }
+
+    def setUp(self):
+        index_dir = tempfile.mkdtemp(prefix="blogqa-test-related-")
+        patcher = patch("blog.related.INDEX_PATH", os.path.join(index_dir, "related.npz"))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(shutil.rmtree, index_dir)
+
+    def related_titles(self, title):
+        return [post.title for post in Post.objects.public().related_to(self.posts[title])]
+
+    def test_build_finds_topical_neighbours(self):
+        self.assertEqual(related.build(workers=1, chunk_size=2), len(self.TEXTS))
+        self.assertEqual(self.related_titles("Django ORM")[0], "Міграції Django")
+        self.assertEqual(self.related_titles("Закваска вдома")[0], "Випічка хліба")
+        self.assertNotIn("Гірський похід", self.related_titles("Django ORM"))
+        self.assertFalse(Post.objects.filter(related_stale=True).exists())
+
+    @forks_processes
+    def test_parallel_build_matches_serial(self):
+        related.build(workers=1)
+        serial = list(RelatedPost.objects.order_by("post", "rank").values_list("post", "related", "rank"))
+        related.build(workers=2, chunk_size=2)
+        self.assertEqual(
+            list(RelatedPost.objects.order_by("post", "rank").values_list("post", "related", "rank")), serial
+        )
+
+    def test_new_post_updated_incrementally(self):
+        related.update_stale()  # без індексу - повна перебудова
+        post = Post.objects.create(title="Похід у Карпати", content="рюкзак намет карпати маршрут", author=self.author)
+        self.assertEqual(related.update_stale(), 1)
+        self.assertEqual(
+            [p.title for p in Post.objects.public().related_to(post)][:2], ["Маршрути Карпат", "Гірський похід"]
+        )
+        # новий пост потрапляє і до списків своїх сусідів
+        self.assertIn("Похід у Карпати", self.related_titles("Маршрути Карпат"))
+
+    def test_edited_and_hidden_posts(self):
+        related.build(workers=1)
+        post = self.posts["Гірський похід"]
+        post.content = "борошно тісто хліб закваска"
+        post.save()
+        self.assertIn("Гірський похід", self.related_titles("Маршрути Карпат"))
+        related.update_stale()
+        self.assertIn("Випічка хліба", self.related_titles("Гірський похід"))
+        # списки, де пост стояв зі старим текстом, перераховано
+        self.assertNotIn("Гірський похід", self.related_titles("Маршрути Карпат"))
+
+        moderation.hide(Post.objects.filter(pk=self.posts["Міграції Django"].pk))
+        self.assertNotIn("Міграції Django", self.related_titles("Django ORM"))
+
+    def test_detail_page_shows_related(self):
+        related.build(workers=1)
+        response = self.client.get(reverse("post-detail", args=[self.posts["Django ORM"].pk]))
+        self.assertContains(response, "Схожі пости")
+        self.assertContains(response, "Міграції Django")
+
+
+# ══════════════════════════════════════════════════════
+#  21. DUPLICATES  — майже однакові тексти (MinHash/LSH)
+# ══════════════════════════════════════════════════════
+
+
+class DuplicatesTest(TestCase):
+    SPAM = (
+        "Купуйте найкращі годинники за найнижчими цінами тільки сьогодні доставка по всій країні безкоштовно "
+        "пишіть нам у телеграм і отримайте подарунок до кожного замовлення поки діє акція для всіх нових клієнтів"
+    )
+    # та сама розсилка з двома заміненими словами
+    COPY = SPAM.replace("годинники", "окуляри").replace("подарунок", "знижку")
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.spammer = User.objects.create_user(username="spammer", password="pass1234")
+        cls.other = User.objects.create_user(username="other", password="pass1234")
+        cls.post = Post.objects.create(title="Акція", content=cls.SPAM, author=cls.spammer)
+
+    def test_signature_estimates_jaccard(self):
+        def shingles(text):
+            words = text.lower().split()
+            return set(zip(words, words[1:]))
+
+        exact = len(shingles(self.SPAM) & shingles(self.COPY)) / len(shingles(self.SPAM) | shingles(self.COPY))
+        self.assertAlmostEqual(similarity(signature(self.SPAM), signature(self.COPY)), exact, delta=0.15)
+        self.assertIsNone(signature("Дякую, чудовий пост!"))
+
+    def test_saved_post_is_indexed(self):
+        self.assertEqual(PostBand.objects.filter(post=self.post).count(), 25)
+        self.assertEqual(duplicates.find(Post, self.COPY), [self.post.pk])
+        self.assertEqual(duplicates.find(Post, self.SPAM, exclude=self.post.pk), [])
+        self.assertEqual(
+            duplicates.find(Post, "зовсім інший текст про django orm і міграції бази даних на продакшені"), []
+        )
+
+    def test_create_view_rejects_copy(self):
+        self.client.login(username="other", password="pass1234")
+        response = self.client.post(reverse("post-create"), {"title": "Знову акція", "content": self.COPY})
+        self.assertContains(response, "Майже такий самий текст уже є на сайті")
+        self.assertEqual(Post.objects.count(), 1)
+        # редагування без зміни тексту не порівнює пост із ним самим
+        self.client.login(username="spammer", password="pass1234")
+        self.client.post(reverse("post-update", args=[self.post.pk]), {"title": "Нова назва", "content": self.SPAM})
+        self.assertEqual(Post.objects.get(pk=self.post.pk).title, "Нова назва")
+
+    def test_duplicate_comment_rejected_short_allowed(self):
+        self.client.login(username="other", password="pass1234")
+        url = reverse("add-comment", args=[self.post.pk])
+        self.client.post(url, {"content": self.SPAM})
+        response = self.client.post(url, {"content": self.COPY}, follow=True)
+        self.assertContains(response, "Майже такий самий коментар уже є на сайті")
+        self.client.post(url, {"content": "Дякую!"})
+        self.client.post(url, {"content": "Дякую!"})
+        self.assertEqual(Comment.objects.count(), 3)
+
+    def test_scan_backfills_and_hides_later_copies(self):
+        # bulk_create оминає save(): підписів і смуг ще немає
+        quoted, copy = Post.objects.bulk_create(
+            [
+                Post(title="Цитата", content="Дивіться: " + self.COPY, author=self.other),
+                Post(title="Копія", content=self.COPY + " деталі в профілі", author=self.spammer),
+            ]
+        )
+        with patch("blog.duplicates.CHECK_INLINE", False):
+            self.assertTrue(PostForm({"title": "Ще одна", "content": self.COPY, "status": "published"}).is_valid())
+        out = StringIO()
+        call_command("find_duplicates", "posts", "--hide", stdout=out)
+        self.assertIn("перевірено 3, приховано 2", out.getvalue())
+        self.assertEqual(set(Post.objects.filter(is_hidden=True).values_list("pk", flat=True)), {quoted.pk, copy.pk})
+        self.assertEqual(PostBand.objects.filter(post=copy).count(), 25)
+        # позначка: наступний прохід перевіряє лише нові тексти
+        self.assertEqual(duplicates.scan(Post, hide=True), (0, 0))
+
+
+# ══════════════════════════════════════════════════════
+#  22. SPAM  — оцінка коментарів наївним Баєсом
+# ══════════════════════════════════════════════════════
+
+
+class SpamTest(TestCase):
+    HAM = [
+        "Дякую за розбір, спробую індекси у своєму проєкті",
+        "А як це працює з PostgreSQL замість SQLite?",
+        "Гарна стаття, особливо частина про міграції",
+        "У мене запит став швидшим удвічі після цього",
+    ]
+    SPAM = [
+        "Дешеві годинники купуйте зараз знижка переходьте за посиланням",
+        "Заробіток онлайн без вкладень переходьте за посиланням зараз",
+        "Купуйте дешеві ліки знижка тільки сьогодні за посиланням",
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(username="moder", password="pass", email="m@ex.com")
+        cls.reader = User.objects.create_user(username="reader", password="pass1234")
+        cls.post = Post.objects.create(title="Індекси", content="Вміст", author=cls.admin)
+        for text in cls.HAM:
+            Comment.objects.create(post=cls.post, author=cls.reader, content=text)
+        for text in cls.SPAM:
+            Comment.objects.create(
+                post=cls.post, author=cls.reader, content=text, is_hidden=True, review=Comment.Review.SPAM
+            )
+
+    def setUp(self):
+        model_dir = tempfile.mkdtemp(prefix="blogqa-test-spam-")
+        patcher = patch("blog.spam.MODEL_PATH", os.path.join(model_dir, "spam.npz"))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(shutil.rmtree, model_dir)
+
+    def comment(self, text):
+        self.client.force_login(self.reader)
+        self.client.post(reverse("add-comment", args=[self.post.pk]), {"content": text})
+        return Comment.objects.get(content=text)
+
+    def test_new_comments_scored_off_request_and_spam_held(self):
+        self.assertEqual(spam.train(), len(self.HAM) + len(self.SPAM))
+        suspect = self.comment("Купуйте дешеві годинники зараз за посиланням")
+        regular = self.comment("Дякую, а як індекси працюють у PostgreSQL?")
+        # запит лише зберігає коментар
+        self.assertIsNone(suspect.spam_score)
+        self.assertFalse(suspect.is_hidden)
+        # оцінюються всі ще не оцінені, але затримується лише новий спам - позначений модератором уже прихований
+        self.assertEqual(spam.score_pending(), (len(self.HAM) + len(self.SPAM) + 2, 1))
+        suspect.refresh_from_db()
+        regular.refresh_from_db()
+        self.assertGreaterEqual(suspect.spam_score, spam.HOLD_THRESHOLD)
+        self.assertEqual((suspect.is_hidden, suspect.review), (True, Comment.Review.HELD))
+        self.assertLess(regular.spam_score, 0.5)
+        self.assertEqual((regular.is_hidden, regular.review), (False, ""))
+        self.assertEqual(Post.objects.get(pk=self.post.pk).comment_count, len(self.HAM) + 1)
+
+    def test_no_model_or_single_class(self):
+        self.assertEqual(spam.score_pending(), (0, 0))
+        Comment.objects.filter(review=Comment.Review.SPAM).delete()
+        self.assertEqual(spam.train(), 0)
+        self.assertIsNone(spam.Model.load())
+
+    def test_chunked_features_match_serial(self):
+        texts = self.HAM + self.SPAM
+        with patch("blog.spam.CHUNK_SIZE", 2):
+            self.assertEqual((spam._chunked_features(texts) != spam.features(texts)).nnz, 0)
+            self.assertEqual(spam._chunked_features([]).shape, (0, spam.N_FEATURES))
+
+    @forks_processes
+    def test_parallel_features_match_serial(self):
+        texts = self.HAM + self.SPAM
+        with patch("blog.spam.CHUNK_SIZE", 2), spam._featurizer(2) as featurize:
+            parallel = featurize(texts)
+        self.assertEqual((parallel != spam.features(texts)).nnz, 0)
+
+    def test_admin_review_actions(self):
+        spam.train()
+        suspect = self.comment("Заробіток онлайн зараз переходьте за посиланням")
+        spam.score_pending()
+        self.client.force_login(self.admin)
+        changelist = reverse("admin:blog_comment_changelist")
+        self.assertContains(self.client.get(changelist + "?review__exact=held"), "Заробіток онлайн")
+        self.client.post(changelist, {"action": "mark_not_spam", "_selected_action": [suspect.pk], "index": 0})
+        suspect.refresh_from_db()
+        self.assertEqual((suspect.is_hidden, suspect.review), (False, Comment.Review.APPROVED))
+        self.client.post(changelist, {"action": "mark_spam", "_selected_action": [suspect.pk], "index": 0})
+        suspect.refresh_from_db()
+        self.assertEqual((suspect.is_hidden, suspect.review), (True, Comment.Review.SPAM))
+
+    def test_command_trains_and_rescores(self):
+        out = StringIO()
+        call_command("score_comments", "--train", "--rescore", stdout=out)
+        self.assertIn(f"Модель навчено на {len(self.HAM) + len(self.SPAM)} коментарях", out.getvalue())
+        self.assertFalse(Comment.objects.filter(review="", spam_score__isnull=True).exists())
+
+
+# ══════════════════════════════════════════════════════
+#  23. AUTOCOMPLETE  — підказки імен і заголовків з індексу в пам'яті
+# ══════════════════════════════════════════════════════
+
+
+class AutocompleteTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(username="moder", password="pass", email="m@ex.com")
+        cls.anna = User.objects.create_user(username="anna", password="pass1234")
+        User.objects.create_user(username="Annabel", password="pass1234")
+        User.objects.create_user(username="annie", password="pass1234", is_active=False)
+        cls.post = Post.objects.create(title="Міграції в  Django", content="Вміст", author=cls.anna)
+        Post.objects.create(title="Django приховано", content="Вміст", author=cls.anna, is_hidden=True)
+        Post.objects.create(title="Django чернетка", content="Вміст", author=cls.anna, status=Post.Status.DRAFT)
+
+    def setUp(self):
+        index_dir = tempfile.mkdtemp(prefix="blogqa-test-autocomplete-")
+        patcher = patch("blog.autocomplete.INDEX_PATH", os.path.join(index_dir, "autocomplete.idx"))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(shutil.rmtree, index_dir)
+
+    def names(self, kind, text):
+        return [label for _, label in autocomplete.suggest(kind, text)]
+
+    def test_no_suggestions_until_built_then_answers_without_db(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(self.names("users", "ann"), [])
+        self.assertFalse(autocomplete.ready())
+        autocomplete.build()
+        with patch("blog.autocomplete.RELOAD_CHECK", 0), self.assertNumQueries(0):
+            self.assertEqual(self.names("users", "ann"), ["anna", "Annabel"])
+            # з початку заголовка і з будь-якого слова; прихованих і чернеток немає
+            self.assertEqual(self.names("posts", "МІГ"), ["Міграції в Django"])
+            self.assertEqual(self.names("posts", "django"), ["Міграції в Django"])
+            self.assertEqual(self.names("users", "  "), [])
+            self.assertEqual(autocomplete.suggest("users", "a", limit=1), [(self.anna.pk, "anna")])
+
+    def test_changes_reach_index_and_other_processes_through_log(self):
+        autocomplete.build()
+        with self.captureOnCommitCallbacks(execute=True):
+            User.objects.create_user(username="annette", password="pass1234")
+            self.anna.username = "hanna"
+            self.anna.save()
+            self.post.title = "Індекси в Django"
+            self.post.save()
+            moderation.hide(Post.objects.filter(title="Django приховано"), hidden=False)
+        self.assertEqual(self.names("users", "ann"), ["Annabel", "annette"])
+        self.assertEqual(self.names("posts", "django"), ["Індекси в Django", "Django приховано"])
+        self.assertEqual(self.names("posts", "мігр"), [])
+        # інший процес бачить ті самі зміни, дочитавши журнал до спільного файлу
+        other = autocomplete.Index(autocomplete.INDEX_PATH)
+        with patch("blog.autocomplete.BULK_LINES", 0):
+            other.refresh()
+        self.assertEqual([label for _, _, label in other.search("users", b"ann")], ["annette"])
+        self.assertEqual(
+            [label for _, _, label in other.search("posts", b"django")], ["Індекси в Django", "Django приховано"]
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            deletion.schedule_deletion(User.objects.get(username="annette"))
+            moderation.delete(Post.objects.filter(title="Django приховано"))
+        self.assertEqual(self.names("users", "ann"), ["Annabel"])
+        self.assertEqual(self.names("posts", "django"), ["Індекси в Django"])
+
+    def test_rebuild_folds_log_into_file(self):
+        autocomplete.build()
+        with self.captureOnCommitCallbacks(execute=True):
+            User.objects.create_user(username="annette", password="pass1234")
+        out = StringIO()
+        call_command("update_autocomplete", stdout=out)
+        self.assertIn("Проіндексовано: користувачів 4, постів 1", out.getvalue())
+        self.assertFalse(os.path.exists(f"{autocomplete.INDEX_PATH}.log"))
+        self.assertEqual(self.names("users", "ann"), ["anna", "Annabel", "annette"])
+
+    def test_endpoint_and_admin_author_search(self):
+        autocomplete.build()
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("autocomplete"), {"q": "ann"})
+        self.assertEqual(
+            response.json(),
+            {
+                "users": [
+                    {"username": "anna", "url": reverse("user-posts", args=["anna"])},
+                    {"username": "Annabel", "url": reverse("user-posts", args=["Annabel"])},
+                ],
+                "posts": [],
+            },
+        )
+        self.client.force_login(self.admin)
+        response = self.client.get(
+            reverse("admin:autocomplete"),
+            {"app_label": "blog", "model_name": "post", "field_name": "author", "term": "anna"},
+        )
+        self.assertEqual([item["text"] for item in response.json()["results"]], ["Annabel", "anna"])
+
+    def test_build_without_fcntl(self):
+        with patch("blog.autocomplete.fcntl", None):
+            self.assertEqual(autocomplete.build(), {"users": 3, "posts": 1})
+        self.assertTrue(autocomplete.ready())
+
+    def test_admin_author_search_without_index(self):
+        self.client.force_login(self.admin)
+        response = self.client.get(
+            reverse("admin:autocomplete"),
+            {"app_label": "blog", "model_name": "post", "field_name": "author", "term": "bel"},
+        )
+        self.assertEqual([item["text"] for item in response.json()["results"]], ["Annabel"])
+
+
+# ══════════════════════════════════════════════════════
+#  24. SHARED MEMORY CACHE  — кеш, спільний для процесів
+# ══════════════════════════════════════════════════════
+
+
+class SharedMemoryCacheTest(TestCase):
+    def setUp(self):
+        cache_dir = tempfile.mkdtemp(prefix="blogqa-test-cache-")
+        self.addCleanup(shutil.rmtree, cache_dir)
+        self.path = os.path.join(cache_dir, "cache")
+        self.cache = self.make_cache()
+
+    def make_cache(self, **options):
+        return SharedMemoryCache(self.path, {"OPTIONS": {"MAX_ENTRIES": 64, "SIZE": 64 * 1024, **options}})
+
+    def test_django_cache_api(self):
+        self.cache.set("post", {"title": "Індекси"})
+        self.assertEqual(self.cache.get("post"), {"title": "Індекси"})
+        self.assertEqual(self.cache.get("missing", "типово"), "типово")
+        self.assertFalse(self.cache.add("post", 1))
+        self.assertTrue(self.cache.add("count", 1))
+        self.assertEqual(self.cache.incr("count", 5), 6)
+        self.assertEqual(self.cache.decr("count"), 5)
+        with self.assertRaises(ValueError):
+            self.cache.incr("missing")
+        self.cache.set_many({"a": 1, "b": 2})
+        self.assertEqual(self.cache.get_many(["a", "b", "c"]), {"a": 1, "b": 2})
+        self.assertTrue(self.cache.delete("a"))
+        self.assertFalse(self.cache.has_key("a"))
+        self.cache.clear()
+        self.assertIsNone(self.cache.get("post"))
+
+    def test_timeouts(self):
+        now = time.time()
+        self.cache.set("session", 1, timeout=60)
+        self.cache.set("forever", 1, timeout=None)
+        self.cache.set("gone", 1, timeout=0)
+        self.assertIsNone(self.cache.get("gone"))
+        self.assertTrue(self.cache.touch("forever", 120))
+        with patch("time.time", return_value=now + 61):
+            self.assertIsNone(self.cache.get("session"))
+            self.assertFalse(self.cache.touch("session"))
+            self.assertEqual(self.cache.get("forever"), 1)
+        with patch("time.time", return_value=now + 121):
+            self.assertIsNone(self.cache.get("forever"))
+
+    def test_least_recently_used_key_evicted(self):
+        cache = self.make_cache(MAX_ENTRIES=8)
+        with patch("time.time", side_effect=itertools.count(1000)):
+            for number in range(8):
+                cache.set(f"k{number}", number)
+            cache.get("k0")
+            cache.set("k8", 8)
+            self.assertEqual([cache.get(f"k{number}") for number in range(9)], [0, None, 2, 3, 4, 5, 6, 7, 8])
+
+    def test_size_bounded(self):
+        for number in range(40):
+            self.cache.set(f"k{number}", b"x" * 4000)
+        kept = [number for number in range(40) if self.cache.get(f"k{number}")]
+        # у 64 КіБ вміщається близько 16 значень по 4 КБ - лишаються найновіші
+        self.assertEqual(kept, list(range(40 - len(kept), 40)))
+        self.assertGreater(len(kept), 10)
+        self.cache.set("k39", b"x" * 20_000)
+        self.assertIsNone(self.cache.get("k39"))
+
+    def test_instances_over_one_file_share_entries(self):
+        # так файл бачить кожен воркер gunicorn - власним екземпляром і власним mmap
+        other = self.make_cache()
+        self.cache.set("hits", 0)
+        self.assertEqual(other.incr("hits"), 1)
+        self.assertEqual(self.cache.incr("hits"), 2)
+        other.set("post", "Індекси")
+        self.assertEqual(self.cache.get("post"), "Індекси")
+        self.assertTrue(self.cache.delete("post"))
+        self.assertIsNone(other.get("post"))
+
+    @forks_processes
+    def test_shared_between_processes_with_atomic_incr(self):
+        self.cache.set("hits", 0)
+
+        def work():
+            for _ in range(200):
+                self.cache.incr("hits")
+            self.cache.set(f"from:{os.getpid()}", True)
+
+        workers = [multiprocessing.get_context("fork").Process(target=work) for _ in range(3)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        self.assertEqual(self.cache.get("hits"), 600)
+        self.assertTrue(all(self.cache.get(f"from:{worker.pid}") for worker in workers))
+        # окремий екземпляр (воркер без спільного предка) відкриває той самий файл
+        self.assertEqual(self.make_cache().get("hits"), 600)
+
+    @forks_processes
+    def test_reader_never_sees_partial_value(self):
+        context = multiprocessing.get_context("fork")
+        stop = context.Event()
+
+        def write():
+            for number in itertools.count():
+                if stop.is_set():
+                    return
+                self.cache.set("value", bytes([65 + number % 26]) * (100 + number % 3000))
+
+        writer = context.Process(target=write)
+        writer.start()
+        seen = set()
+        try:
+            deadline = time.monotonic() + 1
+            while time.monotonic() < deadline:
+                value = self.cache.get("value")
+                if value:
+                    self.assertEqual(value.count(value[:1]), len(value))
+                    seen.add(value[:1])
+        finally:
+            stop.set()
+            writer.join()
+        # читання справді йшли впереміш із записами
+        self.assertGreater(len(seen), 1)
+
+    def test_slot_left_changing_by_dead_writer_recovered(self):
+        self.cache.set("hits", 1)
+        self.cache.set("post", "Індекси")
+        # інший воркер зробив версії слотів непарними і помер, не закінчивши запис
+        other = self.make_cache()
+        with other._writing() as data:
+            for key in ("hits", "post"):
+                slot = other._find(data, other.make_and_validate_key(key))[0]
+                position = TABLE_AT + slot * SLOT.size
+                VERSION.pack_into(data, position, VERSION.unpack_from(data, position)[0] + 1)
+        # недописаний запис - промах, а не виняток чи вічне очікування
+        self.assertIsNone(self.cache.get("hits"))
+        with self.assertRaises(ValueError):
+            self.cache.incr("hits")
+        self.cache.set("hits", 5)
+        self.assertEqual(self.cache.incr("hits"), 6)
+        self.assertTrue(self.cache.add("post", "Кеш"))
+        self.assertEqual(self.cache.get("post"), "Кеш")
+        self.assertTrue(self.cache.touch("post"))
+        self.assertTrue(self.cache.delete("post"))
@@ -0,0 +1,103 @@
+"""
+Читання дерева коментарів (шляхи - див. blog.paths).
+
+Сторінка поста - сторінка кореневих гілок (keyset по шляху кореня) разом з
+відповідями до глибини COMMENT_VISIBLE_DEPTH, прочитана одним діапазонним
+запитом по індексу (post, path). Рядки вже впорядковані як обхід дерева,
+тож шаблон лише робить відступ за рівнем - без рекурсії і запитів на вузол.
+Глибші відповіді і задовгі гілки згортаються в посилання на сторінку гілки,
+де піддерево читається так само, сторінками по COMMENT_REPLIES_PER_PAGE.
+"""
+
+from django.conf import settings
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber, Substr
+
+from .models import Comment
+from .paginators import CursorPage
+from .paths import STEP, subtree_end
+
+THREADS_PER_PAGE = getattr(settings, "COMMENT_THREADS_PER_PAGE", 20)
+REPLIES_PER_THREAD = getattr(settings, "COMMENT_REPLIES_PER_THREAD", 20)
+REPLIES_PER_PAGE = getattr(settings, "COMMENT_REPLIES_PER_PAGE", 50)
+VISIBLE_DEPTH = getattr(settings, "COMMENT_VISIBLE_DEPTH", 5)
+
+
+def post_threads(post, cursor=None, per_page=THREADS_PER_PAGE, replies=REPLIES_PER_THREAD, max_depth=VISIBLE_DEPTH):
+    """Сторінка гілок поста після cursor (шлях останнього кореня попередньої сторінки)"""
+    roots = Comment.objects.public().filter(post=post, depth=0).order_by("path").values_list("path", flat=True)
+    if cursor:
+        roots = roots.filter(path__gt=cursor)
+    root_paths = list(roots[: per_page + 1])
+    if not root_paths:
+        return CursorPage([], None)
+
+    start, end, next_cursor = root_paths[0], None, None
+    if len(root_paths) > per_page:
+        end, next_cursor = root_paths[per_page], root_paths[per_page - 1]
+
+    comments = _range(post.pk, start, end).filter(depth__lte=max_depth)
+    # не більше replies відповідей на гілку: нумерація рядків у межах кореня (перший сегмент шляху)
+    comments = comments.annotate(
+        thread_row=Window(RowNumber(), partition_by=Substr("path", 1, STEP), order_by=F("path").asc())
+    ).filter(thread_row__lte=replies + 2)
+
+    visible, truncated = [], set()
+    for comment in _drop_hidden(comments, _hidden_paths(post.pk, start, end)):
+        if comment.thread_row > replies + 1:
+            truncated.add(comment.path[:STEP])
+            continue
+        visible.append(comment)
+    for comment in visible:
+        comment.truncated = comment.depth == 0 and comment.path in truncated
+    return CursorPage(_annotate(visible, 0, max_depth), next_cursor)
+
+
+def subtree(comment, cursor=None, per_page=REPLIES_PER_PAGE, max_depth=VISIBLE_DEPTH):
+    """Гілка comment (сам коментар і відповіді) сторінками по per_page у порядку обходу"""
+    end = subtree_end(comment.path)
+    comments = _range(comment.post_id, comment.path, end).filter(depth__lte=comment.depth + max_depth)
+    if cursor:
+        comments = comments.filter(path__gt=cursor)
+    rows = list(comments[: per_page + 1])
+    next_cursor = rows[per_page - 1].path if len(rows) > per_page else None
+    visible = _drop_hidden(rows[:per_page], _hidden_paths(comment.post_id, comment.path, end))
+    for row in visible:
+        row.truncated = False
+    return CursorPage(_annotate(visible, comment.depth, comment.depth + max_depth), next_cursor)
+
+
+def _range(post_id, start, end):
+    comments = Comment.objects.filter(post_id=post_id, path__gte=start)
+    if end is not None:
+        comments = comments.filter(path__lt=end)
+    return comments.select_related("author__profile").order_by("path")
+
+
+def _hidden_paths(post_id, start, end):
+    """Шляхи прихованих коментарів діапазону (частковий індекс blog_comment_hidden_idx)"""
+    hidden = Comment.objects.filter(post_id=post_id, is_hidden=True, path__gte=start)
+    if end is not None:
+        hidden = hidden.filter(path__lt=end)
+    return set(hidden.values_list("path", flat=True))
+
+
+def _drop_hidden(comments, hidden_paths):
+    """Прибирає приховані коментарі і коментарі неактивних авторів разом з усіма їхніми відповідями"""
+    comments = list(comments)
+    hidden_paths = hidden_paths | {comment.path for comment in comments if not comment.author.is_active}
+    if not hidden_paths:
+        return comments
+    return [
+        comment
+        for comment in comments
+        if not any(comment.path[:end] in hidden_paths for end in range(STEP, len(comment.path) + 1, STEP))
+    ]
+
+
+def _annotate(comments, base_depth, max_depth):
+    """level - відступ відносно base_depth; collapsed_replies - кількість відповідей, не показаних через глибину"""
+    for comment in comments:
+        comment.level = comment.depth - base_depth
+        comment.collapsed_replies = comment.reply_count if comment.depth >= max_depth else 0
+    return comments
@@ -0,0 +1,102 @@
+"""
+Персональна стрічка: пости авторів, на яких підписаний користувач.
+
+Гібридна схема. Пост автора, у якого менше ніж TIMELINE_FANOUT_LIMIT
+підписників, під час публікації розсилається в TimelineEntry кожного
+підписника (fan-out on write), тож сторінка стрічки - один діапазон індексу
+(user, -date_posted, -post). Пости популярніших авторів не розсилаються -
+одна публікація коштувала б сотні тисяч INSERT; їх дочитують з Post під час
+відкриття стрічки і зливають з матеріалізованою частиною (fan-out on read).
+Дочитуються також автори, від яких у стрічці ще немає жодного рядка: пости,
+опубліковані, поки автор був вище порогу, не зникають, коли він опускається нижче.
+"""
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, F, OuterRef, Q
+
+from users.models import Follow, Profile
+
+from .bulk import BATCH_SIZE, iter_pk_batches
+from .models import Post, TimelineEntry
+from .paginators import CursorPage, KeysetPage, merge_pages
+
+BACKFILL_SIZE = 50
+
+
+def fans_out_on_write(author_id):
+    """Чи розсилаються пости автора по стрічках підписників"""
+    follower_count = Profile.objects.filter(user_id=author_id).values_list("follower_count", flat=True).first()
+    return (follower_count or 0) < settings.TIMELINE_FANOUT_LIMIT
+
+
+def follow(user, author):
+    """Підписує user на author і додає в стрічку його останні пости; повертає True, якщо підписка нова"""
+    if user.pk == author.pk:
+        return False
+    try:
+        with transaction.atomic():
+            Follow.objects.create(follower=user, author=author)
+            Profile.objects.filter(user=author).update(follower_count=F("follower_count") + 1)
+    except IntegrityError:
+        return False
+    if fans_out_on_write(author.pk):
+        posts = Post.objects.public().filter(author=author).order_by("-date_posted")[:BACKFILL_SIZE]
+        TimelineEntry.objects.bulk_create(
+            [_entry(user.pk, post) for post in posts.only("pk", "author_id", "date_posted")], ignore_conflicts=True
+        )
+    return True
+
+
+def unfollow(user, author):
+    """Скасовує підписку і прибирає пости автора зі стрічки; повертає True, якщо підписка була"""
+    with transaction.atomic():
+        deleted, _ = Follow.objects.filter(follower=user, author=author).delete()
+        if deleted:
+            Profile.objects.filter(user=author).update(follower_count=F("follower_count") - 1)
+            TimelineEntry.objects.filter(user=user, author=author).delete()
+    return bool(deleted)
+
+
+def fan_out(post, batch_size=BATCH_SIZE):
+    """Додає пост у стрічки підписників автора; повертає кількість стрічок (0 для fan-out on read)"""
+    if not fans_out_on_write(post.author_id):
+        return 0
+    followers = Follow.objects.filter(author_id=post.author_id)
+    done = 0
+    for follower_ids in iter_pk_batches(followers, batch_size, field="follower_id"):
+        TimelineEntry.objects.bulk_create([_entry(user_id, post) for user_id in follower_ids], ignore_conflicts=True)
+        done += len(follower_ids)
+    return done
+
+
+def timeline_page(user, cursor=None, per_page=5):
+    """Сторінка стрічки user після cursor (формат курсора KeysetPage)"""
+    entries = (
+        TimelineEntry.objects.filter(user=user, post__is_hidden=False, post__status=Post.Status.PUBLISHED)
+        .select_related("post__author__profile")
+        .defer("post__content", "post__content_html")
+    )
+    page = KeysetPage(entries, "date_posted", cursor, per_page, tiebreak="post_id")
+    materialized = CursorPage([entry.post for entry in page], page.next_cursor)
+
+    limit = settings.TIMELINE_FANOUT_LIMIT
+    delivered = TimelineEntry.objects.filter(user=user, author_id=OuterRef("author_id"))
+    followed = Follow.objects.filter(follower=user).filter(
+        Q(author__profile__follower_count__gte=limit) | ~Exists(delivered)
+    )
+    pulled_authors = list(followed.values_list("author_id", flat=True))
+    if not pulled_authors:
+        return materialized
+    pulled = KeysetPage(
+        Post.objects.public().listing().filter(author_id__in=pulled_authors).select_related("author__profile"),
+        "date_posted",
+        cursor,
+        per_page,
+    )
+    # пост міг потрапити в обидва джерела, якщо автор перейшов поріг уже після розсилки
+    return merge_pages([materialized, pulled], per_page)
+
+
+def _entry(user_id, post):
+    return TimelineEntry(user_id=user_id, post_id=post.pk, author_id=post.author_id, date_posted=post.date_posted)
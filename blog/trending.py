@@ -0,0 +1,32 @@
+"""Інкрементний перерахунок Post.trending_score (див. blog.ranking)"""
+
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .bulk import BATCH_SIZE, iter_pk_batches
+from .models import JobCheckpoint, Post
+from .ranking import post_score
+
+CHECKPOINT = "trending"
+SCORE_FIELDS = ["pk", "date_posted", "comment_count", "like_count", "view_count"]
+
+
+def update_trending_scores(batch_size=BATCH_SIZE, full=False):
+    """
+    Перераховує оцінку лише для постів з активністю (activity_at) з моменту
+    попереднього запуску; full=True - для всіх постів. Повертає кількість постів.
+    """
+    started = timezone.now()
+    since = None if full else parse_datetime(JobCheckpoint.get(CHECKPOINT) or "")
+    posts = Post.objects.all() if since is None else Post.objects.filter(activity_at__gte=since)
+
+    done = 0
+    for pks in iter_pk_batches(posts, batch_size):
+        batch = list(Post.objects.filter(pk__in=pks).only(*SCORE_FIELDS))
+        for post in batch:
+            post.trending_score = post_score(post)
+        Post.objects.bulk_update(batch, ["trending_score"])
+        done += len(batch)
+
+    JobCheckpoint.set(CHECKPOINT, started.isoformat())
+    return done
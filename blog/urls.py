@@ -1,23 +1,52 @@
 from django.urls import path
 
+from .feeds import LatestPostsAtomFeed, LatestPostsFeed, UserPostsAtomFeed, UserPostsFeed, cached_feed
 from .views import (
+    DraftListView,
+    NotificationListView,
     PostCreateView,
     PostDeleteView,
     PostDetailView,
     PostListView,
     PostUpdateView,
+    TagPostListView,
+    TimelineView,
     UserPostListView,
     add_comment,
+    comment_stream,
+    comment_thread,
     delete_comment,
+    follow_user,
+    like_post,
+    mark_notifications_read,
+    search_suggestions,
+    unfollow_user,
+    unlike_post,
 )
 
 urlpatterns = [
     path("", PostListView.as_view(), name="blog-home"),
+    path("timeline/", TimelineView.as_view(), name="timeline"),
+    path("drafts/", DraftListView.as_view(), name="drafts"),
+    path("notifications/", NotificationListView.as_view(), name="notifications"),
+    path("notifications/read/", mark_notifications_read, name="notifications-read"),
+    path("autocomplete/", search_suggestions, name="autocomplete"),
+    path("tag/<str:slugs>/", TagPostListView.as_view(), name="tag-posts"),
     path("user/<str:username>/", UserPostListView.as_view(), name="user-posts"),
+    path("user/<str:username>/follow/", follow_user, name="follow-user"),
+    path("user/<str:username>/unfollow/", unfollow_user, name="unfollow-user"),
+    path("feed/rss/", cached_feed(LatestPostsFeed), name="feed-rss"),
+    path("feed/atom/", cached_feed(LatestPostsAtomFeed), name="feed-atom"),
+    path("user/<str:username>/feed/rss/", cached_feed(UserPostsFeed), name="user-feed-rss"),
+    path("user/<str:username>/feed/atom/", cached_feed(UserPostsAtomFeed), name="user-feed-atom"),
     path("post/<int:pk>/", PostDetailView.as_view(), name="post-detail"),
     path("post/new/", PostCreateView.as_view(), name="post-create"),
     path("post/<int:pk>/update/", PostUpdateView.as_view(), name="post-update"),
     path("post/<int:pk>/delete/", PostDeleteView.as_view(), name="post-delete"),
     path("post/<int:pk>/comment/", add_comment, name="add-comment"),
+    path("post/<int:pk>/comments/live/", comment_stream, name="comment-stream"),
+    path("post/<int:pk>/like/", like_post, name="like-post"),
+    path("post/<int:pk>/unlike/", unlike_post, name="unlike-post"),
+    path("comment/<int:pk>/thread/", comment_thread, name="comment-thread"),
     path("comment/<int:pk>/delete/", delete_comment, name="delete-comment"),
 ]
@@ -1,24 +1,68 @@
+from django.conf import settings
 from django.contrib import messages
+from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.contrib.auth.models import User
-from django.shortcuts import get_object_or_404, redirect
-from django.views.generic import CreateView, DeleteView, DetailView, ListView, UpdateView
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import Max, prefetch_related_objects
+from django.http import Http404, HttpResponse, HttpResponseRedirect, JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404, redirect, render
+from django.urls import reverse
+from django.utils.decorators import method_decorator
+from django.utils.http import url_has_allowed_host_and_scheme
+from django.views.decorators.http import require_POST
+from django.views.generic import CreateView, DeleteView, DetailView, ListView, TemplateView, UpdateView
+
+from blog_project.ratelimit import ratelimit
+from users.models import Follow
+
+from . import autocomplete, deletion, likes, live, notifications, tags, threads, timeline
+from .counters import record_view
+from .forms import CommentForm, PostForm
+from .models import Comment, Notification, Post, Tag
+from .paginators import KeysetPage
+from .paths import ancestor_ids
+
+
+class LikedPostsMixin:
+    """Додає в контекст liked_post_ids - вподобані поточним користувачем пости сторінки"""
 
-from .forms import CommentForm
-from .models import Comment, Post
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["liked_post_ids"] = likes.liked_post_ids(self.request.user, context["object_list"])
+        return context
 
 
-class PostListView(ListView):
-    """Список всіх постів"""
+class PostListView(LikedPostsMixin, ListView):
+    """Список всіх постів: нові (?sort=new) або популярні (?sort=trending)"""
 
     model = Post
+    queryset = Post.objects.public().listing()
     template_name = "blog/home.html"
     context_object_name = "posts"
     ordering = ["-date_posted"]
     paginate_by = 5
 
+    @property
+    def sort(self):
+        return "trending" if self.request.GET.get("sort") == "trending" else "new"
 
-class UserPostListView(ListView):
+    def paginate_queryset(self, queryset, page_size):
+        if self.sort != "trending":
+            return super().paginate_queryset(queryset, page_size)
+        # Популярні - keyset-пагінація по індексу (trending_score, id), без OFFSET і пересортування
+        page = KeysetPage(queryset, "trending_score", self.request.GET.get("after"), page_size)
+        return None, page, page.object_list, False
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["sort"] = self.sort
+        context["keyset_query"] = "sort=trending&"
+        context["tag_cloud"] = tags.tag_cloud()
+        return context
+
+
+class UserPostListView(LikedPostsMixin, ListView):
     """Список постів конкретного користувача"""
 
     model = Post
@@ -27,33 +71,137 @@ class UserPostListView(ListView):
     paginate_by = 5
 
     def get_queryset(self):
-        user = get_object_or_404(User, username=self.kwargs.get("username"))
-        return Post.objects.filter(author=user).order_by("-date_posted")
+        user = get_object_or_404(User, username=self.kwargs.get("username"), is_active=True)
+        return Post.objects.public().listing().filter(author=user).order_by("-date_posted")
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["author"] = get_object_or_404(User, username=self.kwargs.get("username"))
+        context["author"] = author = get_object_or_404(User, username=self.kwargs.get("username"))
+        context["is_following"] = (
+            self.request.user.is_authenticated
+            and Follow.objects.filter(follower=self.request.user, author=author).exists()
+        )
         return context
 
 
+class TimelineView(LoginRequiredMixin, LikedPostsMixin, TemplateView):
+    """Персональна стрічка: пости авторів, на яких підписаний користувач"""
+
+    template_name = "blog/home.html"
+    paginate_by = 5
+
+    def get_context_data(self, **kwargs):
+        page = timeline.timeline_page(self.request.user, self.request.GET.get("after"), self.paginate_by)
+        prefetch_related_objects(page.object_list, "tags")
+        return super().get_context_data(
+            object_list=page.object_list,
+            posts=page.object_list,
+            page_obj=page,
+            sort="timeline",
+            keyset_query="",
+            **kwargs,
+        )
+
+
+class DraftListView(LoginRequiredMixin, TemplateView):
+    """Чернетки і заплановані пости поточного користувача"""
+
+    template_name = "blog/home.html"
+    paginate_by = 5
+
+    def get_context_data(self, **kwargs):
+        posts = Post.objects.filter(author=self.request.user, is_hidden=False).exclude(status=Post.Status.PUBLISHED)
+        page = KeysetPage(posts.listing(), "date_posted", self.request.GET.get("after"), self.paginate_by)
+        return super().get_context_data(
+            object_list=page.object_list,
+            posts=page.object_list,
+            page_obj=page,
+            sort="drafts",
+            keyset_query="",
+            **kwargs,
+        )
+
+
+class TagPostListView(LikedPostsMixin, TemplateView):
+    """Пости з усіма тегами адреси (/tag/python+django/) або з будь-яким із них (?match=any)"""
+
+    template_name = "blog/home.html"
+    paginate_by = 5
+
+    def get_context_data(self, **kwargs):
+        slugs = set(self.kwargs["slugs"].split("+"))
+        selected = list(Tag.objects.filter(slug__in=slugs))
+        if not selected or len(selected) != len(slugs):
+            raise Http404("Тег не знайдено")
+        match_any = len(selected) > 1 and self.request.GET.get("match") == "any"
+        page = tags.tagged_posts(selected, match_any, self.request.GET.get("after"), self.paginate_by)
+        prefetch_related_objects(page.object_list, "tags")
+        return super().get_context_data(
+            object_list=page.object_list,
+            posts=page.object_list,
+            page_obj=page,
+            sort="tag",
+            tags=sorted(selected, key=lambda tag: tag.name),
+            match_any=match_any,
+            keyset_query="match=any&" if match_any else "",
+            tag_cloud=tags.tag_cloud(),
+            **kwargs,
+        )
+
+
+class NotificationListView(LoginRequiredMixin, TemplateView):
+    """Сповіщення користувача про нові коментарі, нові зверху"""
+
+    template_name = "blog/notifications.html"
+    paginate_by = 20
+
+    def get_context_data(self, **kwargs):
+        queryset = Notification.objects.filter(recipient=self.request.user).select_related(
+            "post", "last_comment__author"
+        )
+        page = KeysetPage(queryset, "updated", self.request.GET.get("after"), self.paginate_by)
+        return super().get_context_data(notifications=page, page_obj=page, **kwargs)
+
+
 class PostDetailView(DetailView):
     """Деталі поста з коментарями"""
 
     model = Post
     template_name = "blog/post_detail.html"
 
+    def get_queryset(self):
+        return Post.objects.visible_to(self.request.user)
+
+    def get(self, request, *args, **kwargs):
+        response = super().get(request, *args, **kwargs)
+        if self.object.is_public:
+            record_view(request, self.object.pk)
+        return response
+
+    def get_object(self, queryset=None):
+        post = super().get_object(queryset)
+        post.ensure_rendered()
+        return post
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["comments"] = self.object.comments.all()
+        context["comments"] = threads.post_threads(self.object, self.request.GET.get("after"))
         context["comment_form"] = CommentForm()
+        context["liked_post_ids"] = likes.liked_post_ids(self.request.user, [self.object])
+        # живі коментарі починаються після останнього коментаря на момент рендерингу
+        context["last_comment_id"] = self.object.comments.aggregate(last=Max("pk"))["last"] or 0
+        if self.object.is_public:
+            related = Post.objects.public().related_to(self.object).only("pk", "title", "date_posted")
+            context["related_posts"] = related[: settings.RELATED_POSTS_COUNT]
         return context
 
 
+@method_decorator(ratelimit("post"), name="dispatch")
 class PostCreateView(LoginRequiredMixin, CreateView):
     """Створення нового поста"""
 
     model = Post
-    fields = ["title", "content"]
+    form_class = PostForm
     template_name = "blog/post_form.html"
 
     def form_valid(self, form):
@@ -66,7 +214,7 @@ class PostUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
     """Редагування поста"""
 
     model = Post
-    fields = ["title", "content"]
+    form_class = PostForm
     template_name = "blog/post_form.html"
 
     def form_valid(self, form):
@@ -90,14 +238,17 @@ class PostDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView):
         post = self.get_object()
         return self.request.user == post.author
 
-    def delete(self, request, *args, **kwargs):
+    def form_valid(self, form):
+        # пост зникає одразу, а коментарі й вподобання великого поста видаляє воркер (blog.deletion)
+        deletion.schedule_deletion(self.object, self.request.user)
         messages.success(self.request, "Пост видалено!")
-        return super().delete(request, *args, **kwargs)
+        return HttpResponseRedirect(self.get_success_url())
 
 
+@ratelimit("comment")
 def add_comment(request, pk):
     """Додавання коментаря до поста"""
-    post = get_object_or_404(Post, pk=pk)
+    post = get_object_or_404(Post.objects.public(), pk=pk)
 
     if request.method == "POST":
         form = CommentForm(request.POST)
@@ -105,13 +256,46 @@ def add_comment(request, pk):
             comment = form.save(commit=False)
             comment.post = post
             comment.author = request.user
+            if form.cleaned_data["parent"]:
+                comment.parent = get_object_or_404(Comment.objects.public(), pk=form.cleaned_data["parent"], post=post)
             comment.save()
             messages.success(request, "Коментар додано!")
             return redirect("post-detail", pk=post.pk)
+        for error in form.errors.get("content", []):
+            messages.error(request, error)
 
     return redirect("post-detail", pk=post.pk)
 
 
+def comment_thread(request, pk):
+    """Гілка коментаря з усіма відповідями, сторінками"""
+    comments = Comment.objects.public().filter(post__is_hidden=False, post__status=Post.Status.PUBLISHED)
+    comment = get_object_or_404(comments.select_related("post"), pk=pk)
+    if Comment.objects.hidden().filter(pk__in=ancestor_ids(comment.path)).exists():
+        raise Http404("Коментар приховано")
+    context = {
+        "post": comment.post,
+        "thread": comment,
+        "comments": threads.subtree(comment, request.GET.get("after")),
+        "comment_form": CommentForm(),
+    }
+    return render(request, "blog/comment_thread.html", context)
+
+
+async def comment_stream(request, pk):
+    """Нові коментарі поста як Server-Sent Events (blog.live)"""
+    if not isinstance(request, ASGIRequest):
+        # під WSGI нескінченна відповідь зайняла б потік; 204 - браузер більше не підключається
+        return HttpResponse(status=204)
+    if not await Post.objects.public().filter(pk=pk).aexists():
+        raise Http404("Пост не знайдено")
+    last_event_id = request.headers.get("Last-Event-ID") or request.GET.get("last")
+    response = StreamingHttpResponse(live.comment_events(pk, last_event_id), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
 def delete_comment(request, pk):
     """Видалення коментаря"""
     comment = get_object_or_404(Comment, pk=pk)
@@ -124,3 +308,70 @@ def delete_comment(request, pk):
         messages.error(request, "Ви не можете видалити чужий коментар!")
 
     return redirect("post-detail", pk=post_pk)
+
+
+def _redirect_back(request, to, **kwargs):
+    """Повертає на сторінку, з якої прийшов запит (next), або на redirect(to, **kwargs)"""
+    next_url = request.POST.get("next")
+    if next_url and url_has_allowed_host_and_scheme(next_url, allowed_hosts={request.get_host()}):
+        return redirect(next_url)
+    return redirect(to, **kwargs)
+
+
+@login_required
+@require_POST
+def like_post(request, pk):
+    """Вподобання поста (повторний запит нічого не змінює)"""
+    post = get_object_or_404(Post.objects.public().only("pk"), pk=pk)
+    likes.like(request.user, post.pk)
+    return _redirect_back(request, "post-detail", pk=post.pk)
+
+
+@login_required
+@require_POST
+def unlike_post(request, pk):
+    """Скасування вподобання поста"""
+    post = get_object_or_404(Post.objects.public().only("pk"), pk=pk)
+    likes.unlike(request.user, post.pk)
+    return _redirect_back(request, "post-detail", pk=post.pk)
+
+
+@login_required
+@require_POST
+def follow_user(request, username):
+    """Підписка на автора"""
+    author = get_object_or_404(User, username=username, is_active=True)
+    if timeline.follow(request.user, author):
+        messages.success(request, f"Ви підписалися на {author.username}")
+    return _redirect_back(request, "user-posts", username=author.username)
+
+
+@login_required
+@require_POST
+def unfollow_user(request, username):
+    """Скасування підписки на автора"""
+    author = get_object_or_404(User, username=username)
+    if timeline.unfollow(request.user, author):
+        messages.info(request, f"Ви відписалися від {author.username}")
+    return _redirect_back(request, "user-posts", username=author.username)
+
+
+@login_required
+@require_POST
+def mark_notifications_read(request):
+    """Позначає прочитаними всі сповіщення користувача"""
+    notifications.mark_read(request.user)
+    return _redirect_back(request, "notifications")
+
+
+def search_suggestions(request):
+    """Користувачі й пости, чиє ім'я чи заголовок починається з q - з індексу в пам'яті, без запитів до БД"""
+    query = request.GET.get("q", "")
+    users = autocomplete.suggest("users", query)
+    posts = autocomplete.suggest("posts", query)
+    return JsonResponse(
+        {
+            "users": [{"username": name, "url": reverse("user-posts", args=[name])} for _, name in users],
+            "posts": [{"title": title, "url": reverse("post-detail", args=[pk])} for pk, title in posts],
+        }
+    )
@@ -0,0 +1,51 @@
+"""
+Спільна основа для management-команд бенчмарків (bench_*).
+Кожен бенчмарк працює на тимчасовій тестовій БД, тож робоча db.sqlite3 не змінюється.
+"""
+
+import os
+import tempfile
+import time
+
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import setup_databases, setup_test_environment, teardown_databases, teardown_test_environment
+
+
+def measure(func, iterations):
+    """Виконує func iterations разів і повертає (операцій/сек, секунд на операцію)"""
+    started = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    elapsed = time.perf_counter() - started
+    return iterations / elapsed, elapsed / iterations
+
+
+class BenchmarkCommand(BaseCommand):
+    """Базова команда: готує тестове оточення і викликає run_benchmark()"""
+
+    # SQLite у пам'яті з кількох потоків блокує цілі таблиці без очікування;
+    # багатопотокові бенчмарки працюють на тимчасовому файлі, як робочий сервер
+    file_database = False
+
+    def handle(self, *args, **options):
+        if self.file_database and connection.vendor == "sqlite":
+            test_name = os.path.join(tempfile.mkdtemp(prefix="blogqa-bench-"), "bench.sqlite3")
+            connection.settings_dict["TEST"]["NAME"] = test_name
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False)
+        # спільний кеш переживає процес - записи попереднього запуску належать іншій БД
+        for cache in caches.all():
+            cache.clear()
+        try:
+            self.run_benchmark(**options)
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+
+    def run_benchmark(self, **options):
+        raise NotImplementedError("Підкласи мають реалізувати run_benchmark()")
+
+    def report(self, label, ops_per_sec, seconds_per_op, unit="оп/с"):
+        self.stdout.write(f"{label:<40} {ops_per_sec:>12.1f} {unit}   {seconds_per_op * 1000:>9.3f} мс/оп")
@@ -0,0 +1,339 @@
+"""
+Кеш, спільний для всіх процесів на машині (воркерів gunicorn), без окремого сервера.
+
+Записи живуть у файлі LOCATION (найкраще в /dev/shm), який кожен процес
+відображає в пам'ять (mmap). Файл - заголовок, таблиця слотів і кільцевий
+буфер даних:
+
+* слот - версія, 64-бітний хеш ключа, позиція і розмір блоку в буфері, час
+  завершення TTL і час останнього звернення. Ключ шукається серед PROBE сусідніх
+  слотів від свого хешу; якщо всі вони зайняті, новий ключ витісняє той, до
+  якого найдовше не зверталися (наближений LRU, як вибірка ключів у Redis).
+  Слотів - MAX_ENTRIES, округлене вгору до степеня двійки;
+* блок - ключ і pickle значення. Нові блоки пишуться в голову буфера розміром
+  OPTIONS["SIZE"] байтів, а коли місця бракує, найстаріші блоки з хвоста
+  витісняються разом зі своїми слотами. Значення, більші за чверть буфера, не кешуються.
+
+Записи (set, add, incr, delete...) виконуються по одному на всю машину під flock
+файлу LOCATION.lock, тож incr атомарний між процесами. Читання не бере жодних
+блокувань: перед зміною слота запис робить його версію непарною, а після -
+знову парною, і читач, у якого версія до і після копіювання блоку різна (seqlock),
+просто повторює спробу.
+"""
+
+import fcntl
+import hashlib
+import mmap
+import os
+import pickle
+import struct
+import threading
+import time
+from contextlib import contextmanager
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+MAGIC = b"BQSHM\x00\x00\x01"
+HEADER = struct.Struct("<8sQQQQ")  # мітка, слотів, байтів буфера, голова і хвіст буфера (логічні позиції)
+SLOT = struct.Struct("<QQQQdd")  # версія, хеш ключа, позиція блоку, розмір блоку, завершення TTL, останнє звернення
+BLOCK = struct.Struct("<QQIII")  # слот, хеш ключа, розмір блоку, довжина ключа, довжина значення
+VERSION = struct.Struct("<Q")
+TIME = struct.Struct("<d")
+HEAD_AT = 24  # голова і хвіст у заголовку
+EXPIRES_AT, ACCESSED_AT = 32, 40  # зсуви часу завершення TTL і звернення в слоті
+TABLE_AT = 64
+PADDING = 2**64 - 1  # «слот» блоку-заповнювача до кінця буфера
+PROBE = 8  # скільки сусідніх слотів може займати ключ
+RETRIES = 100  # спроб читання, поки слот змінюється
+ALIGN = 8
+
+
+class SharedMemoryCache(BaseCache):
+    """Кеш у файлі, відображеному в пам'ять усіх процесів; LOCATION - шлях до файлу"""
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        self._path = location
+        options = params.get("OPTIONS", {})
+        self._slots = 1 << max(self._max_entries - 1, 1).bit_length()
+        self._capacity = _aligned(options.get("SIZE", 64 * 2**20))
+        self._data_at = TABLE_AT + _aligned(self._slots * SLOT.size)
+        self._lock = threading.Lock()
+        self._pid = None
+
+    def get(self, key, default=None, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        value = self._read(key)
+        return default if value is None else pickle.loads(value)
+
+    def has_key(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        return self._read(key) is not None
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        value = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        with self._writing() as data:
+            self._store(data, key, value, self._expires(timeout))
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        value = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        with self._writing() as data:
+            if self._live(data, key):
+                return False
+            return self._store(data, key, value, self._expires(timeout))
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        with self._writing() as data:
+            found = self._live(data, key)
+            if found:
+                slot, _, _, _ = found
+                with self._changing(data, slot) as position:
+                    TIME.pack_into(data, position + EXPIRES_AT, self._expires(timeout))
+            return bool(found)
+
+    def incr(self, key, delta=1, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        with self._writing() as data:
+            found = self._live(data, key)
+            if not found:
+                raise ValueError(f"Key '{key}' not found")
+            _, _, expires, value = found
+            value = pickle.loads(value) + delta
+            self._store(data, key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), expires)
+            return value
+
+    def delete(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        with self._writing() as data:
+            found = self._find(data, key)
+            if found:
+                self._release(data, found[0])
+            return bool(found)
+
+    def clear(self):
+        with self._writing() as data:
+            for slot in range(self._slots):
+                if SLOT.unpack_from(data, TABLE_AT + slot * SLOT.size)[1]:
+                    self._release(data, slot)
+            struct.pack_into("<QQ", data, HEAD_AT, 0, 0)
+
+    def _read(self, key):
+        """pickle живого значення key або None - без блокувань"""
+        data = self._map()
+        encoded = key.encode()
+        hashed = _hash(encoded)
+        for _ in range(RETRIES):
+            try:
+                found = self._lookup(data, encoded, hashed)
+            except _Changing:
+                continue
+            if not found:
+                return None
+            slot, _, expires, value = found
+            now = time.time()
+            if expires and expires <= now:
+                return None
+            TIME.pack_into(data, TABLE_AT + slot * SLOT.size + ACCESSED_AT, now)
+            return value
+        return None
+
+    def _lookup(self, data, encoded, hashed, locked=False):
+        """(слот, розмір блоку, завершення TTL, значення) ключа encoded або None.
+
+        Під блокуванням запису (locked) непарна версія означає, що процес помер посеред
+        зміни слота: такий слот із, можливо, недописаним блоком звільняється, а не чекається.
+        """
+        for slot in self._window(hashed):
+            position = TABLE_AT + slot * SLOT.size
+            version, slot_hash, offset, size, expires, _ = SLOT.unpack_from(data, position)
+            if slot_hash != hashed:
+                continue
+            if version & 1:
+                if locked:
+                    self._release(data, slot)
+                    continue
+                raise _Changing
+            start = self._data_at + offset % self._capacity
+            end = start + size
+            block = data[start:end]
+            if VERSION.unpack_from(data, position)[0] != version:
+                raise _Changing
+            _, _, _, key_length, value_length = BLOCK.unpack_from(block)
+            key_start = BLOCK.size
+            key_end = key_start + key_length
+            if block[key_start:key_end] == encoded:
+                value_end = key_end + value_length
+                return slot, size, expires, block[key_end:value_end]
+        return None
+
+    # Далі - лише під блокуванням запису
+
+    def _find(self, data, key):
+        return self._lookup(data, key.encode(), _hash(key.encode()), locked=True)
+
+    def _live(self, data, key):
+        found = self._find(data, key)
+        if found and (not found[2] or found[2] > time.time()):
+            return found
+        return None
+
+    def _store(self, data, key, value, expires):
+        """Записує pickle value під key; False, якщо значення завелике для буфера"""
+        encoded = key.encode()
+        hashed = _hash(encoded)
+        size = _aligned(BLOCK.size + len(encoded) + len(value))
+        found = self._lookup(data, encoded, hashed, locked=True)
+        if size > self._capacity // 4:
+            if found:
+                self._release(data, found[0])
+            return False
+        if found and size <= found[1]:
+            # нове значення вміщається в старий блок
+            slot, size = found[0], found[1]
+            offset = SLOT.unpack_from(data, TABLE_AT + slot * SLOT.size)[2]
+        else:
+            slot = found[0] if found else self._free_slot(data, hashed)
+            offset = self._allocate(data, size)
+        with self._changing(data, slot) as position:
+            start = self._data_at + offset % self._capacity
+            BLOCK.pack_into(data, start, slot, hashed, size, len(encoded), len(value))
+            key_start = start + BLOCK.size
+            key_end = key_start + len(encoded)
+            value_end = key_end + len(value)
+            data[key_start:key_end] = encoded
+            data[key_end:value_end] = value
+            struct.pack_into("<QQQdd", data, position + 8, hashed, offset, size, expires, time.time())
+        return True
+
+    def _free_slot(self, data, hashed):
+        """Порожній слот у вікні ключа, а якщо таких немає - той, до якого найдовше не зверталися"""
+        oldest = None
+        for slot in self._window(hashed):
+            _, slot_hash, _, _, _, accessed = SLOT.unpack_from(data, TABLE_AT + slot * SLOT.size)
+            if not slot_hash:
+                return slot
+            if oldest is None or accessed < oldest[0]:
+                oldest = (accessed, slot)
+        return oldest[1]
+
+    def _allocate(self, data, size):
+        """Логічна позиція нового блоку розміру size; витісняє найстаріші блоки, що заважають"""
+        head, tail = struct.unpack_from("<QQ", data, HEAD_AT)
+        rest = self._capacity - head % self._capacity
+        if rest < size:
+            # блок не розривається на кінці буфера: решта до кінця пропускається
+            tail = self._evict(data, tail, head + rest + size)
+            if rest >= BLOCK.size:
+                BLOCK.pack_into(data, self._data_at + head % self._capacity, PADDING, 0, rest, 0, 0)
+            head += rest
+        else:
+            tail = self._evict(data, tail, head + size)
+        struct.pack_into("<QQ", data, HEAD_AT, head + size, tail)
+        return head
+
+    def _evict(self, data, tail, end):
+        """Звільняє буфер до логічної позиції end, витісняючи блоки з хвоста; повертає новий хвіст"""
+        while end - tail > self._capacity:
+            rest = self._capacity - tail % self._capacity
+            if rest < BLOCK.size:
+                tail += rest
+                continue
+            slot, hashed, size, _, _ = BLOCK.unpack_from(data, self._data_at + tail % self._capacity)
+            if slot != PADDING:
+                # слот міг уже перейти до іншого ключа чи отримати новий блок
+                _, slot_hash, offset, _, _, _ = SLOT.unpack_from(data, TABLE_AT + slot * SLOT.size)
+                if slot_hash == hashed and offset == tail:
+                    self._release(data, slot)
+            tail += size
+        return tail
+
+    def _release(self, data, slot):
+        with self._changing(data, slot) as position:
+            struct.pack_into("<Q", data, position + 8, 0)
+
+    @contextmanager
+    def _changing(self, data, slot):
+        """Непарна версія слота на час зміни: читачі, що застали її, повторюють спробу.
+
+        Версія, лишена непарною процесом, що помер посеред зміни, після неї знову стає парною.
+        """
+        position = TABLE_AT + slot * SLOT.size
+        version = VERSION.unpack_from(data, position)[0] | 1
+        VERSION.pack_into(data, position, version)
+        try:
+            yield position
+        finally:
+            VERSION.pack_into(data, position, version + 1)
+
+    def _window(self, hashed):
+        mask = self._slots - 1
+        return ((hashed + number) & mask for number in range(min(PROBE, self._slots)))
+
+    def _expires(self, timeout):
+        expires = self.get_backend_timeout(timeout)
+        return 0.0 if expires is None else expires
+
+    @contextmanager
+    def _writing(self):
+        data = self._map()
+        with self._lock:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+            try:
+                yield data
+            finally:
+                fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    def _map(self):
+        """Відображення файлу в цьому процесі; після fork відкривається заново - flock не має бути спільним"""
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._lock_file = os.open(f"{self._path}.lock", os.O_RDWR | os.O_CREAT, 0o600)
+                    fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+                    try:
+                        self._data = self._open()
+                    finally:
+                        fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+                    self._pid = os.getpid()
+        return self._data
+
+    def _open(self):
+        size = self._data_at + self._capacity
+        try:
+            descriptor = os.open(self._path, os.O_RDWR)
+        except FileNotFoundError:
+            descriptor = None
+        if descriptor is not None and (
+            os.fstat(descriptor).st_size != size
+            or HEADER.unpack(os.pread(descriptor, HEADER.size, 0))[:3] != (MAGIC, self._slots, self._capacity)
+        ):
+            os.close(descriptor)
+            descriptor = None
+        if descriptor is None:
+            # новий файл замість відсутнього чи з іншими розмірами: процеси зі старими
+            # налаштуваннями працюють зі своєю копією до перезапуску, а не читають за її межами
+            temporary = f"{self._path}.{os.getpid()}.tmp"
+            descriptor = os.open(temporary, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o600)
+            os.ftruncate(descriptor, size)
+            os.pwrite(descriptor, HEADER.pack(MAGIC, self._slots, self._capacity, 0, 0), 0)
+            os.replace(temporary, self._path)
+        try:
+            return mmap.mmap(descriptor, size)
+        finally:
+            os.close(descriptor)
+
+
+class _Changing(Exception):
+    """Слот змінюється іншим процесом"""
+
+
+def _hash(encoded):
+    # hash() рядка різний у різних процесах, тож хеш - з blake2b; 0 позначає порожній слот
+    return int.from_bytes(hashlib.blake2b(encoded, digest_size=8).digest(), "little") or 1
+
+
+def _aligned(size):
+    return -(-size // ALIGN) * ALIGN
@@ -0,0 +1,116 @@
+"""
+Обмеження частоти запитів до view (rate limiting).
+
+Ковзне вікно на двох лічильниках: кількість запитів у поточному вікні плюс
+кількість у попередньому, зважена на частку попереднього вікна, що ще
+потрапляє в ковзне. Це два ключі кешу на ключ обмеження і O(1) звернень на
+перевірку незалежно від ліміту. Ключ - scope (кінцева точка) і користувач чи
+адреса; для scope з RATELIMIT_IP_RATES адреса має ще й спільний ліміт на всі
+акаунти, що з неї пишуть (за проксі - див. client_ip). Лічильники живуть у кеші RATELIMIT_CACHE,
+тож зі спільним кешем (blog_project.cache, Redis, Memcached) ліміт один
+для всіх процесів, а з locmem - окремий для кожного.
+"""
+
+import math
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+
+PERIODS = {"s": 1, "m": 60, "h": 60 * 60, "d": 24 * 60 * 60}
+
+
+def parse_rate(rate):
+    """ "10/m" -> (10, 60)"""
+    count, period = rate.split("/")
+    return int(count), PERIODS[period]
+
+
+def client_ip(request):
+    """
+    Адреса клієнта. За TRUSTED_PROXY_HOPS проксі REMOTE_ADDR - адреса найближчого з них, а клієнта
+    дописує в X-Forwarded-For останній довірений проксі: лівіші записи міг підставити сам клієнт
+    """
+    hops = getattr(settings, "TRUSTED_PROXY_HOPS", 0)
+    if hops:
+        forwarded = [address.strip() for address in request.META.get("HTTP_X_FORWARDED_FOR", "").split(",")]
+        forwarded = [address for address in forwarded if address]
+        if len(forwarded) >= hops:
+            return forwarded[-hops]
+    return request.META.get("REMOTE_ADDR", "")
+
+
+def request_key(request, key):
+    """Ключ обмеження: "user" - користувач, "ip" - адреса, "user_or_ip" - користувач, а анонімів - за адресою"""
+    if key == "user_or_ip":
+        key = "user" if request.user.is_authenticated else "ip"
+    return f"user:{request.user.pk}" if key == "user" else f"ip:{client_ip(request)}"
+
+
+def hit(scope, ident, limit, period, now=None):
+    """
+    Рахує запит і повертає None, якщо він у межах ліміту,
+    або кількість секунд до моменту, коли запит буде дозволено.
+    """
+    cache = caches[settings.RATELIMIT_CACHE]
+    now = time.time() if now is None else now
+    window, elapsed = divmod(now, period)
+    current_key = f"rl:{scope}:{ident}:{int(window)}"
+    previous_key = f"rl:{scope}:{ident}:{int(window) - 1}"
+
+    counts = cache.get_many([current_key, previous_key])
+    current, previous = counts.get(current_key, 0), counts.get(previous_key, 0)
+    weight = 1 - elapsed / period
+    if current + previous * weight >= limit:
+        until_next_window = period - elapsed
+        if current >= limit:
+            return math.ceil(until_next_window)
+        # внесок попереднього вікна зменшується лінійно: чекаємо, поки звільниться місце
+        drained = period * (1 - (limit - current) / previous) - elapsed
+        return max(1, math.ceil(min(drained, until_next_window)))
+
+    if not cache.add(current_key, 1, timeout=2 * period):
+        try:
+            cache.incr(current_key)
+        except ValueError:  # ключ щойно витіснено з кешу
+            cache.add(current_key, 1, timeout=2 * period)
+    return None
+
+
+def ratelimit(scope, key="user_or_ip", methods=("POST",)):
+    """
+    Декоратор view: не більше RATELIMIT_RATES[scope] запитів methods з одного ключа
+    і, якщо scope є в RATELIMIT_IP_RATES, не більше стількох з однієї адреси загалом -
+    хоч би скільки акаунтів з неї писало. Понад ліміт - 429 Too Many Requests із заголовком Retry-After.
+    """
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if settings.RATELIMIT_ENABLED and request.method in methods:
+                checks = [(scope, request_key(request, key), settings.RATELIMIT_RATES[scope])]
+                ip_rate = settings.RATELIMIT_IP_RATES.get(scope)
+                if ip_rate:
+                    # спершу спільний ліміт адреси: відхилений ним запит не витрачає ліміт користувача
+                    checks.insert(0, (f"{scope}/ip", f"ip:{client_ip(request)}", ip_rate))
+                for check_scope, ident, rate in checks:
+                    retry_after = hit(check_scope, ident, *parse_rate(rate))
+                    if retry_after is not None:
+                        return too_many_requests(retry_after)
+            return view(request, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def too_many_requests(retry_after):
+    response = HttpResponse(
+        f"Забагато запитів. Спробуйте ще раз через {retry_after} с.",
+        status=429,
+        content_type="text/plain; charset=utf-8",
+    )
+    response["Retry-After"] = str(retry_after)
+    return response
@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -23,7 +24,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
-    'blog',
+    'blog.apps.BlogConfig',
     'users.apps.UsersConfig',
 ]
 
@@ -50,6 +51,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'blog.context_processors.notifications',
             ],
         },
     },
@@ -63,6 +65,10 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Транзакції одразу беруть блокування запису: фонові воркери (run_deletions,
+        # moderate) пишуть пачками паралельно із запитами, і транзакція, що почалась
+        # читанням, інакше падала б з "database is locked", а не чекала своєї черги
+        'OPTIONS': {'transaction_mode': 'IMMEDIATE'},
     }
 }
 
@@ -84,6 +90,41 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Password hashing
+# Політика хешування обирається змінною оточення BLOGQA_PASSWORD_HASHER:
+#   'pbkdf2' - PBKDF2-SHA256 (за замовчуванням)
+#   'argon2' - Argon2id (потрібен пакет argon2-cffi)
+#   'fast'   - MD5, ЛИШЕ для тестів!
+# Першим у списку стоїть хешер для нових паролів; решта дозволяють перевірити
+# старі хеші, які перераховуються за поточною політикою при наступному вході.
+PASSWORD_HASHER_POLICY = os.environ.get('BLOGQA_PASSWORD_HASHER', 'pbkdf2')
+
+PASSWORD_HASHER_POLICIES = {
+    'pbkdf2': [
+        'users.hashers.TunedPBKDF2PasswordHasher',
+        'users.hashers.TunedArgon2PasswordHasher',
+    ],
+    'argon2': [
+        'users.hashers.TunedArgon2PasswordHasher',
+        'users.hashers.TunedPBKDF2PasswordHasher',
+    ],
+    'fast': [
+        'django.contrib.auth.hashers.MD5PasswordHasher',
+        'users.hashers.TunedPBKDF2PasswordHasher',
+        'users.hashers.TunedArgon2PasswordHasher',
+    ],
+}
+
+PASSWORD_HASHERS = PASSWORD_HASHER_POLICIES[PASSWORD_HASHER_POLICY]
+
+# Вартість хешування (зміна значень не ламає старі хеші - вони оновляться при вході).
+# Без BLOGQA_PBKDF2_ITERATIONS - кількість ітерацій за замовчуванням Django.
+PASSWORD_PBKDF2_ITERATIONS = int(os.environ.get('BLOGQA_PBKDF2_ITERATIONS', 0)) or None
+PASSWORD_ARGON2_TIME_COST = int(os.environ.get('BLOGQA_ARGON2_TIME_COST', 2))
+PASSWORD_ARGON2_MEMORY_COST = int(os.environ.get('BLOGQA_ARGON2_MEMORY_COST', 102400))  # KiB
+PASSWORD_ARGON2_PARALLELISM = int(os.environ.get('BLOGQA_ARGON2_PARALLELISM', 8))
+
+
 # Internationalization
 LANGUAGE_CODE = 'uk-ua'
 
@@ -102,6 +143,18 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Зменшувати аватари до PROFILE_IMAGE_SIZE x PROFILE_IMAGE_SIZE при збереженні профілю
+PROFILE_IMAGE_PROCESSING = True
+PROFILE_IMAGE_SIZE = 300
+
+# Завантаження (users.images): більші файли і зображення відхиляються ще до декодування,
+# тож пам'ять на одне завантаження обмежена ~4 байтами на дозволений піксель
+PROFILE_IMAGE_MAX_BYTES = 5 * 1024 * 1024
+PROFILE_IMAGE_MAX_PIXELS = 16_000_000
+
+# Завантажені файли пишуться на диск, а не накопичуються в пам'яті воркера
+FILE_UPLOAD_HANDLERS = ['django.core.files.uploadhandler.TemporaryFileUploadHandler']
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -109,11 +162,158 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 LOGIN_REDIRECT_URL = 'blog-home'
 LOGIN_URL = 'login'
 
-# Email configuration (для розробки використовуємо консоль)
-EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
+# Адмінка постів і коментарів (blog.admin.LargeTableAdmin): відфільтрований список рахується
+# лише до ADMIN_COUNT_LIMIT рядків (далі сторінки доступні посиланням «далі»), а
+# повний COUNT(*) таблиці поруч із кількістю знайдених - лише з ADMIN_FULL_RESULT_COUNT
+ADMIN_COUNT_LIMIT = 10000
+ADMIN_FULL_RESULT_COUNT = False
+
+# Лічильник переглядів постів (blog.counters): прирости накопичуються в пам'яті
+# процесу і записуються в БД не частіше ніж раз на VIEW_COUNT_FLUSH_INTERVAL секунд;
+# повторні перегляди того самого читача протягом VIEW_COUNT_DEDUPE_WINDOW не рахуються
+VIEW_COUNT_ENABLED = True
+VIEW_COUNT_FLUSH_INTERVAL = 10
+VIEW_COUNT_DEDUPE_WINDOW = 30 * 60
+
+# Лічильник вподобань працює так само: Post.like_count оновлюється пачками
+LIKE_COUNT_FLUSH_INTERVAL = 5
+
+# Персональна стрічка: пости авторів з меншою кількістю підписників розсилаються
+# в таблицю стрічок при публікації (fan-out on write), а пости авторів з
+# TIMELINE_FANOUT_LIMIT і більше підписників читаються напряму (fan-out on read)
+TIMELINE_FANOUT_LIMIT = 1000
+
+# Живі коментарі (blog.live) - Server-Sent Events, працюють лише під ASGI:
+# gunicorn blog_project.asgi:application -k uvicorn.workers.UvicornWorker
+# LIVE_REDIS_URL (потрібен пакет redis) - спільний канал для кількох воркерів;
+# без нього клієнт бачить коментарі, додані через той самий процес
+LIVE_COMMENTS_HEARTBEAT = 20
+LIVE_COMMENTS_QUEUE_SIZE = 100
+LIVE_COMMENTS_BACKLOG = 100
+LIVE_REDIS_URL = None
+
+# Обмеження частоти запитів на запис (blog_project.ratelimit): "кількість/період",
+# період - s, m, h або d. Лічильники зберігаються в кеші RATELIMIT_CACHE
+RATELIMIT_ENABLED = True
+RATELIMIT_CACHE = 'default'
+RATELIMIT_RATES = {
+    'comment': '10/m',
+    'post': '5/m',
+    'register': '5/h',
+    'login': '10/m',
+    'password-reset': '5/h',
+}
+# Ліміти на всі запити з однієї адреси разом, понад ліміти кожного користувача:
+# бот з багатьма акаунтами за однією IP-адресою впирається в них
+RATELIMIT_IP_RATES = {
+    'comment': '30/m',
+    'post': '15/m',
+}
+# Скільки проксі (балансувальник Render, Heroku, nginx) стоїть перед сайтом: за ними REMOTE_ADDR -
+# адреса проксі, а адреса клієнта береться з X-Forwarded-For за стільки записів справа.
+# 0 - сайт приймає з'єднання напряму, заголовок ігнорується (його може підробити клієнт)
+TRUSTED_PROXY_HOPS = int(os.environ.get('BLOGQA_TRUSTED_PROXY_HOPS', 0))
+
+# Сповіщення авторів про нові коментарі (blog.notifications): воркер
+# `python manage.py send_notifications --loop` раз на NOTIFICATION_DIGEST_INTERVAL секунд
+# збирає нові коментарі в одне сповіщення на пост і один лист на автора
+NOTIFICATION_DIGEST_INTERVAL = 15 * 60
+NOTIFICATION_UNREAD_CACHE_TIMEOUT = 10 * 60
+# Адреса сайту для посилань у листах, напр. https://blog.example.com (без / у кінці)
+SITE_URL = os.environ.get('BLOGQA_SITE_URL', 'http://127.0.0.1:8000')
+
+# Відкладена публікація (blog.publishing): воркер `python manage.py run_publish_scheduler --loop`
+# спить до найближчої публікації, але не довше за PUBLISH_SCHEDULER_RECHECK секунд
+PUBLISH_SCHEDULER_RECHECK = 60
+
+# Видалення постів і користувачів (blog.deletion): об'єкт одразу приховується, а воркер
+# `python manage.py run_deletions --loop` видаляє залежні рядки пачками, перевіряючи чергу
+# раз на DELETION_INTERVAL секунд; пости до DELETION_INLINE_LIMIT коментарів і вподобань
+# видаляються одразу в запиті. Між пачками воркер чекає DELETION_BATCH_PAUSE секунд: SQLite,
+# чекаючи на блокування, перевіряє його щонайрідше раз на 100 мс, тож коротша пауза
+# не дає запитам, що пишуть паралельно, вклинитися між пачками. Воркер продовжує свою задачу
+# на DELETION_LEASE секунд після кожної пачки; задачу воркера, що впав, після цього бере інший
+DELETION_INTERVAL = 5
+DELETION_BATCH_PAUSE = 0.1
+DELETION_INLINE_LIMIT = 1000
+DELETION_LEASE = 5 * 60
+
+# Теги постів (blog.tags): до POST_MAX_TAGS на пост, у хмарі - TAG_CLOUD_SIZE найуживаніших
+POST_MAX_TAGS = 10
+TAG_CLOUD_SIZE = 30
+TAG_CLOUD_CACHE_TIMEOUT = 10 * 60
+
+# Схожі пости (blog.related): воркер `python manage.py update_related_posts --loop` раз на
+# RELATED_POSTS_INTERVAL секунд рахує сусідів нових і змінених постів за TF-IDF-матрицею з
+# RELATED_POSTS_INDEX; `update_related_posts --full` перебудовує матрицю і всіх сусідів
+# у RELATED_POSTS_WORKERS процесах (None - всі ядра, 1 - у самому воркері, без пулу)
+RELATED_POSTS_COUNT = 5
+RELATED_POSTS_INDEX = BASE_DIR / 'related_posts.npz'
+RELATED_POSTS_INTERVAL = 5 * 60
+RELATED_POSTS_CHUNK_SIZE = 256
+RELATED_POSTS_WORKERS = None
+
+# Майже однакові пости й коментарі (blog.duplicates): тексти від DUPLICATES_MIN_WORDS слів
+# зі схожістю Жаккара (оцінка MinHash) від DUPLICATES_THRESHOLD вважаються копіями.
+# З DUPLICATES_CHECK_INLINE форми відхиляють копію одразу; інакше їх приховує
+# `python manage.py find_duplicates --hide --loop` кожні DUPLICATES_INTERVAL секунд
+DUPLICATES_THRESHOLD = 0.6
+DUPLICATES_MIN_WORDS = 10
+DUPLICATES_CHECK_INLINE = True
+DUPLICATES_INTERVAL = 60
+
+# Спам у коментарях (blog.spam): `python manage.py score_comments --loop` кожні SPAM_INTERVAL
+# секунд оцінює нові коментарі моделлю з SPAM_MODEL (навчається `score_comments --train`);
+# коментарі з імовірністю спаму від SPAM_HOLD_THRESHOLD приховуються до рішення модератора.
+# Тексти на ознаки перетворюються в SPAM_WORKERS процесах (1 - у самому воркері, без пулу)
+SPAM_MODEL = BASE_DIR / 'spam_model.npz'
+SPAM_HOLD_THRESHOLD = 0.9
+SPAM_INTERVAL = 5
+SPAM_WORKERS = 1
+
+# Автодоповнення імен і заголовків (blog.autocomplete): файл AUTOCOMPLETE_INDEX кожен процес відкриває
+# через mmap, зміни між перебудовами дописуються в журнал поруч із ним, а
+# `python manage.py update_autocomplete --loop` перебудовує файл кожні AUTOCOMPLETE_INTERVAL секунд
+AUTOCOMPLETE_INDEX = BASE_DIR / 'autocomplete.idx'
+AUTOCOMPLETE_LIMIT = 10
+AUTOCOMPLETE_INTERVAL = 60 * 60
+
+# Кеш: типово - у пам'яті кожного процесу, що працює будь-де. З BLOGQA_SHARED_CACHE=1
+# (прод з кількома воркерами на Linux/macOS, потрібен fcntl) - blog_project.cache: файл
+# LOCATION, відображений у пам'ять усіх воркерів на машині, тож RSS/Atom, лічильники
+# обмеження частоти тощо спільні для них без окремого сервера.
+# /dev/shm - пам'ять, а не диск; кілька копій сайту на одній машині мають різні LOCATION.
+# MAX_ENTRIES - кількість ключів, SIZE - байтів під значення
+if os.environ.get('BLOGQA_SHARED_CACHE'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'blog_project.cache.SharedMemoryCache',
+            'LOCATION': os.path.join('/dev/shm' if os.path.isdir('/dev/shm') else BASE_DIR, 'blogqa-cache'),
+            'OPTIONS': {
+                'MAX_ENTRIES': 100_000,
+                'SIZE': 64 * 2**20,
+            },
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Email configuration: запити лише ставлять листи в чергу в БД (users.mail), а доставляє
+# їх воркер `python manage.py send_queued_mail --loop` через MAIL_QUEUE_BACKEND
+# (для розробки - консоль)
+EMAIL_BACKEND = 'users.mail.QueuedEmailBackend'
+MAIL_QUEUE_BACKEND = 'django.core.mail.backends.console.EmailBackend'
+MAIL_QUEUE_BATCH_SIZE = 100
+MAIL_QUEUE_MAX_ATTEMPTS = 8
+MAIL_QUEUE_RETRY_DELAY = 60  # секунд до першого повтору, далі подвоюється
+MAIL_QUEUE_LEASE = 5 * 60  # скільки секунд взятий воркером лист недоступний іншим воркерам
 
 # Для продакшену використовуйте SMTP:
-# EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+# MAIL_QUEUE_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
 # EMAIL_HOST = 'smtp.gmail.com'
 # EMAIL_PORT = 587
 # EMAIL_USE_TLS = True
@@ -0,0 +1,48 @@
+"""
+Налаштування для запуску тестів:
+    python manage.py test --settings=blog_project.test_settings --parallel
+"""
+
+import os
+import tempfile
+
+from .settings import *  # noqa: F401,F403
+
+# БД у пам'яті - кожен паралельний процес отримує власну копію
+DATABASES = {
+    "default": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": ":memory:",
+    }
+}
+
+# Швидкий хешер: тести не перевіряють стійкість паролів
+PASSWORD_HASHERS = [
+    "django.contrib.auth.hashers.MD5PasswordHasher",
+]
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    }
+}
+
+EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
+
+# Завантажені файли не потрапляють у робочу папку media/, зображення не обробляються
+MEDIA_ROOT = tempfile.mkdtemp(prefix="blogqa-test-media-")
+PROFILE_IMAGE_PROCESSING = False
+
+# Лічильники записуються одразу, щоб прирости не переходили між тестами
+VIEW_COUNT_FLUSH_INTERVAL = 0
+LIKE_COUNT_FLUSH_INTERVAL = 0
+
+# Ліміти перевіряються окремими тестами з override_settings
+RATELIMIT_ENABLED = False
+
+# Схожі пости й ознаки спаму рахуються в самому процесі тестів: воркер --parallel (демон) не може мати пулу процесів
+RELATED_POSTS_WORKERS = 1
+SPAM_WORKERS = 1
+
+# Індекс і журнал автодоповнення не потрапляють у робочу папку
+AUTOCOMPLETE_INDEX = os.path.join(tempfile.mkdtemp(prefix="blogqa-test-autocomplete-"), "autocomplete.idx")
@@ -1,14 +1,61 @@
 from django.contrib import admin
+from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.contrib.auth.models import User
+from django.urls import reverse
+from django.utils import timezone
 
-from .models import Profile
+from blog import autocomplete
+from blog.admin import QueuedDeletionMixin
+
+from .models import Follow, Profile, QueuedEmail
+
+admin.site.unregister(User)
+
+
+@admin.register(User)
+class UserAdmin(QueuedDeletionMixin, BaseUserAdmin):
+    """Користувач видаляється у фоні (blog.deletion): одразу лише деактивується і ховаються його пости"""
+
+    def get_search_results(self, request, queryset, search_term):
+        # поля автора з autocomplete_fields шукають за початком імені в індексі blog.autocomplete,
+        # а не LIKE по всій таблиці користувачів (неактивних у ньому немає); без індексу - як зазвичай
+        if search_term and request.path == reverse("admin:autocomplete") and autocomplete.ready():
+            found = autocomplete.suggest("users", search_term, limit=self.list_per_page)
+            return queryset.filter(pk__in=[pk for pk, _ in found]), False
+        return super().get_search_results(request, queryset, search_term)
 
 
 @admin.register(Profile)
 class ProfileAdmin(admin.ModelAdmin):
-    list_display = ["user", "bio_preview"]
+    list_display = ["user", "bio_preview", "follower_count"]
     search_fields = ["user__username", "bio"]
 
     def bio_preview(self, obj):
         return obj.bio[:50] + "..." if len(obj.bio) > 50 else obj.bio
 
     bio_preview.short_description = "Біографія"
+
+
+@admin.register(Follow)
+class FollowAdmin(admin.ModelAdmin):
+    list_display = ["follower", "author", "created"]
+    list_select_related = ["follower", "author"]
+    autocomplete_fields = ["follower", "author"]
+    search_fields = ["follower__username", "author__username"]
+
+
+@admin.register(QueuedEmail)
+class QueuedEmailAdmin(admin.ModelAdmin):
+    list_display = ["subject", "recipients", "status", "attempts", "next_attempt_at", "sent_at"]
+    list_filter = ["status"]
+    search_fields = ["recipients", "subject"]
+    readonly_fields = ["from_email", "recipients", "subject", "attempts", "last_error", "sent_at", "created"]
+    exclude = ["message"]
+    actions = ["retry_now"]
+
+    @admin.action(description="Повторити відправлення зараз")
+    def retry_now(self, request, queryset):
+        updated = queryset.exclude(status=QueuedEmail.SENT).update(
+            status=QueuedEmail.PENDING, next_attempt_at=timezone.now(), lease=""
+        )
+        self.message_user(request, f"Поставлено в чергу: {updated}")
@@ -1,4 +1,6 @@
 from django.apps import AppConfig
+from django.conf import settings
+from PIL import Image
 
 
 class UsersConfig(AppConfig):
@@ -9,3 +11,7 @@ class UsersConfig(AppConfig):
     def ready(self):
         """Імпортуємо signals при запуску додатку"""
         import users.signals  # noqa: F401
+
+        # Image.open відмовляється відкривати зображення, більші за 2 * MAX_IMAGE_PIXELS, -
+        # захист і для коду, що відкриває зображення в обхід users.images
+        Image.MAX_IMAGE_PIXELS = settings.PROFILE_IMAGE_MAX_PIXELS
@@ -2,9 +2,19 @@ from django import forms
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.models import User
 
+from .images import validate_upload
 from .models import Profile
 
 
+class AvatarField(forms.ImageField):
+    """ImageField, що перевіряє розмір файлу і заголовок до того, як Pillow почне читати зображення"""
+
+    def to_python(self, data):
+        if data not in self.empty_values:
+            validate_upload(data)
+        return super().to_python(data)
+
+
 class UserRegisterForm(UserCreationForm):
     """Форма реєстрації користувача"""
 
@@ -56,3 +66,4 @@ class ProfileUpdateForm(forms.ModelForm):
         widgets = {
             "bio": forms.Textarea(attrs={"rows": 4}),
         }
+        field_classes = {"image": AvatarField}
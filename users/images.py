@@ -0,0 +1,73 @@
+"""
+Безпечна обробка завантажених зображень (аватарів).
+
+Завантаження пишуться у тимчасовий файл (FILE_UPLOAD_HANDLERS), а не в
+пам'ять. До декодування перевіряються розмір файлу і розміри з заголовка:
+Image.open читає лише заголовок, тож "бомба" на 100000x100000 пікселів
+відхиляється, не виділивши пам'яті під пікселі. Декодуються лише зображення
+до PROFILE_IMAGE_MAX_PIXELS, тож пам'ять на одне завантаження обмежена;
+JPEG декодується одразу зменшеним (draft - масштабування DCT у 2/4/8 разів).
+"""
+
+import warnings
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from PIL import Image, UnidentifiedImageError
+
+ALLOWED_FORMATS = {"JPEG", "PNG", "GIF", "WEBP"}
+
+
+def read_header(file):
+    """(формат, ширина, висота) із заголовка зображення без декодування пікселів"""
+    position = file.tell() if hasattr(file, "tell") else 0
+    try:
+        with warnings.catch_warnings():
+            # розміри понад ліміт повідомляє validate_upload, з конкретними числами
+            warnings.simplefilter("ignore", Image.DecompressionBombWarning)
+            with Image.open(file) as image:
+                return image.format, image.width, image.height
+    except Image.DecompressionBombError:
+        raise ValidationError("Зображення має завелику роздільну здатність", code="image_too_large")
+    except (UnidentifiedImageError, OSError, SyntaxError, ValueError):
+        raise ValidationError("Файл не є зображенням або пошкоджений", code="invalid_image")
+    finally:
+        if hasattr(file, "seek"):
+            file.seek(position)
+
+
+def validate_upload(file):
+    """Перевіряє розмір файлу, формат і кількість пікселів до декодування"""
+    max_bytes = settings.PROFILE_IMAGE_MAX_BYTES
+    if file.size > max_bytes:
+        raise ValidationError(f"Файл завеликий: максимум {max_bytes // (1024 * 1024)} МБ", code="file_too_large")
+    image_format, width, height = read_header(file)
+    if image_format not in ALLOWED_FORMATS:
+        raise ValidationError(
+            f"Непідтримуваний формат {image_format}: дозволено {', '.join(sorted(ALLOWED_FORMATS))}",
+            code="invalid_format",
+        )
+    if width * height > settings.PROFILE_IMAGE_MAX_PIXELS:
+        raise ValidationError(
+            f"Зображення {width}x{height} завелике: максимум {settings.PROFILE_IMAGE_MAX_PIXELS:,} пікселів",
+            code="image_too_large",
+        )
+
+
+def make_thumbnail(path, size):
+    """
+    Зменшує зображення у файлі path до size x size (зберігаючи пропорції).
+    Повертає False без декодування, якщо зображення вже не більше size
+    або більше PROFILE_IMAGE_MAX_PIXELS (такі не проходять validate_upload).
+    """
+    with Image.open(path) as image:
+        if image.width <= size and image.height <= size:
+            return False
+        if image.width * image.height > settings.PROFILE_IMAGE_MAX_PIXELS:
+            return False
+        image_format = image.format
+        # для JPEG декодер одразу видає зображення, зменшене до найближчого масштабу >= size
+        image.draft(None, (size, size))
+        image.thumbnail((size, size))
+        image.save(path, format=image_format)
+    return True
@@ -0,0 +1,132 @@
+"""
+Черга вихідної пошти.
+
+QueuedEmailBackend (EMAIL_BACKEND) лише зберігає готовий MIME листа в
+QueuedEmail, тож запит (скидання пароля, сповіщення) не чекає на SMTP.
+Воркер `send_queued_mail` забирає листи, яким настав час, пачками і
+надсилає їх через одне з'єднання MAIL_QUEUE_BACKEND; невдалі спроби
+повторюються з експоненційною затримкою, після MAIL_QUEUE_MAX_ATTEMPTS
+лист позначається як недоставлений.
+"""
+
+import email
+import uuid
+from datetime import timedelta
+from email.header import decode_header, make_header
+from email.message import Message
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.mail.message import MIMEMixin
+from django.utils import timezone
+
+from .models import QueuedEmail
+
+MAX_RETRY_DELAY = 6 * 60 * 60
+
+
+class QueuedEmailBackend(BaseEmailBackend):
+    """Email backend, що ставить листи в чергу в БД замість відправлення"""
+
+    def send_messages(self, email_messages):
+        queued = [
+            QueuedEmail(
+                from_email=message.from_email,
+                recipients="\n".join(message.recipients()),
+                subject=str(message.subject)[:255],
+                message=message.message().as_bytes(linesep="\r\n"),
+            )
+            for message in email_messages
+            if message.recipients()
+        ]
+        QueuedEmail.objects.bulk_create(queued)
+        return len(queued)
+
+
+class _MIMEMessage(MIMEMixin, Message):
+    """Розібраний MIME з as_bytes(linesep=...), як чекають backend'и Django"""
+
+
+class RawEmailMessage(EmailMessage):
+    """EmailMessage, що відправляє збережений MIME як є"""
+
+    def __init__(self, raw, from_email, recipients):
+        self.raw = email.message_from_bytes(raw, _class=_MIMEMessage)
+        body = "" if self.raw.is_multipart() else self.raw.get_payload(decode=True).decode(errors="replace")
+        subject = str(make_header(decode_header(self.raw.get("Subject", ""))))
+        # Bcc немає в заголовках: конверт береться з to, а не з MIME
+        super().__init__(subject=subject, body=body, from_email=from_email, to=recipients)
+
+    def message(self, **kwargs):
+        return self.raw
+
+
+def deliver_queued(batch_size=None, connection=None):
+    """
+    Надсилає до batch_size листів, яким настав час, через одне з'єднання.
+    Повертає (надіслано, невдалих спроб).
+    """
+    batch = _claim(batch_size or settings.MAIL_QUEUE_BATCH_SIZE)
+    if not batch:
+        return 0, 0
+
+    connection = connection or get_connection(settings.MAIL_QUEUE_BACKEND)
+    pending = list(reversed(batch))
+    sent = failed = 0
+    try:
+        connection.open()
+        while pending:
+            queued = pending.pop()
+            message = RawEmailMessage(bytes(queued.message), queued.from_email, queued.recipients.splitlines())
+            try:
+                connection.send_messages([message])
+            except Exception as error:  # SMTPException, OSError тощо - лист чекає на повтор
+                _retry_later(queued, error)
+                failed += 1
+                _reopen(connection)
+            else:
+                QueuedEmail.objects.filter(pk=queued.pk).update(
+                    status=QueuedEmail.SENT, sent_at=timezone.now(), attempts=queued.attempts + 1, lease=""
+                )
+                sent += 1
+    except Exception as error:  # сервер недоступний: решта пачки теж відкладається
+        for queued in pending:
+            _retry_later(queued, error)
+            failed += 1
+    finally:
+        connection.close()
+    return sent, failed
+
+
+def purge_sent(older_than):
+    """Видаляє надіслані листи, старші за older_than (timedelta)"""
+    return QueuedEmail.objects.filter(status=QueuedEmail.SENT, sent_at__lt=timezone.now() - older_than).delete()[0]
+
+
+def _claim(batch_size):
+    """Бере пачку листів, яким настав час, під оренду, щоб паралельний воркер їх не взяв"""
+    now = timezone.now()
+    due = QueuedEmail.objects.filter(status=QueuedEmail.PENDING, next_attempt_at__lte=now)
+    pks = list(due.order_by("next_attempt_at").values_list("pk", flat=True)[:batch_size])
+    lease = uuid.uuid4().hex
+    # умова next_attempt_at <= now повторюється: лист, який щойно взяв інший воркер, пропускається
+    due.filter(pk__in=pks).update(lease=lease, next_attempt_at=now + timedelta(seconds=settings.MAIL_QUEUE_LEASE))
+    return list(QueuedEmail.objects.filter(lease=lease).order_by("pk"))
+
+
+def _retry_later(queued, error):
+    attempts = queued.attempts + 1
+    values = {"attempts": attempts, "last_error": f"{type(error).__name__}: {error}"[:1000], "lease": ""}
+    if attempts >= settings.MAIL_QUEUE_MAX_ATTEMPTS:
+        values["status"] = QueuedEmail.FAILED
+    else:
+        delay = min(settings.MAIL_QUEUE_RETRY_DELAY * 2 ** (attempts - 1), MAX_RETRY_DELAY)
+        values["next_attempt_at"] = timezone.now() + timedelta(seconds=delay)
+    QueuedEmail.objects.filter(pk=queued.pk).update(**values)
+
+
+def _reopen(connection):
+    """Після помилки SMTP-сесія може бути в невизначеному стані - нове з'єднання для решти пачки"""
+    connection.close()
+    connection.open()
@@ -0,0 +1,112 @@
+import multiprocessing
+import os
+import resource
+import shutil
+import struct
+import tempfile
+import time
+import warnings
+import zlib
+
+from django import forms
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import UploadedFile
+from PIL import Image
+
+from blog_project.benchmark import BenchmarkCommand
+from users.forms import AvatarField
+from users.images import make_thumbnail
+
+PILLOW_DEFAULT_MAX_PIXELS = int(1024 * 1024 * 1024 // 4 // 3)
+
+
+def write_png(path, width, height, rows=None):
+    """
+    PNG у відтінках сірого, пікселі стискаються потоково - без width * height байтів у пам'яті;
+    rows < height - файл лише заявляє розміри, а даних містить на rows рядків
+    """
+
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    compressor = zlib.compressobj(9)
+    row = b"\0" * (width + 1)
+    with open(path, "wb") as file:
+        file.write(b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 0, 0, 0, 0)))
+        data = b"".join(compressor.compress(row) for _ in range(height if rows is None else rows))
+        data += compressor.flush()
+        file.write(chunk(b"IDAT", data) + chunk(b"IEND", b""))
+
+
+def legacy_upload(path):
+    """Як було до users.images: ImageField форми, потім повне декодування і thumbnail"""
+    Image.MAX_IMAGE_PIXELS = PILLOW_DEFAULT_MAX_PIXELS
+    warnings.simplefilter("ignore", Image.DecompressionBombWarning)
+    with open(path, "rb") as file:
+        forms.ImageField().clean(UploadedFile(file, os.path.basename(path), size=os.path.getsize(path)))
+    image = Image.open(path)
+    image.thumbnail((300, 300))
+    image.save(path, format=image.format)
+
+
+def safe_upload(path):
+    Image.MAX_IMAGE_PIXELS = settings.PROFILE_IMAGE_MAX_PIXELS
+    with open(path, "rb") as file:
+        AvatarField().clean(UploadedFile(file, os.path.basename(path), size=os.path.getsize(path)))
+    make_thumbnail(path, settings.PROFILE_IMAGE_SIZE)
+
+
+def run_in_child(handler, path, results):
+    """Обробка в окремому процесі: ru_maxrss показує пік саме цього завантаження"""
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    started = time.perf_counter()
+    try:
+        handler(path)
+        outcome = "прийнято"
+    except (ValidationError, Image.DecompressionBombError) as exc:
+        outcome = f"відхилено ({getattr(exc, 'code', None) or type(exc).__name__})"
+    elapsed = time.perf_counter() - started
+    results.put((outcome, elapsed, (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline) / 1024))
+
+
+class Command(BenchmarkCommand):
+    help = "Пік RSS і час обробки завантаження аватара до і після перевірок users.images"
+
+    def run_benchmark(self, **options):
+        workdir = tempfile.mkdtemp(prefix="blogqa-bench-images-")
+        try:
+            inputs = self.make_inputs(workdir)
+            context = multiprocessing.get_context("fork")
+            self.stdout.write(f"{'Файл':<34} {'розмір':>9}  {'обробка':<8} {'пік RSS':>10} {'час':>9}  результат")
+            for label, source in inputs:
+                for name, handler in (("до", legacy_upload), ("після", safe_upload)):
+                    path = os.path.join(workdir, f"upload{os.path.splitext(source)[1]}")
+                    shutil.copy(source, path)
+                    results = context.Queue()
+                    process = context.Process(target=run_in_child, args=(handler, path, results))
+                    process.start()
+                    outcome, elapsed, peak = results.get()
+                    process.join()
+                    size = os.path.getsize(source) / 1024
+                    self.stdout.write(
+                        f"{label:<34} {size:>6.0f} КБ  {name:<8} {peak:>7.1f} МБ {elapsed * 1000:>6.0f} мс  {outcome}"
+                    )
+        finally:
+            shutil.rmtree(workdir)
+
+    def make_inputs(self, workdir):
+        inputs = []
+        for width, height in ((1000, 1000), (4000, 3000)):
+            path = os.path.join(workdir, f"photo_{width}x{height}.jpg")
+            Image.linear_gradient("L").resize((width, height)).convert("RGB").save(path, quality=85)
+            inputs.append((f"JPEG {width}x{height}", path))
+        path = os.path.join(workdir, "screenshot.png")
+        Image.linear_gradient("L").resize((2000, 2000)).convert("RGB").save(path)
+        inputs.append(("PNG 2000x2000", path))
+        for width, height in ((12_000, 12_000), (100_000, 100_000)):
+            path = os.path.join(workdir, f"bomb_{width}.png")
+            # 100000x100000 - лише заголовок і один рядок даних: такі розміри Pillow відхиляє і сам
+            write_png(path, width, height, rows=1 if width * height > 2 * PILLOW_DEFAULT_MAX_PIXELS else None)
+            inputs.append((f"PNG-бомба {width}x{height}", path))
+        return inputs
@@ -0,0 +1,38 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from blog_project.benchmark import BenchmarkCommand, measure
+
+PASSWORD = "Bench!Pass123"
+
+
+class Command(BenchmarkCommand):
+    help = "Вимірює пропускну здатність входу (логінів/сек на одне ядро) для кожної політики хешування"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=20, help="Кількість логінів на політику")
+        parser.add_argument(
+            "--policies",
+            nargs="+",
+            default=list(settings.PASSWORD_HASHER_POLICIES),
+            help="Політики з settings.PASSWORD_HASHER_POLICIES",
+        )
+
+    def run_benchmark(self, iterations, policies, **options):
+        self.stdout.write(f"Логінів на політику: {iterations} (один процес = одне ядро)")
+        for policy in policies:
+            with override_settings(PASSWORD_HASHERS=settings.PASSWORD_HASHER_POLICIES[policy]):
+                try:
+                    user = User.objects.create_user(username=f"bench_{policy}", password=PASSWORD)
+                except ValueError as exc:  # наприклад, не встановлено argon2-cffi
+                    self.stderr.write(f"{policy}: пропущено ({exc})")
+                    continue
+
+                client = Client()
+                url = reverse("login")
+                data = {"username": user.username, "password": PASSWORD}
+
+                self.report(f"{policy}: LoginView POST", *measure(lambda: client.post(url, data), iterations))
+                self.report(f"{policy}: check_password", *measure(lambda: user.check_password(PASSWORD), iterations))
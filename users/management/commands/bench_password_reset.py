@@ -0,0 +1,61 @@
+from django.contrib.auth.models import User
+from django.core import mail
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from blog_project.benchmark import BenchmarkCommand, measure
+from users.mail import deliver_queued
+from users.models import QueuedEmail
+from users.smtp_stub import SMTPStub
+
+SMTP = "django.core.mail.backends.smtp.EmailBackend"
+QUEUE = "users.mail.QueuedEmailBackend"
+
+
+class Command(BenchmarkCommand):
+    help = "Порівнює час запиту скидання пароля з прямим SMTP і з чергою, а також пропускну здатність воркера"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=20, help="Кількість запитів скидання пароля")
+        parser.add_argument("--delay", type=float, default=0.05, help="Затримка SMTP-сервера на кожному кроці, с")
+        parser.add_argument("--messages", type=int, default=200, help="Листів у черзі для заміру воркера")
+
+    def run_benchmark(self, iterations, delay, messages, **options):
+        User.objects.create_user(username="forgetful", email="forgetful@example.com", password="Bench!Pass123")
+        client = Client()
+        url = reverse("password_reset")
+        data = {"email": "forgetful@example.com"}
+
+        self.stdout.write(f"SMTP-сервер із затримкою {delay * 1000:.0f} мс на привітання і на кожен лист")
+        stub = SMTPStub(delay=delay)
+        with stub, override_settings(EMAIL_HOST=stub.host, EMAIL_PORT=stub.port, RATELIMIT_ENABLED=False):
+            with override_settings(EMAIL_BACKEND=SMTP):
+                self.report(
+                    "PasswordResetView POST: прямий SMTP", *measure(lambda: client.post(url, data), iterations)
+                )
+            with override_settings(EMAIL_BACKEND=QUEUE):
+                self.report("PasswordResetView POST: черга", *measure(lambda: client.post(url, data), iterations))
+            QueuedEmail.objects.all().delete()
+
+            with override_settings(EMAIL_BACKEND=QUEUE, MAIL_QUEUE_BACKEND=SMTP, MAIL_QUEUE_BATCH_SIZE=messages):
+                self.enqueue(messages)
+                batches_per_sec, seconds_per_batch = measure(deliver_queued, 1)
+                self.report(
+                    "воркер: одне з'єднання на пачку",
+                    batches_per_sec * messages,
+                    seconds_per_batch / messages,
+                    unit="листів/с",
+                )
+
+                self.enqueue(messages)
+                self.report(
+                    "воркер: з'єднання на кожен лист",
+                    *measure(lambda: deliver_queued(batch_size=1), messages),
+                    unit="листів/с",
+                )
+        self.stdout.write(f"Листів прийнято сервером: {len(stub.messages)}, з'єднань: {stub.connections}")
+
+    def enqueue(self, count):
+        mail.send_mass_mail(
+            [(f"Лист {i}", "Тіло листа", "noreply@example.com", [f"user{i}@example.com"]) for i in range(count)]
+        )
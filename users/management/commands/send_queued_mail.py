@@ -0,0 +1,30 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from users.mail import deliver_queued, purge_sent
+
+
+class Command(BaseCommand):
+    help = "Надсилає листи з черги (users.mail) пачками через одне з'єднання MAIL_QUEUE_BACKEND"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=settings.MAIL_QUEUE_BATCH_SIZE)
+        parser.add_argument("--loop", action="store_true", help="Працювати постійно")
+        parser.add_argument("--interval", type=float, default=2, help="Пауза, коли черга порожня, с")
+        parser.add_argument("--purge-days", type=int, default=30, help="Видаляти надіслані листи, старші за N днів")
+
+    def handle(self, batch_size, loop, interval, purge_days, **options):
+        purged = purge_sent(timedelta(days=purge_days))
+        if purged:
+            self.stdout.write(f"Видалено старих листів: {purged}")
+        while True:
+            sent, failed = deliver_queued(batch_size)
+            if sent or failed:
+                self.stdout.write(f"Надіслано: {sent}, відкладено: {failed}")
+            if not loop:
+                return
+            if sent + failed < batch_size:
+                time.sleep(interval)
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-19 04:39
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_follows'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QueuedEmail',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Створено')),
+                ('from_email', models.CharField(max_length=254, verbose_name='Відправник')),
+                ('recipients', models.TextField(verbose_name='Отримувачі')),
+                ('subject', models.CharField(blank=True, max_length=255, verbose_name='Тема')),
+                ('message', models.BinaryField(verbose_name='Повідомлення (MIME)')),
+                ('status', models.CharField(choices=[('pending', 'Очікує'), ('sent', 'Надіслано'), ('failed', 'Не доставлено')], default='pending', max_length=10, verbose_name='Стан')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Спроб')),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Наступна спроба')),
+                ('lease', models.CharField(blank=True, editable=False, max_length=32, verbose_name='Воркер')),
+                ('last_error', models.TextField(blank=True, verbose_name='Остання помилка')),
+                ('sent_at', models.DateTimeField(blank=True, null=True, verbose_name='Надіслано')),
+            ],
+            options={
+                'verbose_name': 'Лист у черзі',
+                'verbose_name_plural': 'Черга листів',
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='users_mail_due_idx')],
+            },
+        ),
+    ]
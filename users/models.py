@@ -1,8 +1,11 @@
 import os
 
+from django.conf import settings
 from django.contrib.auth.models import User
 from django.db import models
-from PIL import Image
+from django.utils import timezone
+
+from .images import make_thumbnail
 
 
 class Profile(models.Model):
@@ -13,6 +16,7 @@ class Profile(models.Model):
         default="default.jpg", upload_to="profile_pics", verbose_name="Аватар"  # повинен лежати у MEDIA_ROOT
     )
     bio = models.TextField(max_length=500, blank=True, verbose_name="Про себе")
+    follower_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="Підписники")
 
     class Meta:
         verbose_name = "Профіль"
@@ -25,9 +29,52 @@ class Profile(models.Model):
         """Зменшуємо розмір зображення при збереженні"""
         super().save(*args, **kwargs)
 
-        # Перевірка чи файл існує
-        if self.image and os.path.exists(self.image.path):
-            img = Image.open(self.image.path)
-            if img.height > 300 or img.width > 300:
-                img.thumbnail((300, 300))
-                img.save(self.image.path)
+        # Перевірка чи файл існує; зображення до 300x300 не декодується
+        if settings.PROFILE_IMAGE_PROCESSING and self.image and os.path.exists(self.image.path):
+            make_thumbnail(self.image.path, settings.PROFILE_IMAGE_SIZE)
+
+
+class Follow(models.Model):
+    """Підписка користувача на автора"""
+
+    follower = models.ForeignKey(User, on_delete=models.CASCADE, related_name="following", verbose_name="Підписник")
+    author = models.ForeignKey(User, on_delete=models.CASCADE, related_name="followers", verbose_name="Автор")
+    created = models.DateTimeField(default=timezone.now, verbose_name="Дата")
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=["follower", "author"], name="users_follow_unique")]
+        indexes = [models.Index(fields=["author", "follower"], name="users_follow_author_idx")]
+        verbose_name = "Підписка"
+        verbose_name_plural = "Підписки"
+
+    def __str__(self):
+        return f"{self.follower.username} -> {self.author.username}"
+
+
+class QueuedEmail(models.Model):
+    """Лист у черзі на відправлення (users.mail): готовий MIME і стан доставки"""
+
+    PENDING = "pending"
+    SENT = "sent"
+    FAILED = "failed"
+    STATUS_CHOICES = [(PENDING, "Очікує"), (SENT, "Надіслано"), (FAILED, "Не доставлено")]
+
+    created = models.DateTimeField(default=timezone.now, verbose_name="Створено")
+    from_email = models.CharField(max_length=254, verbose_name="Відправник")
+    recipients = models.TextField(verbose_name="Отримувачі")  # по одному на рядок, включно з Bcc
+    subject = models.CharField(max_length=255, blank=True, verbose_name="Тема")
+    message = models.BinaryField(verbose_name="Повідомлення (MIME)")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING, verbose_name="Стан")
+    attempts = models.PositiveSmallIntegerField(default=0, verbose_name="Спроб")
+    next_attempt_at = models.DateTimeField(default=timezone.now, verbose_name="Наступна спроба")
+    lease = models.CharField(max_length=32, blank=True, editable=False, verbose_name="Воркер")
+    last_error = models.TextField(blank=True, verbose_name="Остання помилка")
+    sent_at = models.DateTimeField(null=True, blank=True, verbose_name="Надіслано")
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "next_attempt_at"], name="users_mail_due_idx")]
+        verbose_name = "Лист у черзі"
+        verbose_name_plural = "Черга листів"
+
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.recipients.splitlines())}"
@@ -0,0 +1,92 @@
+"""
+Мінімальний SMTP-сервер для тестів і бенчмарків пошти.
+
+Приймає листи в messages, нічого не пересилаючи. Може імітувати повільний
+relay (delay секунд на привітання і на кожен DATA) і тимчасові відмови
+(fail наступних листів отримують 451).
+"""
+
+import socketserver
+import threading
+import time
+
+
+class SMTPStub:
+    def __init__(self, delay=0, fail=0):
+        self.delay = delay
+        self.fail = fail
+        self.messages = []  # (відправник, [отримувачі], тіло в байтах)
+        self.connections = 0
+        self._lock = threading.Lock()
+        self._server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self.host, self.port = self._server.server_address
+
+    def __enter__(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _accept(self, sender, recipients, data):
+        """Зберігає лист або відмовляє, поки лічильник fail не вичерпано"""
+        with self._lock:
+            if self.fail:
+                self.fail -= 1
+                return "451 Try again later"
+            self.messages.append((sender, recipients, data))
+            return "250 OK"
+
+    def _handler(self):
+        stub = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                with stub._lock:
+                    stub.connections += 1
+                time.sleep(stub.delay)
+                self.reply("220 stub ESMTP")
+                sender, recipients = None, []
+                for line in self.rfile:
+                    command = line.decode().strip()
+                    verb, _, argument = command.partition(" ")
+                    verb = verb.upper()
+                    if verb in ("EHLO", "HELO", "NOOP"):
+                        self.reply("250 stub")
+                    elif verb == "MAIL":
+                        sender, recipients = self.address(argument), []
+                        self.reply("250 OK")
+                    elif verb == "RCPT":
+                        recipients.append(self.address(argument))
+                        self.reply("250 OK")
+                    elif verb == "DATA":
+                        self.reply("354 End data with <CR><LF>.<CR><LF>")
+                        data = self.read_data()
+                        time.sleep(stub.delay)
+                        self.reply(stub._accept(sender, recipients, data))
+                    elif verb == "RSET":
+                        sender, recipients = None, []
+                        self.reply("250 OK")
+                    elif verb == "QUIT":
+                        self.reply("221 Bye")
+                        return
+                    else:
+                        self.reply("502 Command not implemented")
+
+            def read_data(self):
+                lines = []
+                for line in self.rfile:
+                    if line == b".\r\n":
+                        break
+                    lines.append(line[1:] if line.startswith(b"..") else line)
+                return b"".join(lines)
+
+            def address(self, argument):
+                return argument.partition(":")[2].strip().strip("<>")
+
+            def reply(self, text):
+                self.wfile.write(f"{text}\r\n".encode())
+
+        return Handler
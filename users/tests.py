@@ -5,14 +5,31 @@ users/tests.py — UNIT-тести для додатку users
 Використовує: django.test.TestCase, unittest.mock (Mock/Spy/patch)
 """
 
+import os
+import struct
+import tempfile
+import zlib
+from io import BytesIO, StringIO
 from unittest.mock import MagicMock, patch
 
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
 from django.contrib.auth.models import User
-from django.test import Client, TestCase
+from django.core import mail
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
 from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+from PIL.JpegImagePlugin import JpegImageFile
 
 from users.forms import ProfileUpdateForm, UserRegisterForm, UserUpdateForm
-from users.models import Profile
+from users.hashers import TunedPBKDF2PasswordHasher
+from users.images import make_thumbnail
+from users.mail import deliver_queued
+from users.models import Profile, QueuedEmail
+from users.smtp_stub import SMTPStub
 
 # ══════════════════════════════════════════════════════
 #  1. MODEL — Profile  (повне покриття 100%)
@@ -20,8 +37,9 @@ from users.models import Profile
 
 
 class ProfileModelTest(TestCase):
-    def setUp(self):
-        self.user = User.objects.create_user(username="testuser", password="pass1234")
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="testuser", password="pass1234")
 
     def test_profile_auto_created(self):
         self.assertTrue(hasattr(self.user, "profile"))
@@ -156,8 +174,9 @@ class UserRegisterFormTest(TestCase):
 
 
 class UserUpdateFormTest(TestCase):
-    def setUp(self):
-        self.user = User.objects.create_user(username="updateme", email="old@ex.com", password="pass")
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="updateme", email="old@ex.com", password="pass")
 
     def test_valid_update(self):
         form = UserUpdateForm(
@@ -214,9 +233,6 @@ class ProfileUpdateFormTest(TestCase):
 
 
 class RegisterViewTest(TestCase):
-    def setUp(self):
-        self.client = Client()
-
     def test_get_status_200(self):
         response = self.client.get(reverse("register"))
         self.assertEqual(response.status_code, 200)
@@ -297,9 +313,9 @@ class RegisterViewTest(TestCase):
 
 
 class ProfileViewTest(TestCase):
-    def setUp(self):
-        self.client = Client()
-        self.user = User.objects.create_user(username="profuser", email="prof@ex.com", password="pass")
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="profuser", email="prof@ex.com", password="pass")
 
     def test_get_requires_login(self):
         response = self.client.get(reverse("profile"))
@@ -368,3 +384,269 @@ class ProfileViewTest(TestCase):
             },
         )
         mock_messages.success.assert_called_once()
+
+
+# ══════════════════════════════════════════════════════
+#  5. PASSWORD HASHING  — політики та оновлення хешів
+# ══════════════════════════════════════════════════════
+
+PBKDF2_POLICY = ["users.hashers.TunedPBKDF2PasswordHasher", "users.hashers.TunedArgon2PasswordHasher"]
+ARGON2_POLICY = ["users.hashers.TunedArgon2PasswordHasher", "users.hashers.TunedPBKDF2PasswordHasher"]
+CHEAP_ARGON2 = {"PASSWORD_ARGON2_TIME_COST": 1, "PASSWORD_ARGON2_MEMORY_COST": 8, "PASSWORD_ARGON2_PARALLELISM": 1}
+
+
+@override_settings(PASSWORD_HASHERS=PBKDF2_POLICY, PASSWORD_PBKDF2_ITERATIONS=1000, **CHEAP_ARGON2)
+class PasswordHasherPolicyTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="hashme", password="pass1234")
+
+    def _login(self):
+        return self.client.post(reverse("login"), {"username": "hashme", "password": "pass1234"})
+
+    def test_iterations_taken_from_settings(self):
+        self.assertTrue(self.user.password.startswith("pbkdf2_sha256$1000$"))
+
+    def test_default_iterations_are_djangos(self):
+        with self.settings(PASSWORD_PBKDF2_ITERATIONS=None):
+            self.assertEqual(TunedPBKDF2PasswordHasher().iterations, PBKDF2PasswordHasher.iterations)
+
+    def test_login_rehashes_with_new_iterations(self):
+        with self.settings(PASSWORD_PBKDF2_ITERATIONS=1500):
+            response = self._login()
+        self.assertEqual(response.status_code, 302)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith("pbkdf2_sha256$1500$"))
+
+    def test_login_upgrades_to_argon2_policy(self):
+        with self.settings(PASSWORD_HASHERS=ARGON2_POLICY):
+            self._login()
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith("argon2$"))
+
+    def test_argon2_rehash_on_cost_change(self):
+        with self.settings(PASSWORD_HASHERS=ARGON2_POLICY):
+            self._login()
+            self.user.refresh_from_db()
+            old_hash = self.user.password
+            with self.settings(PASSWORD_ARGON2_MEMORY_COST=16):
+                self._login()
+        self.user.refresh_from_db()
+        self.assertNotEqual(self.user.password, old_hash)
+        self.assertIn("m=16", self.user.password)
+
+    def test_wrong_password_does_not_rehash(self):
+        with self.settings(PASSWORD_PBKDF2_ITERATIONS=1500):
+            self.client.post(reverse("login"), {"username": "hashme", "password": "wrong"})
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith("pbkdf2_sha256$1000$"))
+
+
+# ══════════════════════════════════════════════════════
+#  6. RATE LIMITING  — реєстрація, вхід, скидання пароля
+# ══════════════════════════════════════════════════════
+
+
+@override_settings(
+    RATELIMIT_ENABLED=True, RATELIMIT_RATES={"register": "2/h", "login": "3/m", "password-reset": "1/h"}
+)
+class AuthRateLimitTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_login_limited_per_ip(self):
+        data = {"username": "nobody", "password": "wrong"}
+        for _ in range(3):
+            self.assertEqual(self.client.post(reverse("login"), data).status_code, 200)
+        response = self.client.post(reverse("login"), data)
+        self.assertEqual(response.status_code, 429)
+        self.assertGreater(int(response["Retry-After"]), 0)
+        other = self.client.post(reverse("login"), data, REMOTE_ADDR="10.0.0.2")
+        self.assertEqual(other.status_code, 200)
+
+    def test_login_page_not_limited(self):
+        for _ in range(5):
+            self.assertEqual(self.client.get(reverse("login")).status_code, 200)
+
+    def test_register_limited(self):
+        for i in range(2):
+            self.client.post(reverse("register"), {"username": f"bot{i}"})
+        self.assertEqual(self.client.post(reverse("register"), {"username": "bot3"}).status_code, 429)
+
+    def test_password_reset_limited(self):
+        self.client.post(reverse("password_reset"), {"email": "a@example.com"})
+        response = self.client.post(reverse("password_reset"), {"email": "a@example.com"})
+        self.assertEqual(response.status_code, 429)
+
+
+# ══════════════════════════════════════════════════════
+#  7. MAIL QUEUE  — черга листів і доставка через SMTP
+# ══════════════════════════════════════════════════════
+
+QUEUE = "users.mail.QueuedEmailBackend"
+SMTP = "django.core.mail.backends.smtp.EmailBackend"
+
+
+@override_settings(EMAIL_BACKEND=QUEUE, MAIL_QUEUE_BACKEND=SMTP, MAIL_QUEUE_MAX_ATTEMPTS=3, MAIL_QUEUE_RETRY_DELAY=60)
+class MailQueueTest(TestCase):
+    def deliver(self, stub, **kwargs):
+        with self.settings(EMAIL_HOST=stub.host, EMAIL_PORT=stub.port):
+            return deliver_queued(**kwargs)
+
+    def test_backend_only_enqueues(self):
+        mail.send_mail("Тема ✓", "Тіло", "from@example.com", ["to@example.com"])
+        queued = QueuedEmail.objects.get()
+        self.assertEqual((queued.subject, queued.recipients, queued.status), ("Тема ✓", "to@example.com", "pending"))
+
+    def test_password_reset_does_not_touch_smtp(self):
+        User.objects.create_user(username="forgetful", email="forgetful@example.com", password="pass")
+        with SMTPStub() as stub, self.settings(EMAIL_HOST=stub.host, EMAIL_PORT=stub.port):
+            response = self.client.post(reverse("password_reset"), {"email": "forgetful@example.com"})
+            self.assertEqual(response.status_code, 302)
+            self.assertEqual(stub.connections, 0)
+        self.assertEqual(QueuedEmail.objects.count(), 1)
+
+    def test_batch_shares_one_connection(self):
+        for i in range(3):
+            mail.send_mail(f"Лист {i}", "Тіло ✓", "from@example.com", [f"user{i}@example.com"])
+        with SMTPStub() as stub:
+            self.assertEqual(self.deliver(stub), (3, 0))
+        self.assertEqual(stub.connections, 1)
+        self.assertIn("Тіло ✓".encode(), stub.messages[0][2])
+        self.assertEqual(QueuedEmail.objects.filter(status=QueuedEmail.SENT).count(), 3)
+
+    def test_bcc_only_in_envelope(self):
+        mail.EmailMessage("Тема", "Тіло", "from@example.com", ["to@example.com"], bcc=["hidden@example.com"]).send()
+        with SMTPStub() as stub:
+            self.deliver(stub)
+        sender, recipients, data = stub.messages[0]
+        self.assertEqual(recipients, ["to@example.com", "hidden@example.com"])
+        self.assertNotIn(b"hidden@example.com", data)
+
+    def test_failed_message_retried_with_backoff(self):
+        mail.send_mail("Перший", "Тіло", "from@example.com", ["a@example.com"])
+        mail.send_mail("Другий", "Тіло", "from@example.com", ["b@example.com"])
+        with SMTPStub(fail=1) as stub:
+            self.assertEqual(self.deliver(stub), (1, 1))
+            self.assertEqual(self.deliver(stub), (0, 0))  # повтор ще не настав
+            retry = QueuedEmail.objects.get(status=QueuedEmail.PENDING)
+            self.assertEqual(retry.attempts, 1)
+            self.assertIn("451", retry.last_error)
+            self.assertGreater(retry.next_attempt_at, timezone.now() + timezone.timedelta(seconds=50))
+            QueuedEmail.objects.update(next_attempt_at=timezone.now())
+            self.assertEqual(self.deliver(stub), (1, 0))
+        self.assertEqual(len(stub.messages), 2)
+
+    def test_gives_up_after_max_attempts(self):
+        mail.send_mail("Тема", "Тіло", "from@example.com", ["a@example.com"])
+        with SMTPStub(fail=10) as stub:
+            for _ in range(3):
+                QueuedEmail.objects.update(next_attempt_at=timezone.now())
+                self.deliver(stub)
+        self.assertEqual(QueuedEmail.objects.get().status, QueuedEmail.FAILED)
+
+    def test_unreachable_server_defers_whole_batch(self):
+        mail.send_mail("Тема", "Тіло", "from@example.com", ["a@example.com"])
+        mail.send_mail("Тема", "Тіло", "from@example.com", ["b@example.com"])
+        with SMTPStub() as stub:
+            pass  # сервер уже зупинено - порт закритий
+        self.assertEqual(self.deliver(stub), (0, 2))
+        self.assertEqual(QueuedEmail.objects.filter(attempts=1, status=QueuedEmail.PENDING).count(), 2)
+
+    def test_command_delivers(self):
+        mail.send_mail("Тема", "Тіло", "from@example.com", ["a@example.com"])
+        with SMTPStub() as stub, self.settings(EMAIL_HOST=stub.host, EMAIL_PORT=stub.port):
+            call_command("send_queued_mail", stdout=StringIO())
+        self.assertEqual(len(stub.messages), 1)
+
+
+# ══════════════════════════════════════════════════════
+#  8. IMAGE UPLOADS  — перевірка до декодування
+# ══════════════════════════════════════════════════════
+
+
+def png_with_header(width, height):
+    """Крихітний PNG, заголовок якого заявляє width x height пікселів"""
+
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 0, 0, 0, 0)
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", header)
+        + chunk(b"IDAT", zlib.compress(b"\0" * 1024))
+        + chunk(b"IEND", b"")
+    )
+
+
+def image_bytes(size, image_format="JPEG"):
+    buffer = BytesIO()
+    Image.new("RGB", size, "purple").save(buffer, format=image_format)
+    return buffer.getvalue()
+
+
+class ImageUploadTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="uploader", password="pass")
+
+    def form(self, content, name="avatar.png"):
+        upload = SimpleUploadedFile(name, content, content_type="image/png")
+        return ProfileUpdateForm(data={"bio": ""}, files={"image": upload}, instance=self.user.profile)
+
+    def test_huge_header_rejected_without_decoding(self):
+        with patch.object(Image.Image, "load") as load:
+            form = self.form(png_with_header(100_000, 100_000))
+            self.assertFalse(form.is_valid())
+        load.assert_not_called()
+        self.assertEqual(form.errors.as_data()["image"][0].code, "image_too_large")
+
+    def test_pixel_limit_reported_with_dimensions(self):
+        form = self.form(png_with_header(5000, 4000))
+        self.assertFalse(form.is_valid())
+        self.assertIn("5000x4000", form.errors["image"][0])
+
+    @override_settings(PROFILE_IMAGE_MAX_BYTES=100)
+    def test_file_size_checked_first(self):
+        with patch("users.images.read_header") as read_header:
+            form = self.form(image_bytes((64, 64)), "avatar.jpg")
+            self.assertFalse(form.is_valid())
+        read_header.assert_not_called()
+        self.assertEqual(form.errors.as_data()["image"][0].code, "file_too_large")
+
+    def test_garbage_and_truncated_files_rejected(self):
+        for content in (b"not an image at all", image_bytes((64, 64))[:40]):
+            with self.subTest(content=content[:10]):
+                self.assertFalse(self.form(content).is_valid())
+
+    def test_unsupported_format_rejected(self):
+        form = self.form(image_bytes((64, 64), "BMP"), "avatar.bmp")
+        self.assertEqual(form.errors.as_data()["image"][0].code, "invalid_format")
+
+    def test_normal_photo_accepted(self):
+        self.assertTrue(self.form(image_bytes((1200, 900)), "avatar.jpg").is_valid())
+
+    def test_thumbnail_decodes_reduced_and_skips_small(self):
+        path = os.path.join(tempfile.mkdtemp(), "avatar.jpg")
+        with open(path, "wb") as file:
+            file.write(image_bytes((2400, 1800)))
+        with patch.object(JpegImageFile, "draft", autospec=True, side_effect=JpegImageFile.draft) as draft:
+            self.assertTrue(make_thumbnail(path, 300))
+        # JPEG декодується вже зменшеним, ще до thumbnail
+        self.assertEqual(draft.call_args_list[0].args[1:], (None, (300, 300)))
+        with Image.open(path) as image:
+            self.assertEqual((image.format, image.size), ("JPEG", (300, 225)))
+        with patch.object(Image.Image, "load") as load:
+            self.assertFalse(make_thumbnail(path, 300))
+        load.assert_not_called()
+
+    @override_settings(PROFILE_IMAGE_PROCESSING=True)
+    def test_profile_upload_resized(self):
+        self.client.force_login(self.user)
+        upload = SimpleUploadedFile("avatar.jpg", image_bytes((800, 600)), content_type="image/jpeg")
+        data = {"username": "uploader", "email": "uploader@example.com", "bio": "", "image": upload}
+        response = self.client.post(reverse("profile"), data)
+        self.assertRedirects(response, reverse("profile"))
+        self.user.profile.refresh_from_db()
+        self.assertEqual(self.user.profile.image.width, 300)
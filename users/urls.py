@@ -1,16 +1,24 @@
 from django.contrib.auth import views as auth_views
 from django.urls import path
 
+from blog_project.ratelimit import ratelimit
+
 from . import views
 
 urlpatterns = [
     path("register/", views.register, name="register"),
     path("profile/", views.profile, name="profile"),
-    path("login/", auth_views.LoginView.as_view(template_name="users/login.html"), name="login"),
+    path(
+        "login/",
+        ratelimit("login", key="ip")(auth_views.LoginView.as_view(template_name="users/login.html")),
+        name="login",
+    ),
     path("logout/", auth_views.LogoutView.as_view(template_name="users/logout.html"), name="logout"),
     path(
         "password-reset/",
-        auth_views.PasswordResetView.as_view(template_name="users/password_reset.html"),
+        ratelimit("password-reset", key="ip")(
+            auth_views.PasswordResetView.as_view(template_name="users/password_reset.html")
+        ),
         name="password_reset",
     ),
     path(
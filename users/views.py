@@ -2,9 +2,12 @@ from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import redirect, render
 
+from blog_project.ratelimit import ratelimit
+
 from .forms import ProfileUpdateForm, UserRegisterForm, UserUpdateForm
 
 
+@ratelimit("register", key="ip")
 def register(request):
     """Реєстрація нового користувача"""
     if request.method == "POST":